@@ -1,14 +1,70 @@
+import time
+from concurrent.futures import ProcessPoolExecutor
+
 from django.core.management.base import BaseCommand
 from django.contrib.auth import get_user_model
 
-from achievements.services.evaluator import evaluate_user_trophies
+
+def _init_worker():
+    import django
+    from django.apps import apps
+    from django.db import connections
+
+    if not apps.ready:
+        django.setup()
+    # Forked workers must not share the parent's database sockets.
+    connections.close_all()
+
+
+def _evaluate_shard(user_ids, commit):
+    from achievements.services.evaluator import evaluate_users
+
+    users = list(get_user_model().objects.filter(id__in=user_ids).only("id"))
+    return len(users), len(evaluate_users(users, {}, commit=commit))
 
 
 class Command(BaseCommand):
     help = "Evaluate trophies for all users"
 
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size", type=int, default=500,
+            help="Users evaluated together; queries are issued per batch, not per user.",
+        )
+        parser.add_argument(
+            "--workers", type=int, default=1,
+            help="Number of processes to shard batches across.",
+        )
+        parser.add_argument(
+            "--dry-run", action="store_true",
+            help="Evaluate without writing unlocks, e.g. for benchmarking.",
+        )
+
     def handle(self, *args, **options):
-        User = get_user_model()
-        for user in User.objects.all():
-            evaluate_user_trophies(user, {})
+        batch_size = max(1, options["batch_size"])
+        workers = max(1, options["workers"])
+        commit = not options["dry_run"]
+
+        user_ids = list(get_user_model().objects.order_by("id").values_list("id", flat=True))
+        batches = [user_ids[i:i + batch_size] for i in range(0, len(user_ids), batch_size)]
+
+        started = time.perf_counter()
+        if workers == 1:
+            results = [_evaluate_shard(batch, commit) for batch in batches]
+        else:
+            from django.db import connections
+
+            connections.close_all()
+            with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker) as pool:
+                results = list(pool.map(_evaluate_shard, batches, [commit] * len(batches)))
+        elapsed = time.perf_counter() - started
+
+        users = sum(count for count, _ in results)
+        unlocks = sum(count for _, count in results)
+        rate = users / elapsed if elapsed else float(users)
+        self.stdout.write(
+            f"{users} users in {elapsed:.2f}s ({rate:.0f} users/s) "
+            f"across {workers} worker(s); {unlocks} unlock(s)"
+            + (" (dry run)" if not commit else "")
+        )
         self.stdout.write(self.style.SUCCESS("Evaluated trophies."))
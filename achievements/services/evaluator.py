@@ -1,18 +1,21 @@
 from __future__ import annotations
 
-from datetime import timedelta
-from typing import Any, Dict, List
+from collections import defaultdict
+from datetime import datetime, timedelta
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
 
 from django.db import transaction
+from django.db.models import Max
 from django.utils import timezone
 
 from achievements.models import Trophy, TrophyUnlock
+from achievements.services import metrics
 
 
-# Placeholder metric reader. Real implementation would query existing models
-# for the given metric and window.
 def read_metric(user, metric: str, window: str, context: Dict[str, Any]) -> Any:
-    return 0
+    """Return the value of ``metric`` over ``window`` for a single user."""
+
+    return metrics.compute(metric, [user.pk], window)[user.pk]
 
 
 def compare(value: Any, comparator: str, threshold: Any) -> bool:
@@ -25,25 +28,34 @@ def compare(value: Any, comparator: str, threshold: Any) -> bool:
     return False
 
 
-def enforce_repeatable_and_cooldown(user, trophy: Trophy) -> bool:
-    if not trophy.repeatable:
-        return not TrophyUnlock.objects.filter(user=user, trophy=trophy).exists()
-    if trophy.cooldown == "none":
-        return True
+def parse_cooldown(cooldown: str) -> Optional[timedelta]:
+    if not cooldown or cooldown == "none":
+        return None
     try:
-        amount = int(trophy.cooldown[:-1])
-        unit = trophy.cooldown[-1]
+        amount = int(cooldown[:-1])
+        unit = cooldown[-1]
     except Exception:  # pragma: no cover - defensive
+        return None
+    return timedelta(days=amount) if unit == "d" else timedelta(hours=amount)
+
+
+def cooldown_allows(trophy: Trophy, latest: Optional[datetime], now: datetime) -> bool:
+    """Decide from the user's latest unlock whether ``trophy`` may unlock again."""
+
+    if latest is None:
         return True
-    delta = timedelta(days=amount) if unit == "d" else timedelta(hours=amount)
+    if not trophy.repeatable:
+        return False
+    delta = parse_cooldown(trophy.cooldown)
+    return delta is None or now - latest >= delta
+
+
+def enforce_repeatable_and_cooldown(user, trophy: Trophy) -> bool:
     latest = (
         TrophyUnlock.objects.filter(user=user, trophy=trophy)
-        .order_by("-earned_at")
-        .first()
+        .aggregate(latest=Max("earned_at"))["latest"]
     )
-    if not latest:
-        return True
-    return timezone.now() - latest.earned_at >= delta
+    return cooldown_allows(trophy, latest, timezone.now())
 
 
 @transaction.atomic
@@ -54,12 +66,68 @@ def grant(user, trophy: Trophy, context: Dict[str, Any]) -> TrophyUnlock:
     return unlock
 
 
-def evaluate_user_trophies(user, context: Dict[str, Any] | None = None) -> List[TrophyUnlock]:
+def latest_unlocks(user_ids: Iterable) -> Dict[Tuple[object, str], datetime]:
+    """Return ``{(user_id, trophy_id): latest earned_at}`` in one query."""
+
+    rows = (
+        TrophyUnlock.objects.filter(user_id__in=list(user_ids))
+        .values("user_id", "trophy_id")
+        .annotate(latest=Max("earned_at"))
+    )
+    return {(row["user_id"], row["trophy_id"]): row["latest"] for row in rows}
+
+
+def evaluate_users(
+    users: Sequence,
+    context: Dict[str, Any] | None = None,
+    *,
+    trophies: Sequence[Trophy] | None = None,
+    commit: bool = True,
+) -> List[TrophyUnlock]:
+    """Evaluate every trophy for a batch of users.
+
+    The number of queries depends on the number of distinct
+    ``(metric, window)`` pairs, not on the number of users: each pair is
+    computed for the whole batch at once, students are resolved once for
+    every metric that needs them, cooldowns are checked against one
+    prefetched latest-unlock map and new unlocks are written with a single
+    ``bulk_create``.
+    """
+
     context = context or {}
+    trophies = list(Trophy.objects.all()) if trophies is None else list(trophies)
+    user_ids = [user.pk for user in users]
+    if not user_ids or not trophies:
+        return []
+
+    now = timezone.now()
+    by_metric: Dict[Tuple[str, str], List[Trophy]] = defaultdict(list)
+    for trophy in trophies:
+        if trophy.metric in metrics.PROVIDERS:
+            by_metric[(trophy.metric, trophy.window)].append(trophy)
+    if not by_metric:
+        return []
+
+    latest = latest_unlocks(user_ids)
+    learners = metrics.Learners(user_ids)
     unlocks: List[TrophyUnlock] = []
-    for trophy in Trophy.objects.all():
-        value = read_metric(user, trophy.metric, trophy.window, context)
-        if compare(value, trophy.comparator, trophy.threshold):
-            if enforce_repeatable_and_cooldown(user, trophy):
-                unlocks.append(grant(user, trophy, context))
+    for (metric, window), group in by_metric.items():
+        values = metrics.compute(metric, learners, window, now)
+        for user_id in user_ids:
+            value = values[user_id]
+            for trophy in group:
+                if not compare(value, trophy.comparator, trophy.threshold):
+                    continue
+                if not cooldown_allows(trophy, latest.get((user_id, trophy.pk)), now):
+                    continue
+                unlocks.append(
+                    TrophyUnlock(user_id=user_id, trophy=trophy, context=context)
+                )
+
+    if commit and unlocks:
+        TrophyUnlock.objects.bulk_create(unlocks, ignore_conflicts=True)
     return unlocks
+
+
+def evaluate_user_trophies(user, context: Dict[str, Any] | None = None) -> List[TrophyUnlock]:
+    return evaluate_users([user], context)
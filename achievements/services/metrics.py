@@ -0,0 +1,199 @@
+"""Metric providers for trophy evaluation.
+
+A provider computes one metric for a whole batch of users with a single
+grouped aggregate query and returns ``{user_id: value}``. Providers are
+registered by name with :func:`metric`; ``Trophy.metric`` selects one and
+``Trophy.window`` limits the rows it aggregates.
+
+Providers receive the batch as ``Learners``. Tables keyed by student are
+filtered on the batch's student ids, resolved from ``Student.user`` once per
+batch (see ``learning.student_users``), instead of joining through
+``Student`` in every metric query.
+"""
+
+from __future__ import annotations
+
+from datetime import datetime, timedelta
+from functools import cached_property
+from typing import Callable, Dict, Iterable, Optional
+
+from django.db.models import Count, Q, Sum
+from django.utils import timezone
+
+from achievements.models import TrophyUnlock
+from learning.models import AssignmentAttempt, AssignmentWordStat, PointsLedgerEntry, Progress, Student
+from learning.student_users import student_ids_for_users
+
+
+class Learners:
+    """The users of one evaluation batch."""
+
+    def __init__(self, user_ids: Iterable[int]) -> None:
+        self.user_ids = list(user_ids)
+
+    @cached_property
+    def students(self) -> Dict[object, int]:
+        """``{student_id: user_id}``, loaded with one query on first use."""
+        return {student_id: user_id for user_id, student_id in student_ids_for_users(self.user_ids).items()}
+
+    def by_user(self, rows) -> Dict[int, float]:
+        """Re-key ``(student_id, value)`` rows by user id."""
+        return {self.students[student_id]: value or 0 for student_id, value in rows}
+
+
+# Called with the batch and the window start (or None).
+Provider = Callable[[Learners, Optional[datetime]], Dict[int, float]]
+
+PROVIDERS: Dict[str, Provider] = {}
+
+_STUDENT_COLUMNS = (
+    "total_points",
+    "weekly_points",
+    "monthly_points",
+    "current_streak",
+    "highest_streak",
+    "assignments_completed",
+    "flashcard_games_played",
+    "match_up_games_played",
+    "destroy_wall_games_played",
+)
+
+
+def metric(name: str) -> Callable[[Provider], Provider]:
+    """Register ``func`` as the provider for metric ``name``."""
+
+    def decorator(func: Provider) -> Provider:
+        PROVIDERS[name] = func
+        return func
+
+    return decorator
+
+
+def window_start(window: str, now: Optional[datetime] = None) -> Optional[datetime]:
+    """Translate a trophy window (``none``, ``week``, ``month``, ``7d``, ``12h``)."""
+
+    now = now or timezone.now()
+    window = (window or "none").strip().lower()
+    if window in ("", "none", "all", "lifetime"):
+        return None
+    if window in ("day", "today"):
+        return now.replace(hour=0, minute=0, second=0, microsecond=0)
+    if window == "week":
+        start = now - timedelta(days=now.weekday())
+        return start.replace(hour=0, minute=0, second=0, microsecond=0)
+    if window == "month":
+        return now.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+    try:
+        amount, unit = int(window[:-1]), window[-1]
+    except ValueError:
+        return None
+    if unit == "d":
+        return now - timedelta(days=amount)
+    if unit == "h":
+        return now - timedelta(hours=amount)
+    return None
+
+
+def compute(
+    name: str, learners, window: str = "none", now: Optional[datetime] = None
+) -> Dict[int, float]:
+    """Return ``{user_id: value}`` for every user; unknown metrics read as 0.
+
+    ``learners`` is a ``Learners`` batch or an iterable of user ids; pass the
+    same ``Learners`` for several metrics to resolve students only once.
+    """
+
+    if not isinstance(learners, Learners):
+        learners = Learners(learners)
+    values = dict.fromkeys(learners.user_ids, 0)
+    provider = PROVIDERS.get(name)
+    if provider is not None and learners.user_ids:
+        values.update(provider(learners, window_start(window, now)))
+    return values
+
+
+def _by_user(rows) -> Dict[int, float]:
+    return {user_id: value or 0 for user_id, value in rows}
+
+
+def _student_column(field: str) -> Provider:
+    def provider(learners, since):
+        return _by_user(Student.objects.filter(user_id__in=learners.user_ids).values_list("user_id", field))
+
+    return provider
+
+
+for _field in _STUDENT_COLUMNS:
+    metric(_field)(_student_column(_field))
+
+
+@metric("points_earned")
+def points_earned(learners, since):
+    entries = PointsLedgerEntry.objects.filter(student_id__in=list(learners.students))
+    if since is not None:
+        entries = entries.filter(created_at__gte=since)
+    rows = entries.values("student_id").annotate(value=Sum("amount"))
+    return learners.by_user(rows.values_list("student_id", "value"))
+
+
+def _attempt_totals(learners, since):
+    """Per-student attempts, correct answers and assignments attempted.
+
+    Lifetime totals come from the ``AssignmentWordStat`` rollup, which keeps
+    counting attempts after ``learning.attempt_archive`` moves them out of
+    the table. Windows read the raw attempts; archival leaves the last month
+    of them in place.
+    """
+    if since is None:
+        rows = AssignmentWordStat.objects.filter(student_id__in=list(learners.students), attempts__gt=0)
+        total, correct = Sum("attempts"), Sum("correct")
+    else:
+        rows = AssignmentAttempt.objects.filter(student_id__in=list(learners.students), timestamp__gte=since)
+        total, correct = Count("id"), Count("id", filter=Q(is_correct=True))
+    return rows.values("student_id").annotate(
+        total=total, correct=correct, assignments=Count("assignment", distinct=True)
+    )
+
+
+@metric("attempts")
+def attempts(learners, since):
+    return learners.by_user((row["student_id"], row["total"]) for row in _attempt_totals(learners, since))
+
+
+@metric("correct_answers")
+def correct_answers(learners, since):
+    return learners.by_user((row["student_id"], row["correct"]) for row in _attempt_totals(learners, since))
+
+
+@metric("accuracy")
+def accuracy(learners, since):
+    return learners.by_user(
+        (row["student_id"], 100.0 * row["correct"] / row["total"])
+        for row in _attempt_totals(learners, since)
+        if row["total"]
+    )
+
+
+@metric("assignments_attempted")
+def assignments_attempted(learners, since):
+    return learners.by_user(
+        (row["student_id"], row["assignments"]) for row in _attempt_totals(learners, since)
+    )
+
+
+@metric("words_reviewed")
+def words_reviewed(learners, since):
+    progress = Progress.objects.filter(student_id__in=learners.user_ids, review_count__gt=0)
+    if since is not None:
+        progress = progress.filter(last_seen__gte=since)
+    rows = progress.values("student_id").annotate(value=Count("id"))
+    return _by_user(rows.values_list("student_id", "value"))
+
+
+@metric("trophies_unlocked")
+def trophies_unlocked(learners, since):
+    unlocks = TrophyUnlock.objects.filter(user_id__in=learners.user_ids)
+    if since is not None:
+        unlocks = unlocks.filter(earned_at__gte=since)
+    rows = unlocks.values("user_id").annotate(value=Count("id"))
+    return _by_user(rows.values_list("user_id", "value"))
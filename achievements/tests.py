@@ -1,6 +1,9 @@
+from datetime import timedelta
+
 from django.core.management import call_command
 from django.contrib.auth import get_user_model
 from django.test import TestCase
+from django.utils import timezone
 from rest_framework.test import APIClient
 
 from achievements.models import Trophy
@@ -28,3 +31,100 @@ class TrophyAPITests(TestCase):
         resp = self.client.get("/api/achievements/unlocks/")
         self.assertEqual(resp.status_code, 200)
         self.assertEqual(resp.json(), [])
+
+
+class TrophyEvaluationTests(TestCase):
+    def setUp(self) -> None:
+        from datetime import date
+
+        from learning.models import School, Student
+
+        school = School.objects.create(name="Eval School")
+        User = get_user_model()
+        self.users = []
+        self.students = []
+        for idx, points in enumerate([50, 150, 300]):
+            username = f"learner{idx}"
+            user = User.objects.create_user(username=username, password="p")
+            student = Student.objects.create(
+                user=user,
+                school=school,
+                first_name="L",
+                last_name=str(idx),
+                year_group=7,
+                date_of_birth=date(2012, 1, 1),
+                username=username,
+                password="1234",
+                total_points=points,
+            )
+            self.users.append(user)
+            self.students.append(student)
+        defaults = {"category": "Progress", "trigger_type": "event", "comparator": "gte", "window": "none"}
+        self.hundred = Trophy.objects.create(
+            id="hundred", name="Hundred", metric="total_points", threshold=100, **defaults
+        )
+        self.two_hundred = Trophy.objects.create(
+            id="two-hundred", name="Two Hundred", metric="total_points", threshold=200, **defaults
+        )
+        self.repeatable = Trophy.objects.create(
+            id="daily", name="Daily", metric="total_points", threshold=1,
+            repeatable=True, cooldown="1d", **defaults
+        )
+        Trophy.objects.create(id="unknown", name="Unknown", metric="", threshold=0, **{**defaults, "comparator": "eq"})
+
+    def test_batch_uses_constant_queries_and_bulk_insert(self) -> None:
+        from achievements.services.evaluator import evaluate_users
+
+        # trophies, latest-unlock map, one metric query, one insert
+        with self.assertNumQueries(4):
+            unlocks = evaluate_users(self.users)
+        earned = {(u.user_id, u.trophy_id) for u in unlocks}
+        self.assertEqual(len(earned), 6)
+        self.assertIn((self.users[2].id, "two-hundred"), earned)
+        self.assertNotIn((self.users[0].id, "hundred"), earned)
+
+    def test_student_metrics_share_one_student_lookup(self) -> None:
+        from achievements.services.evaluator import evaluate_users
+        from learning.models import PointsLedgerEntry
+
+        PointsLedgerEntry.objects.create(student=self.students[0], amount=40)
+        PointsLedgerEntry.objects.create(student=self.students[0], amount=30)
+        defaults = {"category": "Progress", "trigger_type": "event", "comparator": "gte", "window": "none"}
+        trophies = [
+            Trophy.objects.create(id="earner", name="Earner", metric="points_earned", threshold=60, **defaults),
+            Trophy.objects.create(id="tryer", name="Tryer", metric="attempts", threshold=1, **defaults),
+        ]
+
+        # latest-unlock map, students, one query per metric
+        with self.assertNumQueries(4):
+            unlocks = evaluate_users(self.users, trophies=trophies, commit=False)
+        self.assertEqual([(u.user_id, u.trophy_id) for u in unlocks], [(self.users[0].id, "earner")])
+
+    def test_non_repeatable_and_cooldown_are_respected(self) -> None:
+        from achievements.models import TrophyUnlock
+        from achievements.services.evaluator import evaluate_users
+
+        evaluate_users(self.users)
+        self.assertEqual(evaluate_users(self.users), [])
+
+        TrophyUnlock.objects.filter(trophy=self.repeatable).update(
+            earned_at=timezone.now() - timedelta(days=2)
+        )
+        again = evaluate_users(self.users)
+        self.assertEqual({u.trophy_id for u in again}, {"daily"})
+        self.assertEqual(TrophyUnlock.objects.filter(trophy=self.repeatable).count(), 6)
+
+    def test_read_metric_uses_provider(self) -> None:
+        from achievements.services.evaluator import read_metric
+
+        self.assertEqual(read_metric(self.users[1], "total_points", "none", {}), 150)
+        self.assertEqual(read_metric(self.users[1], "missing", "none", {}), 0)
+
+    def test_command_reports_throughput(self) -> None:
+        from io import StringIO
+
+        out = StringIO()
+        call_command("evaluate_trophies", "--batch-size", "2", stdout=out)
+        self.assertIn("3 users", out.getvalue())
+        self.assertIn("users/s", out.getvalue())
+        self.assertIn("6 unlock(s)", out.getvalue())
@@ -1,4 +1,4 @@
-import React, { useEffect, useMemo, useState } from "react";
+import React, { useEffect, useMemo, useRef, useState } from "react";
 
 import { createLiveApi } from "../api";
 import { useLiveGameSocket } from "../hooks/useLiveGameSocket";
@@ -7,6 +7,10 @@ import MiniLeaderboard from "./MiniLeaderboard";
 
 const { createElement } = React;
 
+// How long to wait for an ANSWER_RESULT before retrying over HTTP; the
+// server rejects a duplicate if the socket answer did get through.
+const SOCKET_ANSWER_TIMEOUT_MS = 4000;
+
 function buildWsUrl(baseUrl, path) {
   if (baseUrl) {
     return `${baseUrl.replace(/\/$/, "")}${path}`;
@@ -19,6 +23,31 @@ function buildWsUrl(baseUrl, path) {
   return `${wsProtocol}//${host}${path}`;
 }
 
+// Server clock minus ours, from the state response with the shortest round
+// trip; the request is assumed to reach the server halfway through it.
+export function clockSample(serverTime, sentAt, receivedAt) {
+  const server = Date.parse(serverTime);
+  if (Number.isNaN(server)) {
+    return null;
+  }
+  return {
+    offsetMs: server - (sentAt + receivedAt) / 2,
+    roundTripMs: receivedAt - sentAt,
+  };
+}
+
+// Delay before showing a question so that it appears at the server's
+// revealAt, not revealInMs after a late frame arrived. Without a clock
+// estimate this falls back to the relative lead.
+export function revealDelayMs(event, clock, now = Date.now()) {
+  const lead = Math.max(0, event.revealInMs ?? 0);
+  const revealAt = Date.parse(event.revealAt);
+  if (!clock || Number.isNaN(revealAt)) {
+    return lead;
+  }
+  return Math.min(Math.max(revealAt - clock.offsetMs - now, 0), lead);
+}
+
 function FallbackQuestion({ payload, onSubmit, context }) {
   const [answer, setAnswer] = useState("");
 
@@ -81,28 +110,74 @@ export function StudentLiveGameView({
     [sessionId, wsBaseUrl]
   );
 
-  useLiveGameSocket(wsUrl, {
+  const revealTimerRef = useRef(null);
+  useEffect(() => () => clearTimeout(revealTimerRef.current), []);
+  const clockRef = useRef(null);
+  const requestState = request => {
+    const sentAt = Date.now();
+    return request().then(nextState => {
+      const sample = clockSample(nextState.server_time, sentAt, Date.now());
+      if (sample && (!clockRef.current || sample.roundTripMs < clockRef.current.roundTripMs)) {
+        clockRef.current = sample;
+      }
+      return nextState;
+    });
+  };
+  const pendingAnswersRef = useRef(new Map());
+  const nextRequestIdRef = useRef(0);
+
+  const { sendJson } = useLiveGameSocket(wsUrl, {
+    ANSWER_RESULT: event => {
+      const pending = pendingAnswersRef.current.get(event.requestId);
+      if (!pending) {
+        return;
+      }
+      pendingAnswersRef.current.delete(event.requestId);
+      clearTimeout(pending.timer);
+      if (event.accepted) {
+        pending.resolve(event);
+      } else {
+        pending.reject(new Error(event.detail || "Answer rejected"));
+      }
+    },
     QUESTION: event => {
       const typed = event || {};
-      setQuestionState({
-        payload: typed.payload ?? null,
-        deadlineAt: typed.deadlineAt ?? null,
-        locked: false,
-      });
-      setState(prev =>
-        prev
-          ? {
-              ...prev,
-              current_question_idx: typed.index ?? prev.current_question_idx,
-              started_at: typed.startedAt ?? prev.started_at,
-              deadline_at: typed.deadlineAt ?? prev.deadline_at,
-            }
-          : prev
-      );
+      const reveal = () => {
+        revealTimerRef.current = null;
+        setQuestionState({
+          payload: typed.payload ?? null,
+          deadlineAt: typed.deadlineAt ?? null,
+          locked: false,
+        });
+        setState(prev =>
+          prev
+            ? {
+                ...prev,
+                current_question_idx: typed.index ?? prev.current_question_idx,
+                started_at: typed.startedAt ?? prev.started_at,
+                deadline_at: typed.deadlineAt ?? prev.deadline_at,
+              }
+            : prev
+        );
+      };
+      // Questions arrive ahead of time and the answer clock starts at
+      // revealAt, so a frame that arrived late is shown sooner.
+      if (revealTimerRef.current) {
+        clearTimeout(revealTimerRef.current);
+      }
+      const delay = revealDelayMs(typed, clockRef.current);
+      if (delay > 0) {
+        revealTimerRef.current = setTimeout(reveal, delay);
+      } else {
+        reveal();
+      }
     },
     LEADERBOARD: event => {
       setLeaderboard(event.top ?? []);
-      setYou(event.you ?? null);
+    },
+    // Sent only to this participant, when a question closes.
+    YOU: event => {
+      setYou({ rank: event.rank, score: event.score, streak: event.streak });
     },
     GAME_ENDED: () => {
       setQuestionState(prev => ({ ...prev, locked: true }));
@@ -114,8 +189,7 @@ export function StudentLiveGameView({
       return;
     }
     let cancelled = false;
-    api
-      .fetchState(sessionId)
+    requestState(() => api.fetchState(sessionId))
       .then(nextState => {
         if (cancelled) {
           return;
@@ -137,8 +211,7 @@ export function StudentLiveGameView({
   const joinSession = () => {
     setJoining(true);
     setError(null);
-    api
-      .joinSession(sessionId)
+    requestState(() => api.joinSession(sessionId))
       .then(nextState => {
         setJoined(true);
         setState(nextState);
@@ -153,17 +226,39 @@ export function StudentLiveGameView({
       });
   };
 
+  // Resolves with the server's verdict, or null if the socket could not be used.
+  const submitOverSocket = payload =>
+    new Promise((resolve, reject) => {
+      nextRequestIdRef.current += 1;
+      const requestId = `answer-${nextRequestIdRef.current}`;
+      const sent = sendJson({ type: "ANSWER", requestId, ...payload });
+      if (!sent) {
+        resolve(null);
+        return;
+      }
+      const timer = setTimeout(() => {
+        pendingAnswersRef.current.delete(requestId);
+        resolve(null);
+      }, SOCKET_ANSWER_TIMEOUT_MS);
+      pendingAnswersRef.current.set(requestId, { resolve, reject, timer });
+    });
+
   const handleSubmit = async answerPayload => {
     if (!state) {
       return;
     }
     setSubmissionError(null);
     setQuestionState(prev => ({ ...prev, locked: true }));
+    const payload = {
+      questionIndex: state.current_question_idx,
+      answerPayload,
+    };
     try {
-      const response = await api.submitAnswer(sessionId, {
-        questionIndex: state.current_question_idx,
-        answerPayload,
-      });
+      const response =
+        (await submitOverSocket(payload)) ?? (await api.submitAnswer(sessionId, payload));
+      if (response.you) {
+        setYou(response.you);
+      }
       if (onAnswerAccepted) {
         onAnswerAccepted(response);
       }
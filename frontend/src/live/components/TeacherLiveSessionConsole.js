@@ -66,7 +66,6 @@ export function TeacherLiveSessionConsole({
     },
     LEADERBOARD: event => {
       setLeaderboard(event.top ?? []);
-      setYou(event.you ?? null);
     },
     LOBBY_UPDATE: event => {
       const participants = Array.isArray(event.participants) ? event.participants : [];
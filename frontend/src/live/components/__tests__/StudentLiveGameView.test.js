@@ -3,7 +3,7 @@ import React from "react";
 import { jest } from "@jest/globals";
 import { fireEvent, render, screen, waitFor } from "@testing-library/react";
 
-import StudentLiveGameView from "../StudentLiveGameView";
+import StudentLiveGameView, { clockSample, revealDelayMs } from "../StudentLiveGameView";
 
 const initialState = {
   session_id: "session-1",
@@ -91,3 +91,26 @@ describe("StudentLiveGameView", () => {
     await waitFor(() => expect(screen.getByRole("alert")).toHaveTextContent("nope"));
   });
 });
+
+describe("revealDelayMs", () => {
+  const revealAt = "2026-01-01T12:00:01.000Z";
+  const event = { revealAt, revealInMs: 1000 };
+
+  it("shows a late frame at revealAt on the server clock", () => {
+    // Our clock runs 5s behind the server's; the frame arrived 700ms late.
+    const clock = clockSample(
+      "2026-01-01T12:00:00.000Z",
+      Date.parse("2026-01-01T11:59:54.900Z"),
+      Date.parse("2026-01-01T11:59:55.100Z")
+    );
+    expect(clock).toEqual({ offsetMs: 5000, roundTripMs: 200 });
+    expect(revealDelayMs(event, clock, Date.parse("2026-01-01T11:59:55.700Z"))).toBe(300);
+  });
+
+  it("clamps to the lead and falls back without a clock estimate", () => {
+    const clock = { offsetMs: 0, roundTripMs: 50 };
+    expect(revealDelayMs(event, clock, Date.parse("2026-01-01T12:00:05.000Z"))).toBe(0);
+    expect(revealDelayMs(event, clock, Date.parse("2026-01-01T11:59:00.000Z"))).toBe(1000);
+    expect(revealDelayMs(event, null)).toBe(1000);
+  });
+});
@@ -1,4 +1,4 @@
-import { useEffect, useRef, useState } from "react";
+import { useCallback, useEffect, useRef, useState } from "react";
 
 const CONNECTION_STATES = {
   IDLE: "idle",
@@ -86,7 +86,17 @@ export function useLiveGameSocket(url, handlers, { reconnectIntervalMs = 2000 }
     };
   }, [url, reconnectIntervalMs]);
 
-  return status;
+  // Returns false when the socket is not open, so callers can fall back to HTTP.
+  const sendJson = useCallback(data => {
+    const ws = socketRef.current;
+    if (!ws || ws.readyState !== WebSocket.OPEN) {
+      return false;
+    }
+    ws.send(JSON.stringify(data));
+    return true;
+  }, []);
+
+  return { status, sendJson };
 }
 
 export default useLiveGameSocket;
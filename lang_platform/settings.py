@@ -64,6 +64,7 @@ INSTALLED_APPS = [
 
 # Middleware
 MIDDLEWARE = [
+    'learning.instrumentation.PerformanceMiddleware',
     'django.middleware.security.SecurityMiddleware',
     "whitenoise.middleware.WhiteNoiseMiddleware",  # ✅ Add this here
     'django.contrib.sessions.middleware.SessionMiddleware',
@@ -102,6 +103,13 @@ REDIS_URL = os.getenv("REDIS_URL")
 GAME_PIN_LENGTH = int(os.getenv("GAME_PIN_LENGTH", "6"))
 QUESTION_TIME_DEFAULT = int(os.getenv("QUESTION_TIME_DEFAULT", "20"))
 GAME_MAX_CLASS_SIZE = int(os.getenv("GAME_MAX_CLASS_SIZE", "200"))
+# Where running live games keep scores and answers; see live/state.py.
+LIVE_GAME_STATE_BACKEND = os.getenv("LIVE_GAME_STATE_BACKEND", "redis" if REDIS_URL else "database")
+LIVE_FLUSH_BATCH_SIZE = int(os.getenv("LIVE_FLUSH_BATCH_SIZE", "500"))
+# Leaderboard frames are coalesced to one per interval; see live/broadcasts.py.
+LIVE_LEADERBOARD_INTERVAL_MS = int(os.getenv("LIVE_LEADERBOARD_INTERVAL_MS", "500"))
+# Questions are pushed this long before clients reveal them.
+LIVE_REVEAL_LEAD_MS = int(os.getenv("LIVE_REVEAL_LEAD_MS", "1000"))
 
 CHANNEL_LAYERS = {
     "default": {
@@ -112,6 +120,23 @@ CHANNEL_LAYERS = {
     }
 }
 
+# Dashboard, student home and analytics caches are invalidated by version
+# tokens stored here, so every worker must share it. Local memory is only for
+# single-process development and tests.
+if REDIS_URL:
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.redis.RedisCache",
+            "LOCATION": REDIS_URL,
+        }
+    }
+else:
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        }
+    }
+
 # Database Configuration
 DATABASE_URL = os.getenv("DATABASE_URL")
 if DATABASE_URL:
@@ -178,3 +203,8 @@ Q_CLUSTER = {
     "ack_failures": True,
     "orm": "default",
 }
+
+# The nightly attempt archival (learning.attempt_archive) deletes raw attempts
+# once they are written to the default storage. Only turn it on where that
+# storage survives a redeploy (a persistent MEDIA_ROOT or object storage).
+ATTEMPT_ARCHIVE_ENABLED = os.getenv("ATTEMPT_ARCHIVE_ENABLED", "").lower() in {"1", "true", "yes"}
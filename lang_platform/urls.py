@@ -157,6 +157,22 @@ urlpatterns = [
         views_api.api_export_progress,
         name="api_export_progress",
     ),
+    path("api/exports/<uuid:job_id>/", views_api.api_export_job_status, name="api_export_job_status"),
+    path(
+        "api/exports/<uuid:job_id>/download/",
+        views_api.api_export_job_download,
+        name="api_export_job_download",
+    ),
+    path(
+        "api/classes/<uuid:class_id>/trends/words/",
+        views_api.api_class_word_trends,
+        name="api_class_word_trends",
+    ),
+    path(
+        "api/classes/<uuid:class_id>/trends/daily/",
+        views_api.api_class_daily_trend,
+        name="api_class_daily_trend",
+    ),
     path(
         "api/classes/<uuid:class_id>/attendance/one-off/",
         views_api.api_add_one_off_attendance,
@@ -25,6 +25,7 @@ from .models import (
     StudentCalendarEntry,
     TeacherNotification,
 )
+from .attempt_stats import delete_attempts
 
 @admin.register(Trophy)
 class TrophyAdmin(admin.ModelAdmin):
@@ -318,3 +319,9 @@ class AssignmentAttemptAdmin(admin.ModelAdmin):
     list_display = ('student', 'assignment', 'vocabulary_word', 'is_correct', 'timestamp')
     list_filter = ('is_correct', 'assignment', 'student')
     search_fields = ('student__username', 'assignment__name', 'vocabulary_word__word')
+
+    def delete_model(self, request, obj):
+        delete_attempts(AssignmentAttempt.objects.filter(pk=obj.pk))
+
+    def delete_queryset(self, request, queryset):
+        delete_attempts(queryset)
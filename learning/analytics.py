@@ -1,42 +1,201 @@
 from collections import defaultdict
+from dataclasses import dataclass
 import math
 import random
 import statistics
 
-from django.db.models import Case, Count, F, Q, Sum, When
-from django.db.models.functions import Coalesce
+from django.core.cache import cache
+from django.db.models import Count, Max, OuterRef, Subquery
 
 from .models import (
+    ArchivedAttemptSummary,
     Assignment,
     AssignmentAttempt,
     AssignmentProgress,
+    AssignmentWordStat,
+    Student,
     VocabularyWord,
 )
 
 
 # ---------- Core Aggregations ----------
+#
+# Everything below is derived from one read of the ``AssignmentWordStat``
+# rollup (see ``attempt_stats``), which holds a row per student, word and mode.
+# ``get_bundle`` caches the result under ``analytics_version``, so the API
+# endpoints and activity generators share it until attempts or the rollup
+# change.
 
-def _student_accuracy_map(assignment_id):
-    """Return mapping of student_id -> overall accuracy for the assignment."""
-    student_stats = (
-        AssignmentAttempt.objects
-        .filter(assignment_id=assignment_id)
-        .values("student_id")
-        .annotate(
-            total_attempts=Count("id"),
-            total_correct=Coalesce(Sum(Case(When(is_correct=True, then=1), default=0)), 0),
+ANALYTICS_CACHE_TIMEOUT = 60 * 60
+
+
+@dataclass
+class AnalyticsBundle:
+    """All per-assignment aggregates, computed together."""
+
+    word_stats: list
+    mode_breakdown: list
+    student_mastery: list
+    heatmap: dict
+    # student_id -> {"attempts": n, "correct": n}
+    student_totals: dict
+
+
+def _bundle_key(assignment_id, version):
+    return f"analytics:bundle:{assignment_id}:{version}"
+
+
+def analytics_version(assignment_id):
+    """A string that changes whenever the assignment's analytics would.
+
+    Made of the newest raw attempt id, the number of rollup rows and the
+    assignment's ``rollup_version``, read in one query: new attempts change
+    the id, cascade deletes of students or words drop rollup rows, and
+    attempts taken out of the rollup or a rebuild bump the version. It lives
+    in the database, so every worker agrees on it whatever the cache backend.
+    """
+    latest = (
+        AssignmentAttempt.objects.filter(assignment_id=OuterRef("pk"))
+        .order_by().values("assignment_id").annotate(latest=Max("id")).values("latest")
+    )
+    cells = (
+        AssignmentWordStat.objects.filter(assignment_id=OuterRef("pk"))
+        .order_by().values("assignment_id").annotate(cells=Count("id")).values("cells")
+    )
+    row = (
+        Assignment.objects.filter(pk=assignment_id)
+        .annotate(latest=Subquery(latest), cells=Subquery(cells))
+        .values_list("latest", "cells", "rollup_version")
+        .first()
+    ) or (None, None, 0)
+    return f"{row[0] or 0}-{row[1] or 0}-{row[2]}"
+
+
+def get_bundle(assignment_id, version=None):
+    """Return the cached ``AnalyticsBundle`` for ``assignment_id``.
+
+    Costs a single ``analytics_version`` query when the bundle is still
+    fresh; callers that already have the version can pass it in.
+    """
+    if version is None:
+        version = analytics_version(assignment_id)
+    key = _bundle_key(assignment_id, version)
+    bundle = cache.get(key)
+    if bundle is None:
+        bundle = build_bundle(assignment_id)
+        cache.set(key, bundle, ANALYTICS_CACHE_TIMEOUT)
+    return bundle
+
+
+def build_bundle(assignment_id):
+    """Build an ``AnalyticsBundle`` from one query over the rollup."""
+    cells = (
+        AssignmentWordStat.objects
+        .filter(assignment_id=assignment_id, attempts__gt=0)
+        .values_list(
+            "student_id",
+            "student__first_name",
+            "student__last_name",
+            "vocabulary_word_id",
+            "vocabulary_word__word",
+            "mode",
+            "attempts",
+            "correct",
         )
+        .order_by("student__last_name", "student__first_name", "student_id", "vocabulary_word_id")
+    )
+
+    names = {}
+    words = {}
+    per_student = defaultdict(lambda: [0, 0])
+    per_word = defaultdict(lambda: [0, 0])
+    per_mode = defaultdict(lambda: [0, 0])
+    per_student_word = defaultdict(lambda: [0, 0])
+    students_by_word = defaultdict(set)
+    struggling_by_word = defaultdict(set)
+
+    for sid, first_name, last_name, wid, word, mode, attempts, correct in cells:
+        names[sid] = f"{first_name} {last_name}".strip()
+        words[wid] = word
+        for totals in (per_student[sid], per_word[wid], per_mode[mode], per_student_word[sid, wid]):
+            totals[0] += attempts
+            totals[1] += correct
+        students_by_word[wid].add(sid)
+        if correct < attempts:
+            struggling_by_word[wid].add(sid)
+
+    student_scores = {
+        sid: (correct / attempts) if attempts else 0.0
+        for sid, (attempts, correct) in per_student.items()
+    }
+    discrimination_map = _point_biserial_for_words(per_student_word, student_scores)
+
+    stats = []
+    for wid, (attempts, correct) in per_word.items():
+        facility = (correct * 1.0) / attempts
+        stats.append({
+            "vocabulary_word": wid,
+            "word": words[wid],
+            "attempts": attempts,
+            "correct": correct,
+            "students_total": len(students_by_word[wid]),
+            "students_struggling": len(struggling_by_word[wid]),
+            "facility": facility,
+            "difficulty": 1.0 - facility,
+            "discrimination": float(discrimination_map.get(wid, 0.0)),
+        })
+    stats.sort(key=lambda row: (-row["difficulty"], -row["attempts"]))
+
+    modes = [
+        {
+            "mode": mode,
+            "attempts": attempts,
+            "correct": correct,
+            "facility": (correct * 1.0) / attempts,
+        }
+        for mode, (attempts, correct) in sorted(per_mode.items())
+    ]
+
+    mastery = {
+        sid: {"student_id": sid, "name": name, "words_aced": [], "needs_practice": []}
+        for sid, name in names.items()
+    }
+    grid_cells = []
+    for (sid, wid), (attempts, correct) in per_student_word.items():
+        acc = (correct * 1.0) / attempts
+        if attempts >= 3 and acc >= 0.8:
+            mastery[sid]["words_aced"].append(words[wid])
+        if attempts >= 2 and acc <= 0.5:
+            mastery[sid]["needs_practice"].append(words[wid])
+        grid_cells.append({
+            "student": str(sid),
+            "word": str(wid),
+            "attempts": attempts,
+            "correct": correct,
+            "accuracy": round(acc, 2),
+        })
+
+    return AnalyticsBundle(
+        word_stats=stats,
+        mode_breakdown=modes,
+        student_mastery=list(mastery.values()),
+        heatmap={
+            "students": {str(sid): name for sid, name in names.items()},
+            "words": {str(wid): word for wid, word in words.items()},
+            "cells": grid_cells,
+        },
+        student_totals={
+            sid: {"attempts": attempts, "correct": correct}
+            for sid, (attempts, correct) in per_student.items()
+        },
     )
-    scores = {}
-    for row in student_stats:
-        attempts = row["total_attempts"] or 0
-        correct = row["total_correct"] or 0
-        scores[row["student_id"]] = (correct / attempts) if attempts else 0.0
-    return scores
 
 
-def _point_biserial_for_words(assignment_id, student_scores):
-    """Compute point-biserial discrimination per word based on student scores."""
+def _point_biserial_for_words(per_student_word, student_scores):
+    """Compute point-biserial discrimination per word based on student scores.
+
+    ``per_student_word`` maps ``(student_id, word_id)`` to ``[attempts, correct]``.
+    """
     # Prepare accumulator for each word keyed by vocabulary_word_id
     per_word = defaultdict(lambda: {
         "correct_score_sum": 0.0,
@@ -45,22 +204,7 @@ def _point_biserial_for_words(assignment_id, student_scores):
         "incorrect_count": 0,
     })
 
-    # Aggregate attempts per student per word to determine success grouping
-    per_word_student = (
-        AssignmentAttempt.objects
-        .filter(assignment_id=assignment_id)
-        .values("vocabulary_word_id", "student_id")
-        .annotate(
-            attempts=Count("id"),
-            correct=Coalesce(Sum(Case(When(is_correct=True, then=1), default=0)), 0),
-        )
-    )
-
-    for row in per_word_student:
-        student_id = row["student_id"]
-        word_id = row["vocabulary_word_id"]
-        attempts = row["attempts"] or 0
-        correct = row["correct"] or 0
+    for (student_id, word_id), (attempts, correct) in per_student_word.items():
         if attempts == 0:
             continue
         score = student_scores.get(student_id, 0.0)
@@ -114,41 +258,7 @@ def word_stats(assignment_id):
       'discrimination': 0.19
     }, ...] (sorted hardest first)
     """
-    qs = (
-        AssignmentAttempt.objects
-        .filter(assignment_id=assignment_id)
-        .values("vocabulary_word", "vocabulary_word__word")
-        .annotate(
-            attempts=Count("id"),
-            correct=Coalesce(Sum(Case(When(is_correct=True, then=1), default=0)), 0),
-            students_total=Count("student", distinct=True),
-            students_struggling=Count("student", filter=Q(is_correct=False), distinct=True),
-        )
-        .annotate(
-            facility=(F("correct") * 1.0) / F("attempts"),
-            difficulty=1.0 - (F("correct") * 1.0) / F("attempts"),
-        )
-        .order_by("-difficulty", "-attempts")
-    )
-
-    student_scores = _student_accuracy_map(assignment_id)
-    discrimination_map = _point_biserial_for_words(assignment_id, student_scores)
-
-    results = []
-    for row in qs:
-        word_id = row["vocabulary_word"]
-        results.append({
-            "vocabulary_word": word_id,
-            "word": row["vocabulary_word__word"],
-            "attempts": row["attempts"],
-            "correct": row["correct"],
-            "students_total": row["students_total"],
-            "students_struggling": row["students_struggling"],
-            "facility": float(row["facility"]),
-            "difficulty": float(row["difficulty"]),
-            "discrimination": float(discrimination_map.get(word_id, 0.0)),
-        })
-    return results
+    return get_bundle(assignment_id).word_stats
 
 
 def mode_breakdown(assignment_id):
@@ -156,28 +266,7 @@ def mode_breakdown(assignment_id):
     Returns list of dicts per mode:
     [{'mode':'flashcards','attempts':20,'correct':13,'facility':0.65}, ...]
     """
-    qs = (
-        AssignmentAttempt.objects
-        .filter(assignment_id=assignment_id)
-        .values("mode")
-        .annotate(
-            attempts=Count("id"),
-            correct=Coalesce(Sum(Case(When(is_correct=True, then=1), default=0)), 0),
-        )
-        .annotate(
-            facility=(F("correct") * 1.0) / F("attempts")
-        )
-        .order_by("mode")
-    )
-    return [
-        {
-            "mode": row["mode"],
-            "attempts": row["attempts"],
-            "correct": row["correct"],
-            "facility": float(row["facility"]),
-        }
-        for row in qs
-    ]
+    return get_bundle(assignment_id).mode_breakdown
 
 
 def student_mastery(assignment_id):
@@ -186,38 +275,10 @@ def student_mastery(assignment_id):
     Aced: >=3 attempts and >=80% correct
     Needs practice: >=2 attempts and <=50% correct
     """
-    base = (
-        AssignmentAttempt.objects
-        .filter(assignment_id=assignment_id)
-        .values("student_id", "student__first_name", "student__last_name", "vocabulary_word__word")
-        .annotate(
-            attempts=Count("id"),
-            correct=Coalesce(Sum(Case(When(is_correct=True, then=1), default=0)), 0),
-        )
-    )
-
-    by_student = {}
-    for row in base:
-        sid = row["student_id"]
-        name = f"{row['student__first_name']} {row['student__last_name']}".strip()
-        student_bucket = by_student.setdefault(sid, {
-            "student_id": sid,
-            "name": name,
-            "words_aced": [],
-            "needs_practice": [],
-        })
-        attempts = row["attempts"] or 0
-        acc = (row["correct"] * 1.0) / attempts if attempts else 0.0
-        word = row["vocabulary_word__word"]
-        if attempts >= 3 and acc >= 0.8:
-            student_bucket["words_aced"].append(word)
-        if attempts >= 2 and acc <= 0.5:
-            student_bucket["needs_practice"].append(word)
+    return get_bundle(assignment_id).student_mastery
 
-    return list(by_student.values())
 
-
-def heatmap_data(assignment_id):
+def heatmap_data(assignment_id, version=None):
     """
     Returns JSON-serialisable mapping for heatmap grid.
     {
@@ -229,39 +290,41 @@ def heatmap_data(assignment_id):
         ]
     }
     """
-    grid = (
-        AssignmentAttempt.objects
-        .filter(assignment_id=assignment_id)
-        .values(
-            "student_id",
-            "student__first_name",
-            "student__last_name",
-            "vocabulary_word_id",
-            "vocabulary_word__word",
-        )
-        .annotate(
-            attempts=Count("id"),
-            correct=Coalesce(Sum(Case(When(is_correct=True, then=1), default=0)), 0),
-        )
-    )
+    return get_bundle(assignment_id, version).heatmap
 
-    students, words, cells = {}, {}, []
-    for row in grid:
-        sid = str(row["student_id"])
-        wid = str(row["vocabulary_word_id"])
-        attempts = row["attempts"] or 0
-        correct = row["correct"] or 0
-        students[sid] = f"{row['student__first_name']} {row['student__last_name']}".strip()
-        words[wid] = row["vocabulary_word__word"]
-        accuracy = (correct * 1.0) / attempts if attempts else 0.0
-        cells.append({
-            "student": sid,
-            "word": wid,
-            "attempts": attempts,
-            "correct": correct,
-            "accuracy": round(accuracy, 2),
-        })
-    return {"students": students, "words": words, "cells": cells}
+
+def heatmap_columnar(assignment_id, version=None):
+    """
+    Returns the heatmap as ordered axes and dense row-major arrays:
+    {
+        'students': {'ids': [sid, ...], 'names': ['Name', ...]},
+        'words': {'ids': [wid, ...], 'labels': ['word', ...]},
+        'attempts': [3, 0, ...],      # len(students) * len(words)
+        'accuracy': [0.33, None, ...],
+    }
+    Cell (i, j) is at index ``i * len(words) + j``; cells with no attempts
+    have 0 attempts and ``None`` accuracy.
+    """
+    heatmap = get_bundle(assignment_id, version).heatmap
+    student_ids = list(heatmap["students"])
+    word_ids = list(heatmap["words"])
+    rows = {sid: i for i, sid in enumerate(student_ids)}
+    columns = {wid: j for j, wid in enumerate(word_ids)}
+
+    width = len(word_ids)
+    attempts = [0] * (len(student_ids) * width)
+    accuracy = [None] * len(attempts)
+    for cell in heatmap["cells"]:
+        index = rows[cell["student"]] * width + columns[cell["word"]]
+        attempts[index] = cell["attempts"]
+        accuracy[index] = cell["accuracy"]
+
+    return {
+        "students": {"ids": student_ids, "names": list(heatmap["students"].values())},
+        "words": {"ids": word_ids, "labels": list(heatmap["words"].values())},
+        "attempts": attempts,
+        "accuracy": accuracy,
+    }
 
 
 def assignment_overview(assignment_id):
@@ -286,6 +349,122 @@ def assignment_overview(assignment_id):
     return output
 
 
+ATTEMPT_CHUNK_SIZE = 2000
+
+
+def attempt_cells(assignment_id, chunk_size=ATTEMPT_CHUNK_SIZE, raw=None):
+    """
+    Returns {(student_id, word_id): [attempts, correct, wrong_before_correct]}
+    for an assignment, in the order the cells were first attempted.
+
+    Order matters: a word's wrong answers only count until the student first
+    gets it right. Archived attempts (see ``attempt_archive``) come from their
+    summary rows; the raw attempts still in the table are streamed in
+    timestamp order as bare id tuples and folded in on top, so memory is
+    bounded by students x words rather than the number of attempts.
+    ``raw`` limits the raw attempts folded in to a queryset of them.
+    """
+    cells = {}
+    archived = (
+        ArchivedAttemptSummary.objects
+        .filter(assignment_id=assignment_id)
+        .order_by("position")
+        .values_list("student_id", "vocabulary_word_id", "attempts", "correct", "wrong_before_correct")
+    )
+    for sid, wid, attempts, correct, wrong_before in archived:
+        cells[(sid, wid)] = [attempts, correct, wrong_before]
+
+    if raw is None:
+        raw = AssignmentAttempt.objects.filter(assignment_id=assignment_id)
+    attempts = (
+        raw
+        .order_by("timestamp", "id")
+        .values_list("student_id", "vocabulary_word_id", "is_correct")
+        .iterator(chunk_size=chunk_size)
+    )
+    for sid, wid, is_correct in attempts:
+        cell = cells.get((sid, wid))
+        if cell is None:
+            cell = cells[(sid, wid)] = [0, 0, 0]
+        cell[0] += 1
+        if is_correct:
+            cell[1] += 1
+        elif not cell[1]:
+            cell[2] += 1
+    return cells
+
+
+def attempt_summaries(assignment_id, chunk_size=ATTEMPT_CHUNK_SIZE):
+    """
+    Returns (student_summary, word_summary, total_attempts, total_correct)
+    for the assignment analytics page.
+
+    Built from ``attempt_cells``; both summaries keep the order in which
+    students and words first appear.
+    """
+    total_attempts = total_correct = 0
+    students, words = {}, {}
+    for (sid, wid), (attempts, correct, wrong_before) in attempt_cells(assignment_id, chunk_size).items():
+        total_attempts += attempts
+        total_correct += correct
+
+        student_bucket = students.get(sid)
+        if student_bucket is None:
+            student_bucket = students[sid] = {"words": [], "attempts": 0, "correct": 0}
+        student_bucket["attempts"] += attempts
+        student_bucket["correct"] += correct
+        student_bucket["words"].append((wid, wrong_before, correct > 0))
+
+        word_bucket = words.get(wid)
+        if word_bucket is None:
+            word_bucket = words[wid] = {"wrong_attempts": 0, "total_attempts": 0, "students": 0}
+        word_bucket["total_attempts"] += attempts
+        if attempts > correct:
+            word_bucket["wrong_attempts"] += attempts - correct
+            word_bucket["students"] += 1
+
+    student_objects = Student.objects.in_bulk(list(students))
+    translations = dict(
+        VocabularyWord.objects.filter(id__in=list(words)).values_list("id", "translation")
+    )
+
+    student_summary = []
+    for sid, summary in students.items():
+        words_aced, attempts_wrong = [], []
+        for wid, wrong, aced in summary["words"]:
+            if aced:
+                words_aced.append(translations[wid])
+            if wrong > 0:
+                attempts_wrong.append((translations[wid], wrong))
+        attempts_wrong.sort(key=lambda item: item[1], reverse=True)
+
+        attempts_count = summary["attempts"]
+        correct_count = summary["correct"]
+        student_summary.append({
+            "student": student_objects[sid],
+            "words_aced": words_aced,
+            "attempts_wrong": attempts_wrong,
+            "total_attempts": attempts_count,
+            "correct_attempts": correct_count,
+            "accuracy": (correct_count / attempts_count * 100) if attempts_count else 0,
+        })
+
+    word_summary = []
+    for wid, summary in words.items():
+        total = summary["total_attempts"]
+        wrong = summary["wrong_attempts"]
+        word_summary.append({
+            "word": translations[wid],
+            "wrong_attempts": wrong,
+            "students_difficulty": summary["students"],
+            "difficulty_percentage": (wrong / total) * 100 if total else 0,
+            "facility_percentage": ((total - wrong) / total * 100) if total else 0,
+            "total_attempts": total,
+        })
+
+    return student_summary, word_summary, total_attempts, total_correct
+
+
 # ---------- Activity Generators (no schema changes) ----------
 
 def _get_vocab_dict(assignment_id):
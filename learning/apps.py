@@ -4,3 +4,10 @@ from django.apps import AppConfig
 class LearningConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'learning'
+
+    def ready(self):
+        from . import signals  # noqa: F401
+        from .services import exports  # noqa: F401  (registers export kinds)
+        from .instrumentation import install
+
+        install()
@@ -0,0 +1,249 @@
+"""Move attempt logs of finished assignments out of ``AssignmentAttempt``.
+
+``archive_assignment`` writes an assignment's raw attempts to gzipped JSONL
+chunks in the default storage (one ``AttemptArchive`` row per chunk), records
+the order-dependent per-student, per-word totals the analytics page needs in
+``ArchivedAttemptSummary`` and then deletes the raw rows. The
+``AssignmentWordStat`` rollup is left alone, so every analytics view and the
+lifetime trophy metrics keep counting them. ``restore_assignment`` puts the
+rows back for audits.
+
+Assignments become eligible once closed or ``ARCHIVE_AFTER`` past their
+deadline; ``archive_attempt_logs`` archives all of them. The nightly task
+only runs it when ``ATTEMPT_ARCHIVE_ENABLED`` is set, since archives written
+to an ephemeral filesystem would be lost with the raw rows already deleted.
+Attempts younger than ``KEEP_RECENT`` stay in the table, where windowed
+trophy metrics (up to a month) still find them.
+"""
+
+from __future__ import annotations
+
+import gzip
+import hashlib
+import io
+import json
+import logging
+import tempfile
+from datetime import timedelta
+from typing import Iterator, List, Optional
+
+from django.core.files import File
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import transaction
+from django.db.models import Exists, Max, OuterRef, Q
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from .analytics import attempt_cells
+from .class_trends import bucketed_attempt_id
+from .models import ArchivedAttemptSummary, Assignment, AssignmentAttempt, AttemptArchive
+
+
+logger = logging.getLogger(__name__)
+
+ARCHIVE_AFTER = timedelta(days=180)
+KEEP_RECENT = timedelta(days=35)
+ARCHIVE_CHUNK_SIZE = 50_000
+RESTORE_BATCH_SIZE = 2000
+SUMMARY_BATCH_SIZE = 2000
+
+_FIELDS = ("id", "student_id", "vocabulary_word_id", "mode", "is_correct", "timestamp")
+
+
+def archivable_assignments(now=None, older_than: timedelta = ARCHIVE_AFTER):
+    """Closed or long-expired assignments that still have raw attempts to archive."""
+
+    now = now or timezone.now()
+    cutoff = now - older_than
+    has_attempts = AssignmentAttempt.objects.filter(
+        assignment_id=OuterRef("pk"), timestamp__lt=now - KEEP_RECENT
+    )
+    return (
+        Assignment.objects.filter(Q(is_closed=True) | Q(deadline__lt=cutoff))
+        .filter(Exists(has_attempts))
+        .order_by("pk")
+    )
+
+
+def archive_assignment(
+    assignment: Assignment, chunk_size: int = ARCHIVE_CHUNK_SIZE, now=None,
+) -> int:
+    """Archive ``assignment``'s raw attempts and return how many were moved.
+
+    Attempts logged while the archive is being written (ids above the
+    snapshot taken at the start), not yet counted by the class trend
+    buckets, or younger than ``KEEP_RECENT`` stay in the table for a later
+    run. Running it again on an archived assignment adds new chunks and
+    refreshes the summaries.
+    """
+
+    # Attempts not yet folded into the class trend buckets wait for a later run.
+    candidates = AssignmentAttempt.objects.filter(
+        assignment=assignment,
+        id__lte=bucketed_attempt_id(),
+        timestamp__lt=(now or timezone.now()) - KEEP_RECENT,
+    )
+    upto_id = candidates.aggregate(latest=Max("id"))["latest"]
+    if upto_id is None:
+        return 0
+    archived = candidates.filter(id__lte=upto_id)
+
+    cells = attempt_cells(assignment.pk, raw=archived)
+    next_sequence = (
+        AttemptArchive.objects.filter(assignment=assignment).aggregate(last=Max("sequence"))["last"] or 0
+    ) + 1
+    archives = _write_chunks(assignment, archived, chunk_size, next_sequence)
+    moved = sum(archive.row_count for archive in archives)
+
+    try:
+        with transaction.atomic():
+            ArchivedAttemptSummary.objects.filter(assignment=assignment).delete()
+            ArchivedAttemptSummary.objects.bulk_create(
+                (
+                    ArchivedAttemptSummary(
+                        assignment=assignment,
+                        student_id=sid,
+                        vocabulary_word_id=wid,
+                        position=position,
+                        attempts=attempts,
+                        correct=correct,
+                        wrong_before_correct=wrong_before,
+                    )
+                    for position, ((sid, wid), (attempts, correct, wrong_before)) in enumerate(cells.items())
+                ),
+                batch_size=SUMMARY_BATCH_SIZE,
+            )
+            AttemptArchive.objects.bulk_create(archives)
+            # Attempts have no delete signals, so this is a single DELETE and
+            # the rollup keeps counting the rows.
+            archived.delete()
+            Assignment.objects.filter(pk=assignment.pk).update(attempts_archived_at=timezone.now())
+    except Exception:
+        for archive in archives:
+            archive.file.delete(save=False)
+        raise
+
+    logger.info("Archived %s attempts of assignment %s in %s chunk(s)", moved, assignment.pk, len(archives))
+    return moved
+
+
+def _write_chunks(assignment, attempts, chunk_size, sequence) -> List[AttemptArchive]:
+    rows = (
+        attempts
+        .order_by("id")
+        .values_list(*_FIELDS)
+        .iterator(chunk_size=min(chunk_size, 5000))
+    )
+    archives: List[AttemptArchive] = []
+    try:
+        chunk = []
+        for row in rows:
+            chunk.append(row)
+            if len(chunk) >= chunk_size:
+                archives.append(_write_chunk(assignment, sequence + len(archives), chunk))
+                chunk = []
+        if chunk:
+            archives.append(_write_chunk(assignment, sequence + len(archives), chunk))
+    except Exception:
+        for archive in archives:
+            archive.file.delete(save=False)
+        raise
+    return archives
+
+
+def _write_chunk(assignment, sequence, rows) -> AttemptArchive:
+    digest = hashlib.sha256()
+    with tempfile.TemporaryFile() as spool:
+        with gzip.GzipFile(fileobj=spool, mode="wb") as compressed:
+            for row in rows:
+                record = dict(zip(_FIELDS, row))
+                # Full precision; DjangoJSONEncoder would cut microseconds.
+                record["timestamp"] = record["timestamp"].isoformat()
+                line = json.dumps(record, cls=DjangoJSONEncoder, separators=(",", ":"))
+                compressed.write(line.encode() + b"\n")
+        spool.seek(0)
+        for block in iter(lambda: spool.read(64 * 1024), b""):
+            digest.update(block)
+        spool.seek(0)
+        archive = AttemptArchive(
+            assignment=assignment,
+            sequence=sequence,
+            row_count=len(rows),
+            first_attempt_id=rows[0][0],
+            last_attempt_id=rows[-1][0],
+            sha256=digest.hexdigest(),
+        )
+        archive.file.save(f"{assignment.pk}-{sequence:04d}.jsonl.gz", File(spool), save=False)
+    return archive
+
+
+def read_archive(archive: AttemptArchive) -> Iterator[dict]:
+    """Yield the attempt records stored in one chunk, checking its checksum first."""
+
+    with archive.file.open("rb") as handle:
+        data = handle.read()
+    if hashlib.sha256(data).hexdigest() != archive.sha256:
+        raise ValueError(f"Checksum mismatch for {archive.file.name}")
+    with gzip.GzipFile(fileobj=io.BytesIO(data)) as lines:
+        for line in lines:
+            record = json.loads(line)
+            record["timestamp"] = parse_datetime(record["timestamp"])
+            yield record
+
+
+def restore_assignment(assignment: Assignment, batch_size: int = RESTORE_BATCH_SIZE) -> int:
+    """Put an archived assignment's attempts back and return how many were restored.
+
+    The rows keep their original ids and timestamps. The rollup already counts
+    them, so it is not touched; the chunk files are deleted once the restore
+    has committed.
+    """
+
+    archives = list(AttemptArchive.objects.filter(assignment=assignment).order_by("sequence"))
+    restored = 0
+    with transaction.atomic():
+        for archive in archives:
+            batch = []
+            for record in read_archive(archive):
+                batch.append(AssignmentAttempt(assignment_id=assignment.pk, **record))
+                if len(batch) >= batch_size:
+                    restored += _restore_batch(batch)
+                    batch = []
+            if batch:
+                restored += _restore_batch(batch)
+        ArchivedAttemptSummary.objects.filter(assignment=assignment).delete()
+        AttemptArchive.objects.filter(pk__in=[archive.pk for archive in archives]).delete()
+        Assignment.objects.filter(pk=assignment.pk).update(attempts_archived_at=None)
+        transaction.on_commit(lambda: _delete_files(archives))
+    return restored
+
+
+def _restore_batch(batch) -> int:
+    timestamps = [attempt.timestamp for attempt in batch]
+    # bulk_create stamps auto_now_add fields with the current time, and skips
+    # the post_save rollup signal, which is what we want here.
+    AssignmentAttempt.objects.bulk_create(batch)
+    for attempt, timestamp in zip(batch, timestamps):
+        attempt.timestamp = timestamp
+    AssignmentAttempt.objects.bulk_update(batch, ["timestamp"])
+    return len(batch)
+
+
+def _delete_files(archives) -> None:
+    for archive in archives:
+        archive.file.delete(save=False)
+
+
+def archive_attempt_logs(
+    now=None, older_than: timedelta = ARCHIVE_AFTER, chunk_size: int = ARCHIVE_CHUNK_SIZE,
+    limit: Optional[int] = None,
+) -> int:
+    """Archive every eligible assignment; returns the number of attempts moved."""
+
+    moved = 0
+    assignments = archivable_assignments(now, older_than)
+    if limit is not None:
+        assignments = assignments[:limit]
+    for assignment in assignments:
+        moved += archive_assignment(assignment, chunk_size=chunk_size, now=now)
+    return moved
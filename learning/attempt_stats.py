@@ -0,0 +1,125 @@
+"""Maintain the ``AssignmentWordStat`` rollup of assignment attempts.
+
+Each logged ``AssignmentAttempt`` bumps the matching rollup row with an
+``F()`` UPDATE, so concurrent writers never lose counts; the first attempt for
+a cell inserts the row instead. ``rebuild_word_stats`` recomputes rows from the
+raw attempts and backs the ``backfill_word_stats`` command.
+
+Attempts are append-only in this app. There is deliberately no delete
+signal: any ``post_delete`` receiver would stop Django from fast-deleting
+attempts when a student or assignment goes, and their rollup rows cascade
+away with them anyway. Delete individual attempts with ``delete_attempts``;
+editing ``is_correct`` in place is not tracked.
+
+``Assignment.rollup_version`` identifies the rollup of an assignment for
+caches (see ``analytics.analytics_version``). It is bumped in the same
+transaction when attempts are taken out of the rollup or the rollup is
+rebuilt; new attempts are already told apart by their ids.
+"""
+
+from __future__ import annotations
+
+from collections import Counter
+from typing import Iterable, Optional
+
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F, Q
+
+from .models import Assignment, AssignmentAttempt, AssignmentWordStat
+
+
+_KEY_FIELDS = ("assignment_id", "student_id", "vocabulary_word_id", "mode")
+BACKFILL_BATCH_SIZE = 2000
+
+
+def record_attempts(attempts: Iterable[AssignmentAttempt], sign: int = 1) -> None:
+    """Add ``attempts`` to the rollup, or remove them when ``sign`` is -1.
+
+    Attempts for the same cell are folded together first, so a batch costs one
+    UPDATE per distinct (assignment, student, word, mode).
+    """
+
+    totals: Counter = Counter()
+    correct: Counter = Counter()
+    for attempt in attempts:
+        key = tuple(getattr(attempt, field) for field in _KEY_FIELDS)
+        totals[key] += 1
+        correct[key] += 1 if attempt.is_correct else 0
+
+    with transaction.atomic():
+        for key, count in totals.items():
+            _bump(key, sign * count, sign * correct[key])
+        if sign < 0:
+            _bump_versions(key[0] for key in totals)
+
+
+def delete_attempts(attempts) -> int:
+    """Delete an ``AssignmentAttempt`` queryset and take it out of the rollup."""
+
+    with transaction.atomic():
+        doomed = list(attempts.only(*_KEY_FIELDS, "is_correct"))
+        if not doomed:
+            return 0
+        AssignmentAttempt.objects.filter(pk__in=[attempt.pk for attempt in doomed]).delete()
+        record_attempts(doomed, sign=-1)
+    return len(doomed)
+
+
+def _bump(key, attempts: int, correct: int) -> None:
+    cell = dict(zip(_KEY_FIELDS, key))
+    rows = AssignmentWordStat.objects.filter(**cell)
+    if rows.update(attempts=F("attempts") + attempts, correct=F("correct") + correct):
+        return
+    if attempts <= 0:
+        return
+    try:
+        with transaction.atomic():
+            AssignmentWordStat.objects.create(attempts=attempts, correct=correct, **cell)
+    except IntegrityError:
+        # Another request created the row first; add to it instead.
+        rows.update(attempts=F("attempts") + attempts, correct=F("correct") + correct)
+
+
+def rebuild_word_stats(
+    assignment_ids: Optional[Iterable[int]] = None, batch_size: int = BACKFILL_BATCH_SIZE
+) -> int:
+    """Recompute rollup rows from raw attempts and return how many were written.
+
+    Each assignment is rebuilt in its own transaction; pass ``assignment_ids``
+    to limit the rebuild, or ``None`` for every assignment with attempts.
+    Assignments whose attempts have been archived are skipped: their raw rows
+    are no longer in the table, and the rollup is all that still counts them.
+    """
+
+    if assignment_ids is None:
+        # Include assignments whose attempts are gone so stale rows are cleared.
+        targets = set(AssignmentAttempt.objects.values_list("assignment_id", flat=True).distinct())
+        targets.update(AssignmentWordStat.objects.values_list("assignment_id", flat=True).distinct())
+    else:
+        targets = set(assignment_ids)
+    targets -= set(
+        Assignment.objects.filter(pk__in=targets, attempts_archived_at__isnull=False)
+        .values_list("pk", flat=True)
+    )
+
+    written = 0
+    for assignment_id in sorted(targets):
+        grouped = (
+            AssignmentAttempt.objects.filter(assignment_id=assignment_id)
+            .values("student_id", "vocabulary_word_id", "mode")
+            .annotate(attempts=Count("id"), correct=Count("id", filter=Q(is_correct=True)))
+            .order_by()
+        )
+        with transaction.atomic():
+            AssignmentWordStat.objects.filter(assignment_id=assignment_id).delete()
+            rows = [AssignmentWordStat(assignment_id=assignment_id, **row) for row in grouped]
+            AssignmentWordStat.objects.bulk_create(rows, batch_size=batch_size)
+            _bump_versions([assignment_id])
+        written += len(rows)
+    return written
+
+
+def _bump_versions(assignment_ids: Iterable) -> None:
+    Assignment.objects.filter(pk__in=set(assignment_ids)).update(
+        rollup_version=F("rollup_version") + 1
+    )
@@ -0,0 +1,230 @@
+"""Class-level trends over daily per-word buckets.
+
+``rollup_class_buckets`` folds new ``AssignmentAttempt`` rows and live-game
+answers into ``ClassWordDayBucket`` (one row per class, word, mode and day),
+consuming each source in id order past a stored watermark like the points
+ledger rollup. The trend queries then aggregate a term's worth of buckets
+instead of scanning every attempt of every assignment.
+"""
+
+from __future__ import annotations
+
+from collections import defaultdict
+from datetime import date, timedelta
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+from django.db import transaction
+from django.db.models import Count, Sum
+from django.utils import timezone
+
+from live.models import LiveGameAnswer
+
+from .models import AssignmentAttempt, ClassBucketCursor, ClassWordDayBucket, VocabularyWord
+
+
+ATTEMPTS_CURSOR = "attempts"
+LIVE_CURSOR = "live-answers"
+# Live answers are bucketed under their own mode alongside the assignment modes.
+LIVE_MODE = "live_game"
+ROLLUP_LAG = timedelta(minutes=5)
+ROLLUP_BATCH_SIZE = 5000
+TREND_DEFAULT_DAYS = 90
+
+# (row id, class id, word id, mode, is_correct, answered at)
+SourceRow = Tuple[int, object, Optional[int], str, bool, object]
+
+
+def _attempt_rows(last_id: int, batch_size: int):
+    return (
+        AssignmentAttempt.objects.filter(id__gt=last_id)
+        .order_by("id")
+        .values_list(
+            "id", "assignment__class_assigned_id", "vocabulary_word_id", "mode", "is_correct", "timestamp"
+        )[:batch_size]
+    )
+
+
+def _live_rows(last_id: int, batch_size: int):
+    rows = (
+        LiveGameAnswer.objects.filter(id__gt=last_id)
+        .order_by("id")
+        .values_list(
+            "id", "question__session__clazz_id", "question__payload__word_id", "is_correct", "submitted_at"
+        )[:batch_size]
+    )
+    for answer_id, class_id, word_id, is_correct, submitted_at in rows:
+        yield answer_id, class_id, word_id if isinstance(word_id, int) else None, LIVE_MODE, is_correct, submitted_at
+
+
+# Cursor name -> function(last_id, batch_size) yielding ``SourceRow`` tuples.
+SOURCES: Dict[str, Callable[[int, int], Iterable[SourceRow]]] = {
+    ATTEMPTS_CURSOR: _attempt_rows,
+    LIVE_CURSOR: _live_rows,
+}
+
+
+def rollup_class_buckets(*, lag: timedelta = ROLLUP_LAG, batch_size: int = ROLLUP_BATCH_SIZE) -> int:
+    """Fold every source into the daily buckets and return the rows processed.
+
+    Each batch commits with its watermark, so an interrupted run loses
+    nothing. Rows younger than ``lag`` are left for the next run so that a
+    transaction which took an earlier id but committed late is not skipped.
+    """
+
+    cutoff = timezone.now() - lag
+    processed = 0
+    for name, source in SOURCES.items():
+        while True:
+            folded, caught_up = _fold_batch(name, source, cutoff, batch_size)
+            processed += folded
+            if caught_up:
+                break
+    return processed
+
+
+def _fold_batch(name, source, cutoff, batch_size) -> Tuple[int, bool]:
+    """Fold one batch from ``source``; returns (rows folded, caught up)."""
+
+    with transaction.atomic():
+        cursor, _ = ClassBucketCursor.objects.select_for_update().get_or_create(name=name)
+        totals: Dict[tuple, List[int]] = defaultdict(lambda: [0, 0])
+        last_id = None
+        folded = 0
+        caught_up = True
+        for row_id, class_id, word_id, mode, is_correct, answered_at in source(cursor.last_id, batch_size):
+            if answered_at >= cutoff:
+                break
+            last_id = row_id
+            folded += 1
+            if class_id is None or word_id is None:
+                continue
+            bucket = totals[(class_id, word_id, mode, timezone.localdate(answered_at))]
+            bucket[0] += 1
+            bucket[1] += 1 if is_correct else 0
+        else:
+            caught_up = folded < batch_size
+        if last_id is None:
+            return 0, True
+
+        if totals:
+            _apply(totals)
+        cursor.last_id = last_id
+        cursor.save(update_fields=["last_id", "updated_at"])
+    return folded, caught_up
+
+
+def _apply(totals: Dict[tuple, List[int]]) -> None:
+    # Live questions carry the word id in their payload; skip words deleted since.
+    word_ids = {key[1] for key in totals}
+    known = set(VocabularyWord.objects.filter(id__in=word_ids).values_list("id", flat=True))
+    existing = ClassWordDayBucket.objects.select_for_update().filter(
+        clazz_id__in={key[0] for key in totals},
+        vocabulary_word_id__in=word_ids,
+        day__in={key[3] for key in totals},
+    )
+    to_update = []
+    for bucket in existing:
+        key = (bucket.clazz_id, bucket.vocabulary_word_id, bucket.mode, bucket.day)
+        if key in totals:
+            attempts, correct = totals.pop(key)
+            bucket.attempts += attempts
+            bucket.correct += correct
+            to_update.append(bucket)
+    ClassWordDayBucket.objects.bulk_update(to_update, ["attempts", "correct"])
+    ClassWordDayBucket.objects.bulk_create(
+        ClassWordDayBucket(
+            clazz_id=class_id, vocabulary_word_id=word_id, mode=mode, day=day,
+            attempts=attempts, correct=correct,
+        )
+        for (class_id, word_id, mode, day), (attempts, correct) in totals.items()
+        if word_id in known
+    )
+
+
+def bucketed_attempt_id() -> int:
+    """Highest ``AssignmentAttempt`` id already folded into the buckets."""
+
+    cursor = ClassBucketCursor.objects.filter(name=ATTEMPTS_CURSOR).first()
+    return cursor.last_id if cursor else 0
+
+
+def default_range(today: Optional[date] = None) -> Tuple[date, date]:
+    today = today or timezone.localdate()
+    return today - timedelta(days=TREND_DEFAULT_DAYS - 1), today
+
+
+def _buckets(class_id, start: date, end: date, mode: Optional[str] = None):
+    buckets = ClassWordDayBucket.objects.filter(clazz_id=class_id, day__range=(start, end))
+    if mode:
+        buckets = buckets.filter(mode=mode)
+    return buckets
+
+
+def class_word_trends(
+    class_id, start: date, end: date, mode: Optional[str] = None, min_attempts: int = 1,
+    limit: Optional[int] = None,
+) -> List[dict]:
+    """
+    Returns per-word totals for a class between ``start`` and ``end``:
+    [{
+      'vocabulary_word': <id>,
+      'word': 'Bibliothek',
+      'translation': 'library',
+      'attempts': 42,
+      'correct': 19,
+      'accuracy': 0.45,
+      'active_days': 6
+    }, ...] (lowest accuracy first)
+    """
+    rows = (
+        _buckets(class_id, start, end, mode)
+        .values("vocabulary_word_id", "vocabulary_word__word", "vocabulary_word__translation")
+        .annotate(attempts=Sum("attempts"), correct=Sum("correct"), active_days=Count("day", distinct=True))
+        .filter(attempts__gte=max(1, min_attempts))
+        .order_by()
+    )
+    results = [
+        {
+            "vocabulary_word": row["vocabulary_word_id"],
+            "word": row["vocabulary_word__word"],
+            "translation": row["vocabulary_word__translation"],
+            "attempts": row["attempts"],
+            "correct": row["correct"],
+            "accuracy": round(row["correct"] / row["attempts"], 3),
+            "active_days": row["active_days"],
+        }
+        for row in rows
+    ]
+    results.sort(key=lambda row: (row["accuracy"], -row["attempts"], row["word"]))
+    return results[:limit] if limit else results
+
+
+def class_daily_trend(
+    class_id, start: date, end: date, mode: Optional[str] = None, word_id: Optional[int] = None,
+) -> List[dict]:
+    """
+    Returns one entry per day with answers, oldest first:
+    [{'day': '2024-03-04', 'attempts': 120, 'correct': 90, 'accuracy': 0.75, 'words': 14}, ...]
+    """
+    buckets = _buckets(class_id, start, end, mode)
+    if word_id is not None:
+        buckets = buckets.filter(vocabulary_word_id=word_id)
+    rows = (
+        buckets.values("day")
+        .annotate(
+            attempts=Sum("attempts"),
+            correct=Sum("correct"),
+            words=Count("vocabulary_word_id", distinct=True),
+        )
+        .order_by("day")
+    )
+    return [
+        {
+            "day": row["day"].isoformat(),
+            "attempts": row["attempts"],
+            "correct": row["correct"],
+            "accuracy": round(row["correct"] / row["attempts"], 3) if row["attempts"] else 0.0,
+            "words": row["words"],
+        }
+        for row in rows
+    ]
@@ -1,20 +1,37 @@
+from django.core.exceptions import ValidationError
 from django.shortcuts import redirect
 from functools import wraps
 from .models import Student
 
+
+def get_student(request):
+    """Return the logged-in Student for ``request`` or ``None``.
+
+    The student is loaded at most once per request and cached on it. Weekly and
+    monthly totals are rolled over here, which only writes when a period
+    boundary has actually passed.
+    """
+    if not hasattr(request, "_cached_student"):
+        student = None
+        student_id = request.session.get('student_id')
+        if student_id:
+            try:
+                student = Student.objects.select_related('user').get(id=student_id)
+            except (Student.DoesNotExist, ValidationError):
+                del request.session['student_id']
+            else:
+                student.reset_periodic_points()
+        request._cached_student = student
+    return request._cached_student
+
+
 def student_login_required(view_func):
     @wraps(view_func)
     def _wrapped_view(request, *args, **kwargs):
         # Check if the student is logged in using the session
-        student_id = request.session.get('student_id')
-        if not student_id:
+        student = get_student(request)
+        if student is None:
             return redirect('student_login')  # Redirect to the student login page
-        try:
-            student = Student.objects.get(id=student_id)
-            student.reset_periodic_points()
-            student.save()
-        except Student.DoesNotExist:
-            del request.session['student_id']
-            return redirect('student_login')
+        request.student = student
         return view_func(request, *args, **kwargs)
     return _wrapped_view
@@ -0,0 +1,216 @@
+"""Background file exports run on the django-q cluster.
+
+A request calls :func:`enqueue_export` and gets back an ``ExportJob`` to poll;
+the worker runs the registered exporter, spools its output to a temporary file
+chunk by chunk, stores the result with the default storage backend and records
+progress on the job as it goes. Web workers only ever enqueue and serve the
+finished file.
+
+Exporters are registered by kind with :func:`exporter`. Each one is called as
+``func(params, tracker)`` and returns an :class:`ExportFile`; it should wrap its
+row iterables with ``tracker.track`` so progress is reported.
+
+A job still running after ``EXPORT_TASK_TIMEOUT`` lost its worker to the
+timeout or a recycle and is marked failed. Jobs and their files are deleted
+``EXPORT_RETENTION`` after they were requested; ``clean_up_export_jobs`` does
+both and runs hourly.
+"""
+
+from __future__ import annotations
+
+import csv
+import io
+import logging
+import tempfile
+import time
+from dataclasses import dataclass
+from datetime import timedelta
+from typing import Callable, Dict, Iterable, Iterator, Optional
+
+from django.core.files import File
+from django.http import JsonResponse
+from django.urls import reverse
+from django.utils import timezone
+from django_q.tasks import async_task
+
+from .models import ExportJob
+
+
+logger = logging.getLogger(__name__)
+
+# Exports may take far longer than the cluster-wide task timeout.
+EXPORT_TASK_TIMEOUT = 30 * 60
+EXPORT_RETENTION = timedelta(days=1)
+# Minimum seconds between progress writes to the job row.
+PROGRESS_INTERVAL = 1.0
+CSV_ROWS_PER_CHUNK = 500
+
+
+@dataclass
+class ExportFile:
+    filename: str
+    chunks: Iterable[bytes]
+
+
+Exporter = Callable[[dict, "ProgressTracker"], ExportFile]
+
+EXPORTERS: Dict[str, Exporter] = {}
+
+
+def exporter(kind: str) -> Callable[[Exporter], Exporter]:
+    """Register ``func`` as the exporter for jobs of ``kind``."""
+
+    def decorator(func: Exporter) -> Exporter:
+        EXPORTERS[kind] = func
+        return func
+
+    return decorator
+
+
+class ProgressTracker:
+    """Counts exported rows and writes progress to the job at most once a second."""
+
+    def __init__(self, job_id, total: Optional[int] = None) -> None:
+        self.job_id = job_id
+        self.total = total
+        self.rows = 0
+        self._saved_at = 0.0
+
+    def track(self, rows: Iterable) -> Iterator:
+        for row in rows:
+            yield row
+            self.rows += 1
+            if time.monotonic() - self._saved_at >= PROGRESS_INTERVAL:
+                self.save()
+
+    def save(self) -> None:
+        self._saved_at = time.monotonic()
+        update = {"rows_written": self.rows}
+        if self.total:
+            # Leave 100% for when the file has actually been stored.
+            update["progress"] = min(99, self.rows * 100 // self.total)
+        ExportJob.objects.filter(pk=self.job_id).update(**update)
+
+
+def csv_chunks(rows: Iterable[Iterable]) -> Iterator[bytes]:
+    """Encode ``rows`` as UTF-8 CSV, a few hundred rows per chunk."""
+
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    for count, row in enumerate(rows, start=1):
+        writer.writerow(row)
+        if count % CSV_ROWS_PER_CHUNK == 0:
+            yield buffer.getvalue().encode()
+            buffer.seek(0)
+            buffer.truncate()
+    yield buffer.getvalue().encode()
+
+
+def enqueue_export(kind: str, params: dict, user) -> ExportJob:
+    """Create a queued job for ``kind`` on behalf of ``user`` and hand it to
+    the cluster. Only that user can read the job afterwards."""
+
+    if kind not in EXPORTERS:
+        raise ValueError(f"Unknown export kind: {kind}")
+    if not user.is_authenticated:
+        raise ValueError("Background exports need a signed-in user.")
+    job = ExportJob.objects.create(kind=kind, params=params, requested_by=user)
+    async_task(
+        "learning.tasks.run_export_job",
+        str(job.pk),
+        task_name=f"export-{kind}-{job.pk}",
+        timeout=EXPORT_TASK_TIMEOUT,
+    )
+    return job
+
+
+def enqueued_response(job: ExportJob) -> JsonResponse:
+    """202 response pointing the client at the job's status endpoint."""
+
+    return JsonResponse(job_payload(job), status=202)
+
+
+def job_payload(job: ExportJob) -> dict:
+    payload = {
+        "id": str(job.pk),
+        "kind": job.kind,
+        "status": job.status,
+        "progress": job.progress,
+        "rows_written": job.rows_written,
+        "status_url": reverse("api_export_job_status", args=[job.pk]),
+    }
+    if job.status == ExportJob.STATUS_DONE:
+        payload["filename"] = job.filename
+        payload["download_url"] = reverse("api_export_job_download", args=[job.pk])
+    if job.status == ExportJob.STATUS_FAILED:
+        payload["error"] = job.error
+    return payload
+
+
+def run_export_job(job_id) -> Optional[ExportJob]:
+    """Produce the file for a queued job; other states are left untouched.
+
+    Claiming the job with a conditional UPDATE makes a redelivered task a
+    no-op, since the broker may hand a long export out again before it ends.
+    """
+
+    claimed = ExportJob.objects.filter(pk=job_id, status=ExportJob.STATUS_QUEUED).update(
+        status=ExportJob.STATUS_RUNNING, started_at=timezone.now()
+    )
+    if not claimed:
+        # Redelivered after the timeout: the worker that claimed it is gone.
+        _fail_stale(ExportJob.objects.filter(pk=job_id))
+        return None
+    job = ExportJob.objects.get(pk=job_id)
+    tracker = ProgressTracker(job.pk)
+
+    try:
+        result = EXPORTERS[job.kind](job.params, tracker)
+        with tempfile.TemporaryFile() as spool:
+            for chunk in result.chunks:
+                spool.write(chunk)
+            spool.seek(0)
+            job.file.save(result.filename, File(spool), save=False)
+    except Exception as exc:  # noqa: BLE001 - recorded on the job for the client
+        logger.exception("Export job %s (%s) failed", job.pk, job.kind)
+        ExportJob.objects.filter(pk=job.pk).update(
+            status=ExportJob.STATUS_FAILED,
+            error=str(exc) or exc.__class__.__name__,
+            rows_written=tracker.rows,
+            finished_at=timezone.now(),
+        )
+    else:
+        ExportJob.objects.filter(pk=job.pk).update(
+            status=ExportJob.STATUS_DONE,
+            progress=100,
+            rows_written=tracker.rows,
+            filename=result.filename,
+            file=job.file.name,
+            finished_at=timezone.now(),
+        )
+    job.refresh_from_db()
+    return job
+
+
+def fail_stale_exports(now=None) -> int:
+    """Mark jobs running for longer than the task timeout as failed."""
+
+    return _fail_stale(ExportJob.objects.all(), now)
+
+
+def _fail_stale(jobs, now=None) -> int:
+    now = now or timezone.now()
+    return jobs.filter(
+        status=ExportJob.STATUS_RUNNING,
+        started_at__lt=now - timedelta(seconds=EXPORT_TASK_TIMEOUT),
+    ).update(status=ExportJob.STATUS_FAILED, error="The export timed out.", finished_at=now)
+
+
+def purge_expired_exports(now=None, retention: timedelta = EXPORT_RETENTION) -> int:
+    """Delete jobs requested more than ``retention`` ago, with their files."""
+
+    cutoff = (now or timezone.now()) - retention
+    expired = ExportJob.objects.filter(created_at__lt=cutoff).exclude(status=ExportJob.STATUS_RUNNING)
+    for job in expired.exclude(file="").only("pk", "file").iterator():
+        job.file.delete(save=False)
+    return expired.delete()[0]
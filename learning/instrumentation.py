@@ -0,0 +1,280 @@
+"""Per-request performance counters.
+
+``instrument()`` opens a measurement scope that counts SQL queries and
+database time, cache hits and misses, and outbound calls to Wikimedia/Pixabay
+(through ``wikimedia_images.SESSION``) and Gemini (wrapped in
+``external_call("gemini")``). ``PerformanceMiddleware`` opens one per request
+and reports it as a ``Server-Timing`` header and a structured log line; tests
+use ``query_budget`` to hold views to a fixed number of queries.
+
+Settings:
+
+``PERFORMANCE_SERVER_TIMING``
+    Add the ``Server-Timing`` header to responses for staff users (default
+    ``True``). Other users never see it, since it exposes query counts and
+    upstream timings.
+``PERFORMANCE_SLOW_REQUEST_MS``
+    Requests slower than this are logged with their query list, when sampled.
+    Off when unset.
+``PERFORMANCE_SLOW_SAMPLE_RATE``
+    Fraction of requests whose queries are captured for the slow-request log
+    (default ``1.0`` once a threshold is set). Capturing has a cost, so lower
+    it on busy sites.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import random
+import time
+from contextlib import ExitStack, contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Dict, Iterator, List, Optional
+
+from django.conf import settings
+from django.core.cache import caches
+from django.core.cache.backends.base import BaseCache
+from django.db import connections
+
+
+logger = logging.getLogger("learning.performance")
+
+_current: ContextVar[Optional["Metrics"]] = ContextVar("learning_performance_metrics", default=None)
+_MISSING = object()
+
+
+@dataclass
+class Metrics:
+    queries: int = 0
+    db_ms: float = 0.0
+    cache_hits: int = 0
+    cache_misses: int = 0
+    # service name -> [calls, milliseconds]
+    external: Dict[str, List[float]] = field(default_factory=dict)
+    total_ms: float = 0.0
+    # (sql, milliseconds) for every query, only when capture was requested
+    captured: Optional[List[tuple]] = None
+    # The enclosing scope, which sees everything this one records.
+    parent: Optional["Metrics"] = field(default=None, repr=False)
+
+    def external_calls(self, service: Optional[str] = None) -> int:
+        if service is not None:
+            return int(self.external.get(service, (0, 0.0))[0])
+        return int(sum(calls for calls, _ in self.external.values()))
+
+    def server_timing(self) -> str:
+        entries = [
+            f'db;dur={self.db_ms:.1f};desc="{self.queries} queries"',
+            f'cache;desc="{self.cache_hits} hits, {self.cache_misses} misses"',
+        ]
+        for service, (calls, elapsed) in sorted(self.external.items()):
+            entries.append(f'{service};dur={elapsed:.1f};desc="{int(calls)} calls"')
+        entries.append(f"total;dur={self.total_ms:.1f}")
+        return ", ".join(entries)
+
+    def as_dict(self) -> dict:
+        return {
+            "queries": self.queries,
+            "db_ms": round(self.db_ms, 1),
+            "cache_hits": self.cache_hits,
+            "cache_misses": self.cache_misses,
+            "external": {
+                service: {"calls": int(calls), "ms": round(elapsed, 1)}
+                for service, (calls, elapsed) in self.external.items()
+            },
+            "total_ms": round(self.total_ms, 1),
+        }
+
+
+def current() -> Optional[Metrics]:
+    """The innermost metrics being collected, if any."""
+
+    return _current.get()
+
+
+def _scopes() -> Iterator[Metrics]:
+    metrics = _current.get()
+    while metrics is not None:
+        yield metrics
+        metrics = metrics.parent
+
+
+@contextmanager
+def instrument(capture_queries: bool = False) -> Iterator[Metrics]:
+    """Collect ``Metrics`` for everything run inside the block.
+
+    Blocks nest: an outer block (say, a test's ``query_budget``) also counts
+    what an inner one (the middleware) records.
+    """
+
+    metrics = Metrics(captured=[] if capture_queries else None, parent=_current.get())
+    token = _current.set(metrics)
+    started = time.perf_counter()
+    try:
+        with ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(_QueryCounter(metrics)))
+            yield metrics
+    finally:
+        metrics.total_ms = (time.perf_counter() - started) * 1000
+        _current.reset(token)
+
+
+class _QueryCounter:
+    def __init__(self, metrics: Metrics) -> None:
+        self.metrics = metrics
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            elapsed = (time.perf_counter() - started) * 1000
+            self.metrics.queries += 1
+            self.metrics.db_ms += elapsed
+            if self.metrics.captured is not None:
+                self.metrics.captured.append((sql, round(elapsed, 2)))
+
+
+def _record_call(service: str, elapsed_ms: float) -> None:
+    for metrics in _scopes():
+        calls = metrics.external.setdefault(service, [0, 0.0])
+        calls[0] += 1
+        calls[1] += elapsed_ms
+
+
+@contextmanager
+def external_call(service: str) -> Iterator[None]:
+    """Time an outbound call made inside the block, e.g. ``external_call("gemini")``."""
+
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        _record_call(service, (time.perf_counter() - started) * 1000)
+
+
+def record_http_response(service: str):
+    """A ``requests`` response hook that records calls made through a session."""
+
+    def hook(response, *args, **kwargs):
+        _record_call(service, response.elapsed.total_seconds() * 1000)
+        return response
+
+    return hook
+
+
+def _count_cache_reads(hits: int, misses: int) -> None:
+    for metrics in _scopes():
+        metrics.cache_hits += hits
+        metrics.cache_misses += misses
+
+
+def _counting_get(method):
+    def get(self, key, default=None, version=None):
+        if _current.get() is None:
+            return method(self, key, default, version)
+        value = method(self, key, _MISSING, version)
+        if value is _MISSING:
+            _count_cache_reads(0, 1)
+            return default
+        _count_cache_reads(1, 0)
+        return value
+
+    get._counts_cache_reads = True
+    return get
+
+
+def _counting_get_many(method):
+    def get_many(self, keys, version=None):
+        keys = list(keys)
+        found = method(self, keys, version)
+        _count_cache_reads(len(found), len(keys) - len(found))
+        return found
+
+    get_many._counts_cache_reads = True
+    return get_many
+
+
+def install() -> None:
+    """Count cache reads on the configured backends; called from ``LearningConfig.ready``.
+
+    Django has no cache signals, so ``get`` (and ``get_many`` where a backend
+    implements its own rather than looping over ``get``) is wrapped once per
+    backend class. Outside an ``instrument()`` block the wrapper only checks a
+    context variable before delegating.
+    """
+
+    for alias in settings.CACHES:
+        backend = type(caches[alias])
+        if getattr(backend.get, "_counts_cache_reads", False):
+            continue
+        backend.get = _counting_get(backend.get)
+        if backend.get_many is not BaseCache.get_many:
+            backend.get_many = _counting_get_many(backend.get_many)
+
+
+@contextmanager
+def query_budget(queries: Optional[int] = None, external_calls: Optional[int] = 0) -> Iterator[Metrics]:
+    """Fail with ``AssertionError`` if the block exceeds the given budget.
+
+    For tests::
+
+        with query_budget(queries=12):
+            self.client.get(reverse("teacher_dashboard"))
+    """
+
+    with instrument(capture_queries=True) as metrics:
+        yield metrics
+    if queries is not None and metrics.queries > queries:
+        listing = "\n".join(f"{n}. {sql}" for n, (sql, _) in enumerate(metrics.captured, start=1))
+        raise AssertionError(f"{metrics.queries} queries, budget is {queries}:\n{listing}")
+    if external_calls is not None and metrics.external_calls() > external_calls:
+        raise AssertionError(
+            f"{metrics.external_calls()} external calls, budget is {external_calls}: {metrics.external}"
+        )
+
+
+def _is_staff(request) -> bool:
+    user = getattr(request, "user", None)
+    return bool(user is not None and user.is_authenticated and user.is_staff)
+
+
+class PerformanceMiddleware:
+    """Measure each request; see the module docstring for the settings."""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.server_timing = getattr(settings, "PERFORMANCE_SERVER_TIMING", True)
+        self.slow_ms = getattr(settings, "PERFORMANCE_SLOW_REQUEST_MS", None)
+        self.sample_rate = getattr(settings, "PERFORMANCE_SLOW_SAMPLE_RATE", 1.0)
+
+    def __call__(self, request):
+        sampled = self.slow_ms is not None and random.random() < self.sample_rate
+        with instrument(capture_queries=sampled) as metrics:
+            response = self.get_response(request)
+        # Streamed bodies are produced after this returns, so only the view's
+        # own work up to the first byte is measured for them.
+
+        if self.server_timing and _is_staff(request):
+            response["Server-Timing"] = metrics.server_timing()
+
+        if not logger.isEnabledFor(logging.INFO) and not sampled:
+            return response
+        record = {
+            "method": request.method,
+            "path": request.path,
+            "status": response.status_code,
+            **metrics.as_dict(),
+        }
+        logger.info("request %s", json.dumps(record), extra={"performance": record})
+        if sampled and metrics.total_ms >= self.slow_ms:
+            logger.warning(
+                "slow request %s %s",
+                json.dumps(record),
+                json.dumps(metrics.captured),
+                extra={"performance": record, "queries": metrics.captured},
+            )
+        return response
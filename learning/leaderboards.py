@@ -0,0 +1,199 @@
+"""Class leaderboards built on the per-student point columns.
+
+Weekly and monthly totals are rolled over lazily and in bulk: the first read
+after a period boundary zeroes every stale row of the affected classes with a
+single UPDATE, and a cache marker stops later reads from repeating it.
+Rankings are served with keyset pagination on ``(points, id)``.
+
+The last finished week and month are ranked from the points ledger's period
+buckets (``learning.points.period_standings``) instead of the live columns.
+"""
+
+from __future__ import annotations
+
+from collections import defaultdict
+from dataclasses import dataclass, replace
+from datetime import timedelta
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from django.core.cache import cache
+from django.db.models import Q
+from django.utils.timezone import now
+
+from .models import PointsPeriodBucket, Student, period_starts
+from .points import period_standings
+
+
+CATEGORIES = ("total_points", "monthly_points", "weekly_points")
+DEFAULT_CATEGORY = "total_points"
+# Finished periods, read from the ledger's period buckets.
+PAST_CATEGORIES = {
+    "last_week_points": PointsPeriodBucket.PERIOD_WEEK,
+    "last_month_points": PointsPeriodBucket.PERIOD_MONTH,
+}
+PAGE_SIZE = 50
+
+_STANDING_FIELDS = ("id", "first_name", "last_name") + CATEGORIES
+_PERIODS = (
+    # (points field, last-reset field, marker lifetime)
+    ("weekly_points", "weekly_points_last_reset", timedelta(days=8)),
+    ("monthly_points", "monthly_points_last_reset", timedelta(days=32)),
+)
+
+
+@dataclass(frozen=True)
+class Standing:
+    """A single row of a class leaderboard."""
+
+    id: object
+    first_name: str
+    last_name: str
+    total_points: int
+    monthly_points: int
+    weekly_points: int
+    rank: int = 0
+
+
+@dataclass
+class LeaderboardPage:
+    entries: List[Standing]
+    next_cursor: Optional[str]
+
+
+def normalize_category(category: Optional[str]) -> str:
+    if category in CATEGORIES or category in PAST_CATEGORIES:
+        return category
+    return DEFAULT_CATEGORY
+
+
+def roll_over_classes(class_ids: Iterable, *, today=None) -> None:
+    """Zero stale weekly/monthly points for every student in ``class_ids``.
+
+    At most one UPDATE is issued per period, and only for classes that have
+    not been rolled over since the current period began.
+    """
+
+    class_ids = [str(class_id) for class_id in class_ids]
+    if not class_ids:
+        return
+
+    today = today or now().date()
+    week_start, month_start = period_starts(today)
+    starts = {"weekly_points": week_start, "monthly_points": month_start}
+
+    for points_field, reset_field, lifetime in _PERIODS:
+        period_start = starts[points_field]
+        keys = {
+            f"leaderboard:rollover:{points_field}:{period_start.isoformat()}:{class_id}": class_id
+            for class_id in class_ids
+        }
+        done = cache.get_many(keys.keys())
+        pending = [class_id for key, class_id in keys.items() if key not in done]
+        if not pending:
+            continue
+
+        Student.objects.filter(
+            classes__id__in=pending, **{f"{reset_field}__lt": period_start}
+        ).update(**{points_field: 0, reset_field: today})
+        cache.set_many(
+            {key: True for key, class_id in keys.items() if class_id in pending},
+            timeout=int(lifetime.total_seconds()),
+        )
+
+
+def class_standings(class_ids: Iterable) -> Dict[str, Dict[str, List[Standing]]]:
+    """Return ``{class_id: {category: [Standing, ...]}}`` for several classes.
+
+    All members of all classes are fetched in one query and ranked in memory,
+    so the cost does not depend on how many classes are requested.
+    """
+
+    class_ids = [str(class_id) for class_id in class_ids]
+    roll_over_classes(class_ids)
+
+    members: Dict[str, List[Standing]] = defaultdict(list)
+    rows = (
+        Student.classes.through.objects.filter(class_id__in=class_ids)
+        .values_list("class_id", *(f"student__{field}" for field in _STANDING_FIELDS))
+    )
+    for class_id, *values in rows:
+        members[str(class_id)].append(Standing(*values))
+
+    standings: Dict[str, Dict[str, List[Standing]]] = {}
+    for class_id in class_ids:
+        students = members.get(class_id, [])
+        standings[class_id] = {
+            category: _ranked(
+                sorted(students, key=lambda s, c=category: (-getattr(s, c), str(s.id)))
+            )
+            for category in CATEGORIES
+        }
+    return standings
+
+
+def leaderboard_page(
+    class_id,
+    category: str = DEFAULT_CATEGORY,
+    *,
+    cursor: Optional[str] = None,
+    limit: int = PAGE_SIZE,
+) -> LeaderboardPage:
+    """Return one ranked page of a class leaderboard.
+
+    ``cursor`` is the opaque ``next_cursor`` of the previous page. Pages are
+    selected with a ``(points, id)`` seek rather than an OFFSET, so deep pages
+    cost the same as the first one. Past periods come back whole on one page.
+    """
+
+    category = normalize_category(category)
+    if category in PAST_CATEGORIES:
+        return _past_period_page(class_id, PAST_CATEGORIES[category])
+    roll_over_classes([class_id])
+
+    queryset = Student.objects.filter(classes__id=class_id)
+    after = _decode_cursor(cursor)
+    rank_offset = 0
+    if after is not None:
+        points, student_id, rank_offset = after
+        queryset = queryset.filter(
+            Q(**{f"{category}__lt": points})
+            | Q(**{category: points, "id__gt": student_id})
+        )
+
+    rows = list(
+        queryset.order_by(f"-{category}", "id")
+        .values_list(*_STANDING_FIELDS)[: limit + 1]
+    )
+    entries = _ranked([Standing(*row) for row in rows[:limit]], start=rank_offset + 1)
+
+    next_cursor = None
+    if len(rows) > limit:
+        last = entries[-1]
+        next_cursor = f"{getattr(last, category)}:{last.id}:{last.rank}"
+    return LeaderboardPage(entries=entries, next_cursor=next_cursor)
+
+
+def _past_period_page(class_id, period: str, *, today=None) -> LeaderboardPage:
+    week_start, month_start = period_starts(today or now().date())
+    if period == PointsPeriodBucket.PERIOD_WEEK:
+        start = week_start - timedelta(days=7)
+    else:
+        start = (month_start - timedelta(days=1)).replace(day=1)
+    return LeaderboardPage(entries=period_standings(class_id, period, start), next_cursor=None)
+
+
+def _ranked(standings: List[Standing], start: int = 1) -> List[Standing]:
+    return [
+        replace(standing, rank=rank)
+        for rank, standing in enumerate(standings, start=start)
+    ]
+
+
+def _decode_cursor(cursor: Optional[str]) -> Optional[Tuple[int, str, int]]:
+    if not cursor:
+        return None
+    try:
+        points, student_id, rank = cursor.split(":")
+        return int(points), student_id, int(rank)
+    except ValueError:
+        return None
@@ -0,0 +1,56 @@
+import time
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+
+from learning.attempt_archive import (
+    ARCHIVE_AFTER,
+    ARCHIVE_CHUNK_SIZE,
+    archivable_assignments,
+    archive_assignment,
+)
+from learning.models import Assignment
+
+
+class Command(BaseCommand):
+    help = "Move raw attempts of closed or long-expired assignments to compressed archive files"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--assignment", type=int, action="append", dest="assignments",
+            help="Archive this assignment (repeatable), whether or not it is eligible yet.",
+        )
+        parser.add_argument(
+            "--older-than-days", type=int, default=ARCHIVE_AFTER.days,
+            help="Archive assignments whose deadline passed at least this many days ago.",
+        )
+        parser.add_argument(
+            "--chunk-size", type=int, default=ARCHIVE_CHUNK_SIZE,
+            help="Attempts per archive file.",
+        )
+        parser.add_argument(
+            "--dry-run", action="store_true",
+            help="List the assignments that would be archived without changing anything.",
+        )
+
+    def handle(self, *args, **options):
+        if options["assignments"]:
+            assignments = Assignment.objects.filter(pk__in=options["assignments"]).order_by("pk")
+            missing = set(options["assignments"]) - set(assignments.values_list("pk", flat=True))
+            if missing:
+                raise CommandError(f"Unknown assignment(s): {', '.join(map(str, sorted(missing)))}")
+        else:
+            assignments = archivable_assignments(older_than=timedelta(days=options["older_than_days"]))
+
+        started = time.perf_counter()
+        total = 0
+        for assignment in assignments:
+            if options["dry_run"]:
+                self.stdout.write(f"Would archive assignment {assignment.pk} ({assignment.name})")
+                continue
+            moved = archive_assignment(assignment, chunk_size=max(1, options["chunk_size"]))
+            total += moved
+            self.stdout.write(f"Assignment {assignment.pk}: archived {moved} attempt(s)")
+        if not options["dry_run"]:
+            elapsed = time.perf_counter() - started
+            self.stdout.write(self.style.SUCCESS(f"Archived {total} attempt(s) in {elapsed:.2f}s."))
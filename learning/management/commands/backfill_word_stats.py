@@ -0,0 +1,25 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from learning.attempt_stats import BACKFILL_BATCH_SIZE, rebuild_word_stats
+
+
+class Command(BaseCommand):
+    help = "Rebuild the per-student, per-word assignment analytics rollup from raw attempts"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--assignment", type=int, action="append", dest="assignments",
+            help="Only rebuild this assignment (repeatable). Defaults to all assignments.",
+        )
+        parser.add_argument(
+            "--batch-size", type=int, default=BACKFILL_BATCH_SIZE,
+            help="Rows per bulk insert.",
+        )
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        written = rebuild_word_stats(options["assignments"], batch_size=max(1, options["batch_size"]))
+        elapsed = time.perf_counter() - started
+        self.stdout.write(self.style.SUCCESS(f"Wrote {written} rollup row(s) in {elapsed:.2f}s."))
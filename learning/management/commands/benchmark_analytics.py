@@ -0,0 +1,174 @@
+import json
+import platform
+import statistics
+import subprocess
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.db.models import Sum
+from django.test.utils import CaptureQueriesContext, override_settings
+from django.utils import timezone
+
+from learning import analytics
+from learning.models import Assignment, AssignmentAttempt, AssignmentWordStat, Student, User
+from learning.services.dashboard import build_student_home, build_teacher_snapshot
+
+
+BENCHMARK_CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        "LOCATION": "benchmark-analytics",
+    }
+}
+
+
+class Command(BaseCommand):
+    help = (
+        "Time the analytics and dashboard code paths against the current database "
+        "and write the results as JSON for comparison between commits"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--assignment", type=int,
+            help="Assignment to benchmark. Defaults to the one with the most attempts.",
+        )
+        parser.add_argument("--repeat", type=int, default=5, help="Timed runs per case.")
+        parser.add_argument("--output", help="Write the results to this JSON file.")
+        parser.add_argument(
+            "--compare", help="Earlier results file; prints the change in median time per case.",
+        )
+
+    def handle(self, *args, **options):
+        repeat = max(1, options["repeat"])
+        assignment = self._assignment(options["assignment"])
+        teacher = User.objects.get(pk=assignment.teacher_id) if assignment.teacher_id else None
+        student = (
+            Student.objects.filter(classes=assignment.class_assigned_id).order_by("pk").first()
+        )
+
+        cases = {
+            "analytics.build_bundle": lambda: analytics.build_bundle(assignment.pk),
+            "analytics.word_stats": lambda: _cold(analytics.word_stats, assignment.pk),
+            "analytics.heatmap_data": lambda: _cold(analytics.heatmap_data, assignment.pk),
+            "assignment_analytics": lambda: analytics.attempt_summaries(assignment.pk),
+        }
+        if teacher is not None:
+            teacher_class_ids = list(teacher.shared_classes.values_list("id", flat=True))
+            cases["teacher_dashboard"] = lambda: build_teacher_snapshot(teacher, teacher_class_ids)
+        if student is not None:
+            student_class_ids = list(student.classes.values_list("id", flat=True))
+            cases["student_dashboard"] = lambda: build_student_home(
+                student, student_class_ids, timezone.now()
+            )
+
+        # A private cache, so emptying it between cold runs cannot flush the
+        # dashboards, trophies or live games of the site being measured.
+        with override_settings(CACHES=BENCHMARK_CACHES):
+            results = {
+                "metadata": self._metadata(assignment, repeat),
+                "cases": {name: _measure(func, repeat) for name, func in cases.items()},
+            }
+        for name, result in results["cases"].items():
+            self.stdout.write(
+                f"{name:<28} median {result['median_ms']:>9.2f} ms  "
+                f"min {result['min_ms']:>9.2f} ms  queries {result['queries']}"
+            )
+
+        if options["compare"]:
+            self._compare(options["compare"], results["cases"])
+        if options["output"]:
+            with open(options["output"], "w", encoding="utf-8") as handle:
+                json.dump(results, handle, indent=2, sort_keys=True)
+            self.stdout.write(self.style.SUCCESS(f"Wrote results to {options['output']}"))
+
+    def _assignment(self, assignment_id):
+        if assignment_id is None:
+            busiest = (
+                AssignmentWordStat.objects.values("assignment_id")
+                .annotate(total=Sum("attempts"))
+                .order_by("-total")
+                .values_list("assignment_id", flat=True)
+                .first()
+            )
+            if busiest is None:
+                raise CommandError("No attempts recorded; run generate_synthetic_school first.")
+            assignment_id = busiest
+        try:
+            return Assignment.objects.get(pk=assignment_id)
+        except Assignment.DoesNotExist as exc:
+            raise CommandError(f"Assignment {assignment_id} does not exist.") from exc
+
+    def _metadata(self, assignment, repeat):
+        return {
+            "commit": _git_commit(),
+            "timestamp": timezone.now().isoformat(),
+            "python": platform.python_version(),
+            "database": connection.vendor,
+            "cache": settings.CACHES["default"]["BACKEND"],
+            "repeat": repeat,
+            "assignment_id": assignment.pk,
+            "assignment_attempts": AssignmentAttempt.objects.filter(assignment=assignment).count(),
+            "total_attempts": AssignmentAttempt.objects.count(),
+            "students": Student.objects.count(),
+            "assignments": Assignment.objects.count(),
+        }
+
+    def _compare(self, path, cases):
+        try:
+            with open(path, encoding="utf-8") as handle:
+                previous = json.load(handle)["cases"]
+        except (OSError, ValueError, KeyError) as exc:
+            raise CommandError(f"Could not read {path}: {exc}") from exc
+        self.stdout.write(f"Compared with {path}:")
+        for name, result in cases.items():
+            before = previous.get(name)
+            if not before or not before.get("median_ms"):
+                continue
+            change = (result["median_ms"] - before["median_ms"]) / before["median_ms"] * 100
+            self.stdout.write(
+                f"  {name:<26} {change:+7.1f}%  queries {before['queries']} -> {result['queries']}"
+            )
+
+
+def _cold(func, assignment_id):
+    """Call ``func`` with the benchmark's private cache emptied first."""
+
+    cache.clear()
+    return func(assignment_id)
+
+
+def _measure(func, repeat):
+    # One untimed run warms imports and the database's own caches; its
+    # query count is the one reported.
+    with CaptureQueriesContext(connection) as queries:
+        func()
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        timings.append((time.perf_counter() - started) * 1000)
+    return {
+        "queries": len(queries),
+        "min_ms": round(min(timings), 3),
+        "median_ms": round(statistics.median(timings), 3),
+        "mean_ms": round(statistics.fmean(timings), 3),
+        "max_ms": round(max(timings), 3),
+        "runs": repeat,
+    }
+
+
+def _git_commit():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "HEAD"],
+            cwd=settings.BASE_DIR,
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
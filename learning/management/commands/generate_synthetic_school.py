@@ -0,0 +1,57 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from learning.synthetic import SyntheticSpec, generate_school
+
+
+class Command(BaseCommand):
+    help = "Create a reproducible synthetic school for benchmarks and load tests"
+
+    def add_arguments(self, parser):
+        defaults = SyntheticSpec()
+        parser.add_argument("--seed", type=int, default=defaults.seed)
+        parser.add_argument("--teachers", type=int, default=defaults.teachers)
+        parser.add_argument("--classes", type=int, default=defaults.classes)
+        parser.add_argument("--students", type=int, default=defaults.students)
+        parser.add_argument("--lists", type=int, default=defaults.lists)
+        parser.add_argument("--words-per-list", type=int, default=defaults.words_per_list)
+        parser.add_argument("--assignments", type=int, default=defaults.assignments)
+        parser.add_argument(
+            "--attempts", type=int, default=defaults.attempts,
+            help="Total AssignmentAttempt rows, spread unevenly across assignments.",
+        )
+        parser.add_argument(
+            "--history-days", type=int, default=defaults.history_days,
+            help="How far back deadlines go; attempts fall in each assignment's open window.",
+        )
+        parser.add_argument(
+            "--prefix", default=defaults.prefix,
+            help="Username prefix; combined with the seed so schools do not collide.",
+        )
+
+    def handle(self, *args, **options):
+        spec = SyntheticSpec(
+            seed=options["seed"],
+            teachers=options["teachers"],
+            classes=options["classes"],
+            students=options["students"],
+            lists=options["lists"],
+            words_per_list=options["words_per_list"],
+            assignments=options["assignments"],
+            attempts=options["attempts"],
+            history_days=options["history_days"],
+            prefix=options["prefix"],
+        )
+        if min(spec.teachers, spec.classes, spec.lists) < 1:
+            raise CommandError("--teachers, --classes and --lists must be at least 1.")
+
+        started = time.perf_counter()
+        school = generate_school(spec, log=self.stdout.write)
+        elapsed = time.perf_counter() - started
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Created {school.school.name} (id {school.school.pk}) with "
+                f"{school.attempts} attempts in {elapsed:.1f}s."
+            )
+        )
@@ -0,0 +1,28 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from learning.attempt_archive import restore_assignment
+from learning.models import Assignment
+
+
+class Command(BaseCommand):
+    help = "Restore archived raw attempts of an assignment, e.g. for an audit"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--assignment", type=int, action="append", dest="assignments", required=True,
+            help="Assignment to restore (repeatable).",
+        )
+
+    def handle(self, *args, **options):
+        for assignment_id in options["assignments"]:
+            try:
+                assignment = Assignment.objects.get(pk=assignment_id)
+            except Assignment.DoesNotExist as exc:
+                raise CommandError(f"Assignment {assignment_id} does not exist.") from exc
+            try:
+                restored = restore_assignment(assignment)
+            except ValueError as exc:
+                raise CommandError(str(exc)) from exc
+            self.stdout.write(
+                self.style.SUCCESS(f"Assignment {assignment_id}: restored {restored} attempt(s).")
+            )
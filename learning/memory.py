@@ -1,9 +1,11 @@
 """Utilities for computing vocabulary memory strength metrics."""
 from __future__ import annotations
 
+from datetime import datetime
 from math import log1p
-from typing import Tuple
+from typing import Iterable, List, Sequence, Tuple
 
+import numpy as np
 from django.utils import timezone
 
 from .models import Progress
@@ -14,6 +16,17 @@ _SUCCESS_WEIGHT = 0.45
 _STABILITY_WEIGHT = 0.35
 _RECENCY_WEIGHT = 0.20
 
+# Progress columns read by the batch API, in the order it expects them.
+STRENGTH_FIELDS = (
+    "correct_attempts",
+    "incorrect_attempts",
+    "review_count",
+    "interval",
+    "next_due",
+    "last_seen",
+)
+BANDS = ("high", "medium", "low")
+
 
 def _success_component(progress: Progress) -> float:
     """Return a success component between 0 and 1 based on accuracy.
@@ -95,3 +108,95 @@ def memory_meter(progress: Progress, *, now=None) -> Tuple[int, str]:
     else:
         label = "low"
     return percent, label
+
+
+# ---------------------------------------------------------------------------
+# Batch API
+#
+# The functions below mirror ``calculate_memory_strength`` over NumPy arrays so
+# a whole queryset can be scored, sorted and filtered from ``values_list``
+# output without building ``Progress`` instances.
+# ---------------------------------------------------------------------------
+
+
+def _timestamps(values: Iterable[datetime | None]) -> np.ndarray:
+    return np.array(
+        [value.timestamp() if value is not None else np.nan for value in values],
+        dtype=float,
+    )
+
+
+def memory_strengths(rows: Sequence[Sequence], *, now=None) -> np.ndarray:
+    """Return strengths for rows laid out as ``STRENGTH_FIELDS``."""
+
+    if not rows:
+        return np.zeros(0)
+    if now is None:
+        now = timezone.now()
+    correct, incorrect, reviews, interval, next_due, last_seen = zip(*rows)
+    correct = np.array(correct, dtype=float)
+    incorrect = np.array(incorrect, dtype=float)
+    reviews = np.array(reviews, dtype=float)
+    interval = np.maximum(np.nan_to_num(np.array(interval, dtype=float), nan=1.0), 1.0)
+    due = _timestamps(next_due)
+    seen = _timestamps(last_seen)
+
+    denominator = correct + 0.7 * incorrect
+    with np.errstate(divide="ignore", invalid="ignore"):
+        success = np.where(denominator > 0, np.minimum(1.0, correct / denominator), 0.0)
+    stability = np.where(reviews > 0, np.minimum(1.0, np.log1p(np.maximum(reviews, 0)) / log1p(15)), 0.0)
+
+    now_ts = now.timestamp()
+    has_due = ~np.isnan(due)
+    reference = np.where(has_due, due, seen)
+    overdue_days = (now_ts - reference) / 86400
+    ratio = np.maximum(0.0, overdue_days / interval)
+    recency = np.maximum(0.0, 1.0 - np.minimum(ratio, 2.0) * 0.5)
+    recency = np.where(has_due & (now_ts <= due), 1.0, recency)
+    recency = np.where(np.isnan(reference), 0.0, recency)
+
+    score = (
+        _SUCCESS_WEIGHT * success
+        + _STABILITY_WEIGHT * stability
+        + _RECENCY_WEIGHT * recency
+    )
+    return np.clip(score, 0.0, 1.0)
+
+
+def memory_percents(strengths: np.ndarray) -> np.ndarray:
+    return np.rint(strengths * 100).astype(int)
+
+
+def memory_bands(percents: np.ndarray) -> np.ndarray:
+    """Label each percent ``high``, ``medium`` or ``low`` like ``memory_meter``."""
+
+    return np.select([percents >= 75, percents >= 45], ["high", "medium"], default="low")
+
+
+def score_queryset(queryset, *fields: str, now=None) -> Tuple[List[tuple], np.ndarray]:
+    """Fetch ``fields`` plus the strength columns in one query and score them.
+
+    Returns the rows trimmed to ``fields`` and an aligned strength array.
+    """
+
+    rows = list(queryset.values_list(*fields, *STRENGTH_FIELDS))
+    width = len(fields)
+    strengths = memory_strengths([row[width:] for row in rows], now=now)
+    return [row[:width] for row in rows], strengths
+
+
+def weakest(queryset, k: int, *, field: str = "word_id", now=None) -> List:
+    """Return ``field`` for the ``k`` weakest rows, weakest first."""
+
+    if k <= 0:
+        return []
+    rows, strengths = score_queryset(queryset, field, now=now)
+    if not rows:
+        return []
+    if k < len(rows):
+        candidates = np.argpartition(strengths, k - 1)[:k]
+    else:
+        candidates = np.arange(len(rows))
+    # Break ties by fetch order so results are deterministic.
+    order = candidates[np.lexsort((candidates, strengths[candidates]))]
+    return [rows[index][0] for index in order]
@@ -0,0 +1,51 @@
+# Generated by Django 5.0.3 on 2026-10-17 03:30
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('learning', '0041_clubsession_clubattendance_studentcalendarentry_and_more'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PointsRollupCursor',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=40, unique=True)),
+                ('last_entry_id', models.BigIntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='PointsLedgerEntry',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('amount', models.IntegerField()),
+                ('source', models.CharField(blank=True, max_length=40)),
+                ('created_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('student', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='points_ledger', to='learning.student')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['student', 'created_at'], name='learning_po_student_fe9da1_idx')],
+            },
+        ),
+        migrations.CreateModel(
+            name='PointsPeriodBucket',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('period', models.CharField(choices=[('week', 'Week'), ('month', 'Month')], max_length=5)),
+                ('period_start', models.DateField()),
+                ('points', models.IntegerField(default=0)),
+                ('student', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='points_buckets', to='learning.student')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['period', 'period_start', 'points'], name='learning_po_period_9c60a0_idx')],
+                'unique_together': {('student', 'period', 'period_start')},
+            },
+        ),
+    ]
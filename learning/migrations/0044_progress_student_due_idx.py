@@ -0,0 +1,17 @@
+# Generated by Django 5.0.3 on 2026-10-17 03:38
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('learning', '0043_schedule_points_rollup'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='progress',
+            index=models.Index(fields=['student', 'next_due'], name='progress_student_due_idx'),
+        ),
+    ]
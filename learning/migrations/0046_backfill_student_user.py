@@ -0,0 +1,58 @@
+from django.db import migrations, transaction
+
+
+CHUNK_SIZE = 500
+
+
+def link_students(apps, schema_editor):
+    Student = apps.get_model("learning", "Student")
+    User = apps.get_model("learning", "User")
+
+    last_pk = None
+    while True:
+        chunk = Student.objects.filter(user__isnull=True).order_by("pk")
+        if last_pk is not None:
+            chunk = chunk.filter(pk__gt=last_pk)
+        students = list(
+            chunk.only("pk", "username", "first_name", "last_name", "password")[:CHUNK_SIZE]
+        )
+        if not students:
+            break
+        last_pk = students[-1].pk
+
+        with transaction.atomic():
+            usernames = [student.username for student in students]
+            users = dict(User.objects.filter(username__in=usernames).values_list("username", "id"))
+            missing = [
+                User(
+                    username=student.username,
+                    is_student=True,
+                    first_name=student.first_name,
+                    last_name=student.last_name,
+                    password=student.password,
+                )
+                for student in students
+                if student.username not in users
+            ]
+            if missing:
+                User.objects.bulk_create(missing, ignore_conflicts=True)
+                users = dict(
+                    User.objects.filter(username__in=usernames).values_list("username", "id")
+                )
+            for student in students:
+                student.user_id = users[student.username]
+            Student.objects.bulk_update(students, ["user"])
+
+
+class Migration(migrations.Migration):
+    # Each chunk commits on its own so large tables are not locked for the
+    # whole backfill.
+    atomic = False
+
+    dependencies = [
+        ("learning", "0045_student_user"),
+    ]
+
+    operations = [
+        migrations.RunPython(link_students, migrations.RunPython.noop),
+    ]
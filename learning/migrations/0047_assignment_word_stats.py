@@ -0,0 +1,29 @@
+# Generated by Django 5.0.3 on 2026-10-17 03:43
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('learning', '0046_backfill_student_user'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AssignmentWordStat',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('mode', models.CharField(choices=[('flashcards', 'Flashcards'), ('matchup', 'Matchup'), ('fill_gap', 'Gap Fill'), ('destroy_wall', 'Destroy the Wall'), ('unscramble', 'Unscramble'), ('listening_dictation', 'Listening Dictation'), ('listening_translation', 'Listening Translation')], max_length=30)),
+                ('attempts', models.PositiveIntegerField(default=0)),
+                ('correct', models.PositiveIntegerField(default=0)),
+                ('assignment', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='word_stats', to='learning.assignment')),
+                ('student', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='learning.student')),
+                ('vocabulary_word', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='learning.vocabularyword')),
+            ],
+            options={
+                'unique_together': {('assignment', 'student', 'vocabulary_word', 'mode')},
+            },
+        ),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 5.0.3 on 2026-10-17 03:45
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('learning', '0047_assignment_word_stats'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='assignmentattempt',
+            index=models.Index(fields=['assignment', 'id'], name='attempt_assignment_latest_idx'),
+        ),
+    ]
@@ -0,0 +1,54 @@
+# Generated by Django 5.0.3 on 2026-10-17 03:58
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('learning', '0049_export_jobs'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='assignment',
+            name='attempts_archived_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.CreateModel(
+            name='ArchivedAttemptSummary',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('position', models.PositiveIntegerField()),
+                ('attempts', models.PositiveIntegerField(default=0)),
+                ('correct', models.PositiveIntegerField(default=0)),
+                ('wrong_before_correct', models.PositiveIntegerField(default=0)),
+                ('assignment', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='archived_summaries', to='learning.assignment')),
+                ('student', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='learning.student')),
+                ('vocabulary_word', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='learning.vocabularyword')),
+            ],
+            options={
+                'ordering': ('assignment', 'position'),
+                'unique_together': {('assignment', 'student', 'vocabulary_word')},
+            },
+        ),
+        migrations.CreateModel(
+            name='AttemptArchive',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('sequence', models.PositiveIntegerField()),
+                ('file', models.FileField(upload_to='attempt_archives/')),
+                ('row_count', models.PositiveIntegerField()),
+                ('first_attempt_id', models.BigIntegerField()),
+                ('last_attempt_id', models.BigIntegerField()),
+                ('sha256', models.CharField(max_length=64)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('assignment', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='attempt_archives', to='learning.assignment')),
+            ],
+            options={
+                'ordering': ('assignment', 'sequence'),
+                'unique_together': {('assignment', 'sequence')},
+            },
+        ),
+    ]
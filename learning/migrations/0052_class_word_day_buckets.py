@@ -0,0 +1,39 @@
+# Generated by Django 5.0.3 on 2026-10-17 04:02
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('learning', '0051_schedule_attempt_archival'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ClassBucketCursor',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=40, unique=True)),
+                ('last_id', models.BigIntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='ClassWordDayBucket',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('mode', models.CharField(max_length=30)),
+                ('day', models.DateField()),
+                ('attempts', models.PositiveIntegerField(default=0)),
+                ('correct', models.PositiveIntegerField(default=0)),
+                ('clazz', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='word_day_buckets', to='learning.class')),
+                ('vocabulary_word', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='learning.vocabularyword')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['clazz', 'day'], name='learning_cl_clazz_i_7f20fb_idx')],
+                'unique_together': {('clazz', 'vocabulary_word', 'mode', 'day')},
+            },
+        ),
+    ]
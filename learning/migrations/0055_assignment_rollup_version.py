@@ -0,0 +1,18 @@
+# Generated by Django 5.0.3 on 2026-10-17 04:53
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('learning', '0054_schedule_export_cleanup'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='assignment',
+            name='rollup_version',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+    ]
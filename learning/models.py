@@ -1,4 +1,5 @@
 from django.db import models
+from django.db.models import Case, F, Q, Value, When
 from django.contrib.auth.models import AbstractUser
 import uuid
 import random
@@ -7,6 +8,15 @@ from django.utils.timezone import now
 from datetime import datetime, timedelta
 from django_countries.fields import CountryField
 
+def period_starts(today):
+    """Return the (week_start, month_start) dates for the period containing ``today``."""
+    return today - timedelta(days=today.weekday()), today.replace(day=1)
+
+
+def _as_date(value):
+    return value.date() if isinstance(value, datetime) else value
+
+
 def generate_school_key():
     return ''.join(random.choices(string.ascii_uppercase + string.digits, k=10))
 
@@ -99,6 +109,14 @@ class Student(models.Model):
     password = models.CharField(max_length=50)
     classes = models.ManyToManyField(Class, related_name="students")
     last_login = models.DateTimeField(null=True, blank=True)
+    # Shadow account used by progress, SRS and achievements records.
+    user = models.OneToOneField(
+        User,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name="student_profile",
+    )
     
     # Existing points tracking
     total_points = models.PositiveIntegerField(default=0)
@@ -131,31 +149,112 @@ class Student(models.Model):
         self.save()
 
     def reset_periodic_points(self):
+        """Zero stale weekly/monthly totals with a single conditional UPDATE.
+
+        Nothing is written unless a week or month boundary has passed since the
+        last reset, so this is safe to call on every request.
+        """
         today = now().date()
-        updated = False
-        if (
-            self.weekly_points_last_reset.isocalendar()[1] != today.isocalendar()[1]
-            or self.weekly_points_last_reset.year != today.year
-        ):
+        week_start, month_start = period_starts(today)
+        weekly_stale = _as_date(self.weekly_points_last_reset) < week_start
+        monthly_stale = _as_date(self.monthly_points_last_reset) < month_start
+        if not (weekly_stale or monthly_stale):
+            return False
+
+        weekly_due = Q(weekly_points_last_reset__lt=week_start)
+        monthly_due = Q(monthly_points_last_reset__lt=month_start)
+        points_field, date_field = models.PositiveIntegerField(), models.DateField()
+        Student.objects.filter(weekly_due | monthly_due, pk=self.pk).update(
+            weekly_points=Case(
+                When(weekly_due, then=Value(0)),
+                default=F("weekly_points"),
+                output_field=points_field,
+            ),
+            weekly_points_last_reset=Case(
+                When(weekly_due, then=Value(today)),
+                default=F("weekly_points_last_reset"),
+                output_field=date_field,
+            ),
+            monthly_points=Case(
+                When(monthly_due, then=Value(0)),
+                default=F("monthly_points"),
+                output_field=points_field,
+            ),
+            monthly_points_last_reset=Case(
+                When(monthly_due, then=Value(today)),
+                default=F("monthly_points_last_reset"),
+                output_field=date_field,
+            ),
+        )
+        if weekly_stale:
             self.weekly_points = 0
             self.weekly_points_last_reset = today
-            updated = True
-        if (
-            self.monthly_points_last_reset.month != today.month
-            or self.monthly_points_last_reset.year != today.year
-        ):
+        if monthly_stale:
             self.monthly_points = 0
             self.monthly_points_last_reset = today
-            updated = True
-        if updated:
-            self.save()
+        return True
 
-    def add_points(self, amount):
-        self.reset_periodic_points()
-        self.total_points += amount
-        self.weekly_points += amount
-        self.monthly_points += amount
-        self.save()
+    def add_points(self, amount, source=""):
+        from .points import award_points
+
+        award_points(self, amount, source=source)
+
+
+class PointsLedgerEntry(models.Model):
+    """Append-only record of every point award.
+
+    Rows are never updated or deleted; per-period totals are rolled up from
+    them into ``PointsPeriodBucket`` by ``learning.tasks.rollup_points_ledger``.
+    """
+
+    student = models.ForeignKey(
+        Student, on_delete=models.CASCADE, related_name="points_ledger"
+    )
+    amount = models.IntegerField()
+    source = models.CharField(max_length=40, blank=True)
+    created_at = models.DateTimeField(default=now)
+
+    class Meta:
+        indexes = [models.Index(fields=["student", "created_at"])]
+
+    def __str__(self) -> str:  # pragma: no cover - simple representation
+        return f"{self.student_id} +{self.amount} ({self.source or 'points'})"
+
+
+class PointsPeriodBucket(models.Model):
+    """Points a student earned in one calendar week or month."""
+
+    PERIOD_WEEK = "week"
+    PERIOD_MONTH = "month"
+    PERIOD_CHOICES = (
+        (PERIOD_WEEK, "Week"),
+        (PERIOD_MONTH, "Month"),
+    )
+
+    student = models.ForeignKey(
+        Student, on_delete=models.CASCADE, related_name="points_buckets"
+    )
+    period = models.CharField(max_length=5, choices=PERIOD_CHOICES)
+    period_start = models.DateField()
+    points = models.IntegerField(default=0)
+
+    class Meta:
+        unique_together = ("student", "period", "period_start")
+        indexes = [models.Index(fields=["period", "period_start", "points"])]
+
+    def __str__(self) -> str:  # pragma: no cover - simple representation
+        return f"{self.student_id} {self.period} {self.period_start}: {self.points}"
+
+
+class PointsRollupCursor(models.Model):
+    """Remembers the last ledger entry folded into the period buckets."""
+
+    name = models.CharField(max_length=40, unique=True)
+    last_entry_id = models.BigIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self) -> str:  # pragma: no cover - simple representation
+        return f"{self.name} @ {self.last_entry_id}"
 
 
 class ClubSession(models.Model):
@@ -335,6 +434,9 @@ class Progress(models.Model):
     interval = models.IntegerField(default=1)
     points = models.IntegerField(default=0)  # Points for this specific word interaction
 
+    class Meta:
+        indexes = [models.Index(fields=["student", "next_due"], name="progress_student_due_idx")]
+
     def update_points(self, points_awarded):
         self.points += points_awarded
         self.save()
@@ -357,6 +459,10 @@ class Assignment(models.Model):
     deadline = models.DateTimeField()
     target_points = models.IntegerField()  # Total target points for the assignment
     is_closed = models.BooleanField(default=False)
+    # Set while raw attempts live in ``AttemptArchive`` files (see learning.attempt_archive).
+    attempts_archived_at = models.DateTimeField(null=True, blank=True)
+    # Bumped when attempts leave the ``AssignmentWordStat`` rollup or it is rebuilt.
+    rollup_version = models.PositiveIntegerField(default=0, editable=False)
 
     # Existing Modes
     include_flashcards = models.BooleanField(default=False)
@@ -498,11 +604,116 @@ class AssignmentAttempt(models.Model):
     is_correct = models.BooleanField(default=False)
     timestamp = models.DateTimeField(auto_now_add=True)
 
+    class Meta:
+        indexes = [
+            # Latest attempt per assignment, used to key cached analytics.
+            models.Index(fields=["assignment", "id"], name="attempt_assignment_latest_idx"),
+        ]
+
     def __str__(self):
         status = "Correct" if self.is_correct else "Incorrect"
         return f"{self.student.username} - {self.vocabulary_word.word} ({self.mode}): {status} at {self.timestamp}"
 
 
+class AssignmentWordStat(models.Model):
+    """Attempt counts for one student, word and mode within an assignment.
+
+    Maintained from ``AssignmentAttempt`` by ``learning.attempt_stats`` so the
+    analytics read one row per cell instead of every raw attempt.
+    """
+
+    assignment = models.ForeignKey(Assignment, on_delete=models.CASCADE, related_name="word_stats")
+    student = models.ForeignKey(Student, on_delete=models.CASCADE, related_name="+")
+    vocabulary_word = models.ForeignKey(VocabularyWord, on_delete=models.CASCADE, related_name="+")
+    mode = models.CharField(max_length=30, choices=AssignmentAttempt.MODE_CHOICES)
+    attempts = models.PositiveIntegerField(default=0)
+    correct = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        unique_together = ("assignment", "student", "vocabulary_word", "mode")
+
+    def __str__(self) -> str:  # pragma: no cover - simple representation
+        return f"{self.assignment_id}/{self.student_id}/{self.vocabulary_word_id} ({self.mode}): {self.correct}/{self.attempts}"
+
+
+class ArchivedAttemptSummary(models.Model):
+    """Order-dependent totals for one student and word of an archived assignment.
+
+    Written by ``learning.attempt_archive`` when raw attempts are moved to
+    disk, so the assignment analytics page still has what it needs.
+    ``position`` keeps the order in which the cells were first attempted.
+    """
+
+    assignment = models.ForeignKey(Assignment, on_delete=models.CASCADE, related_name="archived_summaries")
+    student = models.ForeignKey(Student, on_delete=models.CASCADE, related_name="+")
+    vocabulary_word = models.ForeignKey(VocabularyWord, on_delete=models.CASCADE, related_name="+")
+    position = models.PositiveIntegerField()
+    attempts = models.PositiveIntegerField(default=0)
+    correct = models.PositiveIntegerField(default=0)
+    # Wrong answers before the student first got the word right.
+    wrong_before_correct = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        unique_together = ("assignment", "student", "vocabulary_word")
+        ordering = ("assignment", "position")
+
+    def __str__(self) -> str:  # pragma: no cover - simple representation
+        return f"{self.assignment_id}/{self.student_id}/{self.vocabulary_word_id}: {self.correct}/{self.attempts}"
+
+
+class AttemptArchive(models.Model):
+    """One gzipped JSONL chunk of an assignment's archived attempts."""
+
+    assignment = models.ForeignKey(Assignment, on_delete=models.CASCADE, related_name="attempt_archives")
+    sequence = models.PositiveIntegerField()
+    file = models.FileField(upload_to="attempt_archives/")
+    row_count = models.PositiveIntegerField()
+    first_attempt_id = models.BigIntegerField()
+    last_attempt_id = models.BigIntegerField()
+    sha256 = models.CharField(max_length=64)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        unique_together = ("assignment", "sequence")
+        ordering = ("assignment", "sequence")
+
+    def __str__(self) -> str:  # pragma: no cover - simple representation
+        return f"{self.assignment_id} #{self.sequence} ({self.row_count} attempts)"
+
+
+class ClassWordDayBucket(models.Model):
+    """Answers given by one class for one word and mode on one day.
+
+    Folded in from ``AssignmentAttempt`` and live-game answers by
+    ``learning.class_trends``; the class trend endpoints read only this table.
+    """
+
+    clazz = models.ForeignKey(Class, on_delete=models.CASCADE, related_name="word_day_buckets")
+    vocabulary_word = models.ForeignKey(VocabularyWord, on_delete=models.CASCADE, related_name="+")
+    mode = models.CharField(max_length=30)
+    day = models.DateField()
+    attempts = models.PositiveIntegerField(default=0)
+    correct = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        unique_together = ("clazz", "vocabulary_word", "mode", "day")
+        indexes = [models.Index(fields=["clazz", "day"])]
+
+    def __str__(self) -> str:  # pragma: no cover - simple representation
+        return f"{self.clazz_id}/{self.vocabulary_word_id} ({self.mode}) {self.day}: {self.correct}/{self.attempts}"
+
+
+class ClassBucketCursor(models.Model):
+    """Remembers the last row of each source folded into ``ClassWordDayBucket``."""
+
+    name = models.CharField(max_length=40, unique=True)
+    last_id = models.BigIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self) -> str:  # pragma: no cover - simple representation
+        return f"{self.name} @ {self.last_id}"
+
+
 class GrammarLadder(models.Model):
     teacher = models.ForeignKey(User, on_delete=models.CASCADE, related_name="grammar_ladders")
     name = models.CharField(max_length=100)
@@ -528,3 +739,37 @@ class LadderItem(models.Model):
         return f"{self.phrase} - {'Correct' if self.is_correct else 'Incorrect'}"
 
 
+
+
+class ExportJob(models.Model):
+    """A file export produced in the background by ``learning.export_jobs``."""
+
+    STATUS_QUEUED = "queued"
+    STATUS_RUNNING = "running"
+    STATUS_DONE = "done"
+    STATUS_FAILED = "failed"
+    STATUS_CHOICES = (
+        (STATUS_QUEUED, "Queued"),
+        (STATUS_RUNNING, "Running"),
+        (STATUS_DONE, "Done"),
+        (STATUS_FAILED, "Failed"),
+    )
+
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    kind = models.CharField(max_length=50)
+    params = models.JSONField(default=dict, blank=True)
+    requested_by = models.ForeignKey(
+        User, on_delete=models.CASCADE, null=True, blank=True, related_name="export_jobs"
+    )
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default=STATUS_QUEUED)
+    progress = models.PositiveSmallIntegerField(default=0)  # percent
+    rows_written = models.PositiveIntegerField(default=0)
+    filename = models.CharField(max_length=255, blank=True)
+    file = models.FileField(upload_to="exports/", blank=True)
+    error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    def __str__(self) -> str:  # pragma: no cover - simple representation
+        return f"{self.kind} ({self.status})"
@@ -0,0 +1,186 @@
+"""Points awarding backed by an append-only ledger.
+
+Every award inserts a ``PointsLedgerEntry`` and bumps the student's running
+columns with a single ``F()`` UPDATE, so concurrent requests never overwrite
+each other. The UPDATE also rolls the weekly/monthly columns over when their
+period has ended, which is why no scheduled reset job is needed.
+
+Historical standings come from ``PointsPeriodBucket`` rows, which
+``rollup_points_ledger`` folds out of the ledger in the background.
+"""
+
+from __future__ import annotations
+
+from collections import defaultdict
+from dataclasses import dataclass
+from datetime import date, timedelta
+from typing import List, Optional
+
+from django.db import transaction
+from django.db.models import Case, DateField, F, PositiveIntegerField, Value, When
+from django.utils import timezone
+
+from .models import (
+    PointsLedgerEntry,
+    PointsPeriodBucket,
+    PointsRollupCursor,
+    Student,
+    period_starts,
+)
+
+
+ROLLUP_CURSOR = "period-buckets"
+ROLLUP_LAG = timedelta(minutes=1)
+ROLLUP_BATCH_SIZE = 5000
+
+_POINT_FIELDS = (
+    "total_points",
+    "weekly_points",
+    "monthly_points",
+    "weekly_points_last_reset",
+    "monthly_points_last_reset",
+)
+
+
+@dataclass(frozen=True)
+class PeriodStanding:
+    """A student's score for one historical week or month."""
+
+    id: object
+    first_name: str
+    last_name: str
+    points: int
+    rank: int
+
+
+def award_points(student: Student, amount, source: str = "") -> Student:
+    """Record ``amount`` points for ``student`` and update its running totals.
+
+    One INSERT into the ledger and one UPDATE of the student row, both inside a
+    transaction. ``student`` is refreshed with the stored totals afterwards.
+    """
+
+    amount = int(amount)
+    if not amount:
+        return student
+
+    today = timezone.localdate()
+    week_start, month_start = period_starts(today)
+
+    with transaction.atomic():
+        PointsLedgerEntry.objects.create(student=student, amount=amount, source=source)
+        Student.objects.filter(pk=student.pk).update(
+            total_points=F("total_points") + amount,
+            weekly_points=_period_points("weekly", week_start, amount),
+            monthly_points=_period_points("monthly", month_start, amount),
+            weekly_points_last_reset=_period_reset("weekly", week_start, today),
+            monthly_points_last_reset=_period_reset("monthly", month_start, today),
+        )
+    student.refresh_from_db(fields=_POINT_FIELDS)
+    return student
+
+
+def _period_points(prefix: str, start: date, amount: int) -> Case:
+    return Case(
+        When(**{f"{prefix}_points_last_reset__lt": start}, then=Value(amount)),
+        default=F(f"{prefix}_points") + amount,
+        output_field=PositiveIntegerField(),
+    )
+
+
+def _period_reset(prefix: str, start: date, today: date) -> Case:
+    return Case(
+        When(**{f"{prefix}_points_last_reset__lt": start}, then=Value(today)),
+        default=F(f"{prefix}_points_last_reset"),
+        output_field=DateField(),
+    )
+
+
+def rollup_points_ledger(
+    *, lag: timedelta = ROLLUP_LAG, batch_size: int = ROLLUP_BATCH_SIZE
+) -> int:
+    """Fold new ledger entries into weekly and monthly buckets.
+
+    Entries are consumed in id order past a stored watermark. Entries younger
+    than ``lag`` are left for the next run so that a transaction which took an
+    earlier id but committed late is not skipped. Returns the number of
+    entries processed.
+    """
+
+    cutoff = timezone.now() - lag
+    with transaction.atomic():
+        cursor, _ = PointsRollupCursor.objects.select_for_update().get_or_create(
+            name=ROLLUP_CURSOR
+        )
+        entries = (
+            PointsLedgerEntry.objects.filter(id__gt=cursor.last_entry_id)
+            .order_by("id")
+            .values_list("id", "student_id", "amount", "created_at")[:batch_size]
+        )
+
+        totals = defaultdict(int)
+        last_id = None
+        processed = 0
+        for entry_id, student_id, amount, created_at in entries:
+            if created_at >= cutoff:
+                break
+            week_start, month_start = period_starts(timezone.localdate(created_at))
+            totals[(student_id, PointsPeriodBucket.PERIOD_WEEK, week_start)] += amount
+            totals[(student_id, PointsPeriodBucket.PERIOD_MONTH, month_start)] += amount
+            last_id = entry_id
+            processed += 1
+        if last_id is None:
+            return 0
+
+        existing = PointsPeriodBucket.objects.select_for_update().filter(
+            student_id__in={key[0] for key in totals},
+            period_start__in={key[2] for key in totals},
+        )
+        to_update = []
+        for bucket in existing:
+            key = (bucket.student_id, bucket.period, bucket.period_start)
+            if key in totals:
+                bucket.points += totals.pop(key)
+                to_update.append(bucket)
+        PointsPeriodBucket.objects.bulk_update(to_update, ["points"])
+        PointsPeriodBucket.objects.bulk_create(
+            PointsPeriodBucket(
+                student_id=student_id, period=period, period_start=start, points=points
+            )
+            for (student_id, period, start), points in totals.items()
+        )
+
+        cursor.last_entry_id = last_id
+        cursor.save(update_fields=["last_entry_id", "updated_at"])
+    return processed
+
+
+def period_standings(
+    class_id,
+    period: str,
+    period_start: date,
+    *,
+    limit: Optional[int] = None,
+) -> List[PeriodStanding]:
+    """Rank the members of a class by points earned in a past week or month.
+
+    ``period_start`` is normalised to the Monday or first of the month that
+    contains it. Students who earned nothing in that period are omitted.
+    """
+
+    week_start, month_start = period_starts(period_start)
+    start = week_start if period == PointsPeriodBucket.PERIOD_WEEK else month_start
+    rows = (
+        PointsPeriodBucket.objects.filter(
+            period=period, period_start=start, student__classes__id=class_id
+        )
+        .order_by("-points", "student_id")
+        .values_list(
+            "student_id", "student__first_name", "student__last_name", "points"
+        )
+    )
+    if limit is not None:
+        rows = rows[:limit]
+    return [
+        PeriodStanding(*row, rank=rank) for rank, row in enumerate(rows, start=1)
+    ]
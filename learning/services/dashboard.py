@@ -0,0 +1,259 @@
+"""Cached, constant-query payloads for the teacher and student dashboards.
+
+The teacher snapshot holds per-class assignment lists, student counts,
+vocabulary-list attachments and assignment completion counts, loaded with a
+fixed number of aggregate queries. The student home payload holds the
+student's assignments with their progress and the practice vocabulary lists.
+
+Cache keys embed a version token for each class involved (and, for students,
+one per student); ``invalidate_classes`` and ``invalidate_student_home``
+(wired to model signals in ``learning.signals``) replace those tokens after
+commit so stale payloads are never read. The tokens only work across
+processes when ``CACHES`` is shared, which settings do when ``REDIS_URL`` is
+set.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import uuid
+from collections import defaultdict
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, List, Optional, Set
+
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Count
+from django.utils.timezone import now
+
+from learning.models import Assignment, AssignmentProgress, Class, User, VocabularyList
+
+
+SNAPSHOT_TIMEOUT = 60 * 30
+VERSION_TIMEOUT = 60 * 60 * 24 * 7
+
+# Expired assignments older than the window are not loaded for students, and
+# at most EXPIRED_LIMIT of the most recent ones are shown per class.
+EXPIRED_WINDOW = timedelta(days=120)
+EXPIRED_LIMIT = 10
+
+
+@dataclass
+class TeacherDashboardSnapshot:
+    """Everything the dashboard needs that does not depend on query params."""
+
+    classes: List[Class]
+    assignments: Dict[object, List[Assignment]] = field(default_factory=dict)
+    attached_class_ids: Dict[object, Set[object]] = field(default_factory=dict)
+    completed_counts: Dict[object, int] = field(default_factory=dict)
+
+    def annotate_classes(self, current_time: datetime) -> List[Class]:
+        """Attach ``live_assignments`` and ``expired_assignments`` to each class."""
+
+        for class_instance in self.classes:
+            live, expired = [], []
+            for assignment in self.assignments.get(class_instance.id, []):
+                if assignment.is_closed or assignment.deadline < current_time:
+                    expired.append(assignment)
+                else:
+                    live.append(assignment)
+            class_instance.live_assignments = live
+            class_instance.expired_assignments = expired
+        return self.classes
+
+    def unattached_classes(self, vocab_list_id) -> List[Class]:
+        attached = self.attached_class_ids.get(vocab_list_id, ())
+        return [c for c in self.classes if c.id not in attached]
+
+    def pending_assignments(self, current_time: datetime) -> List[dict]:
+        """Live assignments with students still to finish, in deadline order."""
+
+        student_counts = {c.id: c.student_count for c in self.classes}
+        pending = []
+        for class_id, assignments in self.assignments.items():
+            for assignment in assignments:
+                if assignment.is_closed or assignment.deadline < current_time:
+                    continue
+                count = student_counts.get(class_id, 0) - self.completed_counts.get(
+                    assignment.id, 0
+                )
+                if count > 0:
+                    pending.append({"assignment": assignment, "pending": count})
+        pending.sort(key=lambda item: (item["assignment"].deadline, item["assignment"].id))
+        return pending
+
+
+def get_teacher_snapshot(teacher: User) -> TeacherDashboardSnapshot:
+    """Return the cached snapshot for ``teacher``, rebuilding it if stale."""
+
+    class_ids = list(
+        Class.objects.filter(teachers=teacher)
+        .order_by("id")
+        .values_list("id", flat=True)
+        .distinct()
+    )
+    key = f"dashboard:teacher:{teacher.pk}:{_versions_digest(_version_keys(class_ids))}"
+    snapshot = cache.get(key)
+    if snapshot is None:
+        snapshot = build_teacher_snapshot(teacher, class_ids)
+        cache.set(key, snapshot, SNAPSHOT_TIMEOUT)
+    return snapshot
+
+
+def build_teacher_snapshot(teacher: User, class_ids: Iterable) -> TeacherDashboardSnapshot:
+    """Load a snapshot from the database in four queries."""
+
+    class_ids = list(class_ids)
+    classes = list(
+        Class.objects.filter(id__in=class_ids).annotate(
+            student_count=Count("students", distinct=True)
+        )
+    )
+
+    assignments: Dict[object, List[Assignment]] = defaultdict(list)
+    for assignment in Assignment.objects.filter(class_assigned_id__in=class_ids).order_by("id"):
+        assignments[assignment.class_assigned_id].append(assignment)
+
+    attached: Dict[object, Set[object]] = defaultdict(set)
+    links = VocabularyList.classes.through.objects.filter(
+        vocabularylist__teacher=teacher, class_id__in=class_ids
+    ).values_list("vocabularylist_id", "class_id")
+    for vocab_list_id, class_id in links:
+        attached[vocab_list_id].add(class_id)
+
+    completed_counts = dict(
+        AssignmentProgress.objects.filter(
+            assignment__class_assigned_id__in=class_ids, completed=True
+        )
+        .values("assignment_id")
+        .annotate(total=Count("id"))
+        .values_list("assignment_id", "total")
+    )
+
+    return TeacherDashboardSnapshot(
+        classes=classes,
+        assignments=dict(assignments),
+        attached_class_ids=dict(attached),
+        completed_counts=completed_counts,
+    )
+
+
+@dataclass
+class StudentHomePayload:
+    """A student's assignments (with progress) and practice lists."""
+
+    live: Dict[object, List[Assignment]]
+    expired: Dict[object, List[Assignment]]
+    vocab_lists: List[VocabularyList]
+    expires_at: Optional[datetime] = None
+
+    def annotate_classes(self, classes: Iterable[Class]) -> None:
+        for class_instance in classes:
+            class_instance.live_assignments = self.live.get(class_instance.id, [])
+            class_instance.expired_assignments = self.expired.get(class_instance.id, [])
+
+
+def get_student_home(student, class_ids: Iterable) -> StudentHomePayload:
+    """Return the cached home payload for ``student`` in ``class_ids``."""
+
+    class_ids = sorted(class_ids, key=str)
+    version_keys = [_student_version_key(student.pk)] + _version_keys(class_ids)
+    key = f"dashboard:student:{student.pk}:{_versions_digest(version_keys)}"
+    current_time = now()
+    payload = cache.get(key)
+    if payload is None or (payload.expires_at and payload.expires_at <= current_time):
+        payload = build_student_home(student, class_ids, current_time)
+        timeout = SNAPSHOT_TIMEOUT
+        if payload.expires_at:
+            timeout = min(timeout, int((payload.expires_at - current_time).total_seconds()) + 1)
+        cache.set(key, payload, timeout)
+    return payload
+
+
+def build_student_home(student, class_ids: Iterable, current_time: datetime) -> StudentHomePayload:
+    """Load a student home payload in three queries.
+
+    Assignments whose deadline is older than ``EXPIRED_WINDOW`` are never
+    fetched. ``expires_at`` is the earliest live deadline, after which the
+    live/expired split is out of date.
+    """
+
+    class_ids = list(class_ids)
+    assignments = list(
+        Assignment.objects.filter(
+            class_assigned_id__in=class_ids,
+            deadline__gte=current_time - EXPIRED_WINDOW,
+        ).order_by("deadline", "id")
+    )
+    progress = {
+        assignment_id: (points, completed)
+        for assignment_id, points, completed in AssignmentProgress.objects.filter(
+            student=student, assignment_id__in=[a.id for a in assignments]
+        ).values_list("assignment_id", "points_earned", "completed")
+    }
+
+    live: Dict[object, List[Assignment]] = defaultdict(list)
+    expired: Dict[object, List[Assignment]] = defaultdict(list)
+    expires_at = None
+    for assignment in assignments:
+        points, completed = progress.get(assignment.id, (0, False))
+        assignment.student_progress = points
+        assignment.target_points = assignment.target_points or 1
+        assignment.progress_percentage = (points / assignment.target_points) * 100
+        assignment.is_complete = completed
+        if assignment.is_closed or assignment.deadline < current_time:
+            expired[assignment.class_assigned_id].insert(0, assignment)
+        else:
+            live[assignment.class_assigned_id].append(assignment)
+            if expires_at is None:
+                expires_at = assignment.deadline
+
+    vocab_lists = list(VocabularyList.objects.filter(classes__id__in=class_ids).distinct())
+    return StudentHomePayload(
+        live=dict(live),
+        expired={class_id: items[:EXPIRED_LIMIT] for class_id, items in expired.items()},
+        vocab_lists=vocab_lists,
+        expires_at=expires_at,
+    )
+
+
+def invalidate_classes(class_ids: Iterable) -> None:
+    """Mark every cached snapshot covering ``class_ids`` as stale once the
+    current transaction commits, so no reader caches the old rows under the
+    new token."""
+
+    token = uuid.uuid4().hex
+    versions = {_version_key(class_id): token for class_id in class_ids if class_id is not None}
+    if versions:
+        transaction.on_commit(lambda: cache.set_many(versions, VERSION_TIMEOUT))
+
+
+def invalidate_student_home(student_id) -> None:
+    """Drop the cached home payload of one student after commit."""
+
+    key = _student_version_key(student_id)
+    transaction.on_commit(lambda: cache.delete(key))
+
+
+def _version_key(class_id) -> str:
+    return f"dashboard:class-version:{class_id}"
+
+
+def _version_keys(class_ids: Iterable) -> List[str]:
+    return [_version_key(class_id) for class_id in class_ids]
+
+
+def _student_version_key(student_id) -> str:
+    return f"dashboard:student-version:{student_id}"
+
+
+def _versions_digest(version_keys: List[str]) -> str:
+    versions = cache.get_many(version_keys)
+    missing = {key: uuid.uuid4().hex for key in version_keys if key not in versions}
+    if missing:
+        cache.set_many(missing, VERSION_TIMEOUT)
+        versions.update(missing)
+    return hashlib.md5(
+        "|".join(f"{key}={versions[key]}" for key in version_keys).encode()
+    ).hexdigest()
@@ -0,0 +1,156 @@
+"""Sheet builders for spreadsheet exports.
+
+Each builder returns ``(name, headers, rows)`` tuples for
+:func:`learning.services.xlsx.stream_xlsx`; rows are generators so nothing is
+materialised until the workbook is written.
+"""
+
+from __future__ import annotations
+
+from typing import Dict, Iterator, List, Optional
+
+from django.utils.text import slugify
+
+from learning.analytics import get_bundle
+from learning.export_jobs import ExportFile, ProgressTracker, exporter
+from learning.models import Assignment, AssignmentProgress, Student
+from learning.services.xlsx import Sheet, stream_xlsx
+
+
+PROGRESS_HEADERS = [
+    "Student",
+    "Username",
+    "Points Earned",
+    "Completed",
+    "Time Spent",
+    "Total Attempts",
+    "Correct",
+    "Accuracy (%)",
+    "Words Aced",
+    "Needs Practice",
+]
+WORD_HEADERS = [
+    "Word",
+    "Attempts",
+    "Correct",
+    "Facility (%)",
+    "Students",
+    "Students Struggling",
+    "Discrimination",
+]
+HEATMAP_HEADERS = ["Student", "Word", "Attempts", "Correct", "Accuracy"]
+
+
+def progress_filename(assignment: Assignment) -> str:
+    return f"{slugify(assignment.name) or f'assignment-{assignment.id}'}-progress.xlsx"
+
+
+def assignment_progress_sheets(
+    assignment: Assignment, tracker: Optional[ProgressTracker] = None
+) -> List[Sheet]:
+    """Per-student summary, per-word stats and the raw heatmap for ``assignment``."""
+
+    bundle = get_bundle(assignment.id)
+    sheets = [
+        ("Progress", PROGRESS_HEADERS, _progress_rows(assignment, bundle)),
+        ("Words", WORD_HEADERS, _word_rows(bundle)),
+        ("Heatmap", HEATMAP_HEADERS, _heatmap_rows(bundle)),
+    ]
+    if tracker is None:
+        return sheets
+    students = set(bundle.student_totals)
+    students.update(
+        AssignmentProgress.objects.filter(assignment=assignment).values_list("student_id", flat=True)
+    )
+    tracker.total = (
+        len(students)
+        + len(bundle.word_stats)
+        + len(bundle.heatmap["cells"])
+    )
+    return [(name, headers, tracker.track(rows)) for name, headers, rows in sheets]
+
+
+@exporter("assignment-progress")
+def export_assignment_progress(params: dict, tracker: ProgressTracker) -> ExportFile:
+    assignment = Assignment.objects.get(pk=params["assignment_id"])
+    return ExportFile(
+        filename=progress_filename(assignment),
+        chunks=stream_xlsx(assignment_progress_sheets(assignment, tracker)),
+    )
+
+
+def _progress_rows(assignment: Assignment, bundle) -> Iterator[list]:
+    stats_map = bundle.student_totals
+    mastery_map = {entry["student_id"]: entry for entry in bundle.student_mastery}
+
+    progress_qs = (
+        AssignmentProgress.objects.filter(assignment=assignment)
+        .select_related("student")
+        .order_by("student__last_name", "student__first_name")
+    )
+    student_rows: Dict[object, dict] = {}
+    for progress in progress_qs.iterator():
+        name = f"{progress.student.first_name} {progress.student.last_name}".strip()
+        student_rows[progress.student_id] = {
+            "name": name or progress.student.username,
+            "username": progress.student.username,
+            "points": progress.points_earned,
+            "completed": "Yes" if progress.completed else "No",
+            "time_spent": str(progress.time_spent) if progress.time_spent else "",
+        }
+
+    # Ensure we include students who have attempts but no progress row yet.
+    missing_ids = [sid for sid in stats_map if sid not in student_rows]
+    for student in Student.objects.filter(id__in=missing_ids):
+        name = f"{student.first_name} {student.last_name}".strip()
+        student_rows[student.id] = {
+            "name": name or student.username,
+            "username": student.username,
+            "points": "",
+            "completed": "",
+            "time_spent": "",
+        }
+
+    for student_id, row in sorted(student_rows.items(), key=lambda item: item[1]["name"].lower()):
+        stats = stats_map.get(student_id, {})
+        attempts = stats.get("attempts", 0) or 0
+        correct = stats.get("correct", 0) or 0
+        mastery = mastery_map.get(student_id, {})
+        yield [
+            row["name"],
+            row["username"],
+            row["points"],
+            row["completed"],
+            row["time_spent"],
+            attempts,
+            correct,
+            round((correct / attempts * 100), 1) if attempts else 0.0,
+            ", ".join(mastery.get("words_aced", [])),
+            ", ".join(mastery.get("needs_practice", [])),
+        ]
+
+
+def _word_rows(bundle) -> Iterator[list]:
+    for row in bundle.word_stats:
+        yield [
+            row["word"],
+            row["attempts"],
+            row["correct"],
+            round(row["facility"] * 100, 1),
+            row["students_total"],
+            row["students_struggling"],
+            round(row["discrimination"], 3),
+        ]
+
+
+def _heatmap_rows(bundle) -> Iterator[list]:
+    students = bundle.heatmap["students"]
+    words = bundle.heatmap["words"]
+    for cell in bundle.heatmap["cells"]:
+        yield [
+            students[cell["student"]],
+            words[cell["word"]],
+            cell["attempts"],
+            cell["correct"],
+            cell["accuracy"],
+        ]
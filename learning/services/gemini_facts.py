@@ -13,6 +13,8 @@ from typing import Any, Dict, Optional, TypedDict, List, Tuple
 from django.conf import settings
 from django.utils.translation import get_language_info
 
+from learning.instrumentation import external_call
+
 try:
     # Django cache (preferred if configured)
     from django.core.cache import cache as django_cache  # type: ignore
@@ -318,7 +320,8 @@ def _call_gemini(prompt: str, *, model_id: str, temperature: float = 0.6, max_to
     last_err = None
     while attempt <= _MAX_RETRIES:
         try:
-            resp = model.generate_content(prompt)
+            with external_call("gemini"):
+                resp = model.generate_content(prompt)
             raw = getattr(resp, "text", "") or ""
             if not raw and getattr(resp, "candidates", None):
                 for cand in resp.candidates or []:
@@ -4,10 +4,9 @@ from __future__ import annotations
 
 import random
 import unicodedata
+from collections import defaultdict
 from dataclasses import dataclass
-from typing import Any, Dict, List, Optional, Sequence
-
-from django.db.models import QuerySet
+from typing import Any, Dict, Iterable, List, Optional, Sequence
 
 from learning.models import VocabularyList, VocabularyWord
 
@@ -21,6 +20,9 @@ QUESTION_TYPES = (
     "true_false",
 )
 
+# Alt text for images sent to players before they answer.
+PUBLIC_IMAGE_ALT = "Picture clue"
+
 
 @dataclass
 class NormalizedAnswer:
@@ -28,6 +30,54 @@ class NormalizedAnswer:
     canonical_answer: Optional[str]
 
 
+class WordPool:
+    """The words of some lists, loaded once for building a deck of questions.
+
+    Each list's word ids and texts are kept in parallel arrays so distractors
+    are drawn by index, without a query per question.
+    """
+
+    FIELDS = (
+        "id", "list_id", "word", "translation", "image_url", "image_approved",
+        "image_thumb_url", "image_source", "image_attribution", "image_license",
+    )
+
+    def __init__(self, words: Iterable[VocabularyWord]) -> None:
+        self.words: List[VocabularyWord] = list(words)
+        self._ids: Dict[int, List[int]] = defaultdict(list)
+        self._texts: Dict[str, Dict[int, List[str]]] = {"word": defaultdict(list), "translation": defaultdict(list)}
+        for word in self.words:
+            self._ids[word.list_id].append(word.id)
+            self._texts["word"][word.list_id].append(word.word)
+            self._texts["translation"][word.list_id].append(word.translation)
+
+    @classmethod
+    def for_lists(cls, vocab_lists: Iterable) -> "WordPool":
+        return cls(VocabularyWord.objects.filter(list__in=vocab_lists).only(*cls.FIELDS).order_by("id"))
+
+    def others(self, word: VocabularyWord, field: str, count: int, rng: random.Random) -> List[str]:
+        """Up to ``count`` ``field`` texts of other words in ``word``'s list, in random order.
+
+        Texts equal to ``word``'s own are skipped so a distractor is never
+        also a right answer.
+        """
+
+        ids = self._ids.get(word.list_id, [])
+        texts = self._texts[field].get(word.list_id, [])
+        own = getattr(word, field)
+        picked: List[str] = []
+        seen = {own}
+        # A few spare draws cover the word itself and repeated texts.
+        for index in rng.sample(range(len(ids)), min(len(ids), count + 3)):
+            if ids[index] == word.id or texts[index] in seen:
+                continue
+            seen.add(texts[index])
+            picked.append(texts[index])
+            if len(picked) == count:
+                break
+        return picked
+
+
 class QuestionFlowEngine:
     """Provides helpers for generating and validating question payloads."""
 
@@ -39,32 +89,39 @@ class QuestionFlowEngine:
         vocab_lists: Sequence[VocabularyList],
         count: int,
     ) -> List[Dict[str, Any]]:
-        """Generate a list of question payloads."""
+        """Generate a list of question payloads with a single query.
+
+        Words are dealt from a shuffled deck, so none repeats until every
+        word of the lists has been asked.
+        """
 
         if not vocab_lists:
             return []
 
-        words_qs: QuerySet[VocabularyWord] = VocabularyWord.objects.filter(
-            list__in=vocab_lists
-        ).select_related("list")
-        words: List[VocabularyWord] = list(words_qs)
-
+        pool = WordPool.for_lists(vocab_lists)
+        words = pool.words
         if not words:
             return []
 
         payloads: List[Dict[str, Any]] = []
+        deck: List[VocabularyWord] = []
         for _ in range(count):
-            word = self.rng.choice(words)
+            if not deck:
+                deck = self.rng.sample(words, len(words))
+            word = deck.pop()
             activity = self.rng.choice(QUESTION_TYPES)
-            payload = self.build_activity_payload(word, activity)
-            payloads.append(payload)
+            payloads.append(self.build_activity_payload(word, activity, pool=pool))
         return payloads
 
     def build_activity_payload(
-        self, word: VocabularyWord, activity: str
+        self, word: VocabularyWord, activity: str, pool: Optional[WordPool] = None
     ) -> Dict[str, Any]:
+        """Build one question; ``pool`` supplies distractors (loaded from ``word``'s list if not given)."""
+
         if activity not in QUESTION_TYPES:
             activity = "typing"
+        if pool is None and activity in ("multiple_choice", "true_false"):
+            pool = WordPool.for_lists([word.list_id])
 
         image_data = self._image_payload(word)
 
@@ -119,23 +176,10 @@ class QuestionFlowEngine:
             }
         elif activity == "multiple_choice":
             if self.rng.choice([True, False]):
-                prompt = word.word
-                answer = word.translation
-                distractors = list(
-                    VocabularyWord.objects.filter(list=word.list)
-                    .exclude(id=word.id)
-                    .values_list("translation", flat=True)
-                )
+                prompt, answer, field = word.word, word.translation, "translation"
             else:
-                prompt = word.translation
-                answer = word.word
-                distractors = list(
-                    VocabularyWord.objects.filter(list=word.list)
-                    .exclude(id=word.id)
-                    .values_list("word", flat=True)
-                )
-            self.rng.shuffle(distractors)
-            options = distractors[:3] + [answer]
+                prompt, answer, field = word.translation, word.word, "word"
+            options = pool.others(word, field, 3, self.rng) + [answer]
             self.rng.shuffle(options)
             payload = {
                 "type": "multiple_choice",
@@ -146,16 +190,12 @@ class QuestionFlowEngine:
             }
         else:  # true_false
             if self.rng.choice([True, False]):
-                prompt, correct_answer = word.word, word.translation
-                pool = VocabularyWord.objects.filter(list=word.list).exclude(id=word.id)
-                values = list(pool.values_list("translation", flat=True))
+                prompt, correct_answer, field = word.word, word.translation, "translation"
             else:
-                prompt, correct_answer = word.translation, word.word
-                pool = VocabularyWord.objects.filter(list=word.list).exclude(id=word.id)
-                values = list(pool.values_list("word", flat=True))
+                prompt, correct_answer, field = word.translation, word.word, "word"
             shown = correct_answer
-            if values and self.rng.choice([True, False]):
-                shown = self.rng.choice(values)
+            if self.rng.choice([True, False]):
+                shown = next(iter(pool.others(word, field, 1, self.rng)), correct_answer)
             payload = {
                 "type": "true_false",
                 "word_id": word.id,
@@ -181,6 +221,18 @@ class QuestionFlowEngine:
             "alt": word.word,
         }
 
+    @staticmethod
+    def public_payload(payload: Dict[str, Any]) -> Dict[str, Any]:
+        """``payload`` without the answer, for sending to players ahead of time.
+
+        The image alt text is the target word itself, so it is replaced too.
+        """
+
+        public = {key: value for key, value in payload.items() if key != "answer"}
+        if public.get("image"):
+            public["image"] = {**public["image"], "alt": PUBLIC_IMAGE_ALT}
+        return public
+
     @staticmethod
     def normalize_and_score(payload: Dict[str, Any], answer_payload: Any) -> NormalizedAnswer:
         """Normalize client answer for comparison."""
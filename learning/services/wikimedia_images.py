@@ -8,6 +8,8 @@ from typing import Dict, Iterable, List, Optional, Set, Tuple
 
 import requests
 
+from learning.instrumentation import record_http_response
+
 logger = logging.getLogger(__name__)
 
 # ---------- HTTP clients ----------
@@ -18,6 +20,7 @@ TIMEOUT = 12
 
 SESSION = requests.Session()
 SESSION.headers.update({"User-Agent": UA})
+SESSION.hooks["response"].append(record_http_response("http"))
 
 PIXABAY_API = "https://pixabay.com/api/"
 PIXABAY_KEY = os.getenv("PIXABAY_KEY", "").strip()
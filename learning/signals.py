@@ -0,0 +1,101 @@
+"""Model signal handlers for the learning app."""
+
+from django.db.models.signals import m2m_changed, post_delete, post_init, post_save, pre_delete
+from django.dispatch import receiver
+
+from .attempt_stats import record_attempts
+from .models import (
+    Assignment,
+    AssignmentAttempt,
+    AssignmentProgress,
+    Class,
+    Student,
+    StudentTrophy,
+    Trophy,
+    VocabularyList,
+)
+from .services.dashboard import invalidate_classes, invalidate_student_home
+from .trophies import forget_awarded, reset_catalogue
+
+
+@receiver(post_save, sender=Class)
+@receiver(post_delete, sender=Class)
+def _class_changed(sender, instance, **kwargs):
+    invalidate_classes([instance.pk])
+
+
+@receiver(post_save, sender=Assignment)
+@receiver(post_delete, sender=Assignment)
+def _assignment_changed(sender, instance, **kwargs):
+    invalidate_classes([instance.class_assigned_id])
+
+
+@receiver(post_save, sender=VocabularyList)
+def _vocab_list_changed(sender, instance, created, **kwargs):
+    if not created:
+        invalidate_classes(instance.classes.values_list("id", flat=True))
+
+
+@receiver(post_save, sender=AssignmentAttempt)
+def _attempt_logged(sender, instance, created, raw=False, **kwargs):
+    if created and not raw:
+        record_attempts([instance])
+
+
+@receiver(pre_delete, sender=Student)
+def _student_removing(sender, instance, **kwargs):
+    # Deleting a student drops its class links without firing m2m_changed.
+    instance._deleted_class_ids = list(instance.classes.values_list("id", flat=True))
+
+
+@receiver(post_delete, sender=Student)
+def _student_removed(sender, instance, **kwargs):
+    invalidate_classes(getattr(instance, "_deleted_class_ids", []))
+    invalidate_student_home(instance.pk)
+
+
+@receiver(post_init, sender=AssignmentProgress)
+def _remember_progress_state(sender, instance, **kwargs):
+    instance._loaded_completed = instance.completed
+
+
+@receiver(post_save, sender=AssignmentProgress)
+@receiver(post_delete, sender=AssignmentProgress)
+def _progress_changed(sender, instance, **kwargs):
+    invalidate_student_home(instance.student_id)
+    # Only completion feeds the teacher dashboard, so ignore plain point updates.
+    if kwargs.get("signal") is post_save:
+        if instance.completed == instance._loaded_completed and not (
+            kwargs.get("created") and instance.completed
+        ):
+            return
+        instance._loaded_completed = instance.completed
+    elif not instance.completed:
+        return
+    invalidate_classes([instance.assignment.class_assigned_id])
+
+
+@receiver(m2m_changed, sender=VocabularyList.classes.through)
+@receiver(m2m_changed, sender=Student.classes.through)
+def _class_links_changed(sender, instance, action, pk_set, model, **kwargs):
+    if model is not Class:
+        if action.startswith("post_"):
+            invalidate_classes([instance.pk])
+    elif action == "pre_clear":
+        # pk_set is not provided on clear, so remember what is about to go.
+        instance._cleared_class_ids = list(instance.classes.values_list("id", flat=True))
+    elif action == "post_clear":
+        invalidate_classes(getattr(instance, "_cleared_class_ids", []))
+    elif action.startswith("post_"):
+        invalidate_classes(pk_set or [])
+
+
+@receiver(post_save, sender=Trophy)
+@receiver(post_delete, sender=Trophy)
+def _trophy_changed(sender, **kwargs):
+    reset_catalogue()
+
+
+@receiver(post_delete, sender=StudentTrophy)
+def _student_trophy_removed(sender, instance, **kwargs):
+    forget_awarded(instance.student_id)
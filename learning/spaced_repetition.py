@@ -3,22 +3,14 @@ import random
 from django.db.models import Q
 from django.utils import timezone
 
-from .memory import calculate_memory_strength
-from .models import Progress, VocabularyWord, User
+from .memory import weakest
+from .models import Progress, VocabularyWord
+from .student_users import user_for_student
 
 
 def _get_user_from_student(student):
-    """Ensure a User object exists for the given Student instance."""
-    user, _ = User.objects.get_or_create(
-        username=student.username,
-        defaults={
-            "is_student": True,
-            "first_name": student.first_name,
-            "last_name": student.last_name,
-            "password": student.password,
-        },
-    )
-    return user
+    """Return the User linked to ``student``, creating the link on first use."""
+    return user_for_student(student)
 
 
 def get_due_words(student, vocab_list, limit=20):
@@ -53,22 +45,12 @@ def get_due_words(student, vocab_list, limit=20):
                 word_ids.add(word.id)
 
     if len(words) < limit:
-        weak_progresses = (
-            Progress.objects.filter(student=user, word__list=vocab_list)
-            .exclude(word_id__in=word_ids)
-            .select_related("word")
-        )
-        sorted_by_strength = sorted(
-            weak_progresses,
-            key=lambda prog: calculate_memory_strength(prog, now=now),
-        )
-        for prog in sorted_by_strength:
-            if prog.word_id in word_ids:
-                continue
-            words.append(prog.word)
-            word_ids.add(prog.word_id)
-            if len(words) >= limit:
-                break
+        weak_progresses = Progress.objects.filter(
+            student=user, word__list=vocab_list
+        ).exclude(word_id__in=word_ids)
+        weak_ids = list(dict.fromkeys(weakest(weak_progresses, limit - len(words), now=now)))
+        weak_words = VocabularyWord.objects.in_bulk(weak_ids)
+        words.extend(weak_words[word_id] for word_id in weak_ids)
 
     random.shuffle(words)
     return words[:limit]
@@ -0,0 +1,82 @@
+"""Resolve the shadow ``User`` accounts that back ``Student`` records.
+
+Progress, SRS and achievements rows hang off ``User``, while pupils sign in as
+``Student``. ``Student.user`` links the two; these helpers follow that link and
+create and link the account on first use for students that predate it.
+"""
+
+from __future__ import annotations
+
+from typing import Dict, Iterable, List
+
+from django.db import transaction
+
+from .models import Student, User
+
+
+def user_for_student(student: Student) -> User:
+    """Return the student's account, creating and linking it if needed."""
+
+    if student.user_id is not None:
+        return student.user
+    return users_for_students([student])[student.pk]
+
+
+def users_for_students(students: Iterable[Student]) -> Dict[object, User]:
+    """Return ``{student.pk: User}`` for many students.
+
+    Linked accounts are loaded with one query. Unlinked students are matched
+    to existing accounts by username and the rest are created, with one
+    ``bulk_create`` and one ``bulk_update`` for the whole batch.
+    """
+
+    students = list(students)
+    linked = [s for s in students if s.user_id is not None]
+    unlinked = [s for s in students if s.user_id is None]
+
+    users: Dict[object, User] = {}
+    if linked:
+        by_id = User.objects.in_bulk([s.user_id for s in linked])
+        for student in linked:
+            users[student.pk] = by_id[student.user_id]
+    if unlinked:
+        users.update(_link_students(unlinked))
+    return users
+
+
+def student_ids_for_users(user_ids: Iterable) -> Dict[int, object]:
+    """Return ``{user_id: student_id}`` for users that belong to a student."""
+
+    return dict(
+        Student.objects.filter(user_id__in=list(user_ids)).values_list("user_id", "pk")
+    )
+
+
+@transaction.atomic
+def _link_students(students: List[Student]) -> Dict[object, User]:
+    existing = {
+        user.username: user
+        for user in User.objects.filter(username__in=[s.username for s in students])
+    }
+    missing = [
+        User(
+            username=student.username,
+            is_student=True,
+            first_name=student.first_name,
+            last_name=student.last_name,
+            password=student.password,
+        )
+        for student in students
+        if student.username not in existing
+    ]
+    if missing:
+        User.objects.bulk_create(missing, ignore_conflicts=True)
+        existing.update(
+            (user.username, user)
+            for user in User.objects.filter(username__in=[u.username for u in missing])
+        )
+
+    for student in students:
+        student.user = existing[student.username]
+    Student.objects.bulk_update(students, ["user"])
+    return {student.pk: student.user for student in students}
@@ -0,0 +1,263 @@
+"""Reproducible synthetic schools for load testing and benchmarks.
+
+``generate_school`` builds a school with teachers, classes, students, word
+lists, assignments and attempt logs from a seed, using bulk inserts
+throughout so millions of attempts can be created in minutes. Bulk inserts
+skip model signals, so the attempt rollup is rebuilt once at the end.
+
+Deadlines fall up to ``history_days`` in the past, and each attempt is
+timestamped inside its assignment's open window, so archival, the daily
+class buckets and windowed trophy metrics all have history to work on.
+Everything is written in one transaction.
+"""
+
+from __future__ import annotations
+
+import random
+from dataclasses import dataclass, field
+from datetime import date, timedelta
+from itertools import accumulate
+from typing import Callable, List, Optional
+
+from django.contrib.auth.hashers import make_password
+from django.db import transaction
+from django.utils import timezone
+
+from .attempt_stats import rebuild_word_stats
+from .models import (
+    Assignment,
+    AssignmentAttempt,
+    AssignmentProgress,
+    Class,
+    School,
+    Student,
+    User,
+    VocabularyList,
+    VocabularyWord,
+)
+
+
+INSERT_BATCH_SIZE = 5000
+TIMESTAMP_BATCH_SIZE = 1000
+# Assignments are open for this long before their deadline.
+OPEN_DAYS = 21
+LANGUAGES = ("French", "German", "Spanish")
+MODES = [mode for mode, _ in AssignmentAttempt.MODE_CHOICES]
+
+
+@dataclass
+class SyntheticSpec:
+    seed: int = 1
+    teachers: int = 5
+    classes: int = 10
+    students: int = 250
+    lists: int = 20
+    words_per_list: int = 25
+    assignments: int = 40
+    attempts: int = 100_000
+    history_days: int = 60
+    prefix: str = "synth"
+
+
+@dataclass
+class SyntheticSchool:
+    school: School
+    teacher_ids: List[int] = field(default_factory=list)
+    class_ids: List[object] = field(default_factory=list)
+    student_ids: List[object] = field(default_factory=list)
+    assignment_ids: List[int] = field(default_factory=list)
+    attempts: int = 0
+
+
+def generate_school(
+    spec: SyntheticSpec, log: Optional[Callable[[str], None]] = None
+) -> SyntheticSchool:
+    """Create the school described by ``spec``; the same seed gives the same data."""
+
+    log = log or (lambda message: None)
+    rng = random.Random(spec.seed)
+    tag = f"{spec.prefix}{spec.seed}"
+    password = make_password("synthetic")
+
+    with transaction.atomic():
+        school = School.objects.create(name=f"Synthetic School {tag}")
+        result = SyntheticSchool(school=school)
+
+        teachers = User.objects.bulk_create(
+            User(
+                username=f"{tag}-teacher{n}",
+                first_name="Teacher",
+                last_name=str(n),
+                password=password,
+                is_teacher=True,
+                school=school,
+            )
+            for n in range(spec.teachers)
+        )
+        result.teacher_ids = [teacher.pk for teacher in teachers]
+
+        classes = Class.objects.bulk_create(
+            Class(school=school, name=f"{tag} Class {n}", language=rng.choice(LANGUAGES))
+            for n in range(spec.classes)
+        )
+        result.class_ids = [klass.pk for klass in classes]
+        class_teachers = {klass.pk: teachers[n % len(teachers)] for n, klass in enumerate(classes)}
+        Class.teachers.through.objects.bulk_create(
+            Class.teachers.through(class_id=class_id, user_id=teacher.pk)
+            for class_id, teacher in class_teachers.items()
+        )
+        log(f"{len(teachers)} teachers, {len(classes)} classes")
+
+        students = Student.objects.bulk_create(
+            (
+                Student(
+                    school=school,
+                    first_name=f"Pupil{n}",
+                    last_name=tag,
+                    year_group=rng.randint(7, 13),
+                    date_of_birth=date(2010, 1, 1) + timedelta(days=rng.randint(0, 1500)),
+                    username=f"{tag}-pupil{n}",
+                    password="synthetic",
+                )
+                for n in range(spec.students)
+            ),
+            batch_size=INSERT_BATCH_SIZE,
+        )
+        result.student_ids = [student.pk for student in students]
+        roster = {klass.pk: [] for klass in classes}
+        for n, student in enumerate(students):
+            roster[classes[n % len(classes)].pk].append(student)
+        Student.classes.through.objects.bulk_create(
+            (
+                Student.classes.through(student_id=student.pk, class_id=class_id)
+                for class_id, members in roster.items()
+                for student in members
+            ),
+            batch_size=INSERT_BATCH_SIZE,
+        )
+        log(f"{len(students)} students")
+
+        vocab_lists = VocabularyList.objects.bulk_create(
+            VocabularyList(
+                name=f"{tag} List {n}",
+                source_language="English",
+                target_language=rng.choice(LANGUAGES),
+                teacher=teachers[n % len(teachers)],
+            )
+            for n in range(spec.lists)
+        )
+        words = VocabularyWord.objects.bulk_create(
+            (
+                VocabularyWord(list=vocab_list, word=f"w{n}-{i}", translation=f"t{n}-{i}")
+                for n, vocab_list in enumerate(vocab_lists)
+                for i in range(spec.words_per_list)
+            ),
+            batch_size=INSERT_BATCH_SIZE,
+        )
+        words_by_list = {vocab_list.pk: [] for vocab_list in vocab_lists}
+        for word in words:
+            words_by_list[word.list_id].append(word.pk)
+        log(f"{len(vocab_lists)} lists, {len(words)} words")
+
+        now = timezone.now()
+        assignments = Assignment.objects.bulk_create(
+            Assignment(
+                name=f"{tag} Assignment {n}",
+                class_assigned=classes[n % len(classes)],
+                vocab_list=vocab_lists[n % len(vocab_lists)],
+                deadline=now + timedelta(days=rng.randint(-spec.history_days, 30)),
+                target_points=rng.choice((50, 100, 200)),
+                include_flashcards=True,
+                include_matchup=True,
+                teacher=class_teachers[classes[n % len(classes)].pk],
+            )
+            for n in range(spec.assignments)
+        )
+        result.assignment_ids = [assignment.pk for assignment in assignments]
+        # Attach lists through both relations, as attach_vocab_list does.
+        links = {(a.class_assigned_id, a.vocab_list_id) for a in assignments}
+        Class.vocabulary_lists.through.objects.bulk_create(
+            Class.vocabulary_lists.through(class_id=class_id, vocabularylist_id=list_id)
+            for class_id, list_id in links
+        )
+        VocabularyList.classes.through.objects.bulk_create(
+            VocabularyList.classes.through(vocabularylist_id=list_id, class_id=class_id)
+            for class_id, list_id in links
+        )
+
+        result.attempts = _generate_attempts(spec, rng, now, assignments, roster, words_by_list, log)
+
+        progress = []
+        for assignment in assignments:
+            for student in roster[assignment.class_assigned_id]:
+                points = rng.randint(0, assignment.target_points + 20)
+                progress.append(
+                    AssignmentProgress(
+                        student_id=student.pk,
+                        assignment_id=assignment.pk,
+                        points_earned=points,
+                        time_spent=timedelta(seconds=rng.randint(0, 3600)),
+                        completed=points >= assignment.target_points,
+                    )
+                )
+        AssignmentProgress.objects.bulk_create(progress, batch_size=INSERT_BATCH_SIZE)
+
+        rebuild_word_stats(result.assignment_ids)
+    log(f"{result.attempts} attempts; rollup rebuilt")
+    return result
+
+
+def _generate_attempts(spec, rng, now, assignments, roster, words_by_list, log) -> int:
+    if not assignments or not spec.attempts:
+        return 0
+    # (opened at, seconds open so far) for each assignment.
+    windows = {}
+    for assignment in assignments:
+        closes = min(assignment.deadline, now)
+        opens = min(assignment.deadline - timedelta(days=OPEN_DAYS), closes - timedelta(days=1))
+        windows[assignment.pk] = (opens, (closes - opens).total_seconds())
+    # Popular assignments get far more traffic than the rest.
+    cum_weights = list(accumulate(1.0 / (rank + 1) for rank in range(len(assignments))))
+    # Each student has a fixed chance of success per assignment.
+    skill = {}
+    batch = []
+    timestamps = []
+    written = 0
+    for _ in range(spec.attempts):
+        assignment = rng.choices(assignments, cum_weights=cum_weights)[0]
+        members = roster[assignment.class_assigned_id]
+        word_ids = words_by_list[assignment.vocab_list_id]
+        if not members or not word_ids:
+            continue
+        student = rng.choice(members)
+        key = (student.pk, assignment.pk)
+        if key not in skill:
+            skill[key] = rng.uniform(0.3, 0.95)
+        batch.append(
+            AssignmentAttempt(
+                student_id=student.pk,
+                assignment_id=assignment.pk,
+                vocabulary_word_id=rng.choice(word_ids),
+                mode=rng.choice(MODES[:4]),
+                is_correct=rng.random() < skill[key],
+            )
+        )
+        opens, span = windows[assignment.pk]
+        timestamps.append(opens + timedelta(seconds=rng.uniform(0, span)))
+        if len(batch) >= INSERT_BATCH_SIZE:
+            written += _insert_attempts(batch, timestamps)
+            batch, timestamps = [], []
+            if written % (INSERT_BATCH_SIZE * 20) == 0:
+                log(f"  {written} attempts")
+    if batch:
+        written += _insert_attempts(batch, timestamps)
+    return written
+
+
+def _insert_attempts(batch, timestamps) -> int:
+    # bulk_create stamps auto_now_add fields with the current time.
+    AssignmentAttempt.objects.bulk_create(batch)
+    for attempt, timestamp in zip(batch, timestamps):
+        attempt.timestamp = timestamp
+    AssignmentAttempt.objects.bulk_update(batch, ["timestamp"], batch_size=TIMESTAMP_BATCH_SIZE)
+    return len(batch)
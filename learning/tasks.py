@@ -1,18 +1,60 @@
-from learning.models import Student
-from celery import shared_task
-from django.utils.timezone import now
-
-@shared_task
-def reset_weekly_points():
-    """Reset weekly points for all students."""
-    today = now().date()
-    Student.objects.update(weekly_points=0, weekly_points_last_reset=today)
-    print("Weekly points reset completed!")
-
-
-@shared_task
-def reset_monthly_points():
-    """Reset monthly points for all students."""
-    today = now().date()
-    Student.objects.update(monthly_points=0, monthly_points_last_reset=today)
-    print("Monthly points reset completed!")
+"""Background tasks run by the django-q cluster."""
+
+from django.conf import settings
+
+from learning.attempt_archive import archive_attempt_logs as _archive_attempt_logs
+from learning.class_trends import rollup_class_buckets as _rollup_class_buckets
+from learning.export_jobs import fail_stale_exports, purge_expired_exports
+from learning.export_jobs import run_export_job as _run_export_job
+from learning.points import rollup_points_ledger as _rollup_points_ledger
+
+
+def rollup_points_ledger():
+    """Fold recent points ledger entries into weekly/monthly buckets.
+
+    Scheduled every few minutes by migration 0043. The running weekly and
+    monthly columns roll themselves over when points are awarded, so the old
+    reset jobs are no longer needed.
+    """
+    processed = _rollup_points_ledger()
+    return f"Rolled up {processed} ledger entries"
+
+
+def run_export_job(job_id):
+    """Build the file for a queued ``ExportJob`` (see ``learning.export_jobs``)."""
+    job = _run_export_job(job_id)
+    if job is None:
+        return f"Export {job_id} was already claimed"
+    return f"Export {job_id} {job.status}: {job.rows_written} rows"
+
+
+def clean_up_export_jobs():
+    """Fail exports whose worker died and delete expired ones with their files.
+
+    Scheduled hourly by migration 0054; see ``learning.export_jobs``.
+    """
+    failed = fail_stale_exports()
+    purged = purge_expired_exports()
+    return f"Failed {failed} stale exports, deleted {purged} expired"
+
+
+def archive_attempt_logs():
+    """Move attempts of closed and long-expired assignments to archive files.
+
+    Scheduled nightly by migration 0051; see ``learning.attempt_archive``.
+    Does nothing unless ``ATTEMPT_ARCHIVE_ENABLED`` is set, because the raw
+    rows are deleted and the files must land in durable storage.
+    """
+    if not getattr(settings, "ATTEMPT_ARCHIVE_ENABLED", False):
+        return "Attempt archival is disabled (ATTEMPT_ARCHIVE_ENABLED is off)"
+    moved = _archive_attempt_logs()
+    return f"Archived {moved} attempts"
+
+
+def rollup_class_buckets():
+    """Fold new attempts and live answers into the daily class word buckets.
+
+    Scheduled nightly by migration 0053; see ``learning.class_trends``.
+    """
+    processed = _rollup_class_buckets()
+    return f"Bucketed {processed} answers"
@@ -2,6 +2,7 @@ import os
 from datetime import date, timedelta
 
 import django
+from django.core.cache import cache
 from django.test import TestCase
 from django.utils import timezone
 
@@ -77,6 +78,10 @@ class AnalyticsBaseTestCase(TestCase):
         )
         cls.student2.classes.add(cls.classroom)
 
+    def setUp(self):
+        # Analytics are cached by attempt id, which the test database reuses.
+        cache.clear()
+
 
 class AnalyticsEmptyTests(AnalyticsBaseTestCase):
     def test_word_stats_empty(self):
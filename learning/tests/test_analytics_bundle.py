@@ -0,0 +1,159 @@
+import json
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.urls import reverse
+
+from learning.analytics import (
+    build_do_now,
+    build_game_seed,
+    get_bundle,
+    heatmap_columnar,
+    heatmap_data,
+    mode_breakdown,
+    pick_hinge_question,
+    student_mastery,
+    word_stats,
+)
+from learning.attempt_stats import delete_attempts
+from learning.models import AssignmentAttempt
+
+from .test_analytics import AnalyticsBaseTestCase
+
+
+class AnalyticsBundleTests(AnalyticsBaseTestCase):
+    def _log(self, student, word, mode, *results):
+        for is_correct in results:
+            AssignmentAttempt.objects.create(
+                student=student,
+                assignment=self.assignment,
+                vocabulary_word=word,
+                mode=mode,
+                is_correct=is_correct,
+            )
+
+    def setUp(self):
+        super().setUp()
+        self._log(self.student1, self.word1, "flashcards", True, True, True)
+        self._log(self.student1, self.word2, "flashcards", False, True)
+        self._log(self.student2, self.word1, "matchup", True, False)
+        self._log(self.student2, self.word2, "matchup", False, False)
+
+    def test_bundle_is_built_once_and_shared(self):
+        # analytics version, then one read of the rollup
+        with self.assertNumQueries(2):
+            get_bundle(self.assignment.id)
+        # Every aggregate afterwards is a cache hit behind one version lookup.
+        for func in (word_stats, mode_breakdown, student_mastery, heatmap_data, pick_hinge_question):
+            with self.assertNumQueries(1):
+                func(self.assignment.id)
+        with self.assertNumQueries(3):  # bundle check, assignment, vocabulary
+            build_do_now(self.assignment.id)
+        with self.assertNumQueries(1):
+            build_game_seed(self.assignment.id)
+
+    def test_new_attempt_refreshes_bundle(self):
+        before = {row["word"]: row["attempts"] for row in word_stats(self.assignment.id)}
+        self._log(self.student2, self.word1, "matchup", True)
+        after = {row["word"]: row["attempts"] for row in word_stats(self.assignment.id)}
+        self.assertEqual(after["hola"], before["hola"] + 1)
+
+    def test_bundle_contents(self):
+        stats = word_stats(self.assignment.id)
+        self.assertEqual([row["word"] for row in stats], ["adiós", "hola"])
+        hola = stats[1]
+        self.assertEqual((hola["attempts"], hola["correct"]), (5, 4))
+        self.assertEqual((hola["students_total"], hola["students_struggling"]), (2, 1))
+        self.assertAlmostEqual(hola["facility"], 0.8)
+        # Alex (4/5) gets both words right; Bailey (1/4) only half of hola.
+        self.assertEqual(hola["discrimination"], 0.0)
+        self.assertGreater(stats[0]["discrimination"], 0.0)
+
+        self.assertEqual(
+            [(row["mode"], row["attempts"], row["correct"]) for row in mode_breakdown(self.assignment.id)],
+            [("flashcards", 5, 4), ("matchup", 4, 1)],
+        )
+
+        mastery = {row["name"]: row for row in student_mastery(self.assignment.id)}
+        self.assertEqual(mastery["Alex One"]["words_aced"], ["hola"])
+        self.assertEqual(mastery["Bailey Two"]["needs_practice"], ["hola", "adiós"])
+
+        grid = heatmap_data(self.assignment.id)
+        self.assertEqual(grid["students"][str(self.student1.id)], "Alex One")
+        self.assertEqual(len(grid["cells"]), 4)
+
+        totals = get_bundle(self.assignment.id).student_totals
+        self.assertEqual(totals[self.student1.id], {"attempts": 5, "correct": 4})
+
+
+class HeatmapApiTests(AnalyticsBaseTestCase):
+    _log = AnalyticsBundleTests._log
+
+    def setUp(self):
+        super().setUp()
+        self._log(self.student1, self.word1, "flashcards", True, True, False)
+        self._log(self.student2, self.word2, "matchup", False, True)
+
+    def _get(self, **headers):
+        self.client.force_login(self.teacher)
+        return self.client.get(
+            reverse("api_heatmap", args=[self.assignment.id]), {"format": "columnar"}, **headers
+        )
+
+    def test_columnar_layout_matches_cells(self):
+        grid = heatmap_data(self.assignment.id)
+        columnar = heatmap_columnar(self.assignment.id)
+        width = len(columnar["words"]["ids"])
+        self.assertEqual(columnar["students"]["names"], list(grid["students"].values()))
+        self.assertEqual(len(columnar["attempts"]), len(columnar["students"]["ids"]) * width)
+        for cell in grid["cells"]:
+            index = (
+                columnar["students"]["ids"].index(cell["student"]) * width
+                + columnar["words"]["ids"].index(cell["word"])
+            )
+            self.assertEqual(columnar["attempts"][index], cell["attempts"])
+            self.assertEqual(columnar["accuracy"][index], cell["accuracy"])
+
+    def test_etag_gives_not_modified_until_next_attempt(self):
+        response = self._get()
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json(), heatmap_columnar(self.assignment.id))
+        etag = response["ETag"]
+
+        cached = self._get(HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(cached.status_code, 304)
+        self.assertEqual(cached["ETag"], etag)
+
+        self._log(self.student2, self.word1, "matchup", True)
+        fresh = self._get(HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(fresh.status_code, 200)
+        self.assertNotEqual(fresh["ETag"], etag)
+
+    def test_removed_attempts_and_students_change_the_etag(self):
+        etag = self._get()["ETag"]
+
+        # Not the newest attempt, so the latest id stays the same.
+        oldest = AssignmentAttempt.objects.filter(assignment=self.assignment).earliest("id")
+        delete_attempts(AssignmentAttempt.objects.filter(pk=oldest.pk))
+        after_delete = self._get(HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(after_delete.status_code, 200)
+        self.assertEqual(after_delete.json(), heatmap_columnar(self.assignment.id))
+
+        self.student1.delete()
+        after_student = self._get(HTTP_IF_NONE_MATCH=after_delete["ETag"])
+        self.assertEqual(after_student.status_code, 200)
+        self.assertEqual(after_student.json()["students"]["ids"], [str(self.student2.id)])
+
+    def test_breakdown_endpoints_serve_the_bundle(self):
+        self.client.force_login(self.teacher)
+        for name, func in (("api_mode_breakdown", mode_breakdown), ("api_student_mastery", student_mastery)):
+            response = self.client.get(reverse(name, args=[self.assignment.id]))
+            self.assertEqual(response.status_code, 200, name)
+            expected = json.loads(json.dumps(func(self.assignment.id), cls=DjangoJSONEncoder))
+            self.assertEqual(response.json()["results"], expected)
+
+    def test_unknown_format_is_rejected(self):
+        self.client.force_login(self.teacher)
+        response = self.client.get(
+            reverse("api_heatmap", args=[self.assignment.id]), {"format": "csv"}
+        )
+        self.assertEqual(response.status_code, 400)
@@ -0,0 +1,141 @@
+import random
+from datetime import date, timedelta
+
+from django.test import override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from learning.analytics import attempt_summaries
+from learning.models import AssignmentAttempt, AssignmentProgress, Student, VocabularyWord
+
+from .test_analytics import AnalyticsBaseTestCase
+
+
+def _legacy_summaries(assignment):
+    """The view's original in-memory aggregation, kept as the reference."""
+    attempts = list(
+        AssignmentAttempt.objects.filter(assignment=assignment)
+        .select_related("student", "vocabulary_word")
+        .order_by("timestamp", "id")
+    )
+    total_attempts = len(attempts)
+    total_correct = sum(1 for att in attempts if att.is_correct)
+
+    student_summary = {}
+    for att in attempts:
+        sid = att.student.id
+        wid = att.vocabulary_word.id
+        bucket = student_summary.setdefault(
+            sid, {"student": att.student, "words": {}, "attempts": 0, "correct": 0}
+        )
+        bucket["attempts"] += 1
+        if att.is_correct:
+            bucket["correct"] += 1
+        if wid not in bucket["words"]:
+            bucket["words"][wid] = {"word": att.vocabulary_word.translation, "wrong": 0, "aced": False}
+        if not bucket["words"][wid]["aced"]:
+            if att.is_correct:
+                bucket["words"][wid]["aced"] = True
+            else:
+                bucket["words"][wid]["wrong"] += 1
+
+    student_summary_list = []
+    for summary in student_summary.values():
+        words_aced, attempts_wrong = [], []
+        for data in summary["words"].values():
+            if data["aced"]:
+                words_aced.append(data["word"])
+            if data["wrong"] > 0:
+                attempts_wrong.append((data["word"], data["wrong"]))
+        attempts_wrong.sort(key=lambda item: item[1], reverse=True)
+        attempts_count = summary["attempts"]
+        correct_count = summary["correct"]
+        student_summary_list.append({
+            "student": summary["student"],
+            "words_aced": words_aced,
+            "attempts_wrong": attempts_wrong,
+            "total_attempts": attempts_count,
+            "correct_attempts": correct_count,
+            "accuracy": (correct_count / attempts_count * 100) if attempts_count else 0,
+        })
+
+    word_summary_dict = {}
+    for att in attempts:
+        wid = att.vocabulary_word.id
+        summary = word_summary_dict.setdefault(
+            wid,
+            {"word": att.vocabulary_word.translation, "wrong_attempts": 0, "total_attempts": 0, "students": set()},
+        )
+        summary["total_attempts"] += 1
+        if not att.is_correct:
+            summary["wrong_attempts"] += 1
+            summary["students"].add(att.student.id)
+
+    word_summary_list = []
+    for summary in word_summary_dict.values():
+        total = summary["total_attempts"]
+        wrong = summary["wrong_attempts"]
+        word_summary_list.append({
+            "word": summary["word"],
+            "wrong_attempts": wrong,
+            "students_difficulty": len(summary["students"]),
+            "difficulty_percentage": (wrong / total) * 100 if total else 0,
+            "facility_percentage": ((total - wrong) / total * 100) if total else 0,
+            "total_attempts": total,
+        })
+    return student_summary_list, word_summary_list, total_attempts, total_correct
+
+
+@override_settings(STATICFILES_STORAGE='django.contrib.staticfiles.storage.StaticFilesStorage')
+class AssignmentAnalyticsPageTests(AnalyticsBaseTestCase):
+    def setUp(self):
+        super().setUp()
+        rng = random.Random(7)
+        words = [self.word1, self.word2] + [
+            VocabularyWord.objects.create(list=self.vocab_list, word=f"w{n}", translation=f"t{n}")
+            for n in range(6)
+        ]
+        students = [self.student1, self.student2] + [
+            Student.objects.create(
+                school=self.school,
+                first_name=f"S{n}",
+                last_name="Extra",
+                year_group=8,
+                date_of_birth=date(2010, 3, 3),
+                username=f"extra{n}",
+                password="pass",
+            )
+            for n in range(4)
+        ]
+        modes = ["flashcards", "matchup", "fill_gap"]
+        start = timezone.now() - timedelta(days=1)
+        rows = [
+            AssignmentAttempt(
+                student=rng.choice(students),
+                assignment=self.assignment,
+                vocabulary_word=rng.choice(words),
+                mode=rng.choice(modes),
+                is_correct=rng.random() < 0.55,
+            )
+            for _ in range(300)
+        ]
+        AssignmentAttempt.objects.bulk_create(rows)
+        # Shuffle timestamps so the stream order differs from insertion order.
+        for offset, attempt in enumerate(rng.sample(list(AssignmentAttempt.objects.all()), 300)):
+            AssignmentAttempt.objects.filter(pk=attempt.pk).update(timestamp=start + timedelta(seconds=offset))
+        AssignmentProgress.objects.create(student=self.student1, assignment=self.assignment, completed=True)
+
+    def test_matches_legacy_aggregation(self):
+        self.assertEqual(attempt_summaries(self.assignment.id, chunk_size=37), _legacy_summaries(self.assignment))
+
+    def test_view_renders_streamed_summary(self):
+        self.client.force_login(self.teacher)
+        expected_students, expected_words, total, correct = _legacy_summaries(self.assignment)
+        response = self.client.get(reverse("assignment_analytics", args=[self.assignment.id]))
+        self.assertEqual(response.status_code, 200)
+        context = response.context
+        self.assertEqual(context["student_summary"], expected_students)
+        self.assertEqual(context["word_summary"], expected_words)
+        self.assertEqual(context["total_attempts"], total)
+        self.assertEqual(context["class_accuracy"], correct / total * 100)
+        self.assertEqual(context["students_completed"], 1)
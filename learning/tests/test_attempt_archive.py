@@ -0,0 +1,162 @@
+import os
+import shutil
+import tempfile
+from datetime import timedelta
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import override_settings
+from django.utils import timezone
+
+from achievements.services import metrics
+from learning.analytics import attempt_summaries, word_stats
+from learning import tasks
+from learning.attempt_archive import archivable_assignments, archive_assignment, restore_assignment
+from learning.attempt_stats import rebuild_word_stats
+from learning.class_trends import rollup_class_buckets
+from learning.models import ArchivedAttemptSummary, AssignmentAttempt, AssignmentWordStat, AttemptArchive
+from learning.student_users import user_for_student
+
+from .test_analytics import AnalyticsBaseTestCase
+
+
+def _page_summary(assignment_id):
+    students, words, total, correct = attempt_summaries(assignment_id)
+    return (
+        [(row["student"].pk, row["words_aced"], row["attempts_wrong"], row["total_attempts"]) for row in students],
+        words,
+        total,
+        correct,
+    )
+
+
+def _rollup(assignment_id):
+    return sorted(
+        AssignmentWordStat.objects.filter(assignment_id=assignment_id)
+        .values_list("student_id", "vocabulary_word_id", "mode", "attempts", "correct")
+    )
+
+
+class AttemptArchiveTests(AnalyticsBaseTestCase):
+    def setUp(self):
+        super().setUp()
+        self.media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.media_root, ignore_errors=True)
+        media = override_settings(MEDIA_ROOT=self.media_root)
+        media.enable()
+        self.addCleanup(media.disable)
+
+        for student, word, mode, results in (
+            (self.student1, self.word1, "flashcards", (False, True, False)),
+            (self.student2, self.word2, "matchup", (False, False)),
+            (self.student1, self.word2, "matchup", (True,)),
+            (self.student2, self.word1, "flashcards", (True, False)),
+        ):
+            for is_correct in results:
+                AssignmentAttempt.objects.create(
+                    student=student, assignment=self.assignment,
+                    vocabulary_word=word, mode=mode, is_correct=is_correct,
+                )
+        # Old enough to leave the table; see KEEP_RECENT.
+        AssignmentAttempt.objects.update(timestamp=timezone.now() - timedelta(days=60))
+        rollup_class_buckets(lag=timedelta(0))
+        self.raw = list(
+            AssignmentAttempt.objects.order_by("id").values_list(
+                "id", "student_id", "vocabulary_word_id", "mode", "is_correct", "timestamp"
+            )
+        )
+
+    def test_archive_keeps_analytics_and_restore_brings_rows_back(self):
+        page = _page_summary(self.assignment.id)
+        rollup = _rollup(self.assignment.id)
+        stats = word_stats(self.assignment.id)
+
+        moved = archive_assignment(self.assignment, chunk_size=3)
+
+        self.assertEqual(moved, 8)
+        self.assertFalse(AssignmentAttempt.objects.exists())
+        self.assertEqual(AttemptArchive.objects.count(), 3)
+        self.assertEqual(ArchivedAttemptSummary.objects.count(), 4)
+        self.assertEqual(_rollup(self.assignment.id), rollup)
+        self.assertEqual(_page_summary(self.assignment.id), page)
+        self.assertEqual(word_stats(self.assignment.id), stats)
+        self.assertEqual(rebuild_word_stats([self.assignment.id]), 0)
+        self.assertEqual(_rollup(self.assignment.id), rollup)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            restored = restore_assignment(self.assignment)
+
+        self.assertEqual(restored, 8)
+        restored_rows = list(
+            AssignmentAttempt.objects.order_by("id").values_list(
+                "id", "student_id", "vocabulary_word_id", "mode", "is_correct", "timestamp"
+            )
+        )
+        self.assertEqual(restored_rows, self.raw)
+        self.assertEqual(_rollup(self.assignment.id), rollup)
+        self.assertFalse(AttemptArchive.objects.exists())
+        self.assertFalse(ArchivedAttemptSummary.objects.exists())
+        self.assertEqual(os.listdir(os.path.join(self.media_root, "attempt_archives")), [])
+
+    def test_new_attempts_after_archival_fold_into_the_summary(self):
+        archive_assignment(self.assignment)
+        latest = AssignmentAttempt.objects.create(
+            student=self.student2, assignment=self.assignment,
+            vocabulary_word=self.word2, mode="matchup", is_correct=True,
+        )
+        students, words, total, correct = attempt_summaries(self.assignment.id)
+        self.assertEqual((total, correct), (9, 4))
+        bailey = next(row for row in students if row["student"] == self.student2)
+        self.assertIn(self.word2.translation, bailey["words_aced"])
+        self.assertIn((self.word2.translation, 2), bailey["attempts_wrong"])
+
+        self.assertEqual(archive_assignment(self.assignment), 0)  # not bucketed yet
+        rollup_class_buckets(lag=timedelta(0))
+        self.assertEqual(archive_assignment(self.assignment), 0)  # too recent
+        AssignmentAttempt.objects.filter(pk=latest.pk).update(timestamp=timezone.now() - timedelta(days=40))
+        self.assertEqual(archive_assignment(self.assignment), 1)
+        self.assertEqual(AttemptArchive.objects.count(), 2)
+        self.assertEqual(attempt_summaries(self.assignment.id)[2:], (9, 4))
+
+    def test_trophy_metrics_keep_counting_archived_attempts(self):
+        user1 = user_for_student(self.student1)
+        users = [user1.pk, user_for_student(self.student2).pk]
+        names = ("attempts", "correct_answers", "accuracy", "assignments_attempted")
+        before = {name: metrics.compute(name, users) for name in names}
+        self.assertEqual(before["attempts"][user1.pk], 4)
+
+        archive_assignment(self.assignment)
+
+        self.assertEqual({name: metrics.compute(name, users) for name in names}, before)
+
+    def test_commands_select_finished_assignments(self):
+        self.assertFalse(archivable_assignments().exists())
+        self.assignment.deadline = timezone.now() - timedelta(days=200)
+        self.assignment.save()
+        self.assertEqual(list(archivable_assignments()), [self.assignment])
+
+        out = StringIO()
+        call_command("archive_attempts", "--dry-run", stdout=out)
+        self.assertIn(f"Would archive assignment {self.assignment.id}", out.getvalue())
+        self.assertEqual(AssignmentAttempt.objects.count(), 8)
+
+        call_command("archive_attempts", stdout=out)
+        self.assertIn("Archived 8 attempt(s)", out.getvalue())
+        self.assertFalse(archivable_assignments().exists())
+
+        call_command("restore_attempts", f"--assignment={self.assignment.id}", stdout=out)
+        self.assertIn("restored 8 attempt(s)", out.getvalue())
+        self.assertEqual(AssignmentAttempt.objects.count(), 8)
+
+    def test_nightly_task_needs_opt_in(self):
+        self.assignment.deadline = timezone.now() - timedelta(days=200)
+        self.assignment.save()
+
+        with override_settings(ATTEMPT_ARCHIVE_ENABLED=False):
+            self.assertIn("disabled", tasks.archive_attempt_logs())
+        self.assertEqual(AssignmentAttempt.objects.count(), 8)
+        self.assertFalse(AttemptArchive.objects.exists())
+
+        with override_settings(ATTEMPT_ARCHIVE_ENABLED=True):
+            self.assertEqual(tasks.archive_attempt_logs(), "Archived 8 attempts")
+        self.assertEqual(AssignmentAttempt.objects.count(), 0)
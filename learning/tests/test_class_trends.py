@@ -0,0 +1,112 @@
+from datetime import timedelta
+
+from django.urls import reverse
+from django.utils import timezone
+
+from learning.class_trends import (
+    LIVE_MODE,
+    class_daily_trend,
+    class_word_trends,
+    rollup_class_buckets,
+)
+from learning.models import AssignmentAttempt, ClassWordDayBucket, User
+from live.models import LiveGameAnswer, LiveGameParticipant, LiveGameQuestion, LiveGameSession
+
+from .test_analytics import AnalyticsBaseTestCase
+
+
+class ClassTrendTests(AnalyticsBaseTestCase):
+    def _log(self, student, word, mode, *results, days_ago=0):
+        for is_correct in results:
+            attempt = AssignmentAttempt.objects.create(
+                student=student, assignment=self.assignment,
+                vocabulary_word=word, mode=mode, is_correct=is_correct,
+            )
+            if days_ago:
+                AssignmentAttempt.objects.filter(pk=attempt.pk).update(
+                    timestamp=timezone.now() - timedelta(days=days_ago)
+                )
+
+    def setUp(self):
+        super().setUp()
+        self.today = timezone.localdate()
+        self._log(self.student1, self.word1, "flashcards", True, True, days_ago=2)
+        self._log(self.student2, self.word1, "flashcards", False, days_ago=2)
+        self._log(self.student1, self.word2, "matchup", False, False, True)
+
+        session = LiveGameSession.objects.create(
+            host=self.teacher, clazz=self.classroom, pin="123456", total_questions=1
+        )
+        question = LiveGameQuestion.objects.create(
+            session=session, index=1, payload={"type": "multiple_choice", "word_id": self.word2.id}
+        )
+        participant = LiveGameParticipant.objects.create(session=session, display_name="Alex O.")
+        LiveGameAnswer.objects.create(
+            participant=participant, question=question, is_correct=False, latency_ms=900
+        )
+
+    def test_rollup_folds_attempts_and_live_answers_once(self):
+        self.assertEqual(rollup_class_buckets(lag=timedelta(0)), 7)
+        self.assertEqual(rollup_class_buckets(lag=timedelta(0)), 0)
+
+        buckets = {
+            (b.vocabulary_word_id, b.mode, b.day): (b.attempts, b.correct)
+            for b in ClassWordDayBucket.objects.filter(clazz=self.classroom)
+        }
+        self.assertEqual(buckets, {
+            (self.word1.id, "flashcards", self.today - timedelta(days=2)): (3, 2),
+            (self.word2.id, "matchup", self.today): (3, 1),
+            (self.word2.id, LIVE_MODE, self.today): (1, 0),
+        })
+
+        # New attempts are added to the existing bucket in small batches.
+        self._log(self.student2, self.word2, "matchup", True, True)
+        self.assertEqual(rollup_class_buckets(lag=timedelta(0), batch_size=1), 2)
+        bucket = ClassWordDayBucket.objects.get(vocabulary_word=self.word2, mode="matchup")
+        self.assertEqual((bucket.attempts, bucket.correct), (5, 3))
+
+    def test_recent_rows_wait_for_the_lag(self):
+        # Only the attempts backdated two days are old enough.
+        self.assertEqual(rollup_class_buckets(), 3)
+        self.assertEqual(
+            list(ClassWordDayBucket.objects.values_list("day", flat=True)),
+            [self.today - timedelta(days=2)],
+        )
+
+    def test_trends_aggregate_the_range(self):
+        rollup_class_buckets(lag=timedelta(0))
+        start, end = self.today - timedelta(days=7), self.today
+
+        words = class_word_trends(self.classroom.id, start, end)
+        self.assertEqual([row["word"] for row in words], ["adiós", "hola"])
+        self.assertEqual((words[0]["attempts"], words[0]["correct"]), (4, 1))
+        self.assertEqual(words[1]["active_days"], 1)
+        self.assertEqual(class_word_trends(self.classroom.id, start, end, mode=LIVE_MODE)[0]["attempts"], 1)
+        self.assertEqual(class_word_trends(self.classroom.id, self.today, end)[0]["word"], "adiós")
+
+        daily = class_daily_trend(self.classroom.id, start, end)
+        self.assertEqual(
+            [(row["day"], row["attempts"], row["words"]) for row in daily],
+            [((self.today - timedelta(days=2)).isoformat(), 3, 1), (self.today.isoformat(), 4, 1)],
+        )
+
+    def test_endpoints_are_limited_to_class_teachers(self):
+        rollup_class_buckets(lag=timedelta(0))
+        url = reverse("api_class_word_trends", args=[self.classroom.id])
+
+        self.client.force_login(self.teacher)
+        response = self.client.get(url, {"limit": 1})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([row["word"] for row in response.json()["results"]], ["adiós"])
+
+        daily = self.client.get(
+            reverse("api_class_daily_trend", args=[self.classroom.id]), {"word": self.word1.id}
+        )
+        self.assertEqual(len(daily.json()["results"]), 1)
+        self.assertEqual(self.client.get(url, {"start": "not-a-date"}).status_code, 400)
+
+        outsider = User.objects.create_user(
+            username="outsider", password="password123", is_teacher=True, school=self.school
+        )
+        self.client.force_login(outsider)
+        self.assertEqual(self.client.get(url).status_code, 403)
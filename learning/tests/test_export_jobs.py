@@ -0,0 +1,124 @@
+import shutil
+import tempfile
+from datetime import timedelta
+from io import BytesIO
+from unittest import mock
+
+from django.core.files.storage import default_storage
+from django.test import override_settings
+from django.urls import reverse
+from django.utils import timezone
+from openpyxl import load_workbook
+
+from learning import export_jobs
+from learning.export_jobs import ExportFile, exporter, run_export_job
+from learning.models import AssignmentAttempt, ExportJob, User
+
+from .test_analytics import AnalyticsBaseTestCase
+
+
+class ExportJobTests(AnalyticsBaseTestCase):
+    def setUp(self):
+        super().setUp()
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root, ignore_errors=True)
+        media = override_settings(MEDIA_ROOT=media_root)
+        media.enable()
+        self.addCleanup(media.disable)
+        patcher = mock.patch.object(export_jobs, "async_task")
+        self.async_task = patcher.start()
+        self.addCleanup(patcher.stop)
+
+        AssignmentAttempt.objects.create(
+            student=self.student1,
+            assignment=self.assignment,
+            vocabulary_word=self.word1,
+            mode="flashcards",
+            is_correct=True,
+        )
+        self.client.force_login(self.teacher)
+
+    def _enqueue(self):
+        response = self.client.get(
+            reverse("api_export_progress", args=[self.assignment.id]), {"background": "1"}
+        )
+        self.assertEqual(response.status_code, 202)
+        return response.json()
+
+    def test_background_export_is_built_by_the_worker(self):
+        payload = self._enqueue()
+        self.assertEqual(payload["status"], ExportJob.STATUS_QUEUED)
+        self.async_task.assert_called_once()
+        self.assertEqual(self.async_task.call_args.args, ("learning.tasks.run_export_job", payload["id"]))
+        self.assertEqual(self.async_task.call_args.kwargs["timeout"], export_jobs.EXPORT_TASK_TIMEOUT)
+
+        job = run_export_job(payload["id"])
+        self.assertEqual((job.status, job.progress), (ExportJob.STATUS_DONE, 100))
+        self.assertEqual(job.rows_written, 3)  # one student, one word, one heatmap cell
+        # A redelivered task finds the job already claimed.
+        self.assertIsNone(run_export_job(payload["id"]))
+
+        status = self.client.get(payload["status_url"]).json()
+        self.assertEqual(status["filename"], "assignment-1-progress.xlsx")
+        response = self.client.get(status["download_url"])
+        self.assertIn("assignment-1-progress.xlsx", response["Content-Disposition"])
+        book = load_workbook(BytesIO(b"".join(response.streaming_content)), read_only=True)
+        self.assertEqual(book.sheetnames, ["Progress", "Words", "Heatmap"])
+
+    def test_download_waits_for_completion_and_is_private(self):
+        payload = self._enqueue()
+        self.assertEqual(self.client.get(reverse("api_export_job_download", args=[payload["id"]])).status_code, 409)
+
+        other = User.objects.create_user(username="other", password="x", is_teacher=True)
+        self.client.force_login(other)
+        self.assertEqual(self.client.get(payload["status_url"]).status_code, 403)
+
+        self.client.logout()
+        self.assertEqual(self.client.get(payload["status_url"]).status_code, 302)
+
+    def test_failures_are_recorded_on_the_job(self):
+        @exporter("broken")
+        def broken(params, tracker):
+            def chunks():
+                yield b"partial"
+                raise RuntimeError("disk full")
+
+            return ExportFile("broken.csv", chunks())
+
+        self.addCleanup(export_jobs.EXPORTERS.pop, "broken")
+        job = export_jobs.enqueue_export("broken", {}, self.teacher)
+        job = run_export_job(job.pk)
+        self.assertEqual((job.status, job.error), (ExportJob.STATUS_FAILED, "disk full"))
+        self.assertNotIn("download_url", export_jobs.job_payload(job))
+
+    def test_jobs_left_running_by_a_dead_worker_fail(self):
+        payload = self._enqueue()
+        started = timezone.now() - timedelta(seconds=export_jobs.EXPORT_TASK_TIMEOUT - 60)
+        ExportJob.objects.filter(pk=payload["id"]).update(status=ExportJob.STATUS_RUNNING, started_at=started)
+
+        # Still inside the timeout: a redelivery leaves the running export alone.
+        self.assertIsNone(run_export_job(payload["id"]))
+        self.assertEqual(export_jobs.fail_stale_exports(), 0)
+
+        later = timezone.now() + timedelta(minutes=2)
+        self.assertEqual(export_jobs.fail_stale_exports(now=later), 1)
+        status = self.client.get(payload["status_url"]).json()
+        self.assertEqual((status["status"], status["error"]), (ExportJob.STATUS_FAILED, "The export timed out."))
+
+        ExportJob.objects.filter(pk=payload["id"]).update(
+            status=ExportJob.STATUS_RUNNING, started_at=timezone.now() - timedelta(hours=1)
+        )
+        self.assertIsNone(run_export_job(payload["id"]))
+        self.assertEqual(ExportJob.objects.get(pk=payload["id"]).status, ExportJob.STATUS_FAILED)
+
+    def test_expired_jobs_and_files_are_deleted(self):
+        job = run_export_job(self._enqueue()["id"])
+        recent = run_export_job(self._enqueue()["id"])
+        ExportJob.objects.filter(pk=job.pk).update(
+            created_at=timezone.now() - export_jobs.EXPORT_RETENTION - timedelta(minutes=1)
+        )
+
+        self.assertEqual(export_jobs.purge_expired_exports(), 1)
+        self.assertFalse(default_storage.exists(job.file.name))
+        self.assertTrue(default_storage.exists(recent.file.name))
+        self.assertEqual(list(ExportJob.objects.values_list("pk", flat=True)), [recent.pk])
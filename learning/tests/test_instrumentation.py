@@ -0,0 +1,76 @@
+from datetime import timedelta
+from types import SimpleNamespace
+
+from django.core.cache import cache
+from django.test import override_settings
+from django.urls import reverse
+
+from learning.instrumentation import (
+    external_call,
+    instrument,
+    query_budget,
+    record_http_response,
+)
+from learning.models import AssignmentAttempt
+
+from .test_analytics import AnalyticsBaseTestCase
+
+
+@override_settings(STATICFILES_STORAGE='django.contrib.staticfiles.storage.StaticFilesStorage')
+class InstrumentationTests(AnalyticsBaseTestCase):
+    def test_counts_queries_cache_reads_and_external_calls(self):
+        with instrument() as outer:
+            with instrument() as inner:
+                list(AssignmentAttempt.objects.all())
+                cache.get("missing")
+                cache.set("present", 1)
+                cache.get("present")
+                with external_call("gemini"):
+                    pass
+                record_http_response("http")(SimpleNamespace(elapsed=timedelta(milliseconds=40)))
+            list(AssignmentAttempt.objects.all())
+
+        self.assertEqual(inner.queries, 1)
+        self.assertEqual((inner.cache_hits, inner.cache_misses), (1, 1))
+        self.assertEqual(inner.external_calls("gemini"), 1)
+        self.assertEqual(inner.external["http"], [1, 40.0])
+        # The outer scope sees everything, including its own query.
+        self.assertEqual(outer.queries, 2)
+        self.assertEqual(outer.external_calls(), 2)
+
+    def test_middleware_adds_server_timing_and_logs(self):
+        self.teacher.is_staff = True
+        self.teacher.save(update_fields=["is_staff"])
+        self.client.force_login(self.teacher)
+        with self.assertLogs("learning.performance", "INFO") as logs:
+            response = self.client.get(reverse("api_word_stats", args=[self.assignment.id]))
+        self.assertEqual(response.status_code, 200)
+        self.assertRegex(response["Server-Timing"], r'^db;dur=[\d.]+;desc="\d+ queries", cache;desc=')
+        self.assertIn('"path": "/api/analytics/', logs.output[0])
+
+    def test_server_timing_is_staff_only(self):
+        url = reverse("api_word_stats", args=[self.assignment.id])
+        self.assertNotIn("Server-Timing", self.client.get(url))
+        self.client.force_login(self.teacher)
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotIn("Server-Timing", response)
+
+    @override_settings(PERFORMANCE_SLOW_REQUEST_MS=0, PERFORMANCE_SERVER_TIMING=False)
+    def test_slow_requests_are_logged_with_their_queries(self):
+        self.client.force_login(self.teacher)
+        with self.assertLogs("learning.performance", "WARNING") as logs:
+            response = self.client.get(reverse("api_word_stats", args=[self.assignment.id]))
+        self.assertNotIn("Server-Timing", response)
+        self.assertIn("slow request", logs.output[0])
+        self.assertIn("SELECT", logs.records[0].queries[0][0])
+
+    def test_query_budget_reports_the_queries(self):
+        with self.assertRaisesRegex(AssertionError, r"2 queries, budget is 1:\n1\. SELECT"):
+            with query_budget(queries=1):
+                list(AssignmentAttempt.objects.all())
+                list(AssignmentAttempt.objects.all())
+        with self.assertRaisesRegex(AssertionError, "1 external calls, budget is 0"):
+            with query_budget():
+                with external_call("gemini"):
+                    pass
@@ -0,0 +1,123 @@
+from datetime import date, timedelta
+
+from django.core.cache import cache
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from learning.leaderboards import class_standings, leaderboard_page, roll_over_classes
+from learning.models import Class, PointsPeriodBucket, School, Student, User, period_starts
+
+
+class LeaderboardTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.school = School.objects.create(name="Board School")
+        self.classes = [
+            Class.objects.create(school=self.school, name=f"Class {idx}", language="French")
+            for idx in range(3)
+        ]
+        today = timezone.now().date()
+        self.students = []
+        for idx, points in enumerate([50, 80, 80, 10, 30]):
+            student = Student.objects.create(
+                school=self.school,
+                first_name=f"Student{idx}",
+                last_name="Test",
+                year_group=8,
+                date_of_birth=date(2011, 1, 1),
+                username=f"student{idx}",
+                password="1234",
+                total_points=points * 10,
+                monthly_points=points * 2,
+                weekly_points=points,
+                weekly_points_last_reset=today,
+                monthly_points_last_reset=today,
+            )
+            student.classes.add(self.classes[0])
+            self.students.append(student)
+        self.students[0].classes.add(self.classes[1])
+
+    def test_roll_over_zeroes_stale_rows_in_bulk_once(self):
+        week_start, _ = period_starts(timezone.now().date())
+        Student.objects.update(weekly_points_last_reset=week_start - timedelta(days=1))
+
+        # One UPDATE per period (weekly and monthly), regardless of class size.
+        with self.assertNumQueries(2):
+            roll_over_classes([self.classes[0].id])
+        self.assertFalse(Student.objects.exclude(weekly_points=0).exists())
+        self.assertTrue(Student.objects.exclude(monthly_points=0).exists())
+
+        with self.assertNumQueries(0):
+            roll_over_classes([self.classes[0].id])
+
+    def test_keyset_pages_cover_ranking_in_order(self):
+        seen = []
+        cursor = None
+        while True:
+            page = leaderboard_page(self.classes[0].id, "weekly_points", cursor=cursor, limit=2)
+            seen.extend(page.entries)
+            cursor = page.next_cursor
+            if cursor is None:
+                break
+
+        self.assertEqual([entry.weekly_points for entry in seen], [80, 80, 50, 30, 10])
+        self.assertEqual([entry.rank for entry in seen], [1, 2, 3, 4, 5])
+        self.assertEqual(len({entry.id for entry in seen}), 5)
+
+    def test_invalid_category_falls_back_to_total(self):
+        page = leaderboard_page(self.classes[0].id, "bogus")
+        self.assertEqual(page.entries[0].total_points, 800)
+
+    def test_last_week_is_ranked_from_period_buckets(self):
+        week_start, _ = period_starts(timezone.now().date())
+        last_week = week_start - timedelta(days=7)
+        PointsPeriodBucket.objects.bulk_create([
+            PointsPeriodBucket(student=self.students[3], period=PointsPeriodBucket.PERIOD_WEEK, period_start=last_week, points=40),
+            PointsPeriodBucket(student=self.students[1], period=PointsPeriodBucket.PERIOD_WEEK, period_start=last_week, points=25),
+            PointsPeriodBucket(student=self.students[0], period=PointsPeriodBucket.PERIOD_WEEK, period_start=week_start, points=99),
+        ])
+
+        with self.assertNumQueries(1):
+            page = leaderboard_page(self.classes[0].id, "last_week_points")
+
+        self.assertEqual(
+            [(entry.id, entry.points, entry.rank) for entry in page.entries],
+            [(self.students[3].id, 40, 1), (self.students[1].id, 25, 2)],
+        )
+        self.assertIsNone(page.next_cursor)
+
+    def test_refresh_renders_last_week_points(self):
+        teacher = User.objects.create_user(
+            username="board-teacher", password="pw", is_teacher=True, school=self.school
+        )
+        self.classes[0].teachers.add(teacher)
+        week_start, _ = period_starts(timezone.now().date())
+        PointsPeriodBucket.objects.create(
+            student=self.students[3],
+            period=PointsPeriodBucket.PERIOD_WEEK,
+            period_start=week_start - timedelta(days=7),
+            points=40,
+        )
+
+        self.client.force_login(teacher)
+        response = self.client.get(
+            reverse("refresh_leaderboard", args=[self.classes[0].id]),
+            {"category": "last_week_points"},
+        )
+
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, "Last Week&#x27;s Points")
+        self.assertContains(response, "40 pts")
+
+    def test_class_standings_query_count_is_constant(self):
+        class_ids = [klass.id for klass in self.classes]
+        roll_over_classes(class_ids)
+
+        with self.assertNumQueries(1):
+            standings = class_standings(class_ids)
+
+        first = standings[str(self.classes[0].id)]
+        self.assertEqual([s.total_points for s in first["total_points"]], [800, 800, 500, 300, 100])
+        self.assertEqual(len(standings[str(self.classes[1].id)]["weekly_points"]), 1)
+        self.assertEqual(standings[str(self.classes[2].id)]["monthly_points"], [])
@@ -0,0 +1,95 @@
+from datetime import date, timedelta
+
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from learning.memory import (
+    STRENGTH_FIELDS,
+    calculate_memory_strength,
+    memory_meter,
+    score_queryset,
+    weakest,
+)
+from learning.models import Progress, School, Student, User, VocabularyList, VocabularyWord
+
+
+class MemoryBatchTests(TestCase):
+    def setUp(self):
+        self.now = timezone.now()
+        school = School.objects.create(name="Memory School")
+        teacher = User.objects.create_user(username="memteacher", password="pass", is_teacher=True)
+        self.user = User.objects.create_user(username="mempupil", password="pass", is_student=True)
+        self.student = Student.objects.create(
+            school=school,
+            first_name="Mem",
+            last_name="Pupil",
+            year_group=8,
+            date_of_birth=date(2011, 1, 1),
+            username="mempupil",
+            password="1234",
+        )
+        vocab_list = VocabularyList.objects.create(
+            name="Memory", source_language="en", target_language="de", teacher=teacher
+        )
+        cases = [
+            # correct, incorrect, reviews, interval, next_due offset, last_seen offset
+            (0, 0, 0, 1, None, None),
+            (5, 0, 5, 8, timedelta(days=3), timedelta(days=-5)),
+            (2, 4, 6, 1, timedelta(days=-1), timedelta(days=-2)),
+            (1, 1, 2, 2, timedelta(days=-10), timedelta(days=-12)),
+            (3, 1, 4, 4, None, timedelta(days=-3)),
+            (9, 2, 30, 16, timedelta(hours=-6), timedelta(days=-16)),
+        ]
+        for idx, (correct, incorrect, reviews, interval, due, seen) in enumerate(cases):
+            word = VocabularyWord.objects.create(word=f"m{idx}", translation=f"t{idx}", list=vocab_list)
+            progress = Progress.objects.create(
+                student=self.user,
+                word=word,
+                correct_attempts=correct,
+                incorrect_attempts=incorrect,
+                review_count=reviews,
+                interval=interval,
+                next_due=self.now + due if due is not None else None,
+            )
+            # last_seen is auto_now, so set it afterwards.
+            Progress.objects.filter(pk=progress.pk).update(
+                last_seen=self.now + seen if seen is not None else None
+            )
+
+    def test_batch_matches_scalar_formula(self):
+        rows, strengths = score_queryset(Progress.objects.order_by("id"), "id", now=self.now)
+        for (pk,), strength in zip(rows, strengths):
+            progress = Progress.objects.get(pk=pk)
+            self.assertAlmostEqual(strength, calculate_memory_strength(progress, now=self.now))
+        self.assertEqual(len(STRENGTH_FIELDS), 6)
+
+    def test_weakest_returns_lowest_scores_first(self):
+        progresses = list(Progress.objects.all())
+        expected = [
+            p.word_id for p in sorted(
+                progresses, key=lambda p: calculate_memory_strength(p, now=self.now)
+            )
+        ]
+        with self.assertNumQueries(1):
+            self.assertEqual(weakest(Progress.objects.all(), 3, now=self.now), expected[:3])
+        self.assertEqual(weakest(Progress.objects.all(), 50, now=self.now), expected)
+
+    def test_my_words_filters_by_band_and_sorts_by_memory(self):
+        session = self.client.session
+        session["student_id"] = str(self.student.id)
+        session.save()
+        headers = {"HTTP_X_REQUESTED_WITH": "XMLHttpRequest"}
+
+        response = self.client.get(reverse("my_words"), {"sort": "memory"}, **headers)
+        words = response.json()["words"]
+        percents = [w["memory_percent"] for w in words]
+        self.assertEqual(percents, sorted(percents, reverse=True))
+        by_text = {p.word.word: memory_meter(p, now=self.now) for p in Progress.objects.select_related("word")}
+        for item in words:
+            self.assertEqual((item["memory_percent"], item["memory_color"]), by_text[item["text"]])
+
+        response = self.client.get(reverse("my_words"), {"band": "low"}, **headers)
+        low = response.json()["words"]
+        self.assertTrue(low)
+        self.assertTrue(all(item["memory_color"] == "low" for item in low))
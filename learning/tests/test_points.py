@@ -0,0 +1,97 @@
+from datetime import date, timedelta
+
+from django.test import TestCase
+from django.utils import timezone
+
+from learning.models import (
+    Class,
+    PointsLedgerEntry,
+    PointsPeriodBucket,
+    School,
+    Student,
+    period_starts,
+)
+from learning.points import (
+    award_points,
+    period_standings,
+    rollup_points_ledger,
+)
+
+
+class PointsLedgerTests(TestCase):
+    def setUp(self):
+        self.school = School.objects.create(name="Ledger School")
+        self.klass = Class.objects.create(school=self.school, name="7A", language="French")
+        today = timezone.localdate()
+        self.students = []
+        for idx in range(2):
+            student = Student.objects.create(
+                school=self.school,
+                first_name=f"Pupil{idx}",
+                last_name="Ledger",
+                year_group=7,
+                date_of_birth=date(2012, 1, 1),
+                username=f"ledger{idx}",
+                password="1234",
+                total_points=100,
+                weekly_points=10,
+                monthly_points=20,
+                weekly_points_last_reset=today,
+                monthly_points_last_reset=today,
+            )
+            student.classes.add(self.klass)
+            self.students.append(student)
+
+    def test_award_increments_without_losing_concurrent_updates(self):
+        student = self.students[0]
+        stale_copy = Student.objects.get(pk=student.pk)
+
+        award_points(student, 5, source="game")
+        award_points(stale_copy, 7, source="assignment")
+
+        student.refresh_from_db()
+        self.assertEqual(student.total_points, 112)
+        self.assertEqual(student.weekly_points, 22)
+        self.assertEqual(stale_copy.total_points, 112)
+        self.assertEqual(
+            list(PointsLedgerEntry.objects.values_list("amount", "source").order_by("id")),
+            [(5, "game"), (7, "assignment")],
+        )
+
+    def test_award_rolls_over_stale_week(self):
+        student = self.students[0]
+        week_start, _ = period_starts(timezone.localdate())
+        Student.objects.filter(pk=student.pk).update(
+            weekly_points_last_reset=week_start - timedelta(days=1)
+        )
+
+        student.add_points(4)
+
+        self.assertEqual(student.weekly_points, 4)
+        self.assertEqual(student.weekly_points_last_reset, timezone.localdate())
+        self.assertEqual(student.total_points, 104)
+
+    def test_rollup_builds_buckets_and_respects_watermark(self):
+        award_points(self.students[0], 5)
+        award_points(self.students[1], 3)
+        award_points(self.students[0], 2)
+        last_week = timezone.now() - timedelta(days=7)
+        PointsLedgerEntry.objects.filter(amount=2).update(created_at=last_week)
+
+        self.assertEqual(rollup_points_ledger(lag=timedelta()), 3)
+        self.assertEqual(rollup_points_ledger(lag=timedelta()), 0)
+
+        award_points(self.students[1], 9)
+        self.assertEqual(rollup_points_ledger(lag=timedelta()), 1)
+
+        week_start, _ = period_starts(timezone.localdate())
+        standings = period_standings(self.klass.id, PointsPeriodBucket.PERIOD_WEEK, week_start)
+        self.assertEqual([(s.id, s.points, s.rank) for s in standings], [
+            (self.students[1].id, 12, 1),
+            (self.students[0].id, 5, 2),
+        ])
+
+    def test_rollup_skips_entries_inside_lag(self):
+        award_points(self.students[0], 5)
+        self.assertEqual(rollup_points_ledger(), 0)
+        self.assertFalse(PointsPeriodBucket.objects.exists())
@@ -0,0 +1,67 @@
+import random
+
+from django.test import TestCase
+
+from learning.instrumentation import query_budget
+from learning.models import School, User, VocabularyList, VocabularyWord
+from learning.services.question_flow import QuestionFlowEngine, WordPool
+
+
+class QuestionDeckTests(TestCase):
+    def setUp(self):
+        school = School.objects.create(name="Deck School")
+        teacher = User.objects.create_user(username="deck-teacher", password="pw", is_teacher=True, school=school)
+        self.vocab_list = VocabularyList.objects.create(
+            name="Animals", source_language="en", target_language="fr", teacher=teacher,
+        )
+        VocabularyWord.objects.bulk_create(
+            VocabularyWord(list=self.vocab_list, word=f"mot{n}", translation=f"word{n}") for n in range(30)
+        )
+        # Same translation as word0: never offered as a wrong option for it.
+        VocabularyWord.objects.create(list=self.vocab_list, word="autre", translation="word0")
+        self.engine = QuestionFlowEngine(rng=random.Random(7))
+
+    def test_deck_is_built_with_one_query(self):
+        with query_budget(queries=1):
+            payloads = self.engine.build_question_payloads([self.vocab_list], 50)
+        self.assertEqual(len(payloads), 50)
+
+    def test_words_do_not_repeat_until_the_list_is_used_up(self):
+        payloads = self.engine.build_question_payloads([self.vocab_list], 40)
+        first_round = [payload["word_id"] for payload in payloads[:31]]
+        self.assertEqual(len(set(first_round)), 31)
+
+    def test_distractors_come_from_the_list_and_are_wrong(self):
+        pool = WordPool.for_lists([self.vocab_list])
+        word0 = next(word for word in pool.words if word.word == "mot0")
+        for _ in range(20):
+            payload = self.engine.build_activity_payload(word0, "multiple_choice", pool=pool)
+            self.assertEqual(len(payload["options"]), 4)
+            self.assertEqual(payload["options"].count(payload["answer"]), 1)
+
+            statement = self.engine.build_activity_payload(word0, "true_false", pool=pool)
+            correct = word0.translation if statement["prompt"] == word0.word else word0.word
+            self.assertEqual(statement["answer"], statement["shown_translation"] == correct)
+
+    def test_single_question_loads_its_own_list(self):
+        word = VocabularyWord.objects.get(word="mot3")
+        with query_budget(queries=1):
+            payload = self.engine.build_activity_payload(word, "multiple_choice")
+        self.assertEqual(len(set(payload["options"])), 4)
+
+    def test_public_payload_hides_the_answer_in_image_alt(self):
+        word = VocabularyWord.objects.create(
+            list=self.vocab_list,
+            word="Bibliothek",
+            translation="library",
+            image_url="https://example.com/library.jpg",
+            image_approved=True,
+        )
+        for qtype in ("show_word", "typing", "fill_gaps", "multiple_choice"):
+            payload = self.engine.build_activity_payload(word, qtype)
+            self.assertEqual(payload["image"]["alt"], "Bibliothek")
+
+            public = QuestionFlowEngine.public_payload(payload)
+            self.assertNotIn("answer", public)
+            self.assertNotIn("Bibliothek", str(public["image"]), qtype)
+            self.assertEqual(public["image"]["url"], "https://example.com/library.jpg")
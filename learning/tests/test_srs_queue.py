@@ -0,0 +1,74 @@
+from datetime import date, timedelta
+
+from django.test import TestCase
+from django.utils import timezone
+
+from learning.models import (
+    Class,
+    Progress,
+    School,
+    Student,
+    User,
+    VocabularyList,
+    VocabularyWord,
+)
+from learning.srs import get_due_words
+
+
+class DueQueueTests(TestCase):
+    def setUp(self):
+        school = School.objects.create(name="Queue School")
+        teacher = User.objects.create_user(username="queueteacher", password="pass", is_teacher=True)
+        self.user = User.objects.create_user(username="queuepupil", password="pass", is_student=True)
+        self.student = Student.objects.create(
+            school=school,
+            first_name="Queue",
+            last_name="Pupil",
+            year_group=8,
+            date_of_birth=date(2011, 1, 1),
+            username="queuepupil",
+            password="1234",
+        )
+        self.words = []
+        for idx in range(3):
+            klass = Class.objects.create(school=school, name=f"Q{idx}", language="French")
+            klass.students.add(self.student)
+            vocab_list = VocabularyList.objects.create(
+                name=f"Queue {idx}", source_language="en", target_language="fr", teacher=teacher
+            )
+            klass.vocabulary_lists.add(vocab_list)
+            for n in range(4):
+                self.words.append(
+                    VocabularyWord.objects.create(word=f"w{idx}{n}", translation="t", list=vocab_list)
+                )
+        # The first list is shared by two classes; words must not repeat.
+        Class.objects.get(name="Q1").vocabulary_lists.add(VocabularyList.objects.get(name="Queue 0"))
+
+        now = timezone.now()
+        for word in self.words[::2]:
+            Progress.objects.create(student=self.user, word=word, next_due=now + timedelta(days=2))
+        Progress.objects.create(student=self.user, word=self.words[1], next_due=now - timedelta(hours=1))
+        Progress.objects.create(student=self.user, word=self.words[3], next_due=None)
+
+    def _legacy(self, limit):
+        now = timezone.now()
+        lists = VocabularyList.objects.filter(linked_classes__students=self.student).distinct()
+        due = []
+        for word in VocabularyWord.objects.filter(list__in=lists).distinct().order_by("id"):
+            progress = Progress.objects.filter(student=self.user, word=word).first()
+            if not progress or not progress.next_due or progress.next_due <= now:
+                due.append(word)
+            if len(due) >= limit:
+                break
+        return due
+
+    def test_matches_per_word_scan_in_two_queries(self):
+        for limit in (1, 3, 50):
+            with self.assertNumQueries(2):
+                due = get_due_words(self.student, limit=limit)
+            self.assertEqual(due, self._legacy(limit))
+        self.assertEqual(get_due_words(self.student, limit=50), self.words[1::2])
+
+    def test_unknown_user_has_no_queue(self):
+        self.user.delete()
+        self.assertEqual(get_due_words(self.student), [])
@@ -0,0 +1,94 @@
+from datetime import date, timedelta
+
+from django.contrib.sessions.middleware import SessionMiddleware
+from django.db import connection
+from django.http import HttpResponse
+from django.test import RequestFactory, TestCase
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from learning.decorators import get_student, student_login_required
+from learning.models import School, Student, period_starts
+
+
+@student_login_required
+def _echo_view(request):
+    return HttpResponse(request.student.username)
+
+
+class StudentLoginRequiredTests(TestCase):
+    def setUp(self):
+        self.factory = RequestFactory()
+        self.school = School.objects.create(name="Auth School")
+        today = timezone.now().date()
+        self.student = Student.objects.create(
+            school=self.school,
+            first_name="Robin",
+            last_name="Reader",
+            year_group=7,
+            date_of_birth=date(2012, 3, 4),
+            username="robinre0403",
+            password="1234",
+            weekly_points=40,
+            monthly_points=90,
+            weekly_points_last_reset=today,
+            monthly_points_last_reset=today,
+        )
+
+    def _request(self, student_id=None):
+        request = self.factory.get("/")
+        SessionMiddleware(lambda req: None).process_request(request)
+        if student_id is not None:
+            request.session["student_id"] = str(student_id)
+        return request
+
+    def _student_updates(self, queries):
+        return [
+            q["sql"] for q in queries
+            if q["sql"].startswith("UPDATE") and "learning_student" in q["sql"]
+        ]
+
+    def test_redirects_without_session(self):
+        response = _echo_view(self._request())
+        self.assertEqual(response.status_code, 302)
+
+    def test_attaches_student_without_writing(self):
+        request = self._request(self.student.id)
+        with CaptureQueriesContext(connection) as ctx:
+            response = _echo_view(request)
+        self.assertEqual(response.content.decode(), self.student.username)
+        self.assertEqual(len(ctx.captured_queries), 1)
+        self.assertEqual(self._student_updates(ctx.captured_queries), [])
+
+    def test_student_is_resolved_once_per_request(self):
+        request = self._request(self.student.id)
+        first = get_student(request)
+        with self.assertNumQueries(0):
+            self.assertIs(get_student(request), first)
+
+    def test_stale_week_rolls_over_with_single_update(self):
+        today = timezone.now().date()
+        week_start, month_start = period_starts(today)
+        last_week = week_start - timedelta(days=1)
+        Student.objects.filter(pk=self.student.pk).update(
+            weekly_points_last_reset=last_week,
+            monthly_points_last_reset=max(last_week, month_start),
+        )
+
+        request = self._request(self.student.id)
+        with CaptureQueriesContext(connection) as ctx:
+            _echo_view(request)
+        self.assertEqual(len(self._student_updates(ctx.captured_queries)), 1)
+
+        self.student.refresh_from_db()
+        self.assertEqual(self.student.weekly_points, 0)
+        self.assertEqual(self.student.weekly_points_last_reset, today)
+        if last_week >= month_start:
+            self.assertEqual(self.student.monthly_points, 90)
+        self.assertEqual(request.student.weekly_points, 0)
+
+    def test_unknown_student_clears_session(self):
+        request = self._request("00000000-0000-0000-0000-000000000000")
+        response = _echo_view(request)
+        self.assertEqual(response.status_code, 302)
+        self.assertNotIn("student_id", request.session)
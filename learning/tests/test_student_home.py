@@ -0,0 +1,123 @@
+from datetime import date, timedelta
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from learning.instrumentation import query_budget
+from learning.models import (
+    Assignment,
+    AssignmentProgress,
+    Class,
+    School,
+    Student,
+    VocabularyList,
+)
+from learning.services.dashboard import EXPIRED_LIMIT, EXPIRED_WINDOW
+
+
+User = get_user_model()
+
+
+@override_settings(STATICFILES_STORAGE='django.contrib.staticfiles.storage.StaticFilesStorage')
+class StudentHomePayloadTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.school = School.objects.create(name="Home School")
+        self.teacher = User.objects.create_user(
+            username="hometeacher", password="pass1234", is_teacher=True
+        )
+        self.klass = Class.objects.create(school=self.school, name="8B", language="Spanish")
+        self.vocab_list = VocabularyList.objects.create(
+            name="Food", source_language="en", target_language="es", teacher=self.teacher
+        )
+        self.vocab_list.classes.add(self.klass)
+        today = timezone.now().date()
+        self.student = Student.objects.create(
+            school=self.school,
+            first_name="Ana",
+            last_name="Home",
+            year_group=8,
+            date_of_birth=date(2011, 5, 5),
+            username="anahome",
+            password="1234",
+            weekly_points_last_reset=today,
+            monthly_points_last_reset=today,
+        )
+        self.student.classes.add(self.klass)
+        session = self.client.session
+        session["student_id"] = str(self.student.id)
+        session.save()
+
+    def _assignment(self, name, deadline, **extra):
+        return Assignment.objects.create(
+            name=name,
+            class_assigned=self.klass,
+            vocab_list=self.vocab_list,
+            teacher=self.teacher,
+            deadline=deadline,
+            target_points=10,
+            **extra,
+        )
+
+    def _dashboard(self):
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(reverse("student_dashboard"))
+        self.assertEqual(response.status_code, 200)
+        return len(ctx.captured_queries), response
+
+    def test_query_count_does_not_grow_with_assignment_history(self):
+        now = timezone.now()
+        self._assignment("Live", now + timedelta(days=2))
+        self._assignment("Recent", now - timedelta(days=1))
+        self._dashboard()  # creates the linked achievements user
+        cache.clear()
+        small, _ = self._dashboard()
+
+        for idx in range(EXPIRED_LIMIT + 5):
+            assignment = self._assignment(f"Past {idx}", now - timedelta(days=idx + 2))
+            AssignmentProgress.objects.create(
+                student=self.student, assignment=assignment, points_earned=idx
+            )
+        self._assignment("Last year", now - EXPIRED_WINDOW - timedelta(days=1))
+        cache.clear()
+        large, response = self._dashboard()
+        self.assertEqual(small, large)
+
+        klass = response.context["classes"][0]
+        self.assertEqual([a.name for a in klass.live_assignments], ["Live"])
+        expired = [a.name for a in klass.expired_assignments]
+        self.assertEqual(len(expired), EXPIRED_LIMIT)
+        self.assertEqual(expired[:2], ["Recent", "Past 0"])
+        self.assertNotIn("Last year", expired)
+
+    def test_repeat_loads_use_cache_until_progress_changes(self):
+        assignment = self._assignment("Live", timezone.now() + timedelta(days=2))
+        self._dashboard()
+        cache.clear()
+        cold, _ = self._dashboard()
+        warm, _ = self._dashboard()
+        self.assertLess(warm, cold)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            progress = AssignmentProgress.objects.create(student=self.student, assignment=assignment)
+            progress.update_progress(4, timedelta(seconds=30))
+
+        _, response = self._dashboard()
+        live = response.context["classes"][0].live_assignments[0]
+        self.assertEqual(live.student_progress, 4)
+        self.assertEqual(live.progress_percentage, 40)
+
+    def test_dashboard_stays_within_budget(self):
+        self._assignment("Live", timezone.now() + timedelta(days=2))
+        self._dashboard()  # creates the linked achievements user
+        cache.clear()
+        with query_budget(queries=15):
+            self.client.get(reverse("student_dashboard"))
+        with query_budget(queries=10) as warm:
+            self.client.get(reverse("student_dashboard"))
+        self.assertGreater(warm.cache_hits, 0)
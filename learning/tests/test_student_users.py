@@ -0,0 +1,69 @@
+from datetime import date
+from importlib import import_module
+
+from django.apps import apps
+from django.test import TestCase
+
+from learning.models import School, Student, User
+from learning.spaced_repetition import _get_user_from_student
+from learning.student_users import student_ids_for_users, users_for_students
+
+backfill = import_module("learning.migrations.0046_backfill_student_user")
+
+
+class StudentUserLinkTests(TestCase):
+    def setUp(self):
+        self.school = School.objects.create(name="Link School")
+
+    def _student(self, username, **kwargs):
+        return Student.objects.create(
+            school=self.school,
+            first_name="Link",
+            last_name=username,
+            year_group=7,
+            date_of_birth=date(2012, 1, 1),
+            username=username,
+            password="1234",
+            **kwargs,
+        )
+
+    def test_linked_student_needs_no_lookup(self):
+        user = User.objects.create_user(username="linked", password="p", is_student=True)
+        student = self._student("linked", user=user)
+        student = Student.objects.select_related("user").get(pk=student.pk)
+        with self.assertNumQueries(0):
+            self.assertEqual(_get_user_from_student(student), user)
+
+    def test_unlinked_students_are_linked_in_bulk(self):
+        existing = User.objects.create_user(username="pupil0", password="p")
+        students = [self._student(f"pupil{idx}") for idx in range(5)]
+
+        # savepoint, existing accounts, insert, re-read, link, release
+        with self.assertNumQueries(6):
+            users = users_for_students(students)
+
+        self.assertEqual(users[students[0].pk], existing)
+        self.assertEqual(User.objects.filter(username__startswith="pupil").count(), 5)
+        self.assertTrue(all(users[s.pk].username == s.username for s in students))
+        for student in Student.objects.filter(pk__in=[s.pk for s in students]):
+            self.assertEqual(student.user_id, users[student.pk].pk)
+
+        reloaded = list(Student.objects.filter(pk__in=[s.pk for s in students]))
+        with self.assertNumQueries(1):
+            users_for_students(reloaded)
+
+        user_id = users[students[1].pk].pk
+        self.assertEqual(student_ids_for_users([user_id]), {user_id: students[1].pk})
+
+    def test_backfill_links_in_chunks(self):
+        User.objects.create_user(username="back0", password="p")
+        students = [self._student(f"back{idx}") for idx in range(5)]
+
+        chunk_size = backfill.CHUNK_SIZE
+        backfill.CHUNK_SIZE = 2
+        self.addCleanup(setattr, backfill, "CHUNK_SIZE", chunk_size)
+        backfill.link_students(apps, None)
+
+        linked = dict(Student.objects.values_list("username", "user__username"))
+        self.assertEqual(linked, {s.username: s.username for s in students})
+        self.assertFalse(Student.objects.filter(user__isnull=True).exists())
@@ -0,0 +1,97 @@
+import json
+import os
+import tempfile
+from datetime import timedelta
+from io import StringIO
+
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import TestCase
+from django.utils import timezone
+
+from learning.models import (
+    Assignment,
+    AssignmentAttempt,
+    AssignmentWordStat,
+    Student,
+    User,
+)
+from learning.synthetic import OPEN_DAYS, SyntheticSpec, generate_school
+
+
+TINY = SyntheticSpec(
+    seed=7, teachers=2, classes=3, students=12, lists=2, words_per_list=5,
+    assignments=4, attempts=600,
+)
+
+
+class SyntheticSchoolTests(TestCase):
+    def test_generates_requested_shape_and_rollup(self):
+        school = generate_school(TINY)
+
+        self.assertEqual(User.objects.filter(school=school.school, is_teacher=True).count(), 2)
+        self.assertEqual(Student.objects.filter(school=school.school).count(), 12)
+        self.assertEqual(Assignment.objects.filter(id__in=school.assignment_ids).count(), 4)
+        self.assertEqual(school.attempts, 600)
+        self.assertEqual(AssignmentAttempt.objects.count(), 600)
+        rolled_up = sum(AssignmentWordStat.objects.values_list("attempts", flat=True))
+        self.assertEqual(rolled_up, 600)
+
+        # Attempts are spread over each assignment's open window, not stamped now.
+        now = timezone.now()
+        for timestamp, deadline in AssignmentAttempt.objects.values_list("timestamp", "assignment__deadline"):
+            self.assertLessEqual(timestamp, min(deadline, now))
+            self.assertGreater(timestamp, min(deadline - timedelta(days=OPEN_DAYS), now - timedelta(days=2)))
+        days = {timestamp.date() for timestamp in AssignmentAttempt.objects.values_list("timestamp", flat=True)}
+        self.assertGreater(len(days), 10)
+
+    def test_same_seed_gives_same_attempts(self):
+        def fingerprint(prefix):
+            spec = SyntheticSpec(**{**TINY.__dict__, "prefix": prefix})
+            school = generate_school(spec)
+            students = {pk: n for n, pk in enumerate(school.student_ids)}
+            assignments = {pk: n for n, pk in enumerate(school.assignment_ids)}
+            return sorted(
+                (students[s], assignments[a], mode, correct)
+                for s, a, mode, correct in AssignmentAttempt.objects.filter(
+                    assignment_id__in=school.assignment_ids
+                ).values_list("student_id", "assignment_id", "mode", "is_correct")
+            )
+
+        self.assertEqual(fingerprint("a"), fingerprint("b"))
+
+
+class BenchmarkCommandTests(TestCase):
+    def test_commands_write_comparable_results(self):
+        call_command(
+            "generate_synthetic_school", "--teachers=1", "--classes=2", "--students=6",
+            "--lists=1", "--words-per-list=4", "--assignments=2", "--attempts=200",
+            stdout=StringIO(),
+        )
+
+        cache.set("dashboard:class-version:kept", "token")
+        with tempfile.TemporaryDirectory() as tmp:
+            first = os.path.join(tmp, "first.json")
+            call_command("benchmark_analytics", "--repeat=1", f"--output={first}", stdout=StringIO())
+            # Cold runs empty a private cache, not the site's.
+            self.assertEqual(cache.get("dashboard:class-version:kept"), "token")
+            with open(first, encoding="utf-8") as handle:
+                results = json.load(handle)
+
+            self.assertEqual(
+                set(results["cases"]),
+                {
+                    "analytics.build_bundle",
+                    "analytics.word_stats",
+                    "analytics.heatmap_data",
+                    "assignment_analytics",
+                    "teacher_dashboard",
+                    "student_dashboard",
+                },
+            )
+            self.assertEqual(results["metadata"]["total_attempts"], 200)
+            self.assertEqual(results["cases"]["analytics.build_bundle"]["queries"], 1)
+
+            out = StringIO()
+            call_command("benchmark_analytics", "--repeat=1", f"--compare={first}", stdout=out)
+            self.assertIn("Compared with", out.getvalue())
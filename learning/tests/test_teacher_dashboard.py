@@ -0,0 +1,146 @@
+from datetime import date, timedelta
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from learning.instrumentation import query_budget
+from learning.services.dashboard import get_teacher_snapshot
+from learning.models import (
+    Assignment,
+    AssignmentProgress,
+    Class,
+    School,
+    Student,
+    VocabularyList,
+)
+
+
+User = get_user_model()
+
+
+@override_settings(STATICFILES_STORAGE='django.contrib.staticfiles.storage.StaticFilesStorage')
+class TeacherDashboardSnapshotTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.school = School.objects.create(name="Snapshot School")
+        self.teacher = User.objects.create_user(
+            username="snapteacher",
+            password="pass1234",
+            first_name="Snap",
+            last_name="Shot",
+            is_teacher=True,
+        )
+        self.client.force_login(self.teacher)
+        self.classes = []
+
+    def _grow(self, count):
+        """Add ``count`` classes, each with students, a list and assignments."""
+        future = timezone.now() + timedelta(days=3)
+        for _ in range(count):
+            idx = len(self.classes)
+            klass = Class.objects.create(school=self.school, name=f"Class {idx}", language="French")
+            klass.teachers.add(self.teacher)
+            vocab_list = VocabularyList.objects.create(
+                name=f"List {idx}", source_language="en", target_language="fr", teacher=self.teacher
+            )
+            vocab_list.classes.add(klass)
+            students = []
+            for n in range(2):
+                student = Student.objects.create(
+                    school=self.school,
+                    first_name=f"S{idx}{n}",
+                    last_name="Pupil",
+                    year_group=7,
+                    date_of_birth=date(2012, 1, 1),
+                    username=f"pupil{idx}x{n}",
+                    password="1234",
+                )
+                student.classes.add(klass)
+                students.append(student)
+            live = Assignment.objects.create(
+                name=f"Live {idx}", class_assigned=klass, vocab_list=vocab_list,
+                deadline=future, target_points=10, teacher=self.teacher,
+            )
+            Assignment.objects.create(
+                name=f"Old {idx}", class_assigned=klass, vocab_list=vocab_list,
+                deadline=future, target_points=10, teacher=self.teacher, is_closed=True,
+            )
+            AssignmentProgress.objects.create(
+                student=students[0], assignment=live, points_earned=10, completed=True
+            )
+            self.classes.append(klass)
+
+    def _query_count(self):
+        cache.clear()
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(reverse("teacher_dashboard"))
+        self.assertEqual(response.status_code, 200)
+        return len(ctx.captured_queries), response
+
+    def test_query_count_does_not_grow_with_classes(self):
+        self._grow(1)
+        small, _ = self._query_count()
+        self._grow(5)
+        large, response = self._query_count()
+        self.assertEqual(small, large)
+
+        pending = response.context["pending_assignments"]
+        self.assertEqual(len(pending), 6)
+        self.assertTrue(all(item["pending"] == 1 for item in pending))
+        klass = response.context["classes"][0]
+        self.assertEqual(len(klass.live_assignments), 1)
+        self.assertEqual(len(klass.expired_assignments), 1)
+
+    def test_snapshot_is_reused_and_invalidated(self):
+        self._grow(2)
+        self.client.get(reverse("teacher_dashboard"))
+        with CaptureQueriesContext(connection) as warm:
+            self.client.get(reverse("teacher_dashboard"))
+        cold, _ = self._query_count()
+        self.assertLess(len(warm.captured_queries), cold)
+
+        progress = AssignmentProgress.objects.get(assignment__name="Live 0")
+        other = progress.assignment.class_assigned.students.exclude(pk=progress.student_id).get()
+        with self.captureOnCommitCallbacks(execute=True):
+            AssignmentProgress.objects.create(
+                student=other, assignment=progress.assignment, points_earned=10, completed=True
+            )
+            VocabularyList.objects.get(name="List 1").classes.add(self.classes[0])
+
+        response = self.client.get(reverse("teacher_dashboard"))
+        names = [item["assignment"].name for item in response.context["pending_assignments"]]
+        self.assertEqual(names, ["Live 1"])
+        list_one = next(v for v in response.context["vocab_lists"] if v.name == "List 1")
+        self.assertEqual(list_one.unattached_classes, [])
+
+    def test_deleting_students_refreshes_the_student_count(self):
+        self._grow(2)
+        klass = self.classes[0]
+
+        def student_count():
+            snapshot = get_teacher_snapshot(self.teacher)
+            return next(c.student_count for c in snapshot.classes if c.id == klass.id)
+
+        self.assertEqual(student_count(), 2)
+        first, second = klass.students.order_by("id")
+        with self.captureOnCommitCallbacks(execute=True):
+            Student.objects.filter(pk=first.pk).delete()
+        self.assertEqual(student_count(), 1)
+        with self.captureOnCommitCallbacks(execute=True):
+            second.delete()
+        self.assertEqual(student_count(), 0)
+
+    def test_dashboard_stays_within_budget(self):
+        self._grow(3)
+        cache.clear()
+        with query_budget(queries=19):
+            self.client.get(reverse("teacher_dashboard"))
+        # A cached snapshot saves the four snapshot queries.
+        with query_budget(queries=15) as warm:
+            self.client.get(reverse("teacher_dashboard"))
+        self.assertGreater(warm.cache_hits, 0)
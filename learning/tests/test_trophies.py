@@ -0,0 +1,58 @@
+from datetime import date
+
+from django.core.cache import cache
+from django.test import TestCase
+
+from learning.models import School, Student, StudentTrophy, Trophy
+from learning.trophies import check_and_award_trophies, reset_catalogue
+
+
+class TrophyEngineTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        reset_catalogue()
+        # Trophy rows are rolled back after each test, so drop their ids too.
+        self.addCleanup(reset_catalogue)
+        self.school = School.objects.create(name="Trophy School")
+        self.student = Student.objects.create(
+            school=self.school,
+            first_name="Tess",
+            last_name="Trophy",
+            year_group=9,
+            date_of_birth=date(2010, 2, 2),
+            username="tesstr0202",
+            password="1234",
+        )
+
+    def test_awards_crossed_thresholds_in_one_insert(self):
+        self.student.total_points = 1200
+        self.student.current_streak = 3
+
+        with self.assertNumQueries(6):
+            # awarded set, catalogue read + create + re-read, confirm, insert
+            awarded = check_and_award_trophies(self.student)
+
+        self.assertCountEqual(awarded, ["Rising Star", "Language Warrior", "Warm-Up"])
+        self.assertEqual(StudentTrophy.objects.filter(student=self.student).count(), 3)
+        self.assertEqual(
+            Trophy.objects.get(name="Language Warrior").description, "Earned 1000 points!"
+        )
+
+    def test_repeat_checks_are_free_until_a_new_threshold(self):
+        self.student.total_points = 600
+        check_and_award_trophies(self.student)
+
+        with self.assertNumQueries(0):
+            self.assertEqual(check_and_award_trophies(self.student), [])
+
+        self.student.total_points = 1000
+        with self.assertNumQueries(2):
+            self.assertEqual(check_and_award_trophies(self.student), ["Language Warrior"])
+
+    def test_existing_awards_are_not_reported_again(self):
+        self.student.total_points = 600
+        check_and_award_trophies(self.student)
+        cache.clear()
+
+        self.assertEqual(check_and_award_trophies(self.student), [])
+        self.assertEqual(StudentTrophy.objects.filter(student=self.student).count(), 1)
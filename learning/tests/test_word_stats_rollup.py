@@ -0,0 +1,111 @@
+from io import StringIO
+
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection
+from django.db.models import Count, Q
+from django.test.utils import CaptureQueriesContext
+
+from learning.analytics import analytics_version, heatmap_data, mode_breakdown, student_mastery, word_stats
+from learning.attempt_stats import delete_attempts, rebuild_word_stats
+from learning.models import AssignmentAttempt, AssignmentWordStat, Student
+
+from .test_analytics import AnalyticsBaseTestCase
+
+
+def _raw_cells(assignment_id):
+    rows = (
+        AssignmentAttempt.objects.filter(assignment_id=assignment_id)
+        .values("student_id", "vocabulary_word_id", "mode")
+        .annotate(attempts=Count("id"), correct=Count("id", filter=Q(is_correct=True)))
+    )
+    return {
+        (r["student_id"], r["vocabulary_word_id"], r["mode"]): (r["attempts"], r["correct"])
+        for r in rows
+    }
+
+
+def _rollup_cells(assignment_id):
+    return {
+        (r.student_id, r.vocabulary_word_id, r.mode): (r.attempts, r.correct)
+        for r in AssignmentWordStat.objects.filter(assignment_id=assignment_id, attempts__gt=0)
+    }
+
+
+class WordStatRollupTests(AnalyticsBaseTestCase):
+    def _log(self, student, word, mode, *results):
+        for is_correct in results:
+            AssignmentAttempt.objects.create(
+                student=student,
+                assignment=self.assignment,
+                vocabulary_word=word,
+                mode=mode,
+                is_correct=is_correct,
+            )
+
+    def setUp(self):
+        super().setUp()
+        self._log(self.student1, self.word1, "flashcards", True, True, True, False)
+        self._log(self.student1, self.word2, "flashcards", False, False)
+        self._log(self.student1, self.word2, "matchup", True)
+        self._log(self.student2, self.word1, "matchup", True, False)
+        self._log(self.student2, self.word2, "matchup", False, False, True)
+
+    def test_logging_attempts_keeps_rollup_in_step(self):
+        self.assertEqual(_rollup_cells(self.assignment.id), _raw_cells(self.assignment.id))
+        removed = delete_attempts(
+            AssignmentAttempt.objects.filter(student=self.student2, vocabulary_word=self.word2)
+        )
+        self.assertEqual(removed, 3)
+        self.assertEqual(_rollup_cells(self.assignment.id), _raw_cells(self.assignment.id))
+
+    def test_deleting_a_student_does_not_load_their_attempts(self):
+        self._log(self.student1, self.word1, "flashcards", *([True] * 40))
+        student = Student.objects.get(pk=self.student1.pk)
+        # Attempts and rollup rows go with one DELETE each, however many there are.
+        with CaptureQueriesContext(connection) as ctx:
+            student.delete()
+        attempt_selects = [
+            q["sql"] for q in ctx.captured_queries
+            if q["sql"].startswith("SELECT") and '"learning_assignmentattempt"' in q["sql"]
+        ]
+        self.assertEqual(attempt_selects, [])
+        self.assertFalse(AssignmentAttempt.objects.filter(student_id=self.student1.pk).exists())
+        self.assertFalse(AssignmentWordStat.objects.filter(student_id=self.student1.pk).exists())
+
+    def test_backfill_rebuilds_from_raw_attempts(self):
+        AssignmentWordStat.objects.all().delete()
+        out = StringIO()
+        call_command("backfill_word_stats", stdout=out)
+        self.assertIn("Wrote 5 rollup row(s)", out.getvalue())
+        self.assertEqual(_rollup_cells(self.assignment.id), _raw_cells(self.assignment.id))
+
+    def test_rebuild_changes_the_analytics_version_without_the_cache(self):
+        before = analytics_version(self.assignment.id)
+        cache.clear()
+        self.assertEqual(analytics_version(self.assignment.id), before)
+
+        rebuild_word_stats([self.assignment.id])
+        self.assertNotEqual(analytics_version(self.assignment.id), before)
+
+    def test_analytics_read_the_rollup(self):
+        stats = {row["word"]: row for row in word_stats(self.assignment.id)}
+        self.assertEqual(stats["hola"]["attempts"], 6)
+        self.assertEqual(stats["hola"]["correct"], 4)
+        self.assertEqual(stats["hola"]["students_struggling"], 2)
+        self.assertEqual(stats["adiós"]["students_total"], 2)
+        self.assertEqual(list(stats), ["adiós", "hola"])
+
+        modes = {row["mode"]: (row["attempts"], row["correct"]) for row in mode_breakdown(self.assignment.id)}
+        self.assertEqual(modes, {"flashcards": (6, 3), "matchup": (6, 3)})
+
+        mastery = {row["name"]: row for row in student_mastery(self.assignment.id)}
+        self.assertEqual(mastery["Alex One"]["needs_practice"], ["adiós"])
+        self.assertCountEqual(mastery["Bailey Two"]["needs_practice"], ["hola", "adiós"])
+
+        grid = heatmap_data(self.assignment.id)
+        self.assertEqual(len(grid["cells"]), 4)
+
+        # Piling on raw attempts does not change the number of rows analysed.
+        self._log(self.student1, self.word1, "flashcards", *([True] * 50))
+        self.assertEqual(AssignmentWordStat.objects.filter(assignment=self.assignment).count(), 5)
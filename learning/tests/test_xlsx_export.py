@@ -0,0 +1,83 @@
+from io import BytesIO
+from zipfile import ZipFile
+
+from django.test import SimpleTestCase
+from django.urls import reverse
+from openpyxl import load_workbook
+
+from learning.models import AssignmentAttempt, AssignmentProgress
+from learning.services import xlsx
+from learning.services.xlsx import build_xlsx, stream_xlsx
+
+from .test_analytics import AnalyticsBaseTestCase
+
+
+class StreamingXlsxTests(SimpleTestCase):
+    def test_multiple_sheets_with_shared_strings(self):
+        def rows():
+            for n in range(1000):
+                yield [f"pupil {n % 7}", n, n / 4, "Yes" if n % 2 else "No", None, "line\nbreak & <tag>"]
+
+        chunks = list(stream_xlsx([
+            ("Summary", ["Name", "N", "Quarter", "Flag", "Empty", "Text"], rows()),
+            ("Empty sheet", ["Only header"], []),
+        ]))
+        self.assertGreater(len(chunks), 3)
+
+        data = b"".join(chunks)
+        with ZipFile(BytesIO(data)) as archive:
+            shared = archive.read("xl/sharedStrings.xml").decode()
+        # 7 headers + 7 names + Yes/No + the text cell, each stored once.
+        self.assertIn('count="3007" uniqueCount="17"', shared)
+
+        book = load_workbook(BytesIO(data), read_only=True)
+        self.assertEqual(book.sheetnames, ["Summary", "Empty sheet"])
+        summary = list(book["Summary"].iter_rows(values_only=True))
+        self.assertEqual(len(summary), 1001)
+        self.assertEqual(summary[0], ("Name", "N", "Quarter", "Flag", "Empty", "Text"))
+        self.assertEqual(summary[4], ("pupil 3", 3, 0.75, "Yes", None, "line\nbreak & <tag>"))
+        self.assertEqual(list(book["Empty sheet"].iter_rows(values_only=True)), [("Only header",)])
+
+    def test_rows_are_consumed_lazily(self):
+        consumed = []
+
+        def rows():
+            for n in range(xlsx.ROWS_PER_CHUNK * 3):
+                consumed.append(n)
+                yield [n]
+
+        stream = stream_xlsx([("Lazy", ["n"], rows())])
+        next(stream)  # package parts only
+        self.assertEqual(consumed, [])
+        next(stream)
+        self.assertLessEqual(len(consumed), xlsx.ROWS_PER_CHUNK * 2 + 1)
+        self.assertTrue(build_xlsx([("Lazy", ["n"], [[1]])]).startswith(b"PK"))
+
+
+class ProgressExportTests(AnalyticsBaseTestCase):
+    def test_export_streams_three_sheets(self):
+        for is_correct in (True, True, False):
+            AssignmentAttempt.objects.create(
+                student=self.student1,
+                assignment=self.assignment,
+                vocabulary_word=self.word1,
+                mode="flashcards",
+                is_correct=is_correct,
+            )
+        AssignmentProgress.objects.create(
+            student=self.student1, assignment=self.assignment, points_earned=12, completed=True
+        )
+        self.client.force_login(self.teacher)
+
+        response = self.client.get(reverse("api_export_progress", args=[self.assignment.id]))
+
+        self.assertTrue(response.streaming)
+        self.assertIn("assignment-1-progress.xlsx", response["Content-Disposition"])
+        book = load_workbook(BytesIO(b"".join(response.streaming_content)), read_only=True)
+        self.assertEqual(book.sheetnames, ["Progress", "Words", "Heatmap"])
+        progress = list(book["Progress"].iter_rows(values_only=True))
+        self.assertEqual(progress[1][:8], ("Alex One", "alex1", 12, "Yes", None, 3, 2, 66.7))
+        words = list(book["Words"].iter_rows(values_only=True))
+        self.assertEqual(words[1][:3], ("hola", 3, 2))
+        heatmap = list(book["Heatmap"].iter_rows(values_only=True))
+        self.assertEqual(heatmap[1], ("Alex One", "hola", 3, 2, 0.67))
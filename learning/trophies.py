@@ -0,0 +1,140 @@
+"""Threshold trophies awarded from a student's counters.
+
+The rule catalogue is resolved to ``Trophy`` ids once per process. Each
+student's awarded set is cached, so a check that crosses no new threshold
+costs no queries at all; new awards are written with a single
+``bulk_create``.
+"""
+
+from __future__ import annotations
+
+import threading
+from dataclasses import dataclass
+from typing import Dict, FrozenSet, List, Optional
+
+from django.core.cache import cache
+
+from .models import Student, StudentTrophy, Trophy
+
+
+AWARDED_TIMEOUT = 60 * 60 * 24
+
+
+@dataclass(frozen=True)
+class TrophyRule:
+    name: str
+    field: str
+    threshold: int
+    description: str
+
+
+RULES = (
+    # Streak Awards
+    TrophyRule("Warm-Up", "current_streak", 3, "Awarded for a 3-day streak!"),
+    TrophyRule("On Fire!", "current_streak", 7, "Awarded for a 7-day streak!"),
+    TrophyRule("Unstoppable!", "current_streak", 30, "Awarded for a 30-day streak!"),
+    TrophyRule("Legendary Commitment!", "current_streak", 100, "Awarded for a 100-day streak!"),
+    # Points Milestones
+    TrophyRule("Rising Star", "total_points", 500, "Earned 500 points!"),
+    TrophyRule("Language Warrior", "total_points", 1000, "Earned 1000 points!"),
+    TrophyRule("Master Linguist", "total_points", 5000, "Earned 5000 points!"),
+    TrophyRule("Polyglot Prodigy", "total_points", 10000, "Earned 10000 points!"),
+    # Assignment Mastery
+    TrophyRule("Diligent Scholar", "assignments_completed", 5, "Completed 5 assignments!"),
+    TrophyRule("Task Crusher", "assignments_completed", 20, "Completed 20 assignments!"),
+    TrophyRule("Perfectionist", "assignments_completed", 50, "Completed 50 assignments!"),
+    # Game Achievements
+    TrophyRule("Flashcard Pro", "flashcard_games_played", 100, "Played 100 times!"),
+    TrophyRule("Puzzle Master", "match_up_games_played", 50, "Played 50 times!"),
+    TrophyRule("Wall Destroyer", "destroy_wall_games_played", 50, "Played 50 times!"),
+)
+
+_catalogue: Optional[Dict[str, int]] = None
+_catalogue_lock = threading.Lock()
+
+
+def check_and_award_trophies(student: Student) -> List[str]:
+    """Award every trophy whose threshold ``student`` has newly crossed.
+
+    Returns the names of the trophies awarded by this call.
+    """
+
+    awarded = _awarded_names(student.pk)
+    crossed = [
+        rule for rule in RULES
+        if rule.name not in awarded and (getattr(student, rule.field, 0) or 0) >= rule.threshold
+    ]
+    if not crossed:
+        return []
+
+    catalogue = get_catalogue()
+    # The cached set may lag behind awards made elsewhere; confirm before writing.
+    already = set(
+        StudentTrophy.objects.filter(
+            student=student, trophy_id__in=[catalogue[rule.name] for rule in crossed]
+        ).values_list("trophy__name", flat=True)
+    )
+    new_names = [rule.name for rule in crossed if rule.name not in already]
+    StudentTrophy.objects.bulk_create(
+        [StudentTrophy(student=student, trophy_id=catalogue[name]) for name in new_names],
+        ignore_conflicts=True,
+    )
+    cache.set(
+        _awarded_key(student.pk),
+        frozenset(awarded | already | set(new_names)),
+        AWARDED_TIMEOUT,
+    )
+    return new_names
+
+
+def get_catalogue() -> Dict[str, int]:
+    """Return ``{rule name: Trophy id}``, creating missing trophies once."""
+
+    global _catalogue
+    if _catalogue is None:
+        with _catalogue_lock:
+            if _catalogue is None:
+                _catalogue = _load_catalogue()
+    return _catalogue
+
+
+def reset_catalogue() -> None:
+    """Forget the cached catalogue; it is reloaded on next use."""
+
+    global _catalogue
+    _catalogue = None
+
+
+def forget_awarded(student_id) -> None:
+    """Drop the cached awarded set of one student."""
+
+    cache.delete(_awarded_key(student_id))
+
+
+def _load_catalogue() -> Dict[str, int]:
+    names = [rule.name for rule in RULES]
+    existing = dict(Trophy.objects.filter(name__in=names).values_list("name", "id"))
+    missing = [rule for rule in RULES if rule.name not in existing]
+    if missing:
+        Trophy.objects.bulk_create(
+            [Trophy(name=rule.name, description=rule.description) for rule in missing],
+            ignore_conflicts=True,
+        )
+        existing = dict(Trophy.objects.filter(name__in=names).values_list("name", "id"))
+    return existing
+
+
+def _awarded_key(student_id) -> str:
+    return f"trophies:awarded:{student_id}"
+
+
+def _awarded_names(student_id) -> FrozenSet[str]:
+    awarded = cache.get(_awarded_key(student_id))
+    if awarded is None:
+        awarded = frozenset(
+            StudentTrophy.objects.filter(
+                student_id=student_id, trophy__name__in=[rule.name for rule in RULES]
+            ).values_list("trophy__name", flat=True)
+        )
+        cache.set(_awarded_key(student_id), awarded, AWARDED_TIMEOUT)
+    return awarded
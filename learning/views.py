@@ -1,6 +1,7 @@
 from django.shortcuts import render, redirect, get_object_or_404
 from django.contrib.auth.decorators import login_required, user_passes_test
 from django.contrib.auth import login, logout, get_user_model
+from django.db import transaction
 from django.db.models import Sum, Count, F, Subquery, OuterRef, Q
 from django.db.models.functions import Coalesce
 from django.contrib import messages
@@ -28,6 +29,7 @@ import random
 import json
 import math
 import re
+import numpy as np
 import requests
 import stripe
 import google.generativeai as genai
@@ -35,12 +37,17 @@ from collections import defaultdict
 from django.conf import settings
 from typing import Any, Dict, List, Optional
 
-from .decorators import student_login_required
+from .analytics import attempt_summaries
+from .decorators import get_student, student_login_required
+from .instrumentation import external_call
 from .utils import generate_student_username, generate_random_password
-from .memory import memory_meter
+from .memory import BANDS as MEMORY_BANDS, memory_bands, memory_percents, score_queryset
 from .services.question_flow import QuestionFlowEngine
+from .services.dashboard import get_student_home, get_teacher_snapshot
 from .spaced_repetition import get_due_words, schedule_review, _get_user_from_student
 from .forms import AssignmentForm
+from .leaderboards import class_standings, leaderboard_page, normalize_category
+from .trophies import check_and_award_trophies
 
 from .models import (
     Progress,
@@ -52,8 +59,6 @@ from .models import (
     School,
     Assignment,
     AssignmentProgress,
-    Trophy,
-    StudentTrophy,
     ReadingLabText,
     AssignmentAttempt,
     GrammarLadder,
@@ -187,15 +192,21 @@ def teacher_dashboard(request):
             filtered_vocab_lists = filtered_vocab_lists.filter(tags__id=tag_id)
         filtered_vocab_lists = filtered_vocab_lists.distinct()
 
-    filtered_vocab_lists = filtered_vocab_lists.prefetch_related("tags")
-    vocab_lists = vocab_lists.prefetch_related("tags")
-    classes = Class.objects.filter(teachers=request.user).distinct()
+    filtered_vocab_lists = list(filtered_vocab_lists.prefetch_related("tags"))
+    vocab_lists = list(vocab_lists.prefetch_related("tags"))
+
+    # Classes, assignments, list attachments and completion counts come from
+    # a cached snapshot so the query count does not grow with the class list.
+    current_time = now()
+    snapshot = get_teacher_snapshot(request.user)
+    classes = snapshot.annotate_classes(current_time)
+    class_ids = [class_instance.id for class_instance in classes]
 
     # --- Student filtering and sorting ---
     selected_class_id = request.GET.get("class_id")
     sort_by = request.GET.get("sort", "alphabetical")
 
-    students = Student.objects.filter(classes__in=classes).distinct()
+    students = Student.objects.filter(classes__id__in=class_ids).distinct()
     if selected_class_id:
         students = students.filter(classes__id=selected_class_id)
 
@@ -206,24 +217,9 @@ def teacher_dashboard(request):
     else:  # alphabetical
         students = students.order_by("last_name", "first_name")
 
-    # Annotate each class with live and expired assignments
-    current_time = now()
-    for class_instance in classes:
-        class_instance.live_assignments = Assignment.objects.filter(
-            class_assigned=class_instance,
-            deadline__gte=current_time,
-            is_closed=False,
-        )
-        class_instance.expired_assignments = (
-            Assignment.objects.filter(class_assigned=class_instance)
-            .filter(Q(deadline__lt=current_time) | Q(is_closed=True))
-        )
-
     # Attach unattached classes to each vocabulary list
-    for vocab_list in vocab_lists:
-        vocab_list.unattached_classes = classes.exclude(
-            id__in=vocab_list.classes.values_list("id", flat=True)
-        )
+    for vocab_list in vocab_lists + filtered_vocab_lists:
+        vocab_list.unattached_classes = snapshot.unattached_classes(vocab_list.id)
 
     # Announcements Pagination (3 posts per page)
     announcements_list = Announcement.objects.all()
@@ -232,46 +228,18 @@ def teacher_dashboard(request):
     announcements = announcements_paginator.get_page(announcements_page_number)
 
     # Overall Leaderboard: Paginate teacher's students ordered by total_points (10 per page)
-    overall_leaderboard_list = students.order_by('-total_points')
+    overall_leaderboard_list = students.order_by('-total_points').prefetch_related("classes")
     overall_page_number = request.GET.get('overall_page', 1)
     overall_paginator = Paginator(overall_leaderboard_list, 10)
     overall_leaderboard_page = overall_paginator.get_page(overall_page_number)
 
-    # Leaderboard by Class (10 per page per class)
-    by_class_leaderboards = []
-    for class_instance in classes:
-        students_in_class = class_instance.students.order_by('-total_points')
-        page_number = request.GET.get(f'class_{class_instance.id}_page', 1)
-        paginator = Paginator(students_in_class, 10)
-        leaderboard_page = paginator.get_page(page_number)
-        by_class_leaderboards.append({
-            'class_instance': class_instance,
-            'leaderboard_page': leaderboard_page,
-        })
-
     # Quick overview data
     inactive_threshold = now() - timedelta(days=7)
     inactive_students = students.filter(
         Q(last_login__lt=inactive_threshold) | Q(last_login__isnull=True)
     ).order_by('last_name', 'first_name')
 
-    pending_assignments = []
-    active_assignments = Assignment.objects.filter(
-        class_assigned__in=classes,
-        deadline__gte=current_time,
-        is_closed=False,
-    )
-    for assignment in active_assignments:
-        total_students = assignment.class_assigned.students.count()
-        completed = AssignmentProgress.objects.filter(
-            assignment=assignment, completed=True
-        ).count()
-        pending_count = total_students - completed
-        if pending_count > 0:
-            pending_assignments.append({
-                "assignment": assignment,
-                "pending": pending_count,
-            })
+    pending_assignments = snapshot.pending_assignments(current_time)
 
     return render(request, "learning/teacher_dashboard.html", {
         "user": request.user,
@@ -284,7 +252,6 @@ def teacher_dashboard(request):
         "announcements": announcements,
         "reading_lab_texts": reading_lab_texts,
         "overall_leaderboard_page": overall_leaderboard_page,
-        "by_class_leaderboards": by_class_leaderboards,
         "pending_assignments": pending_assignments,
         "inactive_students": inactive_students,
         "vocabulary_tags": all_tags,
@@ -888,50 +855,22 @@ def student_login(request):
 
 
 def student_dashboard(request):
-    student_id = request.session.get("student_id")
-    if not student_id:
+    student = get_student(request)
+    if student is None:
         return redirect("student_login")
 
-    student = get_object_or_404(Student, id=student_id)
-    classes = student.classes.all()
+    classes = list(student.classes.all())
+    class_ids = [class_instance.id for class_instance in classes]
+    standings = class_standings(class_ids)
 
-    current_time = now()
+    # Assignments with progress and the practice lists are cached per student
+    # and refreshed when progress, assignments or class links change.
+    home = get_student_home(student, class_ids)
+    home.annotate_classes(classes)
     for class_instance in classes:
-        for class_student in class_instance.students.all():
-            class_student.reset_periodic_points()
-        live_assignments = Assignment.objects.filter(
-            class_assigned=class_instance,
-            deadline__gte=current_time,
-            is_closed=False,
-        )
-        expired_assignments = (
-            Assignment.objects.filter(class_assigned=class_instance)
-            .filter(Q(deadline__lt=current_time) | Q(is_closed=True))
-        )
+        class_instance.leaderboards = standings[str(class_instance.id)]
 
-        for assignment in live_assignments:
-            progress = AssignmentProgress.objects.filter(student=student, assignment=assignment).first()
-            assignment.student_progress = progress.points_earned if progress else 0
-            assignment.target_points = assignment.target_points or 1
-            assignment.progress_percentage = (assignment.student_progress / assignment.target_points) * 100
-            assignment.is_complete = progress.completed if progress else False
-
-        for assignment in expired_assignments:
-            progress = AssignmentProgress.objects.filter(student=student, assignment=assignment).first()
-            assignment.student_progress = progress.points_earned if progress else 0
-            assignment.target_points = assignment.target_points or 1
-            assignment.progress_percentage = (assignment.student_progress / assignment.target_points) * 100
-            assignment.is_complete = progress.completed if progress else False
-
-        class_instance.live_assignments = live_assignments
-        class_instance.expired_assignments = expired_assignments
-        class_instance.leaderboards = {
-            "total_points": class_instance.students.order_by("-total_points"),
-            "monthly_points": class_instance.students.order_by("-monthly_points"),
-            "weekly_points": class_instance.students.order_by("-weekly_points"),
-        }
-
-    vocab_lists = VocabularyList.objects.filter(classes__in=classes).distinct()
+    vocab_lists = home.vocab_lists
     leaderboard_categories = [
         {"category": "total_points", "icon": "🔥", "title": "Total Points"},
         {"category": "monthly_points", "icon": "📅", "title": "Monthly Points"},
@@ -1021,11 +960,10 @@ def student_dashboard(request):
 
 
 def student_trophies(request):
-    student_id = request.session.get("student_id")
-    if not student_id:
+    student = get_student(request)
+    if student is None:
         return redirect("student_login")
 
-    student = get_object_or_404(Student, id=student_id)
     user = _get_user_from_student(student)
 
     achievement_definitions = list(
@@ -1102,11 +1040,10 @@ def student_trophies(request):
 @student_login_required
 def my_words(request):
     """Display a student's vocabulary words with optional search and sort."""
-    student_id = request.session.get("student_id")
-    student = get_object_or_404(Student, id=student_id)
+    student = request.student
     user = _get_user_from_student(student)
 
-    progress_qs = Progress.objects.filter(student=user).select_related("word", "word__list")
+    progress_qs = Progress.objects.filter(student=user)
 
     class_id = request.GET.get("class")
     list_id = request.GET.get("list")
@@ -1121,20 +1058,50 @@ def my_words(request):
             Q(word__word__icontains=search_query) | Q(word__translation__icontains=search_query)
         )
 
+    # Memory strength is scored for every row at once from plain column
+    # values, so no Progress/VocabularyWord instances are built here.
+    rows, strengths = score_queryset(
+        progress_qs,
+        "word__word",
+        "word__translation",
+        "word__list_id",
+        "last_seen",
+        "correct_attempts",
+        "incorrect_attempts",
+        now=timezone.now(),
+    )
+    percents = memory_percents(strengths)
+    bands = memory_bands(percents)
+
+    order = np.arange(len(rows))
+    band = request.GET.get("band")
+    if band in MEMORY_BANDS:
+        order = order[bands[order] == band]
+
+    sort_key = request.GET.get("sort")
+    if sort_key == "last_seen":
+        order = sorted(
+            order, key=lambda i: (rows[i][3] is not None, rows[i][3] or 0), reverse=True
+        )
+    elif sort_key == "attempts":
+        attempts = np.array([rows[i][4] + rows[i][5] for i in order], dtype=int)
+        order = order[np.argsort(-attempts, kind="stable")]
+    elif sort_key == "memory":
+        order = order[np.argsort(-percents[order], kind="stable")]
+
+    list_lookup = VocabularyList.objects.in_bulk({row[2] for row in rows})
     progress_data = []
-    now = timezone.now()
-    for prog in progress_qs:
-        total_attempts = prog.correct_attempts + prog.incorrect_attempts
-        memory_percent, memory_color = memory_meter(prog, now=now)
+    for index in order:
+        text, translation, word_list_id, last_seen, correct, incorrect = rows[index]
         progress_data.append(
             {
-                "text": prog.word.word,
-                "translation": prog.word.translation,
-                "list": prog.word.list,
-                "last_seen": prog.last_seen,
-                "total_attempts": total_attempts,
-                "memory_percent": memory_percent,
-                "memory_color": memory_color,
+                "text": text,
+                "translation": translation,
+                "list": list_lookup[word_list_id],
+                "last_seen": last_seen,
+                "total_attempts": correct + incorrect,
+                "memory_percent": int(percents[index]),
+                "memory_color": str(bands[index]),
             }
         )
 
@@ -1143,20 +1110,6 @@ def my_words(request):
         VocabularyList.objects.filter(words__progress__student=user).distinct()
     )
 
-    sort_key = request.GET.get("sort")
-    if sort_key == "last_seen":
-        progress_data.sort(
-            key=lambda x: x["last_seen"] or datetime.min, reverse=True
-        )
-    elif sort_key == "attempts":
-        progress_data.sort(
-            key=lambda x: x["total_attempts"], reverse=True
-        )
-    elif sort_key == "memory":
-        progress_data.sort(
-            key=lambda x: x["memory_percent"], reverse=True
-        )
-
     if request.headers.get("X-Requested-With") == "XMLHttpRequest":
         for item in progress_data:
             item["last_seen"] = (
@@ -1204,7 +1157,7 @@ question_engine = QuestionFlowEngine()
 
 @student_login_required
 def practice_session(request, vocab_list_id):
-    student = get_object_or_404(Student, id=request.session.get("student_id"))
+    student = request.student
     vocab_list = get_object_or_404(VocabularyList, id=vocab_list_id)
 
     if not student.classes.filter(vocabulary_lists=vocab_list).exists():
@@ -1283,11 +1236,7 @@ def practice_session(request, vocab_list_id):
 
 @student_login_required
 def flashcard_mode(request, vocab_list_id):
-    try:
-        student = Student.objects.get(id=request.session.get('student_id'))
-    except Student.DoesNotExist:
-        return redirect("student_login")
-
+    student = request.student
     vocab_list = get_object_or_404(VocabularyList, id=vocab_list_id)
     if not student.classes.filter(vocabulary_lists=vocab_list).exists():
         return HttpResponseForbidden("You do not have access to this vocabulary list.")
@@ -1314,7 +1263,9 @@ def match_up_mode(request, vocab_list_id=None, assignment_id=None):
     else:
         raise Http404("No assignment or vocab list specified.")
 
-    student = get_object_or_404(Student, id=request.session.get('student_id'))
+    student = get_student(request)
+    if student is None:
+        raise Http404("Student not found.")
 
     words_objs = get_due_words(student, vocab_list, limit=10)
     words = [{"id": w.id, "word": w.word, "translation": w.translation} for w in words_objs]
@@ -1336,7 +1287,7 @@ def match_up_mode(request, vocab_list_id=None, assignment_id=None):
 @student_login_required
 def gap_fill_mode(request, vocab_list_id):
     vocab_list = get_object_or_404(VocabularyList, id=vocab_list_id)
-    student = get_object_or_404(Student, id=request.session.get("student_id"))
+    student = request.student
     if not student.classes.filter(vocabulary_lists=vocab_list).exists():
         return HttpResponseForbidden("You do not have access to this vocabulary list.")
 
@@ -1351,7 +1302,9 @@ def gap_fill_mode(request, vocab_list_id):
 @csrf_exempt
 @require_POST
 def update_progress(request):
-    student = get_object_or_404(Student, id=request.session.get("student_id"))
+    student = get_student(request)
+    if student is None:
+        raise Http404("Student not found.")
     try:
         data = json.loads(request.body.decode())
     except json.JSONDecodeError:
@@ -1428,23 +1381,22 @@ def class_leaderboard(request, class_id):
     if request.user not in class_instance.teachers.all():
         return HttpResponseForbidden("You do not have permission to view this class leaderboard.")
 
-    category = request.GET.get("category", "total_points")
-    if category not in {"total_points", "weekly_points", "monthly_points"}:
-        category = "total_points"
-
-    students_qs = class_instance.students.all()
-    for student in students_qs:
-        student.reset_periodic_points()
-    students = students_qs.order_by(f"-{category}")
+    category = normalize_category(request.GET.get("category"))
+    cursor = request.GET.get("after")
+    page = leaderboard_page(class_instance.id, category, cursor=cursor)
     column_labels = {
         "total_points": "Total Points",
         "weekly_points": "Weekly Points",
         "monthly_points": "Monthly Points",
+        "last_week_points": "Last Week's Points",
+        "last_month_points": "Last Month's Points",
     }
 
     context = {
         "class_instance": class_instance,
-        "students": students,
+        "students": page.entries,
+        "cursor": cursor or "",
+        "next_cursor": page.next_cursor,
         "current_category": category,
         "column_label": column_labels[category],
     }
@@ -1457,23 +1409,22 @@ def refresh_leaderboard(request, class_id):
     if request.user not in class_instance.teachers.all():
         return HttpResponseForbidden("You do not have permission to view this class leaderboard.")
 
-    category = request.GET.get("category", "total_points")
-    if category not in {"total_points", "weekly_points", "monthly_points"}:
-        category = "total_points"
-
-    students_qs = class_instance.students.all()
-    for student in students_qs:
-        student.reset_periodic_points()
-    students = students_qs.order_by(f"-{category}")
+    category = normalize_category(request.GET.get("category"))
+    cursor = request.GET.get("after")
+    page = leaderboard_page(class_instance.id, category, cursor=cursor)
     column_labels = {
         "total_points": "Total Points",
         "weekly_points": "Weekly Points",
         "monthly_points": "Monthly Points",
+        "last_week_points": "Last Week's Points",
+        "last_month_points": "Last Month's Points",
     }
 
     return render(request, "learning/leaderboard_fragment.html", {
         "class_instance": class_instance,
-        "students": students,
+        "students": page.entries,
+        "cursor": cursor or "",
+        "next_cursor": page.next_cursor,
         "current_category": category,
         "column_label": column_labels[category],
     })
@@ -1557,13 +1508,15 @@ def update_assignment_points(request):
             if not (assignment_id and points and student_id):
                 return JsonResponse({"success": False, "error": "Invalid data"})
 
-            student = get_object_or_404(Student, id=student_id)
+            student = get_student(request)
+            if student is None:
+                raise Http404("Student not found.")
             assignment = get_object_or_404(Assignment, id=assignment_id)
 
             assignment_progress, _ = AssignmentProgress.objects.get_or_create(student=student, assignment=assignment)
             assignment_progress.update_progress(points, timedelta())
 
-            student.add_points(points)
+            student.add_points(points, source="assignment")
             new_trophies = check_and_award_trophies(student)
 
             return JsonResponse({
@@ -1620,11 +1573,7 @@ def close_assignment(request, assignment_id):
 
 @student_login_required
 def assignment_page(request, assignment_id):
-    student_id = request.session.get("student_id")
-    if not student_id:
-        return redirect("student_login")
-
-    student = get_object_or_404(Student, id=student_id)
+    student = request.student
     assignment = get_object_or_404(Assignment, id=assignment_id)
 
     if assignment.is_closed:
@@ -1651,7 +1600,7 @@ def access_denied(request):
 @student_login_required
 def gap_fill_mode_assignment(request, assignment_id):
     assignment = get_object_or_404(Assignment, id=assignment_id)
-    student = get_object_or_404(Student, id=request.session.get("student_id"))
+    student = request.student
     vocab_list = assignment.vocab_list
 
     words_objs = get_due_words(student, vocab_list, limit=20)
@@ -1677,7 +1626,7 @@ def gap_fill_mode_assignment(request, assignment_id):
 @student_login_required
 def destroy_wall_mode_assignment(request, assignment_id):
     assignment = get_object_or_404(Assignment, id=assignment_id)
-    student = get_object_or_404(Student, id=request.session.get("student_id"))
+    student = request.student
     vocab_list = assignment.vocab_list
 
     words_objs = get_due_words(student, vocab_list, limit=30)
@@ -1704,7 +1653,9 @@ def match_up_mode_assignment(request, vocab_list_id=None, assignment_id=None):
     else:
         raise Http404("No assignment or vocab list specified.")
 
-    student = get_object_or_404(Student, id=request.session.get('student_id'))
+    student = get_student(request)
+    if student is None:
+        raise Http404("Student not found.")
 
     words_objs = get_due_words(student, vocab_list, limit=10)
     words = [{"id": w.id, "word": w.word, "translation": w.translation} for w in words_objs]
@@ -1729,7 +1680,7 @@ def match_up_mode_assignment(request, vocab_list_id=None, assignment_id=None):
 @student_login_required
 def unscramble_the_word_assignment(request, assignment_id):
     assignment = get_object_or_404(Assignment, id=assignment_id)
-    student = get_object_or_404(Student, id=request.session.get("student_id"))
+    student = request.student
     vocab_list = assignment.vocab_list
 
     words_objs = get_due_words(student, vocab_list, limit=20)
@@ -1747,11 +1698,7 @@ def unscramble_the_word_assignment(request, assignment_id):
 
 @student_login_required
 def flashcard_mode_assignment(request, assignment_id):
-    try:
-        student = Student.objects.get(id=request.session.get('student_id'))
-    except Student.DoesNotExist:
-        return redirect("student_login")
-
+    student = request.student
     assignment = get_object_or_404(Assignment, id=assignment_id)
     vocab_list = assignment.vocab_list
 
@@ -1787,7 +1734,7 @@ def log_assignment_attempt(request):
             return HttpResponseBadRequest("Missing required parameters.")
 
         assignment = get_object_or_404(Assignment, id=assignment_id)
-        student = get_object_or_404(Student, id=request.session.get("student_id"))
+        student = request.student
 
         if not assignment.class_assigned.students.filter(id=student.id).exists():
             return HttpResponseForbidden("You are not enrolled in this class.")
@@ -1797,13 +1744,15 @@ def log_assignment_attempt(request):
         if not mode:
             return HttpResponseBadRequest("Missing mode parameter.")
 
-        AssignmentAttempt.objects.create(
-            student=student,
-            assignment=assignment,
-            vocabulary_word=vocab_word,
-            mode=mode,
-            is_correct=is_correct
-        )
+        # Commit the attempt together with its analytics rollup update.
+        with transaction.atomic():
+            AssignmentAttempt.objects.create(
+                student=student,
+                assignment=assignment,
+                vocabulary_word=vocab_word,
+                mode=mode,
+                is_correct=is_correct
+            )
         return JsonResponse({"success": True})
     except Exception as e:
         return JsonResponse({"success": False, "error": str(e)})
@@ -1818,110 +1767,12 @@ def assignment_analytics(request, assignment_id):
     if assignment.teacher_id != request.user.id and not assignment.class_assigned.teachers.filter(id=request.user.id).exists():
         return HttpResponseForbidden("You do not have permission to view this assignment's analytics.")
 
-    progress_list = AssignmentProgress.objects.filter(assignment=assignment)
+    progress_list = AssignmentProgress.objects.filter(assignment=assignment).select_related("student")
 
-    attempts = list(
-        AssignmentAttempt.objects.filter(assignment=assignment)
-        .select_related("student", "vocabulary_word")
-        .order_by("timestamp")
+    student_summary_list, word_summary_list, total_attempts, total_correct = attempt_summaries(
+        assignment.id
     )
 
-    total_attempts = len(attempts)
-    total_correct = sum(1 for att in attempts if att.is_correct)
-
-    # Student summary
-    student_summary = {}
-    for att in attempts:
-        sid = att.student.id
-        wid = att.vocabulary_word.id
-        student_bucket = student_summary.setdefault(
-            sid,
-            {
-                "student": att.student,
-                "words": {},
-                "attempts": 0,
-                "correct": 0,
-            },
-        )
-
-        student_bucket["attempts"] += 1
-        if att.is_correct:
-            student_bucket["correct"] += 1
-
-        if wid not in student_bucket["words"]:
-            student_bucket["words"][wid] = {
-                "word": att.vocabulary_word.translation,
-                "wrong": 0,
-                "aced": False,
-            }
-
-        if not student_bucket["words"][wid]["aced"]:
-            if att.is_correct:
-                student_bucket["words"][wid]["aced"] = True
-            else:
-                student_bucket["words"][wid]["wrong"] += 1
-
-    student_summary_list = []
-    for summary in student_summary.values():
-        words_aced, attempts_wrong = [], []
-        for data in summary["words"].values():
-            if data["aced"]:
-                words_aced.append(data["word"])
-            if data["wrong"] > 0:
-                attempts_wrong.append((data["word"], data["wrong"]))
-
-        attempts_wrong.sort(key=lambda item: item[1], reverse=True)
-
-        attempts_count = summary["attempts"]
-        correct_count = summary["correct"]
-        accuracy = (correct_count / attempts_count * 100) if attempts_count else 0
-
-        student_summary_list.append(
-            {
-                "student": summary["student"],
-                "words_aced": words_aced,
-                "attempts_wrong": attempts_wrong,
-                "total_attempts": attempts_count,
-                "correct_attempts": correct_count,
-                "accuracy": accuracy,
-            }
-        )
-
-    # Word summary
-    word_summary_dict = {}
-    for att in attempts:
-        wid = att.vocabulary_word.id
-        summary = word_summary_dict.setdefault(
-            wid,
-            {
-                "word": att.vocabulary_word.translation,
-                "wrong_attempts": 0,
-                "total_attempts": 0,
-                "students": set(),
-            },
-        )
-        summary["total_attempts"] += 1
-        if not att.is_correct:
-            summary["wrong_attempts"] += 1
-            summary["students"].add(att.student.id)
-
-    word_summary_list = []
-    for summary in word_summary_dict.values():
-        total = summary["total_attempts"]
-        wrong = summary["wrong_attempts"]
-        percentage = (wrong / total) * 100 if total else 0
-        facility = ((total - wrong) / total * 100) if total else 0
-        word_summary_list.append(
-            {
-                "word": summary["word"],
-                "wrong_attempts": wrong,
-                "students_difficulty": len(summary["students"]),
-                "difficulty_percentage": percentage,
-                "facility_percentage": facility,
-                "total_attempts": total,
-            }
-        )
-
     struggling_words = [word for word in word_summary_list if word["difficulty_percentage"] >= 50]
     top_difficult_words = sorted(
         word_summary_list,
@@ -1980,56 +1831,6 @@ def assignment_analytics(request, assignment_id):
     return render(request, "learning/assignment_analytics.html", context)
 
 
-# ----------------------------
-# Trophies
-# ----------------------------
-
-def check_and_award_trophies(student):
-    new_trophies = []
-
-    # Streak Awards
-    streak_awards = {3: "Warm-Up", 7: "On Fire!", 30: "Unstoppable!", 100: "Legendary Commitment!"}
-    for days, trophy_name in streak_awards.items():
-        if student.current_streak >= days:
-            trophy, _ = Trophy.objects.get_or_create(name=trophy_name, defaults={"description": f"Awarded for a {days}-day streak!"})
-            _, created = StudentTrophy.objects.get_or_create(student=student, trophy=trophy)
-            if created:
-                new_trophies.append(trophy_name)
-
-    # Points Milestones
-    points_awards = {500: "Rising Star", 1000: "Language Warrior", 5000: "Master Linguist", 10000: "Polyglot Prodigy"}
-    for points, trophy_name in points_awards.items():
-        if student.total_points >= points:
-            trophy, _ = Trophy.objects.get_or_create(name=trophy_name, defaults={"description": f"Earned {points} points!"})
-            _, created = StudentTrophy.objects.get_or_create(student=student, trophy=trophy)
-            if created:
-                new_trophies.append(trophy_name)
-
-    # Assignment Mastery
-    assignments_awards = {5: "Diligent Scholar", 20: "Task Crusher", 50: "Perfectionist"}
-    for count, trophy_name in assignments_awards.items():
-        if student.assignments_completed >= count:
-            trophy, _ = Trophy.objects.get_or_create(name=trophy_name, defaults={"description": f"Completed {count} assignments!"})
-            _, created = StudentTrophy.objects.get_or_create(student=student, trophy=trophy)
-            if created:
-                new_trophies.append(trophy_name)
-
-    # Game Achievements
-    game_awards = {
-        "flashcard_games_played": (100, "Flashcard Pro"),
-        "match_up_games_played": (50, "Puzzle Master"),
-        "destroy_wall_games_played": (50, "Wall Destroyer"),
-    }
-    for field, (threshold, trophy_name) in game_awards.items():
-        if getattr(student, field, 0) >= threshold:
-            trophy, _ = Trophy.objects.get_or_create(name=trophy_name, defaults={"description": f"Played {threshold} times!"})
-            _, created = StudentTrophy.objects.get_or_create(student=student, trophy=trophy)
-            if created:
-                new_trophies.append(trophy_name)
-
-    return new_trophies
-
-
 # ----------------------------
 # Payments / Subscriptions
 # ----------------------------
@@ -2259,7 +2060,8 @@ def reading_lab(request):
         prompt += " Separate the source and target texts with '==='."
 
         model = genai.GenerativeModel('gemini-2.0-flash')
-        response = model.generate_content(prompt)
+        with external_call("gemini"):
+            response = model.generate_content(prompt)
         generated_text = response.text
 
         text_parts = generated_text.split("===")
@@ -2376,7 +2178,8 @@ def reading_lab_display(request, text_id):
             f"Target text:\n{reading_lab_text.generated_text_target}"
         )
         model = genai.GenerativeModel('gemini-2.0-flash')
-        tangled_response = model.generate_content(tangled_prompt)
+        with external_call("gemini"):
+            tangled_response = model.generate_content(tangled_prompt)
         tangled_translation = remove_double_asterisks(remove_language_labels(tangled_response.text))
 
         comp_prompt = (
@@ -2387,7 +2190,8 @@ def reading_lab_display(request, text_id):
             f"Source text:\n{reading_lab_text.generated_text_source}\n\n"
             f"Target text:\n{reading_lab_text.generated_text_target}"
         )
-        comp_response = model.generate_content(comp_prompt)
+        with external_call("gemini"):
+            comp_response = model.generate_content(comp_prompt)
         comprehension_questions = remove_double_asterisks(remove_language_labels(comp_response.text))
 
         request.user.deduct_credit()
@@ -2443,7 +2247,8 @@ def grammar_lab(request):
 
         try:
             model = genai.GenerativeModel('gemini-1.5-flash')
-            response = model.generate_content(full_prompt)
+            with external_call("gemini"):
+                response = model.generate_content(full_prompt)
             raw_output = response.text.strip()
         except Exception as e:
             messages.error(request, f"AI generation failed: {e}")
@@ -2556,11 +2361,10 @@ def custom_404_view(request, exception=None):
 
 def progress_dashboard(request):
     """Aggregate and display overall progress for a logged-in student."""
-    student_id = request.session.get("student_id")
-    if not student_id:
+    student = get_student(request)
+    if student is None:
         return redirect("student_login")
 
-    student = get_object_or_404(Student, id=student_id)
     trophies = student.trophies.select_related("trophy")
 
     context = {
@@ -2664,8 +2468,10 @@ def update_points(request):
         points = data.get("points", 0)
 
         if student_id is not None and points is not None:
-            student = get_object_or_404(Student, id=student_id)
-            student.add_points(points)
+            student = get_student(request)
+            if student is None:
+                raise Http404("Student not found.")
+            student.add_points(points, source="game")
 
             new_trophies = check_and_award_trophies(student)
 
@@ -2705,7 +2511,9 @@ def update_mini_game_1_best_streak(request):
     if best_streak_value < 0:
         return JsonResponse({"success": False, "error": "Best streak cannot be negative"}, status=400)
 
-    student = get_object_or_404(Student, id=student_id)
+    student = get_student(request)
+    if student is None:
+        raise Http404("Student not found.")
 
     if best_streak_value > student.mini_game_1_best_streak:
         student.mini_game_1_best_streak = best_streak_value
@@ -2720,7 +2528,7 @@ def update_mini_game_1_best_streak(request):
 @student_login_required
 def mini_game_1(request, vocab_list_id):
     vocab_list = get_object_or_404(VocabularyList, id=vocab_list_id)
-    student = get_object_or_404(Student, id=request.session.get("student_id"))
+    student = request.student
 
     if not student.classes.filter(vocabulary_lists=vocab_list).exists():
         return HttpResponseForbidden("You do not have access to this vocabulary list.")
@@ -2750,7 +2558,7 @@ def destroy_the_wall(request, vocab_list_id):
     vocab_list = get_object_or_404(VocabularyList, id=vocab_list_id)
 
     # Ensure the student has access to this vocabulary list
-    student = get_object_or_404(Student, id=request.session.get("student_id"))
+    student = request.student
     if not student.classes.filter(vocabulary_lists=vocab_list).exists():
         return HttpResponseForbidden("You do not have access to this vocabulary list.")
 
@@ -2771,7 +2579,7 @@ def destroy_the_wall(request, vocab_list_id):
 @student_login_required
 def unscramble_the_word(request, vocab_list_id):
     vocab_list = get_object_or_404(VocabularyList, id=vocab_list_id)
-    student = get_object_or_404(Student, id=request.session.get("student_id"))
+    student = request.student
 
     # optional: ensure access
     if not student.classes.filter(vocabulary_lists=vocab_list).exists():
@@ -2797,7 +2605,7 @@ def listening_dictation_assignment(request, assignment_id):
     Assignment mode for Listening Dictation. Fetches words from the assignment's vocabulary list.
     """
     assignment = get_object_or_404(Assignment, id=assignment_id)
-    student = get_object_or_404(Student, id=request.session.get("student_id"))
+    student = request.student
 
     vocab_list = assignment.vocab_list
 
@@ -2826,7 +2634,7 @@ def listening_translation_assignment(request, assignment_id):
     Assignment mode for Listening Translation. Fetches words from the assignment's vocabulary list.
     """
     assignment = get_object_or_404(Assignment, id=assignment_id)
-    student = get_object_or_404(Student, id=request.session.get("student_id"))
+    student = request.student
 
     vocab_list = assignment.vocab_list
 
@@ -2854,7 +2662,7 @@ def listening_translation_assignment(request, assignment_id):
 @student_login_required
 def listening_dictation_view(request, vocab_list_id):
     vocab_list = get_object_or_404(VocabularyList, id=vocab_list_id)
-    student = get_object_or_404(Student, id=request.session.get("student_id"))
+    student = request.student
 
     # optional access check (keeps behavior consistent with other views)
     if not student.classes.filter(vocabulary_lists=vocab_list).exists():
@@ -2879,7 +2687,7 @@ def listening_dictation_view(request, vocab_list_id):
 @student_login_required
 def listening_translation_view(request, vocab_list_id):
     vocab_list = get_object_or_404(VocabularyList, id=vocab_list_id)
-    student = get_object_or_404(Student, id=request.session.get("student_id"))
+    student = request.student
 
     if not student.classes.filter(vocabulary_lists=vocab_list).exists():
         return HttpResponseForbidden("You do not have access to this vocabulary list.")
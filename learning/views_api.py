@@ -1,186 +1,50 @@
 import json
-from io import BytesIO
 
 from django.contrib.auth.decorators import login_required
+from django.core.cache import cache
+from django.core.serializers.json import DjangoJSONEncoder
 from django.http import (
+    FileResponse,
     HttpResponse,
     HttpResponseBadRequest,
     HttpResponseForbidden,
     JsonResponse,
+    StreamingHttpResponse,
 )
-from django.db.models import Case, Count, Sum, When
-from django.db.models.functions import Coalesce
 from django.shortcuts import get_object_or_404
-from django.utils.text import slugify
+from django.utils.cache import get_conditional_response, patch_cache_control
 from django.views.decorators.http import require_GET, require_POST
-from xml.sax.saxutils import escape
 
-from datetime import datetime
-from zipfile import ZipFile
+from datetime import date, datetime
 
 from .analytics import (
+    ANALYTICS_CACHE_TIMEOUT,
+    analytics_version,
     assignment_overview,
     as_plaintext,
     build_do_now,
     build_exit_tickets,
     build_game_seed,
     build_sentence_builders,
+    heatmap_columnar,
     heatmap_data,
     mode_breakdown,
     pick_hinge_question,
     student_mastery,
     word_stats,
 )
+from .class_trends import class_daily_trend, class_word_trends, default_range
+from .export_jobs import enqueue_export, enqueued_response, job_payload
 from .models import (
     Assignment,
-    AssignmentAttempt,
-    AssignmentProgress,
     Class,
     ClubAttendance,
+    ExportJob,
     Student,
 )
 from .services.attendance import add_student_to_session, get_or_create_session
-
-
-def _column_letter(index: int) -> str:
-    letters = ""
-    while index > 0:
-        index, remainder = divmod(index - 1, 26)
-        letters = chr(65 + remainder) + letters
-    return letters or "A"
-
-
-def _render_sheet_xml(headers, rows):
-    data_rows = [headers] + rows
-    max_cols = max((len(row) for row in data_rows), default=len(headers) or 1)
-    total_rows = len(data_rows)
-    if max_cols <= 0:
-        max_cols = 1
-    if total_rows <= 0:
-        total_rows = 1
-
-    last_cell = f"{_column_letter(max_cols)}{total_rows}"
-    dimension_ref = f"A1:{last_cell}"
-
-    sheet_rows = []
-    for row_idx, row in enumerate(data_rows, start=1):
-        cells_xml = []
-        for col_idx, value in enumerate(row, start=1):
-            cell_ref = f"{_column_letter(col_idx)}{row_idx}"
-            if value is None or value == "":
-                continue
-            if isinstance(value, (int, float)) and not isinstance(value, bool):
-                cells_xml.append(f"<c r=\"{cell_ref}\"><v>{value}</v></c>")
-            else:
-                text = escape(str(value)).replace("\n", "&#10;")
-                cells_xml.append(
-                    f"<c r=\"{cell_ref}\" t=\"inlineStr\"><is><t>{text}</t></is></c>"
-                )
-        sheet_rows.append(f"<row r=\"{row_idx}\">{''.join(cells_xml)}</row>")
-
-    sheet_data = "".join(sheet_rows)
-    return (
-        "<?xml version=\"1.0\" encoding=\"UTF-8\" standalone=\"yes\"?>"
-        "<worksheet xmlns=\"http://schemas.openxmlformats.org/spreadsheetml/2006/main\" "
-        "xmlns:r=\"http://schemas.openxmlformats.org/officeDocument/2006/relationships\">"
-        f"<dimension ref=\"{dimension_ref}\"/>"
-        "<sheetViews><sheetView workbookViewId=\"0\"/></sheetViews>"
-        "<sheetFormatPr defaultRowHeight=\"15\"/>"
-        f"<sheetData>{sheet_data}</sheetData>"
-        "</worksheet>"
-    )
-
-
-def _build_xlsx(headers, rows, sheet_name="Progress") -> bytes:
-    created = datetime.utcnow().replace(microsecond=0).isoformat() + "Z"
-    core_xml = (
-        "<?xml version=\"1.0\" encoding=\"UTF-8\" standalone=\"yes\"?>"
-        "<cp:coreProperties xmlns:cp=\"http://schemas.openxmlformats.org/package/2006/metadata/core-properties\" "
-        "xmlns:dc=\"http://purl.org/dc/elements/1.1/\" xmlns:dcterms=\"http://purl.org/dc/terms/\" "
-        "xmlns:dcmitype=\"http://purl.org/dc/dcmitype/\" xmlns:xsi=\"http://www.w3.org/2001/XMLSchema-instance\">"
-        "<dc:creator>Pavonify</dc:creator>"
-        "<cp:lastModifiedBy>Pavonify</cp:lastModifiedBy>"
-        f"<dcterms:created xsi:type=\"dcterms:W3CDTF\">{created}</dcterms:created>"
-        f"<dcterms:modified xsi:type=\"dcterms:W3CDTF\">{created}</dcterms:modified>"
-        "</cp:coreProperties>"
-    )
-
-    app_xml = (
-        "<?xml version=\"1.0\" encoding=\"UTF-8\" standalone=\"yes\"?>"
-        "<Properties xmlns=\"http://schemas.openxmlformats.org/officeDocument/2006/extended-properties\" "
-        "xmlns:vt=\"http://schemas.openxmlformats.org/officeDocument/2006/docPropsVTypes\">"
-        "<Application>Microsoft Excel</Application>"
-        "</Properties>"
-    )
-
-    content_types_xml = (
-        "<?xml version=\"1.0\" encoding=\"UTF-8\" standalone=\"yes\"?>"
-        "<Types xmlns=\"http://schemas.openxmlformats.org/package/2006/content-types\">"
-        "<Default Extension=\"rels\" ContentType=\"application/vnd.openxmlformats-package.relationships+xml\"/>"
-        "<Default Extension=\"xml\" ContentType=\"application/xml\"/>"
-        "<Override PartName=\"/xl/workbook.xml\" ContentType=\"application/vnd.openxmlformats-officedocument.spreadsheetml.sheet.main+xml\"/>"
-        "<Override PartName=\"/xl/worksheets/sheet1.xml\" ContentType=\"application/vnd.openxmlformats-officedocument.spreadsheetml.worksheet+xml\"/>"
-        "<Override PartName=\"/docProps/core.xml\" ContentType=\"application/vnd.openxmlformats-package.core-properties+xml\"/>"
-        "<Override PartName=\"/docProps/app.xml\" ContentType=\"application/vnd.openxmlformats-officedocument.extended-properties+xml\"/>"
-        "<Override PartName=\"/xl/styles.xml\" ContentType=\"application/vnd.openxmlformats-officedocument.spreadsheetml.styles+xml\"/>"
-        "</Types>"
-    )
-
-    rels_xml = (
-        "<?xml version=\"1.0\" encoding=\"UTF-8\" standalone=\"yes\"?>"
-        "<Relationships xmlns=\"http://schemas.openxmlformats.org/package/2006/relationships\">"
-        "<Relationship Id=\"rId1\" Type=\"http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument\" Target=\"xl/workbook.xml\"/>"
-        "<Relationship Id=\"rId2\" Type=\"http://schemas.openxmlformats.org/package/2006/relationships/metadata/core-properties\" Target=\"docProps/core.xml\"/>"
-        "<Relationship Id=\"rId3\" Type=\"http://schemas.openxmlformats.org/officeDocument/2006/relationships/extended-properties\" Target=\"docProps/app.xml\"/>"
-        "</Relationships>"
-    )
-
-    workbook_xml = (
-        "<?xml version=\"1.0\" encoding=\"UTF-8\" standalone=\"yes\"?>"
-        "<workbook xmlns=\"http://schemas.openxmlformats.org/spreadsheetml/2006/main\" "
-        "xmlns:r=\"http://schemas.openxmlformats.org/officeDocument/2006/relationships\">"
-        "<fileVersion appName=\"xl\"/>"
-        "<workbookPr/>"
-        "<bookViews><workbookView/></bookViews>"
-        f"<sheets><sheet name=\"{escape(sheet_name)}\" sheetId=\"1\" r:id=\"rId1\"/></sheets>"
-        "</workbook>"
-    )
-
-    workbook_rels_xml = (
-        "<?xml version=\"1.0\" encoding=\"UTF-8\" standalone=\"yes\"?>"
-        "<Relationships xmlns=\"http://schemas.openxmlformats.org/package/2006/relationships\">"
-        "<Relationship Id=\"rId1\" Type=\"http://schemas.openxmlformats.org/officeDocument/2006/relationships/worksheet\" Target=\"worksheets/sheet1.xml\"/>"
-        "<Relationship Id=\"rId2\" Type=\"http://schemas.openxmlformats.org/officeDocument/2006/relationships/styles\" Target=\"styles.xml\"/>"
-        "</Relationships>"
-    )
-
-    styles_xml = (
-        "<?xml version=\"1.0\" encoding=\"UTF-8\" standalone=\"yes\"?>"
-        "<styleSheet xmlns=\"http://schemas.openxmlformats.org/spreadsheetml/2006/main\">"
-        "<fonts count=\"1\"><font><sz val=\"11\"/><color theme=\"1\"/><name val=\"Calibri\"/><family val=\"2\"/></font></fonts>"
-        "<fills count=\"2\"><fill><patternFill patternType=\"none\"/></fill><fill><patternFill patternType=\"gray125\"/></fill></fills>"
-        "<borders count=\"1\"><border><left/><right/><top/><bottom/><diagonal/></border></borders>"
-        "<cellStyleXfs count=\"1\"><xf numFmtId=\"0\" fontId=\"0\" fillId=\"0\" borderId=\"0\"/></cellStyleXfs>"
-        "<cellXfs count=\"1\"><xf numFmtId=\"0\" fontId=\"0\" fillId=\"0\" borderId=\"0\" xfId=\"0\"/></cellXfs>"
-        "<cellStyles count=\"1\"><cellStyle name=\"Normal\" xfId=\"0\" builtinId=\"0\"/></cellStyles>"
-        "</styleSheet>"
-    )
-
-    sheet_xml = _render_sheet_xml(headers, rows)
-
-    buffer = BytesIO()
-    with ZipFile(buffer, "w") as zf:
-        zf.writestr("[Content_Types].xml", content_types_xml)
-        zf.writestr("_rels/.rels", rels_xml)
-        zf.writestr("docProps/core.xml", core_xml)
-        zf.writestr("docProps/app.xml", app_xml)
-        zf.writestr("xl/workbook.xml", workbook_xml)
-        zf.writestr("xl/_rels/workbook.xml.rels", workbook_rels_xml)
-        zf.writestr("xl/styles.xml", styles_xml)
-        zf.writestr("xl/worksheets/sheet1.xml", sheet_xml)
-
-    buffer.seek(0)
-    return buffer.getvalue()
+from .services.exports import assignment_progress_sheets, progress_filename
+from .services.xlsx import XLSX_CONTENT_TYPE, stream_xlsx
 
 
 def _teacher_can_view(user, assignment: Assignment) -> bool:
@@ -220,13 +84,40 @@ def api_student_mastery(request, assignment_id):
     return JsonResponse({"results": student_mastery(assignment_id)})
 
 
+# ?format= values accepted by api_heatmap.
+HEATMAP_FORMATS = {
+    "cells": heatmap_data,
+    "columnar": heatmap_columnar,
+}
+
+
 @login_required
 @require_GET
 def api_heatmap(request, assignment_id):
     assignment = get_object_or_404(Assignment, id=assignment_id)
     if not _teacher_can_view(request.user, assignment):
         return HttpResponseForbidden()
-    return JsonResponse(heatmap_data(assignment_id))
+
+    layout = request.GET.get("format", "cells")
+    if layout not in HEATMAP_FORMATS:
+        return HttpResponseBadRequest("Unknown heatmap format.")
+
+    # The grid only changes with the attempts and their rollup, so polling
+    # browsers revalidate against the analytics version and mostly get 304s.
+    version = analytics_version(assignment_id)
+    etag = f'"heatmap-{assignment_id}-{version}-{layout}"'
+    response = get_conditional_response(request, etag=etag)
+    if response is None:
+        key = f"analytics:heatmap-json:{layout}:{assignment_id}:{version}"
+        body = cache.get(key)
+        if body is None:
+            data = HEATMAP_FORMATS[layout](assignment_id, version)
+            body = json.dumps(data, cls=DjangoJSONEncoder, separators=(",", ":"))
+            cache.set(key, body, ANALYTICS_CACHE_TIMEOUT)
+        response = HttpResponse(body, content_type="application/json")
+    response["ETag"] = etag
+    patch_cache_control(response, private=True, no_cache=True)
+    return response
 
 
 @login_required
@@ -247,104 +138,40 @@ def api_export_progress(request, assignment_id):
     if not _teacher_can_view(request.user, assignment):
         return HttpResponseForbidden()
 
-    progress_qs = (
-        AssignmentProgress.objects.filter(assignment=assignment)
-        .select_related("student")
-        .order_by("student__last_name", "student__first_name")
-    )
+    if request.GET.get("background"):
+        job = enqueue_export("assignment-progress", {"assignment_id": assignment.id}, request.user)
+        return enqueued_response(job)
 
-    attempt_stats = (
-        AssignmentAttempt.objects
-        .filter(assignment=assignment)
-        .values("student_id")
-        .annotate(
-            attempts=Count("id"),
-            correct=Coalesce(Sum(Case(When(is_correct=True, then=1), default=0)), 0),
-        )
+    response = StreamingHttpResponse(
+        stream_xlsx(assignment_progress_sheets(assignment)),
+        content_type=XLSX_CONTENT_TYPE,
     )
-    stats_map = {row["student_id"]: row for row in attempt_stats}
-
-    mastery_map = {
-        entry["student_id"]: entry
-        for entry in student_mastery(assignment_id)
-    }
-
-    student_rows = {}
-    for progress in progress_qs:
-        name = f"{progress.student.first_name} {progress.student.last_name}".strip()
-        student_rows[progress.student_id] = {
-            "name": name or progress.student.username,
-            "username": progress.student.username,
-            "points": progress.points_earned,
-            "completed": "Yes" if progress.completed else "No",
-            "time_spent": str(progress.time_spent) if progress.time_spent else "",
-        }
-
-    # Ensure we include students who have attempts but no progress row yet.
-    missing_ids = [sid for sid in stats_map.keys() if sid not in student_rows]
-    if missing_ids:
-        for student in Student.objects.filter(id__in=missing_ids):
-            name = f"{student.first_name} {student.last_name}".strip()
-            student_rows[student.id] = {
-                "name": name or student.username,
-                "username": student.username,
-                "points": "",
-                "completed": "",
-                "time_spent": "",
-            }
-
-    headers = [
-        "Student",
-        "Username",
-        "Points Earned",
-        "Completed",
-        "Time Spent",
-        "Total Attempts",
-        "Correct",
-        "Accuracy (%)",
-        "Words Aced",
-        "Needs Practice",
-    ]
-    rows = []
-
-    for student_id, row in sorted(
-        student_rows.items(), key=lambda item: item[1]["name"].lower()
-    ):
-        stats = stats_map.get(student_id, {})
-        attempts = stats.get("attempts", 0) or 0
-        correct = stats.get("correct", 0) or 0
-        accuracy = round((correct / attempts * 100), 1) if attempts else 0.0
-
-        mastery = mastery_map.get(student_id, {})
-        words_aced = ", ".join(mastery.get("words_aced", []))
-        needs_practice = ", ".join(mastery.get("needs_practice", []))
-
-        rows.append(
-            [
-                row["name"],
-                row["username"],
-                row.get("points", ""),
-                row.get("completed", ""),
-                row.get("time_spent", ""),
-                attempts,
-                correct,
-                accuracy,
-                words_aced,
-                needs_practice,
-            ]
-        )
+    response["Content-Disposition"] = f'attachment; filename="{progress_filename(assignment)}"'
+    return response
 
-    workbook_bytes = _build_xlsx(headers, rows, sheet_name="Progress")
 
-    safe_name = slugify(assignment.name) or f"assignment-{assignment_id}"
-    filename = f"{safe_name}-progress.xlsx"
+def _can_see_export(user, job: ExportJob) -> bool:
+    return job.requested_by_id == user.id
 
-    response = HttpResponse(
-        workbook_bytes,
-        content_type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
-    )
-    response["Content-Disposition"] = f'attachment; filename="{filename}"'
-    return response
+
+@login_required
+@require_GET
+def api_export_job_status(request, job_id):
+    job = get_object_or_404(ExportJob, pk=job_id)
+    if not _can_see_export(request.user, job):
+        return HttpResponseForbidden()
+    return JsonResponse(job_payload(job))
+
+
+@login_required
+@require_GET
+def api_export_job_download(request, job_id):
+    job = get_object_or_404(ExportJob, pk=job_id)
+    if not _can_see_export(request.user, job):
+        return HttpResponseForbidden()
+    if job.status != ExportJob.STATUS_DONE:
+        return JsonResponse(job_payload(job), status=409)
+    return FileResponse(job.file.open("rb"), as_attachment=True, filename=job.filename)
 
 
 @login_required
@@ -377,6 +204,78 @@ def api_generate_activity(request):
     return JsonResponse({"activity": data, "clipboard": as_plaintext(data)})
 
 
+TREND_WORD_LIMIT = 20
+TREND_MAX_WORD_LIMIT = 500
+
+
+def _teacher_can_view_class(user, club: Class) -> bool:
+    if not user.is_authenticated or not getattr(user, "is_teacher", False):
+        return False
+    return club.teachers.filter(id=user.id).exists()
+
+
+def _trend_params(request):
+    """Read ?start=, ?end= (YYYY-MM-DD) and ?mode=; the range defaults to the last term."""
+
+    start, end = default_range()
+    if request.GET.get("start"):
+        start = date.fromisoformat(request.GET["start"])
+    if request.GET.get("end"):
+        end = date.fromisoformat(request.GET["end"])
+    if start > end:
+        raise ValueError("start must not be after end")
+    return start, end, request.GET.get("mode") or None
+
+
+@login_required
+@require_GET
+def api_class_word_trends(request, class_id):
+    """Words a class has found hardest over a date range, from the daily buckets."""
+
+    club = get_object_or_404(Class, id=class_id)
+    if not _teacher_can_view_class(request.user, club):
+        return HttpResponseForbidden()
+    try:
+        start, end, mode = _trend_params(request)
+        limit = min(int(request.GET.get("limit", TREND_WORD_LIMIT)), TREND_MAX_WORD_LIMIT)
+        min_attempts = int(request.GET.get("min_attempts", 1))
+    except ValueError as exc:
+        return JsonResponse({"error": str(exc)}, status=400)
+
+    results = class_word_trends(
+        club.id, start, end, mode=mode, min_attempts=min_attempts, limit=max(1, limit)
+    )
+    return JsonResponse({
+        "start": start.isoformat(),
+        "end": end.isoformat(),
+        "mode": mode,
+        "results": results,
+    })
+
+
+@login_required
+@require_GET
+def api_class_daily_trend(request, class_id):
+    """Daily attempts and accuracy for a class, optionally for a single word."""
+
+    club = get_object_or_404(Class, id=class_id)
+    if not _teacher_can_view_class(request.user, club):
+        return HttpResponseForbidden()
+    try:
+        start, end, mode = _trend_params(request)
+        word_id = int(request.GET["word"]) if request.GET.get("word") else None
+    except ValueError as exc:
+        return JsonResponse({"error": str(exc)}, status=400)
+
+    return JsonResponse({
+        "start": start.isoformat(),
+        "end": end.isoformat(),
+        "mode": mode,
+        "word": word_id,
+        "results": class_daily_trend(club.id, start, end, mode=mode, word_id=word_id),
+    })
+
+
 @require_POST
 @login_required
 def api_add_one_off_attendance(request, class_id):
@@ -0,0 +1,86 @@
+"""Accepting answers, shared by the HTTP endpoint and the websocket consumer."""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Any, Dict, Optional
+
+from django.utils import timezone
+
+from .broadcasts import leaderboard_changed
+from .models import LiveGameSession
+from .state import QuestionClosed, game_state
+
+
+class AnswerRejected(Exception):
+    """The answer was not accepted; ``status`` is the matching HTTP status."""
+
+    def __init__(self, detail: str, status: int) -> None:
+        super().__init__(detail)
+        self.detail = detail
+        self.status = status
+
+
+@dataclass
+class AcceptedAnswer:
+    is_correct: bool
+    score_delta: int
+    # The participant's own rank, score and streak after this answer.
+    you: Optional[Dict[str, Any]]
+
+    def as_dict(self) -> dict:
+        return {"accepted": True, "isCorrect": self.is_correct, "scoreDelta": self.score_delta, "you": self.you}
+
+
+def submit_answer(
+    session: LiveGameSession, participant_id: Optional[int], question_index, answer_payload, engine,
+) -> AcceptedAnswer:
+    """Check an answer against the open question, score it and record it.
+
+    The game's leaderboard broadcast is scheduled through
+    ``live.broadcasts.leaderboard_changed``.
+
+    Raises ``AnswerRejected`` when the participant has not joined, the
+    question is not the open one or not yet revealed, time is up or they
+    already answered.
+    """
+
+    state = game_state()
+    if participant_id is None or not state.has_participant(session, participant_id):
+        raise AnswerRejected("Join the session first.", 400)
+    if not isinstance(question_index, int):
+        raise AnswerRejected("Invalid question index.", 400)
+
+    question = state.active_question(session)
+    if question is None or question.index != question_index:
+        raise AnswerRejected("Question mismatch.", 409)
+
+    now = timezone.now()
+    # Questions are pushed ahead of their reveal; nobody may answer early.
+    if question.started_at and now < question.started_at:
+        raise AnswerRejected("Not open yet.", 409)
+    if question.deadline and now > question.deadline:
+        raise AnswerRejected("Too late.", 400)
+
+    if question.started_at:
+        latency_ms = int((now - question.started_at).total_seconds() * 1000)
+    else:
+        latency_ms = 0
+
+    normalize_result = engine.normalize_and_score(question.payload, answer_payload)
+    try:
+        score_result = state.record_answer(
+            session, participant_id, question, normalize_result.is_correct, latency_ms
+        )
+    except QuestionClosed:
+        raise AnswerRejected("Question mismatch.", 409) from None
+    if score_result is None:
+        raise AnswerRejected("Answer already submitted.", 409)
+
+    leaderboard_changed(session)
+    standing = state.standing(session, participant_id)
+    return AcceptedAnswer(
+        is_correct=normalize_result.is_correct,
+        score_delta=score_result.score_delta,
+        you=standing.as_dict() if standing else None,
+    )
@@ -0,0 +1,111 @@
+"""Channel-layer traffic for live games.
+
+Sending the whole leaderboard to the whole class after every answer costs
+O(N²) messages per question. Instead, ``leaderboard_changed`` coalesces score
+changes: the first change in a window of ``LIVE_LEADERBOARD_INTERVAL_MS``
+(default 500) claims it, and one ``LEADERBOARD`` frame with the current top
+goes to the game's group when the window ends. ``close_question`` sends a
+final frame straight away, plus a ``YOU`` frame with rank, score and streak
+to each participant's own group; answer replies carry the answering
+participant's standing too. Nobody receives anyone else's ``you`` block.
+
+An interval of 0 sends every frame immediately. A deferred frame is dropped
+if the game has ended by the time its window closes: ``GAME_ENDED`` already
+carried the final leaderboard, and the hot state may be gone.
+"""
+
+from __future__ import annotations
+
+import logging
+import threading
+from typing import Any, Callable, Dict
+
+from asgiref.sync import async_to_sync
+from channels.layers import get_channel_layer
+from django.conf import settings
+from django.db import connections
+
+from .models import LiveGameSession
+from .state import game_state
+
+
+logger = logging.getLogger(__name__)
+
+GAME_GROUP_PREFIX = "live_game_"
+LEADERBOARD_INTERVAL_MS = 500
+LEADERBOARD_LIMIT = 20
+
+
+def game_group(session_id) -> str:
+    return f"{GAME_GROUP_PREFIX}{session_id}"
+
+
+def participant_group(session_id, participant_id) -> str:
+    return f"{GAME_GROUP_PREFIX}{session_id}_participant_{participant_id}"
+
+
+def send_to_group(group: str, payload: Dict[str, Any]) -> None:
+    channel_layer = get_channel_layer()
+    if channel_layer is None:
+        return
+    async_to_sync(channel_layer.group_send)(group, {"type": "broadcast", "event": payload})
+
+
+def send_to_game(session: LiveGameSession, payload: Dict[str, Any]) -> None:
+    send_to_group(game_group(session.id), payload)
+
+
+def _interval_ms() -> int:
+    return getattr(settings, "LIVE_LEADERBOARD_INTERVAL_MS", LEADERBOARD_INTERVAL_MS)
+
+
+def send_leaderboard(session: LiveGameSession) -> None:
+    send_to_game(session, {"type": "LEADERBOARD", "top": game_state().leaderboard(session, LEADERBOARD_LIMIT)})
+
+
+def leaderboard_changed(session: LiveGameSession) -> None:
+    """Note a score change; the leaderboard goes out at the end of the current window."""
+
+    interval = _interval_ms()
+    if interval <= 0:
+        send_leaderboard(session)
+        return
+    if game_state().claim_broadcast(session, interval):
+        _defer(lambda: _send_leaderboard_if_running(session.pk), interval / 1000)
+
+
+def _send_leaderboard_if_running(session_id) -> None:
+    session = LiveGameSession.objects.filter(pk=session_id, status="RUNNING").first()
+    if session is not None:
+        send_leaderboard(session)
+
+
+def send_standings(session: LiveGameSession) -> None:
+    """Send each participant their own rank, score and streak."""
+
+    for participant_id, standing in game_state().standings(session).items():
+        send_to_group(participant_group(session.id, participant_id), {"type": "YOU", **standing.as_dict()})
+
+
+def close_question(session: LiveGameSession) -> None:
+    """Send the final leaderboard of a question and each participant's standing."""
+
+    send_leaderboard(session)
+    send_standings(session)
+
+
+def _defer(func: Callable[[], None], delay: float) -> None:
+    """Run ``func`` on a timer thread after ``delay`` seconds."""
+
+    timer = threading.Timer(delay, _run_deferred, args=(func,))
+    timer.daemon = True
+    timer.start()
+
+
+def _run_deferred(func) -> None:
+    try:
+        func()
+    except Exception:
+        logger.exception("Deferred live game broadcast failed")
+    finally:
+        connections.close_all()
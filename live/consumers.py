@@ -2,7 +2,18 @@
 
 from __future__ import annotations
 
+from importlib import import_module
+from typing import Optional
+
+from channels.db import database_sync_to_async
 from channels.generic.websocket import AsyncJsonWebsocketConsumer
+from django.conf import settings
+
+from learning.services.question_flow import QuestionFlowEngine
+
+from .answers import AnswerRejected, submit_answer
+from .broadcasts import game_group, participant_group
+from .models import LiveGameSession
 
 
 class AnnouncementConsumer(AsyncJsonWebsocketConsumer):
@@ -20,14 +31,87 @@ class AnnouncementConsumer(AsyncJsonWebsocketConsumer):
 
 
 class LiveGameConsumer(AsyncJsonWebsocketConsumer):
+    """Fans out game broadcasts and takes ``ANSWER`` frames from participants.
+
+    Every socket is in the game's group; a joined participant's socket is
+    also in their own group (``live.broadcasts.participant_group``), which
+    receives their ``YOU`` standing frames.
+
+    A participant who joined over HTTP (``LiveGameSessionViewSet.join``) can
+    answer on the socket instead of POSTing to ``answer``::
+
+        {"type": "ANSWER", "questionIndex": 3, "answerPayload": "hola", "requestId": "a1"}
+
+    and gets ``{"type": "ANSWER_RESULT", "requestId": "a1", "accepted": true,
+    "isCorrect": ..., "scoreDelta": ..., "you": {...}}`` back on the same socket, or
+    ``"accepted": false`` with ``detail`` and the HTTP ``status`` the endpoint
+    would have used. The session is looked up once per connection and the
+    participant once per join, not per answer.
+    """
+
+    question_engine = QuestionFlowEngine()
+
     async def connect(self):
         self.session_id = self.scope["url_route"]["kwargs"]["session_id"]
-        self.group_name = f"live_game_{self.session_id}"
+        self.group_name = game_group(self.session_id)
+        self.game: Optional[LiveGameSession] = None
+        self.participant_id: Optional[int] = None
+        self.own_group: Optional[str] = None
         await self.channel_layer.group_add(self.group_name, self.channel_name)
         await self.accept()
+        await self._join_participant_group(await database_sync_to_async(self._participant_from_session)())
 
     async def disconnect(self, code):  # pragma: no cover - infrastructure
         await self.channel_layer.group_discard(self.group_name, self.channel_name)
+        if self.own_group:
+            await self.channel_layer.group_discard(self.own_group, self.channel_name)
+
+    async def _join_participant_group(self, participant_id: Optional[int]) -> None:
+        if participant_id is None or self.own_group:
+            return
+        self.participant_id = participant_id
+        self.own_group = participant_group(self.session_id, participant_id)
+        await self.channel_layer.group_add(self.own_group, self.channel_name)
 
     async def broadcast(self, event):
         await self.send_json(event["event"])
+
+    async def receive_json(self, content, **kwargs):
+        if not isinstance(content, dict) or content.get("type") != "ANSWER":
+            await self.send_json({"type": "ERROR", "detail": "Unknown message type."})
+            return
+
+        reply = {"type": "ANSWER_RESULT", "requestId": content.get("requestId")}
+        try:
+            accepted = await self._submit(content.get("questionIndex"), content.get("answerPayload"))
+        except AnswerRejected as exc:
+            await self.send_json({**reply, "accepted": False, "detail": exc.detail, "status": exc.status})
+            return
+        finally:
+            await self._join_participant_group(self.participant_id)
+        await self.send_json({**reply, **accepted.as_dict()})
+
+    @database_sync_to_async
+    def _submit(self, question_index, answer_payload):
+        if self.game is None:
+            self.game = LiveGameSession.objects.filter(pk=self.session_id).first()
+            if self.game is None:
+                raise AnswerRejected("Session not found.", 404)
+        if self.participant_id is None:
+            # Not joined when the socket opened; they may have since.
+            self.participant_id = self._participant_from_session()
+            if self.participant_id is None:
+                raise AnswerRejected("Join the session first.", 400)
+        return submit_answer(self.game, self.participant_id, question_index, answer_payload, self.question_engine)
+
+    def _participant_from_session(self) -> Optional[int]:
+        session = self.scope.get("session")
+        if session is None or not session.session_key:
+            return None
+        # A fresh read: the student may have joined after the socket opened.
+        store = import_module(settings.SESSION_ENGINE).SessionStore(session_key=session.session_key)
+        data = store.load()
+        participant_id = data.get(f"live_participant_{self.session_id}")
+        if not data.get("student_id") or not participant_id:
+            return None
+        return int(participant_id)
@@ -0,0 +1,19 @@
+# Generated by Django 5.0.3 on 2026-10-17 04:08
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('live', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='livegameanswer',
+            name='submitted_at',
+            field=models.DateTimeField(default=django.utils.timezone.now),
+        ),
+    ]
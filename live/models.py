@@ -4,6 +4,7 @@ import uuid
 
 from django.conf import settings
 from django.db import models
+from django.utils import timezone
 
 
 User = settings.AUTH_USER_MODEL
@@ -129,7 +130,8 @@ class LiveGameAnswer(models.Model):
     )
     is_correct = models.BooleanField()
     latency_ms = models.IntegerField()
-    submitted_at = models.DateTimeField(auto_now_add=True)
+    # Not auto_now_add: answers written behind from Redis keep their real time.
+    submitted_at = models.DateTimeField(default=timezone.now)
 
     class Meta:
         unique_together = ("participant", "question")
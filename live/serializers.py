@@ -5,11 +5,13 @@ from __future__ import annotations
 from typing import Any, Dict, Optional
 
 from django.conf import settings
+from django.utils import timezone
 from rest_framework import serializers
 
 from learning.models import Class, VocabularyList
 
 from .models import LiveGameParticipant, LiveGameSession
+from .state import state_for
 
 
 class LiveGameCreateSerializer(serializers.Serializer):
@@ -80,6 +82,8 @@ class LiveGameStateSerializer(serializers.Serializer):
     deadline_at = serializers.DateTimeField(allow_null=True)
     leaderboard = serializers.ListField(child=serializers.DictField())
     you = serializers.DictField(allow_null=True)
+    # Lets clients estimate their clock offset and show questions at revealAt.
+    server_time = serializers.DateTimeField()
 
     @classmethod
     def from_session(
@@ -89,33 +93,10 @@ class LiveGameStateSerializer(serializers.Serializer):
         you: Optional[LiveGameParticipant] = None,
         limit: int = 5,
     ) -> "LiveGameStateSerializer":
-        top_participants = (
-            session.participants.all()
-            .order_by("-score", "total_latency_ms", "joined_at")[:limit]
-        )
-        leaderboard = [
-            {
-                "rank": idx + 1,
-                "name": participant.display_name,
-                "score": participant.score,
-                "streak": participant.streak,
-            }
-            for idx, participant in enumerate(top_participants)
-        ]
-
-        you_payload = None
-        if you:
-            rank = (
-                session.participants.filter(
-                    score__gt=you.score
-                ).count()
-                + 1
-            )
-            you_payload = {
-                "rank": rank,
-                "score": you.score,
-                "streak": you.streak,
-            }
+        state = state_for(session)
+        leaderboard = state.leaderboard(session, limit)
+        standing = state.standing(session, you.pk) if you else None
+        you_payload = standing.as_dict() if standing else None
 
         serializer = cls(
             data={
@@ -128,6 +109,7 @@ class LiveGameStateSerializer(serializers.Serializer):
                 "deadline_at": session.current_question_deadline,
                 "leaderboard": leaderboard,
                 "you": you_payload,
+                "server_time": timezone.now(),
             }
         )
         serializer.is_valid(raise_exception=True)
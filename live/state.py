@@ -0,0 +1,619 @@
+"""Hot state of running live games.
+
+Answering is the busiest path in a live game: a whole class answers inside
+the question window. ``RedisGameState`` keeps what that path needs in Redis
+(``REDIS_URL``): the open question, each participant's score and streak,
+who has answered, and the leaderboard as a sorted set. Accepted answers are
+queued in Redis and written to ``LiveGameAnswer``/``LiveGameParticipant`` in
+batches by ``flush`` (the ``live.tasks.flush_live_answers`` task, a
+per-minute safety-net schedule, and ``end`` when the game finishes).
+
+``DatabaseGameState`` offers the same interface straight on the models and
+is used when no Redis is configured, e.g. in development and tests.
+
+Both keep the game's deck of questions, answers included, from ``start`` so
+that advancing to the next question reads nothing but the session row: in
+Redis, or in the Django cache for ``DatabaseGameState``. A deck that has gone
+missing is rebuilt from ``LiveGameQuestion``.
+
+Settings:
+
+``LIVE_GAME_STATE_BACKEND``
+    ``"redis"`` or ``"database"`` (defaults to ``"redis"`` when ``REDIS_URL``
+    is set).
+``LIVE_FLUSH_BATCH_SIZE``
+    Queued answers written per batch (default 500); a flush is also queued
+    early once this many are waiting.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Sequence
+
+import redis
+from django.conf import settings
+from django.core.cache import cache
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+from django.utils.functional import cached_property
+from django_q.tasks import async_task
+
+from .models import LiveGameAnswer, LiveGameParticipant, LiveGameQuestion, LiveGameSession
+from .scoring import ScoreResult, calculate_score
+
+
+logger = logging.getLogger(__name__)
+
+KEY_PREFIX = "live"
+# Abandoned games are dropped from Redis after this long without activity.
+STATE_TTL = timedelta(hours=6)
+FLUSH_BATCH_SIZE = 500
+# Leaderboard members are ordered by score, then by lower total latency.
+LATENCY_SCALE = 10 ** 9
+DIRTY_SESSIONS_KEY = f"{KEY_PREFIX}:dirty"
+
+# Both answer scripts first check that question ARGV[1] is still open, so an
+# answer racing ``end`` cannot recreate a player's keys after ``_drop``.
+# KEYS: question, answered:<n>, p:<id>. ARGV: index, participant id, TTL.
+# Returns the player's streak, -1 if the question closed, -2 on a repeat.
+CLAIM_ANSWER_SCRIPT = """
+if redis.call("HGET", KEYS[1], "index") ~= ARGV[1] then
+    return -1
+end
+if redis.call("SADD", KEYS[2], ARGV[2]) == 0 then
+    return -2
+end
+redis.call("EXPIRE", KEYS[2], ARGV[3])
+return tonumber(redis.call("HGET", KEYS[3], "streak") or "0")
+"""
+# KEYS: question, p:<id>, board, pending, dirty set. ARGV: index, participant
+# id, TTL, score delta, new streak, latency, pending entry, session id,
+# LATENCY_SCALE. Returns the queue length, or -1 if the question closed.
+APPLY_ANSWER_SCRIPT = """
+if redis.call("HGET", KEYS[1], "index") ~= ARGV[1] then
+    return -1
+end
+local score = redis.call("HINCRBY", KEYS[2], "score", ARGV[4])
+redis.call("HSET", KEYS[2], "streak", ARGV[5])
+local latency = redis.call("HINCRBY", KEYS[2], "latency", ARGV[6])
+local scale = tonumber(ARGV[9])
+-- Same ordering as _board_score.
+redis.call("ZADD", KEYS[3], score * scale - math.min(latency, scale - 1), ARGV[2])
+local queued = redis.call("RPUSH", KEYS[4], ARGV[7])
+redis.call("SADD", KEYS[5], ARGV[8])
+for i = 2, 4 do
+    redis.call("EXPIRE", KEYS[i], ARGV[3])
+end
+return queued
+"""
+
+
+class QuestionClosed(Exception):
+    """The question closed, or the game ended, while an answer was being recorded."""
+
+
+@dataclass
+class DeckQuestion:
+    index: int
+    question_id: int
+    # The full payload, answer included; never sent to players as is.
+    payload: dict
+
+
+@dataclass
+class ActiveQuestion:
+    index: int
+    question_id: int
+    payload: dict
+    started_at: Optional[datetime]
+    deadline: Optional[datetime]
+
+
+@dataclass
+class Standing:
+    rank: int
+    score: int
+    streak: int
+
+    def as_dict(self) -> dict:
+        return {"rank": self.rank, "score": self.score, "streak": self.streak}
+
+
+class GameState:
+    """Interface shared by the backends; see the module docstring."""
+
+    def start(self, session: LiveGameSession, questions: Sequence[LiveGameQuestion]) -> None:
+        """Reset the state for a game that is about to start and keep its deck."""
+        self._store_deck(session.pk, [DeckQuestion(q.index, q.pk, q.payload) for q in questions])
+
+    def deck(self, session: LiveGameSession) -> List[DeckQuestion]:
+        """The game's questions in order."""
+        deck = self._load_deck(session.pk)
+        if deck is None:
+            deck = [DeckQuestion(q.index, q.pk, q.payload) for q in session.questions.order_by("index")]
+            self._store_deck(session.pk, deck)
+        return deck
+
+    def _load_deck(self, session_id) -> Optional[List[DeckQuestion]]:
+        rows = cache.get(_deck_key(session_id))
+        return None if rows is None else [DeckQuestion(*row) for row in rows]
+
+    def _store_deck(self, session_id, deck: List[DeckQuestion]) -> None:
+        cache.set(_deck_key(session_id), _deck_rows(deck), STATE_TTL.total_seconds())
+
+    def add_participant(self, session: LiveGameSession, participant: LiveGameParticipant) -> None:
+        pass
+
+    def open_question(
+        self, session: LiveGameSession, question: DeckQuestion, started_at: datetime, deadline: datetime,
+    ) -> None:
+        """Make ``question`` the one answers are accepted for."""
+
+    def active_question(self, session: LiveGameSession) -> Optional[ActiveQuestion]:
+        raise NotImplementedError
+
+    def has_participant(self, session: LiveGameSession, participant_id: int) -> bool:
+        raise NotImplementedError
+
+    def record_answer(
+        self, session: LiveGameSession, participant_id: int, question: ActiveQuestion,
+        is_correct: bool, latency_ms: int,
+    ) -> Optional[ScoreResult]:
+        """Score and store an answer; ``None`` if the participant already answered.
+
+        ``RedisGameState`` raises ``QuestionClosed`` if ``question`` closed
+        in the meantime.
+        """
+        raise NotImplementedError
+
+    def standing(self, session: LiveGameSession, participant_id: int) -> Optional[Standing]:
+        raise NotImplementedError
+
+    def leaderboard(self, session: LiveGameSession, limit: int = 20) -> List[dict]:
+        raise NotImplementedError
+
+    def standings(self, session: LiveGameSession) -> Dict[int, Standing]:
+        """Every participant's standing, by participant id."""
+        raise NotImplementedError
+
+    def claim_broadcast(self, session: LiveGameSession, interval_ms: int) -> bool:
+        """True for the first caller in each ``interval_ms`` window (see ``live.broadcasts``)."""
+        return cache.add(f"live:{session.pk}:broadcast-tick", 1, timeout=interval_ms / 1000)
+
+    def flush(self, session_id) -> int:
+        """Write queued answers to the database; returns how many were written."""
+        return 0
+
+    def end(self, session: LiveGameSession) -> None:
+        """Flush everything and drop the hot state of a finished game."""
+        cache.delete(_deck_key(session.pk))
+
+
+class DatabaseGameState(GameState):
+    def active_question(self, session):
+        # Read through the session row: a long-lived caller (the websocket
+        # consumer) holds a session object that does not see the host advance.
+        row = (
+            LiveGameQuestion.objects.filter(session_id=session.pk, index=F("session__current_question_idx"))
+            .values(
+                "pk", "index", "payload",
+                "session__current_question_started_at", "session__current_question_deadline",
+            )
+            .first()
+        )
+        if row is None:
+            return None
+        return ActiveQuestion(
+            index=row["index"],
+            question_id=row["pk"],
+            payload=row["payload"],
+            started_at=row["session__current_question_started_at"],
+            deadline=row["session__current_question_deadline"],
+        )
+
+    def has_participant(self, session, participant_id):
+        return session.participants.filter(id=participant_id).exists()
+
+    def record_answer(self, session, participant_id, question, is_correct, latency_ms):
+        try:
+            with transaction.atomic():
+                participant = LiveGameParticipant.objects.select_for_update().get(pk=participant_id)
+                LiveGameAnswer.objects.create(
+                    participant=participant,
+                    question_id=question.question_id,
+                    is_correct=is_correct,
+                    latency_ms=latency_ms,
+                )
+                result = calculate_score(is_correct, latency_ms, participant.streak)
+                participant.score += result.score_delta
+                participant.streak = result.new_streak
+                participant.total_latency_ms += latency_ms
+                participant.save(update_fields=["score", "streak", "total_latency_ms"])
+        except IntegrityError:
+            return None
+        return result
+
+    def standing(self, session, participant_id):
+        ahead = (
+            LiveGameParticipant.objects.filter(session_id=OuterRef("session_id"), score__gt=OuterRef("score"))
+            .order_by()
+            .values("session_id")
+            .annotate(count=Count("pk"))
+            .values("count")
+        )
+        row = (
+            session.participants.filter(id=participant_id)
+            .annotate(ahead=Coalesce(Subquery(ahead), 0))
+            .values("score", "streak", "ahead")
+            .first()
+        )
+        if row is None:
+            return None
+        return Standing(rank=row["ahead"] + 1, score=row["score"], streak=row["streak"])
+
+    def standings(self, session):
+        rows = list(session.participants.order_by("-score").values_list("id", "score", "streak"))
+        standings = {}
+        for position, (participant_id, score, streak) in enumerate(rows):
+            # Ties share a rank, as in ``standing``.
+            if position and rows[position - 1][1] == score:
+                rank = standings[rows[position - 1][0]].rank
+            else:
+                rank = position + 1
+            standings[participant_id] = Standing(rank=rank, score=score, streak=streak)
+        return standings
+
+    def leaderboard(self, session, limit=20):
+        participants = (
+            session.participants.all()
+            .order_by("-score", "total_latency_ms", "joined_at")[:limit]
+        )
+        return [
+            {
+                "rank": idx + 1,
+                "name": participant.display_name,
+                "score": participant.score,
+                "streak": participant.streak,
+            }
+            for idx, participant in enumerate(participants)
+        ]
+
+
+class RedisGameState(GameState):
+    """Keys, all under ``live:<session id>:``:
+
+    ``deck``          JSON list of the game's questions
+    ``question``      hash: index, id, payload, started_at, deadline
+    ``names``         hash: participant id -> display name
+    ``p:<id>``        hash: score, streak, latency
+    ``answered:<n>``  set of participant ids that answered question ``n``
+    ``board``         sorted set of participant ids (see ``LATENCY_SCALE``)
+    ``pending``       list of JSON answers waiting to be written
+    """
+
+    def __init__(self, client=None):
+        self._client = client
+
+    @property
+    def client(self):
+        if self._client is None:
+            self._client = redis.Redis.from_url(
+                settings.REDIS_URL or "redis://127.0.0.1:6379/0", decode_responses=True,
+            )
+        return self._client
+
+    @cached_property
+    def _claim_answer(self):
+        return self.client.register_script(CLAIM_ANSWER_SCRIPT)
+
+    @cached_property
+    def _apply_answer(self):
+        return self.client.register_script(APPLY_ANSWER_SCRIPT)
+
+    @staticmethod
+    def _key(session_id, *parts) -> str:
+        return ":".join((KEY_PREFIX, str(session_id), *map(str, parts)))
+
+    @staticmethod
+    def _expire(pipe, *keys) -> None:
+        for key in keys:
+            pipe.expire(key, STATE_TTL)
+
+    # -- lifecycle ---------------------------------------------------------
+    def start(self, session, questions):
+        self._drop(session.id)
+        super().start(session, questions)
+        participants = list(session.participants.values_list("id", "display_name", "score", "streak",
+                                                               "total_latency_ms"))
+        pipe = self.client.pipeline()
+        for participant_id, name, score, streak, latency in participants:
+            self._register(pipe, session.id, participant_id, name, score, streak, latency)
+        pipe.execute()
+
+    def _load_deck(self, session_id):
+        rows = self.client.get(self._key(session_id, "deck"))
+        return None if rows is None else [DeckQuestion(*row) for row in json.loads(rows)]
+
+    def _store_deck(self, session_id, deck):
+        self.client.set(self._key(session_id, "deck"), json.dumps(_deck_rows(deck)), ex=STATE_TTL)
+
+    def add_participant(self, session, participant):
+        pipe = self.client.pipeline()
+        self._register(
+            pipe, session.id, participant.pk, participant.display_name,
+            participant.score, participant.streak, participant.total_latency_ms,
+        )
+        pipe.execute()
+
+    def _register(self, pipe, session_id, participant_id, name, score, streak, latency):
+        names = self._key(session_id, "names")
+        player = self._key(session_id, "p", participant_id)
+        board = self._key(session_id, "board")
+        pipe.hset(names, participant_id, name)
+        pipe.hset(player, mapping={"score": score, "streak": streak, "latency": latency})
+        pipe.zadd(board, {participant_id: _board_score(score, latency)})
+        self._expire(pipe, names, player, board)
+
+    def open_question(self, session, question, started_at, deadline):
+        key = self._key(session.id, "question")
+        pipe = self.client.pipeline()
+        pipe.delete(key)
+        pipe.hset(key, mapping={
+            "index": question.index,
+            "id": question.question_id,
+            "payload": json.dumps(question.payload),
+            "started_at": started_at.isoformat(),
+            "deadline": deadline.isoformat(),
+        })
+        self._expire(pipe, key)
+        pipe.execute()
+
+    def end(self, session):
+        # Stop taking answers before the final flush so none are dropped.
+        self.client.delete(self._key(session.id, "question"))
+        self.flush(session.id, final=True)
+        self._drop(session.id)
+
+    def _drop(self, session_id) -> None:
+        keys = list(self.client.scan_iter(match=self._key(session_id, "*"), count=500))
+        if keys:
+            self.client.delete(*keys)
+
+    # -- answering ---------------------------------------------------------
+    def active_question(self, session):
+        data = self.client.hgetall(self._key(session.id, "question"))
+        if not data:
+            return None
+        return ActiveQuestion(
+            index=int(data["index"]),
+            question_id=int(data["id"]),
+            payload=json.loads(data["payload"]),
+            started_at=parse_datetime(data["started_at"]),
+            deadline=parse_datetime(data["deadline"]),
+        )
+
+    def has_participant(self, session, participant_id):
+        return bool(self.client.hexists(self._key(session.id, "names"), participant_id))
+
+    def record_answer(self, session, participant_id, question, is_correct, latency_ms):
+        question_key = self._key(session.id, "question")
+        player = self._key(session.id, "p", participant_id)
+        ttl = int(STATE_TTL.total_seconds())
+        streak = self._claim_answer(
+            keys=[question_key, self._key(session.id, "answered", question.index), player],
+            args=[question.index, participant_id, ttl],
+        )
+        if streak == -1:
+            raise QuestionClosed()
+        if streak == -2:
+            return None
+
+        # The answered set admits one answer per participant and question,
+        # so nothing else changes this participant's streak meanwhile.
+        result = calculate_score(is_correct, latency_ms, streak)
+        entry = json.dumps({
+            "participant": participant_id,
+            "question": question.question_id,
+            "is_correct": is_correct,
+            "latency_ms": latency_ms,
+            "submitted_at": timezone.now().isoformat(),
+        })
+        queued = self._apply_answer(
+            keys=[
+                question_key, player, self._key(session.id, "board"),
+                self._key(session.id, "pending"), DIRTY_SESSIONS_KEY,
+            ],
+            args=[
+                question.index, participant_id, ttl, result.score_delta, result.new_streak,
+                latency_ms, entry, str(session.id), LATENCY_SCALE,
+            ],
+        )
+        if queued == -1:
+            raise QuestionClosed()
+
+        if queued == 1 or queued % _batch_size() == 0:
+            self._queue_flush(session.id)
+        return result
+
+    def _queue_flush(self, session_id) -> None:
+        # One queued flush per session at a time; the task clears the flag.
+        if not self.client.set(self._key(session_id, "flush-queued"), 1, nx=True, ex=60):
+            return
+        try:
+            async_task("live.tasks.flush_live_answers", str(session_id), task_name=f"live-flush-{session_id}")
+        except Exception:  # the per-minute schedule picks the answers up
+            logger.exception("Could not queue a flush for live game %s", session_id)
+
+    # -- reading -----------------------------------------------------------
+    def standing(self, session, participant_id):
+        pipe = self.client.pipeline()
+        pipe.zrevrank(self._key(session.id, "board"), participant_id)
+        pipe.hmget(self._key(session.id, "p", participant_id), "score", "streak")
+        rank, (score, streak) = pipe.execute()
+        if rank is None:
+            return None
+        return Standing(rank=rank + 1, score=int(score or 0), streak=int(streak or 0))
+
+    def leaderboard(self, session, limit=20):
+        ids = self.client.zrevrange(self._key(session.id, "board"), 0, limit - 1)
+        if not ids:
+            return []
+        pipe = self.client.pipeline()
+        pipe.hmget(self._key(session.id, "names"), ids)
+        for participant_id in ids:
+            pipe.hmget(self._key(session.id, "p", participant_id), "score", "streak")
+        names, *players = pipe.execute()
+        return [
+            {"rank": idx + 1, "name": name, "score": int(score or 0), "streak": int(streak or 0)}
+            for idx, (name, (score, streak)) in enumerate(zip(names, players))
+        ]
+
+    def standings(self, session):
+        ids = self.client.zrevrange(self._key(session.id, "board"), 0, -1)
+        pipe = self.client.pipeline()
+        for participant_id in ids:
+            pipe.hmget(self._key(session.id, "p", participant_id), "score", "streak")
+        return {
+            int(participant_id): Standing(rank=rank, score=int(score or 0), streak=int(streak or 0))
+            for rank, (participant_id, (score, streak)) in enumerate(zip(ids, pipe.execute()), start=1)
+        }
+
+    def claim_broadcast(self, session, interval_ms):
+        return bool(self.client.set(self._key(session.id, "broadcast-tick"), 1, nx=True, px=max(1, interval_ms)))
+
+    # -- write-behind ------------------------------------------------------
+    def flush(self, session_id, final: bool = False) -> int:
+        """Write the queued answers of one game in batches.
+
+        Entries are removed from the queue only after their batch commits,
+        and the inserts ignore conflicts, so a flush that dies half way is
+        simply repeated. A lock keeps two flushers off the same queue.
+        Only ``end`` passes ``final``; other flushes discard what they find
+        for a game that is no longer running (see ``_write``).
+        """
+
+        pending = self._key(session_id, "pending")
+        batch_size = _batch_size()
+        written = 0
+        self.client.delete(self._key(session_id, "flush-queued"))
+        lock = self.client.lock(self._key(session_id, "flush-lock"), timeout=120, blocking_timeout=30)
+        if not lock.acquire():
+            logger.warning("Live game %s is still being flushed elsewhere", session_id)
+            return 0
+        try:
+            while True:
+                entries = [json.loads(entry) for entry in self.client.lrange(pending, 0, batch_size - 1)]
+                if not entries:
+                    break
+                self._write(session_id, entries, final)
+                self.client.ltrim(pending, len(entries), -1)
+                written += len(entries)
+            self.client.srem(DIRTY_SESSIONS_KEY, str(session_id))
+            # An answer queued after the last read re-marks the session.
+            if self.client.llen(pending):
+                self.client.sadd(DIRTY_SESSIONS_KEY, str(session_id))
+        finally:
+            lock.release()
+        return written
+
+    def _write(self, session_id, entries, final: bool = False) -> None:
+        if not final and not LiveGameSession.objects.filter(pk=session_id, status="RUNNING").exists():
+            # The final flush in ``end`` has already saved the scores; the
+            # Redis totals left behind would only overwrite them.
+            logger.warning("Discarding %d answer(s) queued after live game %s ended", len(entries), session_id)
+            return
+        participant_ids = sorted({entry["participant"] for entry in entries})
+        pipe = self.client.pipeline()
+        for participant_id in participant_ids:
+            pipe.hmget(self._key(session_id, "p", participant_id), "score", "streak", "latency")
+        totals = dict(zip(participant_ids, pipe.execute()))
+
+        with transaction.atomic():
+            LiveGameAnswer.objects.bulk_create(
+                (
+                    LiveGameAnswer(
+                        participant_id=entry["participant"],
+                        question_id=entry["question"],
+                        is_correct=entry["is_correct"],
+                        latency_ms=entry["latency_ms"],
+                        submitted_at=parse_datetime(entry["submitted_at"]),
+                    )
+                    for entry in entries
+                ),
+                ignore_conflicts=True,
+            )
+            participants = list(LiveGameParticipant.objects.filter(pk__in=participant_ids))
+            for participant in participants:
+                score, streak, latency = totals[participant.pk]
+                if score is None:
+                    continue
+                participant.score = int(score)
+                participant.streak = int(streak or 0)
+                participant.total_latency_ms = int(latency or 0)
+            LiveGameParticipant.objects.bulk_update(participants, ["score", "streak", "total_latency_ms"])
+
+    def dirty_sessions(self) -> List[str]:
+        return sorted(self.client.smembers(DIRTY_SESSIONS_KEY))
+
+
+def _deck_key(session_id) -> str:
+    return f"{KEY_PREFIX}:{session_id}:deck"
+
+
+def _deck_rows(deck: List[DeckQuestion]) -> list:
+    return [[question.index, question.question_id, question.payload] for question in deck]
+
+
+def _board_score(score, latency) -> int:
+    return int(score) * LATENCY_SCALE - min(int(latency), LATENCY_SCALE - 1)
+
+
+def _batch_size() -> int:
+    return getattr(settings, "LIVE_FLUSH_BATCH_SIZE", FLUSH_BATCH_SIZE)
+
+
+BACKENDS: Dict[str, type] = {
+    "database": DatabaseGameState,
+    "redis": RedisGameState,
+}
+
+_state: Optional[GameState] = None
+_state_backend: Optional[str] = None
+
+
+def game_state() -> GameState:
+    """The configured backend, created once per process."""
+
+    global _state, _state_backend
+    backend = getattr(settings, "LIVE_GAME_STATE_BACKEND", "database")
+    if _state is None or _state_backend != backend:
+        try:
+            _state = BACKENDS[backend]()
+        except KeyError:
+            raise ValueError(f"Unknown LIVE_GAME_STATE_BACKEND: {backend}") from None
+        _state_backend = backend
+    return _state
+
+
+def state_for(session: LiveGameSession) -> GameState:
+    """Where to read ``session``'s scores: the hot state while it runs, else the models."""
+
+    if session.status == "RUNNING":
+        return game_state()
+    return DatabaseGameState()
+
+
+def flush_all() -> int:
+    """Flush every game with queued answers; returns the answers written."""
+
+    state = game_state()
+    if not isinstance(state, RedisGameState):
+        return 0
+    return sum(state.flush(session_id) for session_id in state.dirty_sessions())
@@ -0,0 +1,16 @@
+"""Background tasks run by the django-q cluster."""
+
+from live.state import flush_all, game_state
+
+
+def flush_live_answers(session_id=None):
+    """Write answers queued in Redis to the database.
+
+    Queued per game as answers arrive (see ``live.state``) and run every
+    minute for all games by migration 0003 as a safety net.
+    """
+    if session_id is None:
+        written = flush_all()
+    else:
+        written = game_state().flush(session_id)
+    return f"Wrote {written} live answers"
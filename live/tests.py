@@ -2,17 +2,72 @@
 
 from __future__ import annotations
 
+import json
 import random
+from datetime import datetime
+from unittest import mock, skipUnless
 
-from django.test import Client, TestCase
+import redis
+from asgiref.sync import async_to_sync
+from asgiref.testing import ApplicationCommunicator
+from django.conf import settings
+from django.contrib.sessions.backends.db import SessionStore
+from django.test import Client, TestCase, override_settings
 from django.urls import reverse
+from django.utils import timezone
+from learning.instrumentation import query_budget
 from learning.models import Class, School, Student, User, VocabularyList, VocabularyWord
 
-from .models import LiveGameParticipant, LiveGameSession
+from . import broadcasts, state as live_state
+from .consumers import LiveGameConsumer
+from .models import LiveGameAnswer, LiveGameParticipant, LiveGameSession
 from .views import LiveGameSessionViewSet
 from learning.services.question_flow import QuestionFlowEngine
 
 
+def _redis_available() -> bool:
+    client = redis.Redis.from_url(settings.REDIS_URL or "redis://127.0.0.1:6379/0", socket_connect_timeout=0.2)
+    try:
+        return bool(client.ping())
+    except redis.RedisError:
+        return False
+
+
+class GameSocket(ApplicationCommunicator):
+    """Drives ``LiveGameConsumer`` directly (``channels.testing`` needs daphne)."""
+
+    def __init__(self, session_id, session=None):
+        scope = {
+            "type": "websocket",
+            "path": f"/ws/live-games/{session_id}/",
+            "headers": [],
+            "subprotocols": [],
+            "url_route": {"args": (), "kwargs": {"session_id": session_id}},
+        }
+        if session is not None:
+            scope["session"] = session
+        super().__init__(LiveGameConsumer.as_asgi(), scope)
+
+    async def connect(self):
+        await self.send_input({"type": "websocket.connect"})
+        return (await self.receive_output(1))["type"] == "websocket.accept"
+
+    async def send_json(self, data):
+        await self.send_input({"type": "websocket.receive", "text": json.dumps(data)})
+
+    async def receive_json(self):
+        return json.loads((await self.receive_output(1))["text"])
+
+    async def close(self):
+        await self.send_input({"type": "websocket.disconnect", "code": 1000})
+        await self.wait(1)
+
+
+IN_MEMORY_LAYERS = {"default": {"BACKEND": "channels.layers.InMemoryChannelLayer"}}
+
+
+# Questions open as soon as they are pushed unless a test sets a lead.
+@override_settings(CHANNEL_LAYERS=IN_MEMORY_LAYERS, LIVE_LEADERBOARD_INTERVAL_MS=0, LIVE_REVEAL_LEAD_MS=0)
 class LiveGameSessionAPITest(TestCase):
     def setUp(self):
         self.school = School.objects.create(name="Test High", location="Test")
@@ -47,13 +102,13 @@ class LiveGameSessionAPITest(TestCase):
         LiveGameSessionViewSet._broadcast_class_announcement = lambda *args, **kwargs: None
         LiveGameSessionViewSet._broadcast_to_game = lambda *args, **kwargs: None
 
-    def test_session_lifecycle(self):
+    def _start_game(self, total_questions=1):
         response = self.client.post(
             "/api/live-games/",
             {
                 "class_id": str(self.school_class.id),
                 "vocab_list_ids": [self.vocab_list.id],
-                "total_questions": 1,
+                "total_questions": total_questions,
             },
             content_type="application/json",
         )
@@ -62,20 +117,16 @@ class LiveGameSessionAPITest(TestCase):
 
         start_response = self.client.post(f"/api/live-games/{session_id}/start/")
         self.assertEqual(start_response.status_code, 200)
+        return session_id
 
-        next_response = self.client.post(f"/api/live-games/{session_id}/next/")
-        self.assertEqual(next_response.status_code, 200)
-
-        session = LiveGameSession.objects.get(id=session_id)
-        question = session.questions.get(index=1)
-
+    def _join(self, session_id, first_name="Sally"):
         student = Student.objects.create(
             school=self.school,
-            first_name="Sally",
+            first_name=first_name,
             last_name="Student",
             year_group=5,
             date_of_birth="2012-01-01",
-            username="sally",
+            username=first_name.lower(),
             password="pass",
         )
         student.classes.add(self.school_class)
@@ -87,20 +138,202 @@ class LiveGameSessionAPITest(TestCase):
 
         join_response = student_client.post(f"/api/live-games/{session_id}/join/")
         self.assertEqual(join_response.status_code, 200)
+        return student_client
 
-        answer_response = student_client.post(
+    def _answer(self, student_client, session_id, index=1, answer=None):
+        if answer is None:
+            answer = self._correct_answer(session_id, index)
+        return student_client.post(
             f"/api/live-games/{session_id}/answer/",
-            {
-                "questionIndex": 1,
-                "answerPayload": question.payload.get("answer"),
-            },
+            {"questionIndex": index, "answerPayload": answer},
             content_type="application/json",
         )
+
+    def _written(self, session_id):
+        """Make scores and answers held back by the game state visible in the database."""
+
+    def _correct_answer(self, session_id, index=1):
+        return LiveGameSession.objects.get(id=session_id).questions.get(index=index).payload.get("answer")
+
+    def test_session_lifecycle(self):
+        session_id = self._start_game()
+        next_response = self.client.post(f"/api/live-games/{session_id}/next/")
+        self.assertEqual(next_response.status_code, 200)
+        student_client = self._join(session_id)
+        answer = self._correct_answer(session_id)
+
+        with query_budget(queries=12):
+            answer_response = self._answer(student_client, session_id, answer=answer)
         self.assertEqual(answer_response.status_code, 200)
 
-        participant = LiveGameParticipant.objects.get(session=session)
+        self._written(session_id)
+        participant = LiveGameParticipant.objects.get(session_id=session_id)
         self.assertGreater(participant.score, 0)
 
+    def test_second_answer_is_rejected(self):
+        session_id = self._start_game()
+        self.client.post(f"/api/live-games/{session_id}/next/")
+        student_client = self._join(session_id)
+
+        self.assertEqual(self._answer(student_client, session_id).status_code, 200)
+        self.assertEqual(self._answer(student_client, session_id).status_code, 409)
+        self._written(session_id)
+        self.assertEqual(LiveGameAnswer.objects.filter(participant__session_id=session_id).count(), 1)
+
+        before = timezone.now()
+        state = student_client.get(f"/api/live-games/{session_id}/state/").json()
+        self.assertEqual(state["leaderboard"][0]["name"], "Sally S.")
+        self.assertEqual(state["you"]["rank"], 1)
+        server_time = datetime.fromisoformat(state["server_time"])
+        self.assertTrue(before <= server_time <= timezone.now())
+
+    def test_answer_over_websocket(self):
+        session_id = self._start_game()
+        self.client.post(f"/api/live-games/{session_id}/next/")
+        student_client = self._join(session_id)
+        answer = self._correct_answer(session_id)
+
+        async def play():
+            socket = GameSocket(session_id, SessionStore(session_key=student_client.session.session_key))
+            self.assertTrue(await socket.connect())
+
+            await socket.send_json({"type": "ANSWER", "questionIndex": 2, "answerPayload": answer})
+            mismatch = await socket.receive_json()
+
+            await socket.send_json(
+                {"type": "ANSWER", "questionIndex": 1, "answerPayload": answer, "requestId": "r1"}
+            )
+            result = await socket.receive_json()
+            leaderboard = await socket.receive_json()
+
+            await socket.send_json({"type": "ANSWER", "questionIndex": 1, "answerPayload": answer})
+            duplicate = await socket.receive_json()
+            await socket.close()
+            return mismatch, result, leaderboard, duplicate
+
+        mismatch, result, leaderboard, duplicate = async_to_sync(play)()
+        self.assertEqual(mismatch, {
+            "type": "ANSWER_RESULT", "requestId": None, "accepted": False,
+            "detail": "Question mismatch.", "status": 409,
+        })
+        self.assertEqual(result["requestId"], "r1")
+        self.assertTrue(result["accepted"])
+        self.assertTrue(result["isCorrect"])
+        self.assertEqual(leaderboard, {
+            "type": "LEADERBOARD",
+            "top": [{"rank": 1, "name": "Sally S.", "score": result["scoreDelta"], "streak": 1}],
+        })
+        self.assertEqual(result["you"], {"rank": 1, "score": result["scoreDelta"], "streak": 1})
+        self.assertEqual(duplicate["status"], 409)
+        self._written(session_id)
+        self.assertEqual(LiveGameParticipant.objects.get(session_id=session_id).score, result["scoreDelta"])
+
+    def test_websocket_answer_requires_joining(self):
+        session_id = self._start_game()
+        self.client.post(f"/api/live-games/{session_id}/next/")
+
+        async def play():
+            socket = GameSocket(session_id)
+            await socket.connect()
+            await socket.send_json({"type": "ANSWER", "questionIndex": 1, "answerPayload": "x"})
+            reply = await socket.receive_json()
+            await socket.close()
+            return reply
+
+        reply = async_to_sync(play)()
+        self.assertFalse(reply["accepted"])
+        self.assertEqual(reply["detail"], "Join the session first.")
+
+    def test_leaderboard_broadcasts_are_coalesced(self):
+        session_id = self._start_game()
+        self.client.post(f"/api/live-games/{session_id}/next/")
+        sally = self._join(session_id)
+        tom = self._join(session_id, first_name="Tom")
+        sent, deferred = [], []
+
+        with override_settings(LIVE_LEADERBOARD_INTERVAL_MS=500), \
+                mock.patch.object(broadcasts, "send_to_group", side_effect=lambda *args: sent.append(args)), \
+                mock.patch.object(broadcasts, "_defer", side_effect=lambda *args: deferred.append(args)):
+            self.assertEqual(self._answer(sally, session_id).status_code, 200)
+            self.assertEqual(self._answer(tom, session_id).status_code, 200)
+            self.assertEqual(sent, [])
+            self.assertEqual([delay for _, delay in deferred], [0.5])
+            deferred[0][0]()
+
+        self.assertEqual(len(sent), 1)
+        group, frame = sent[0]
+        self.assertEqual(group, f"live_game_{session_id}")
+        self.assertEqual(frame["type"], "LEADERBOARD")
+        self.assertEqual([row["name"] for row in frame["top"]], ["Sally S.", "Tom S."])
+
+    def test_deferred_leaderboard_is_dropped_after_the_game_ends(self):
+        session_id = self._start_game()
+        self.client.post(f"/api/live-games/{session_id}/next/")
+        sally = self._join(session_id)
+        sent, deferred = [], []
+
+        with override_settings(LIVE_LEADERBOARD_INTERVAL_MS=500), \
+                mock.patch.object(broadcasts, "send_to_group", side_effect=lambda *args: sent.append(args)), \
+                mock.patch.object(broadcasts, "_defer", side_effect=lambda *args: deferred.append(args)):
+            self.assertEqual(self._answer(sally, session_id).status_code, 200)
+            self.assertEqual(self.client.post(f"/api/live-games/{session_id}/end/").status_code, 204)
+            sent.clear()
+            deferred[0][0]()
+
+        self.assertEqual(sent, [])
+
+    def test_closing_a_question_sends_each_participant_their_standing(self):
+        session_id = self._start_game(total_questions=2)
+        self.client.post(f"/api/live-games/{session_id}/next/")
+        sally = self._join(session_id)
+        self._join(session_id, first_name="Tom")
+        self.assertEqual(self._answer(sally, session_id).status_code, 200)
+        participants = dict(
+            LiveGameParticipant.objects.filter(session_id=session_id).values_list("display_name", "id")
+        )
+        sent = []
+
+        with mock.patch.object(broadcasts, "send_to_group", side_effect=lambda *args: sent.append(args)):
+            self.client.post(f"/api/live-games/{session_id}/next/")
+
+        frames = dict(sent)
+        self.assertEqual(frames[f"live_game_{session_id}"]["type"], "LEADERBOARD")
+        sally_frame = frames[f"live_game_{session_id}_participant_{participants['Sally S.']}"]
+        tom_frame = frames[f"live_game_{session_id}_participant_{participants['Tom S.']}"]
+        self.assertEqual((sally_frame["type"], sally_frame["rank"]), ("YOU", 1))
+        self.assertEqual((tom_frame["rank"], tom_frame["score"]), (2, 0))
+
+    def test_next_question_pushes_the_preloaded_question_without_its_answer(self):
+        session_id = self._start_game(total_questions=2)
+        frames = []
+        LiveGameSessionViewSet._broadcast_to_game = lambda view, session, payload: frames.append(payload)
+
+        with query_budget(queries=4) as metrics, override_settings(LIVE_REVEAL_LEAD_MS=1000):
+            response = self.client.post(f"/api/live-games/{session_id}/next/")
+        self.assertEqual(response.status_code, 200)
+        # Auth session and user, the game session, and its update.
+        self.assertFalse(any("livegamequestion" in sql for sql, _ in metrics.captured))
+
+        question = LiveGameSession.objects.get(id=session_id).questions.get(index=1)
+        frame = frames[-1]
+        self.assertEqual(frame["type"], "QUESTION")
+        self.assertNotIn("answer", frame["payload"])
+        self.assertEqual(frame["payload"]["word_id"], question.payload["word_id"])
+        self.assertEqual(frame["revealInMs"], 1000)
+        self.assertEqual(frame["startedAt"], frame["revealAt"])
+        self.assertEqual(response.json()["payload"], question.payload)
+
+    def test_answers_before_the_reveal_are_rejected(self):
+        session_id = self._start_game()
+        with override_settings(LIVE_REVEAL_LEAD_MS=60_000):
+            self.client.post(f"/api/live-games/{session_id}/next/")
+        sally = self._join(session_id)
+
+        response = self._answer(sally, session_id)
+        self.assertEqual(response.status_code, 409)
+        self.assertEqual(response.json()["detail"], "Not open yet.")
+        self.assertFalse(LiveGameAnswer.objects.exists())
+
     def test_teacher_console_page_renders(self):
         response = self.client.get(reverse("live_teacher_console"))
         self.assertEqual(response.status_code, 200)
@@ -114,3 +347,88 @@ class LiveGameSessionAPITest(TestCase):
         response = self.client.get(reverse("live_teacher_console"))
         self.assertEqual(response.status_code, 302)
         self.assertIn(reverse("teacher_dashboard"), response["Location"])
+
+
+@skipUnless(_redis_available(), "Redis server not reachable")
+@override_settings(LIVE_GAME_STATE_BACKEND="redis")
+class RedisLiveGameTest(LiveGameSessionAPITest):
+    """The same API with scores held in Redis and answers written behind."""
+
+    def setUp(self):
+        super().setUp()
+        patcher = mock.patch.object(live_state, "async_task")
+        self.async_task = patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def _written(self, session_id):
+        live_state.game_state().flush(session_id)
+
+    def test_answers_are_written_behind(self):
+        session_id = self._start_game(total_questions=2)
+        self.client.post(f"/api/live-games/{session_id}/next/")
+        sally = self._join(session_id)
+        tom = self._join(session_id, first_name="Tom")
+        answer = self._correct_answer(session_id)
+
+        with query_budget(queries=4):
+            self.assertEqual(self._answer(sally, session_id, answer=answer).status_code, 200)
+        self.assertEqual(self._answer(tom, session_id).status_code, 200)
+        self.assertEqual(self._answer(tom, session_id).status_code, 409)
+
+        # Scored in Redis and queued for the writer, not yet in the database.
+        self.assertFalse(LiveGameAnswer.objects.filter(participant__session_id=session_id).exists())
+        self.async_task.assert_called_once_with(
+            "live.tasks.flush_live_answers", session_id, task_name=f"live-flush-{session_id}"
+        )
+        state = sally.get(f"/api/live-games/{session_id}/state/").json()
+        self.assertEqual([row["name"] for row in state["leaderboard"]], ["Sally S.", "Tom S."])
+        self.assertEqual(state["you"]["rank"], 1)
+
+        self.assertEqual(live_state.game_state().flush(session_id), 2)
+        self.assertEqual(live_state.game_state().flush(session_id), 0)
+        answers = LiveGameAnswer.objects.filter(participant__session_id=session_id)
+        self.assertEqual(answers.count(), 2)
+        self.assertTrue(all(answer.is_correct for answer in answers))
+        sally_row = LiveGameParticipant.objects.get(session_id=session_id, display_name="Sally S.")
+        self.assertEqual(sally_row.score, state["you"]["score"])
+        self.assertEqual(sally_row.streak, 1)
+
+        self.client.post(f"/api/live-games/{session_id}/next/")
+        self.assertEqual(self._answer(tom, session_id, index=2).status_code, 200)
+        self.assertEqual(self.client.post(f"/api/live-games/{session_id}/end/").status_code, 204)
+        self.assertEqual(LiveGameAnswer.objects.filter(participant__session_id=session_id).count(), 3)
+        self.assertEqual(
+            LiveGameParticipant.objects.get(session_id=session_id, display_name="Tom S.").streak, 2
+        )
+        # The game's Redis state, players included, is gone.
+        self.assertEqual(self._answer(tom, session_id, index=2).status_code, 400)
+
+    def test_answers_racing_the_end_of_the_game_leave_final_scores_alone(self):
+        session_id = self._start_game()
+        self.client.post(f"/api/live-games/{session_id}/next/")
+        sally = self._join(session_id)
+        self._join(session_id, first_name="Tom")
+        self.assertEqual(self._answer(sally, session_id).status_code, 200)
+        ids = dict(LiveGameParticipant.objects.filter(session_id=session_id).values_list("display_name", "id"))
+
+        state = live_state.game_state()
+        session = LiveGameSession.objects.get(id=session_id)
+        # Tom's answer got past active_question just before the host ended the game.
+        question = state.active_question(session)
+        self.client.post(f"/api/live-games/{session_id}/end/")
+        with self.assertRaises(live_state.QuestionClosed):
+            state.record_answer(session, ids["Tom S."], question, True, 100)
+        self.assertEqual(list(state.client.scan_iter(match=f"live:{session_id}:*")), [])
+
+        final = LiveGameParticipant.objects.get(pk=ids["Sally S."]).score
+        self.assertGreater(final, 0)
+        # Whatever still reaches the queue of an ended game is not written.
+        state.client.hset(f"live:{session_id}:p:{ids['Sally S.']}", mapping={"score": 5, "streak": 1, "latency": 0})
+        state.client.rpush(f"live:{session_id}:pending", json.dumps({
+            "participant": ids["Sally S."], "question": question.question_id, "is_correct": True,
+            "latency_ms": 0, "submitted_at": "2026-01-01T00:00:00+00:00",
+        }))
+        state.client.sadd(live_state.DIRTY_SESSIONS_KEY, session_id)
+        live_state.flush_all()
+        self.assertEqual(LiveGameParticipant.objects.get(pk=ids["Sally S."]).score, final)
+        self.assertEqual(LiveGameAnswer.objects.filter(participant__session_id=session_id).count(), 1)
@@ -17,26 +17,29 @@ from rest_framework import status, viewsets
 from rest_framework.decorators import action
 from rest_framework.response import Response
 
+from learning.decorators import get_student
 from learning.models import Class, Student, VocabularyList
 from learning.services.question_flow import QuestionFlowEngine
 
+from .answers import AnswerRejected, submit_answer
+from .broadcasts import close_question, send_standings, send_to_game
 from .models import (
-    LiveGameAnswer,
     LiveGameParticipant,
     LiveGameQuestion,
     LiveGameSession,
 )
-from .scoring import calculate_score
 from .serializers import (
     LiveGameCreateSerializer,
     LiveGameSessionSerializer,
     LiveGameStateSerializer,
 )
+from .state import game_state
 from .utils import generate_unique_pin
 
 
 ANNOUNCE_GROUP_PREFIX = "announce_class_"
-GAME_GROUP_PREFIX = "live_game_"
+# How far ahead of its reveal a question is pushed to players.
+REVEAL_LEAD_MS = 1000
 
 
 class LiveGameSessionViewSet(viewsets.GenericViewSet):
@@ -85,8 +88,10 @@ class LiveGameSessionViewSet(viewsets.GenericViewSet):
 
         with transaction.atomic():
             session.questions.all().delete()
-            for idx, payload in enumerate(payloads, start=1):
-                LiveGameQuestion.objects.create(session=session, index=idx, payload=payload)
+            questions = LiveGameQuestion.objects.bulk_create(
+                LiveGameQuestion(session=session, index=idx, payload=payload)
+                for idx, payload in enumerate(payloads, start=1)
+            )
             session.status = "RUNNING"
             session.started_at = timezone.now()
             session.current_question_idx = 0
@@ -100,6 +105,7 @@ class LiveGameSessionViewSet(viewsets.GenericViewSet):
                 "current_question_deadline",
                 "updated_at",
             ])
+        game_state().start(session, questions)
 
         self._broadcast_to_game(session, {
             "type": "GAME_STARTED",
@@ -117,17 +123,23 @@ class LiveGameSessionViewSet(viewsets.GenericViewSet):
         if session.status != "RUNNING":
             return Response({"detail": "Session is not running."}, status=status.HTTP_400_BAD_REQUEST)
 
-        total_questions = session.questions.count()
-        if session.current_question_idx >= total_questions:
+        state = game_state()
+        deck = state.deck(session)
+        if session.current_question_idx >= len(deck):
             return Response({"detail": "No more questions."}, status=status.HTTP_400_BAD_REQUEST)
 
+        if session.current_question_idx:
+            close_question(session)
         next_index = session.current_question_idx + 1
-        question = session.questions.get(index=next_index)
-        started_at = timezone.now()
-        deadline = started_at + timedelta(seconds=session.question_time_sec)
+        question = deck[next_index - 1]
+        # The frame goes out now and clients show it at ``revealAt``, so a slow
+        # connection still gets the question on time. The clock starts then.
+        lead = timedelta(milliseconds=getattr(settings, "LIVE_REVEAL_LEAD_MS", REVEAL_LEAD_MS))
+        reveal_at = timezone.now() + lead
+        deadline = reveal_at + timedelta(seconds=session.question_time_sec)
 
         session.current_question_idx = next_index
-        session.current_question_started_at = started_at
+        session.current_question_started_at = reveal_at
         session.current_question_deadline = deadline
         session.save(update_fields=[
             "current_question_idx",
@@ -135,20 +147,22 @@ class LiveGameSessionViewSet(viewsets.GenericViewSet):
             "current_question_deadline",
             "updated_at",
         ])
-
-        payload = dict(question.payload)
+        state.open_question(session, question, reveal_at, deadline)
 
         self._broadcast_to_game(
             session,
             {
                 "type": "QUESTION",
                 "index": next_index,
-                "payload": payload,
-                "startedAt": started_at.isoformat(),
+                "payload": self.question_engine.public_payload(question.payload),
+                "revealAt": reveal_at.isoformat(),
+                "revealInMs": int(lead.total_seconds() * 1000),
+                "startedAt": reveal_at.isoformat(),
                 "deadlineAt": deadline.isoformat(),
             },
         )
-        return Response({"index": next_index})
+        # Only the host sees the answer.
+        return Response({"index": next_index, "revealAt": reveal_at.isoformat(), "payload": question.payload})
 
     @action(detail=True, methods=["post"])
     def end(self, request, pk=None):
@@ -160,7 +174,10 @@ class LiveGameSessionViewSet(viewsets.GenericViewSet):
         session.ended_at = timezone.now()
         session.save(update_fields=["status", "ended_at", "updated_at"])
 
-        leaderboard = self._build_leaderboard(session)
+        state = game_state()
+        leaderboard = state.leaderboard(session)
+        send_standings(session)
+        state.end(session)
         self._broadcast_to_game(session, {
             "type": "GAME_ENDED",
             "finalTop": leaderboard,
@@ -190,6 +207,7 @@ class LiveGameSessionViewSet(viewsets.GenericViewSet):
             )
         request.session[f"live_participant_{session.id}"] = str(participant.id)
         request.session.modified = True
+        game_state().add_participant(session, participant)
 
         state = LiveGameStateSerializer.from_session(session, you=participant)
         self._broadcast_to_game(session, {
@@ -206,65 +224,17 @@ class LiveGameSessionViewSet(viewsets.GenericViewSet):
         if student is None:
             return Response({"detail": "Student authentication required."}, status=status.HTTP_403_FORBIDDEN)
 
-        participant = self._get_participant_from_session(session, request)
-        if not participant:
-            return Response({"detail": "Join the session first."}, status=status.HTTP_400_BAD_REQUEST)
-
-        question_index = request.data.get("questionIndex")
-        answer_payload = request.data.get("answerPayload")
-        if not isinstance(question_index, int):
-            return Response({"detail": "Invalid question index."}, status=status.HTTP_400_BAD_REQUEST)
-
-        if session.current_question_idx != question_index:
-            return Response({"detail": "Question mismatch."}, status=status.HTTP_409_CONFLICT)
-
         try:
-            question = session.questions.get(index=question_index)
-        except LiveGameQuestion.DoesNotExist:
-            return Response({"detail": "Question not found."}, status=status.HTTP_404_NOT_FOUND)
-
-        if LiveGameAnswer.objects.filter(participant=participant, question=question).exists():
-            return Response({"detail": "Answer already submitted."}, status=status.HTTP_409_CONFLICT)
-
-        if session.current_question_deadline and timezone.now() > session.current_question_deadline:
-            return Response({"detail": "Too late."}, status=status.HTTP_400_BAD_REQUEST)
-
-        if session.current_question_started_at:
-            latency_ms = int((timezone.now() - session.current_question_started_at).total_seconds() * 1000)
-        else:
-            latency_ms = 0
-
-        normalize_result = self.question_engine.normalize_and_score(question.payload, answer_payload)
-        score_result = calculate_score(normalize_result.is_correct, latency_ms, participant.streak)
-
-        with transaction.atomic():
-            LiveGameAnswer.objects.create(
-                participant=participant,
-                question=question,
-                is_correct=normalize_result.is_correct,
-                latency_ms=latency_ms,
+            accepted = submit_answer(
+                session,
+                self._participant_id(session, request),
+                request.data.get("questionIndex"),
+                request.data.get("answerPayload"),
+                self.question_engine,
             )
-            participant.score += score_result.score_delta
-            participant.streak = score_result.new_streak
-            participant.total_latency_ms += latency_ms
-            participant.save(update_fields=["score", "streak", "total_latency_ms"])
-
-        leaderboard = self._build_leaderboard(session)
-        you_snapshot = {
-            "rank": self._participant_rank(session, participant),
-            "score": participant.score,
-            "streak": participant.streak,
-        }
-        self._broadcast_to_game(
-            session,
-            {"type": "LEADERBOARD", "top": leaderboard, "you": you_snapshot},
-        )
-
-        return Response({
-            "accepted": True,
-            "isCorrect": normalize_result.is_correct,
-            "scoreDelta": score_result.score_delta,
-        })
+        except AnswerRejected as exc:
+            return Response({"detail": exc.detail}, status=exc.status)
+        return Response(accepted.as_dict())
 
     @action(detail=True, methods=["get"])
     def state(self, request, pk=None):
@@ -296,22 +266,17 @@ class LiveGameSessionViewSet(viewsets.GenericViewSet):
         )
 
     def _broadcast_to_game(self, session: LiveGameSession, payload: Dict[str, Any]) -> None:
-        channel_layer = get_channel_layer()
-        if channel_layer is None:
-            return
-        async_to_sync(channel_layer.group_send)(
-            f"{GAME_GROUP_PREFIX}{session.id}",
-            {"type": "broadcast", "event": payload},
-        )
+        send_to_game(session, payload)
 
     def _resolve_student(self, request) -> Optional[Student]:
-        student_id = request.session.get("student_id")
-        if not student_id:
-            return None
-        try:
-            return Student.objects.get(id=student_id)
-        except Student.DoesNotExist:  # pragma: no cover
-            return None
+        return get_student(request._request)
+
+    def _participant_id(self, session: LiveGameSession, request) -> Optional[int]:
+        participant_id = request.session.get(f"live_participant_{session.id}")
+        if participant_id:
+            return int(participant_id)
+        participant = self._get_participant_from_session(session, request)
+        return participant.pk if participant else None
 
     def _get_participant_from_session(
         self, session: LiveGameSession, request
@@ -333,27 +298,6 @@ class LiveGameSessionViewSet(viewsets.GenericViewSet):
             suffix += 1
         return candidate
 
-    def _build_leaderboard(self, session: LiveGameSession, limit: int = 20) -> Any:
-        participants = (
-            session.participants.all()
-            .order_by("-score", "total_latency_ms", "joined_at")[:limit]
-        )
-        return [
-            {
-                "rank": idx + 1,
-                "name": participant.display_name,
-                "score": participant.score,
-                "streak": participant.streak,
-            }
-            for idx, participant in enumerate(participants)
-        ]
-
-    def _participant_rank(self, session: LiveGameSession, participant: LiveGameParticipant) -> int:
-        return (
-            session.participants.filter(score__gt=participant.score).count()
-            + 1
-        )
-
 
 @login_required
 def teacher_live_console(request):
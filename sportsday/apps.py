@@ -4,3 +4,6 @@ from django.apps import AppConfig
 class SportsdayConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "sportsday"
+
+    def ready(self):
+        from . import exports  # noqa: F401  (registers export kinds)
@@ -0,0 +1,188 @@
+"""CSV row builders and background export kinds for sports day meets.
+
+The row builders back both the direct downloads in ``views`` and the
+background jobs registered here (see ``learning.export_jobs``).
+"""
+
+from __future__ import annotations
+
+import json
+from typing import Iterable
+
+from django.db.models import Prefetch
+
+from learning.export_jobs import ExportFile, ProgressTracker, csv_chunks, exporter
+
+from . import models, services
+
+
+EVENT_BACKUP_HEADERS = [
+    "event_name",
+    "sport_type",
+    "grade_min",
+    "grade_max",
+    "gender_limit",
+    "measure_unit",
+    "capacity",
+    "attempts",
+    "rounds_total",
+    "knockout_qualifiers",
+    "schedule",
+    "location",
+    "notes",
+    "is_locked",
+    "teacher_refs",
+    "entry_student_ref",
+    "entry_student_first_name",
+    "entry_student_last_name",
+    "entry_student_grade",
+    "entry_round",
+    "entry_heat",
+    "entry_lane_or_order",
+    "entry_status",
+    "result_best_value",
+    "result_rank",
+    "result_tiebreak",
+    "result_finalized",
+]
+
+
+def _teacher_reference(teacher: models.Teacher) -> str:
+    """Return a stable identifier for a teacher for backup files."""
+
+    return teacher.external_id or f"id:{teacher.pk}"
+
+
+def _student_reference(student: models.Student) -> str:
+    """Return a stable identifier for a student for backup files."""
+
+    return student.external_id or f"id:{student.pk}"
+
+
+def events_backup_rows(meet: models.Meet) -> Iterable[list]:
+    """Yield the backup CSV rows, header first, for every event in ``meet``."""
+
+    entries_prefetch = Prefetch(
+        "entries",
+        queryset=(
+            models.Entry.objects.select_related("student", "result")
+            .order_by("round_no", "heat", "lane_or_order", "pk")
+        ),
+        to_attr="backup_entries",
+    )
+    events = (
+        meet.events.select_related("sport_type")
+        .prefetch_related("assigned_teachers", entries_prefetch)
+        .order_by(*services.SCHEDULE_ORDERING)
+    )
+
+    yield EVENT_BACKUP_HEADERS
+    for event in events:
+        teacher_refs = ";".join(_teacher_reference(teacher) for teacher in event.assigned_teachers.all())
+        entries = list(getattr(event, "backup_entries", []))
+        base_row = [
+            event.name,
+            event.sport_type.key,
+            event.grade_min,
+            event.grade_max,
+            event.gender_limit,
+            event.measure_unit,
+            event.capacity,
+            event.attempts,
+            event.rounds_total,
+            event.knockout_qualifiers,
+            event.schedule_dt.isoformat() if event.schedule_dt else "",
+            event.location,
+            event.notes,
+            "1" if event.is_locked else "0",
+            teacher_refs,
+        ]
+        if not entries:
+            yield base_row + ["" for _ in EVENT_BACKUP_HEADERS[len(base_row) :]]
+            continue
+        for entry in entries:
+            student = entry.student
+            result = getattr(entry, "result", None)
+            yield base_row + [
+                _student_reference(student),
+                student.first_name,
+                student.last_name,
+                student.grade,
+                entry.round_no,
+                entry.heat,
+                entry.lane_or_order or "",
+                entry.status,
+                str(result.best_value) if result and result.best_value is not None else "",
+                result.rank if result else "",
+                json.dumps(result.tiebreak) if result and result.tiebreak else "",
+                "1" if result and result.finalized else "",
+            ]
+
+
+RESULTS_CSV_HEADERS = [
+    "Event",
+    "Round",
+    "Heat",
+    "Lane/Order",
+    "Student",
+    "House",
+    "Grade",
+    "Rank",
+    "Status",
+    "Performance",
+    "Points",
+    "Participation",
+    "Total",
+]
+
+
+def results_csv_rows(meet: models.Meet) -> Iterable[list]:
+    """Yield the results CSV rows, header first, sorted by event and rank."""
+
+    records = services.compute_scoring_records(meet)
+    sorted_records = sorted(
+        records,
+        key=lambda record: (
+            record.event.name,
+            record.rank or 999,
+            record.student.last_name,
+            record.student.first_name,
+        ),
+    )
+    yield RESULTS_CSV_HEADERS
+    for record in sorted_records:
+        entry = record.entry
+        yield [
+            record.event.name,
+            entry.round_no,
+            entry.heat,
+            entry.lane_or_order or "",
+            f"{record.student.first_name} {record.student.last_name}",
+            record.house,
+            record.grade,
+            record.rank or "",
+            entry.get_status_display(),
+            format(record.best_value.normalize(), "f") if record.best_value is not None else "",
+            services.format_decimal(record.points),
+            services.format_decimal(record.participation),
+            services.format_decimal(record.total),
+        ]
+
+
+@exporter("sportsday-results")
+def export_results(params: dict, tracker: ProgressTracker) -> ExportFile:
+    meet = models.Meet.objects.get(slug=params["meet"])
+    return ExportFile(
+        filename=f"sportsday-results-{meet.slug}.csv",
+        chunks=csv_chunks(tracker.track(results_csv_rows(meet))),
+    )
+
+
+@exporter("sportsday-backup")
+def export_events_backup(params: dict, tracker: ProgressTracker) -> ExportFile:
+    meet = models.Meet.objects.get(slug=params["meet"])
+    tracker.total = models.Entry.objects.filter(event__meet=meet).count() + meet.events.count() + 1
+    return ExportFile(
+        filename=f"meet-backup-{meet.slug}.csv",
+        chunks=csv_chunks(tracker.track(events_backup_rows(meet))),
+    )
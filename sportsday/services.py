@@ -29,9 +29,15 @@ __all__ = [
     "compute_scoring_records",
     "compute_timetable_clashes",
     "generate_events",
+    "format_decimal",
+    "SCHEDULE_ORDERING",
 ]
 
 
+# Events in timetable order, unscheduled ones last.
+SCHEDULE_ORDERING = (F("schedule_dt").asc(nulls_last=True), "pk")
+
+
 @dataclass(frozen=True)
 class ScoringRecord:
     """Container describing the scoring outcome for an entry."""
@@ -209,6 +215,16 @@ def parse_imperial_distance(value: str | float | Decimal | None) -> Decimal | No
     return metres.quantize(Decimal("0.001"))
 
 
+def format_decimal(value: Decimal | None) -> str:
+    """Format a points value: whole numbers bare, anything else to two places."""
+
+    if value is None:
+        return "0"
+    if value == value.quantize(Decimal("1")):
+        return f"{value.quantize(Decimal('1'))}"
+    return f"{value.quantize(Decimal('0.01'))}"
+
+
 def compute_timetable_clashes(
     *,
     student: models.Student,
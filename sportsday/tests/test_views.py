@@ -1,5 +1,8 @@
+import shutil
+import tempfile
 from datetime import datetime, time
 from decimal import Decimal
+from unittest import mock
 
 from django.contrib.auth import get_user_model
 from django.test import TestCase, override_settings
@@ -220,6 +223,33 @@ class SportsdayViewsTests(TestCase):
         self.assertEqual(response.status_code, 200)
         self.assertIn(self.other_student.last_name, response.content.decode("utf-8"))
 
+    def test_export_results_csv_in_background(self):
+        from learning.export_jobs import run_export_job
+
+        final_entry = models.Entry.objects.create(
+            event=self.event,
+            student=self.other_student,
+            round_no=self.event.rounds_total,
+            heat=1,
+        )
+        models.Result.objects.create(entry=final_entry, rank=1, best_value=Decimal("12.345"), finalized=True)
+        expected = self.client.get(reverse("sportsday:export-results-csv"), {"meet": self.meet.slug}).content
+
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root, ignore_errors=True)
+        with mock.patch("learning.export_jobs.async_task"), override_settings(MEDIA_ROOT=media_root):
+            params = {"meet": self.meet.slug, "background": "1"}
+            anonymous = self.client.get(reverse("sportsday:export-results-csv"), params)
+            self.assertEqual(anonymous.status_code, 403)
+
+            self.client.force_login(get_user_model().objects.create_user(username="exporter", password="pw"))
+            response = self.client.get(reverse("sportsday:export-results-csv"), params)
+            self.assertEqual(response.status_code, 202)
+            job = run_export_job(response.json()["id"])
+            self.assertEqual(job.status, "done")
+            with job.file.open("rb") as handle:
+                self.assertEqual(handle.read(), expected)
+
     def test_export_leaderboard_csv_contains_header(self):
         final_entry = models.Entry.objects.create(
             event=self.event,
@@ -22,6 +22,7 @@ from django.http import (
     HttpRequest,
     HttpResponse,
     HttpResponseBadRequest,
+    HttpResponseForbidden,
 )
 from django.shortcuts import get_object_or_404, redirect, render
 from django.urls import reverse
@@ -29,60 +30,17 @@ from django.utils import timezone
 from django.utils.http import url_has_allowed_host_and_scheme
 from django.views.decorators.http import require_POST
 
-from . import forms, models, qr, services
+from learning.export_jobs import enqueue_export, enqueued_response
 
-
-LOCKED_STATUS_CODE = 423
+from . import exports, forms, models, qr, services
 
 
-SCHEDULE_ORDERING = (F("schedule_dt").asc(nulls_last=True), "pk")
+LOCKED_STATUS_CODE = 423
 
 
 QUICK_ASSIGNMENT_LOG_SESSION_KEY = "sportsday.quick-assignments.log"
 QUICK_ASSIGNMENT_LOG_LIMIT = 50
 
-EVENT_BACKUP_HEADERS = [
-    "event_name",
-    "sport_type",
-    "grade_min",
-    "grade_max",
-    "gender_limit",
-    "measure_unit",
-    "capacity",
-    "attempts",
-    "rounds_total",
-    "knockout_qualifiers",
-    "schedule",
-    "location",
-    "notes",
-    "is_locked",
-    "teacher_refs",
-    "entry_student_ref",
-    "entry_student_first_name",
-    "entry_student_last_name",
-    "entry_student_grade",
-    "entry_round",
-    "entry_heat",
-    "entry_lane_or_order",
-    "entry_status",
-    "result_best_value",
-    "result_rank",
-    "result_tiebreak",
-    "result_finalized",
-]
-
-
-def _teacher_reference(teacher: models.Teacher) -> str:
-    """Return a stable identifier for a teacher for backup files."""
-
-    return teacher.external_id or f"id:{teacher.pk}"
-
-
-def _student_reference(student: models.Student) -> str:
-    """Return a stable identifier for a student for backup files."""
-
-    return student.external_id or f"id:{student.pk}"
-
 
 def _parse_bool(value) -> bool:
     """Interpret various truthy representations from CSV uploads."""
@@ -280,14 +238,6 @@ def _event_lock_reason(event: models.Event) -> str | None:
     return None
 
 
-def _format_decimal(value: Decimal | None) -> str:
-    if value is None:
-        return "0"
-    if value == value.quantize(Decimal("1")):
-        return f"{value.quantize(Decimal('1'))}"
-    return f"{value.quantize(Decimal('0.01'))}"
-
-
 def _format_result_value(event: models.Event, value: Decimal | None) -> str:
     """Return a human readable performance string for an event result."""
 
@@ -1414,7 +1364,7 @@ def meet_detail(request: HttpRequest, slug: str) -> HttpResponse:
     """Meet hub with schedule cards and quick links."""
 
     meet = get_object_or_404(models.Meet.objects.prefetch_related("events", "events__assigned_teachers"), slug=slug)
-    highlight_event = meet.events.order_by(*SCHEDULE_ORDERING).first()
+    highlight_event = meet.events.order_by(*services.SCHEDULE_ORDERING).first()
     mobile_nav, mobile_nav_active = _build_meet_mobile_nav(meet, active="start")
     entries_total = models.Entry.objects.filter(event__meet=meet).count()
     students_total = meet.participating_students().count()
@@ -1438,7 +1388,7 @@ def meet_schedule_fragment(request: HttpRequest, slug: str) -> HttpResponse:
     """HTMX fragment summarising the meet schedule."""
 
     meet = get_object_or_404(models.Meet.objects.prefetch_related("events", "events__assigned_teachers"), slug=slug)
-    events = list(meet.events.select_related("sport_type").order_by(*SCHEDULE_ORDERING))
+    events = list(meet.events.select_related("sport_type").order_by(*services.SCHEDULE_ORDERING))
     teachers_assigned = models.Teacher.objects.filter(events__meet=meet).distinct().count()
 
     def bucket(event: models.Event) -> str:
@@ -1501,7 +1451,7 @@ def meet_people_fragment(request: HttpRequest, slug: str) -> HttpResponse:
     )
     teacher_assignments = []
     for teacher in teachers:
-        events = list(teacher.events.filter(meet=meet).order_by(*SCHEDULE_ORDERING))
+        events = list(teacher.events.filter(meet=meet).order_by(*services.SCHEDULE_ORDERING))
         if events:
             label = ", ".join(e.name for e in events[:3])
             if len(events) > 3:
@@ -2487,7 +2437,7 @@ def event_list(request: HttpRequest) -> HttpResponse:
             .select_related("sport_type", "meet")
             .prefetch_related("assigned_teachers")
             .annotate(entries_total=Count("entries", distinct=True))
-            .order_by(*SCHEDULE_ORDERING)
+            .order_by(*services.SCHEDULE_ORDERING)
         )
         if query:
             events = events.filter(
@@ -3181,7 +3131,7 @@ def events_table_fragment(request: HttpRequest) -> HttpResponse:
     events = models.Event.objects.select_related("sport_type", "meet")
     if meet_slug:
         events = events.filter(meet__slug=meet_slug)
-    events = events.order_by(*SCHEDULE_ORDERING)[:10]
+    events = events.order_by(*services.SCHEDULE_ORDERING)[:10]
     return render(request, "sportsday/partials/events_table.html", {"events": events})
 
 
@@ -4178,7 +4128,7 @@ def export_events_overview(request: HttpRequest) -> HttpResponse:
     events = (
         meet.events.select_related("sport_type")
         .prefetch_related("assigned_teachers", entries_prefetch)
-        .order_by(*SCHEDULE_ORDERING)
+        .order_by(*services.SCHEDULE_ORDERING)
     )
 
     payload: list[dict[str, object]] = []
@@ -4204,71 +4154,22 @@ def export_events_overview(request: HttpRequest) -> HttpResponse:
 
 
 def events_backup_download(request: HttpRequest, slug: str) -> HttpResponse:
-    """Download a CSV backup containing events, entries, and results."""
+    """Download a CSV backup containing events, entries, and results.
+
+    Pass ``?background=1`` to build the file on the task cluster instead.
+    """
 
     meet = get_object_or_404(models.Meet, slug=slug)
-    entries_prefetch = Prefetch(
-        "entries",
-        queryset=(
-            models.Entry.objects.select_related("student", "result")
-            .order_by("round_no", "heat", "lane_or_order", "pk")
-        ),
-        to_attr="backup_entries",
-    )
-    events = (
-        meet.events.select_related("sport_type")
-        .prefetch_related("assigned_teachers", entries_prefetch)
-        .order_by(*SCHEDULE_ORDERING)
-    )
+    if request.GET.get("background"):
+        if not request.user.is_authenticated:
+            return HttpResponseForbidden("Sign in to run exports in the background.")
+        return enqueued_response(enqueue_export("sportsday-backup", {"meet": meet.slug}, request.user))
 
     response = HttpResponse(content_type="text/csv")
     response["Content-Disposition"] = (
         f'attachment; filename="meet-backup-{meet.slug}.csv"'
     )
-    writer = csv.writer(response)
-    writer.writerow(EVENT_BACKUP_HEADERS)
-
-    for event in events:
-        teacher_refs = ";".join(_teacher_reference(teacher) for teacher in event.assigned_teachers.all())
-        entries = list(getattr(event, "backup_entries", []))
-        base_row = [
-            event.name,
-            event.sport_type.key,
-            event.grade_min,
-            event.grade_max,
-            event.gender_limit,
-            event.measure_unit,
-            event.capacity,
-            event.attempts,
-            event.rounds_total,
-            event.knockout_qualifiers,
-            event.schedule_dt.isoformat() if event.schedule_dt else "",
-            event.location,
-            event.notes,
-            "1" if event.is_locked else "0",
-            teacher_refs,
-        ]
-        if not entries:
-            writer.writerow(base_row + ["" for _ in EVENT_BACKUP_HEADERS[len(base_row) :]])
-            continue
-        for entry in entries:
-            student = entry.student
-            result = getattr(entry, "result", None)
-            row = base_row + [
-                _student_reference(student),
-                student.first_name,
-                student.last_name,
-                student.grade,
-                entry.round_no,
-                entry.heat,
-                entry.lane_or_order or "",
-                entry.status,
-                str(result.best_value) if result and result.best_value is not None else "",
-                result.rank if result else "",
-                json.dumps(result.tiebreak) if result and result.tiebreak else "",
-                "1" if result and result.finalized else "",
-            ]
-            writer.writerow(row)
+    csv.writer(response).writerows(exports.events_backup_rows(meet))
     return response
 
 
@@ -4579,7 +4480,7 @@ def export_teacher_allocations(request: HttpRequest) -> HttpResponse:
     events = (
         meet.events.select_related("sport_type")
         .prefetch_related("assigned_teachers")
-        .order_by(*SCHEDULE_ORDERING)
+        .order_by(*services.SCHEDULE_ORDERING)
     )
 
     allocations: list[dict[str, object]] = []
@@ -4605,7 +4506,7 @@ def export_event_schedule(request: HttpRequest) -> HttpResponse:
     events = (
         meet.events.select_related("sport_type")
         .prefetch_related("assigned_teachers")
-        .order_by(*SCHEDULE_ORDERING)
+        .order_by(*services.SCHEDULE_ORDERING)
     )
 
     scheduled: list[dict[str, object]] = []
@@ -4737,61 +4638,23 @@ def export_startlists_csv(request: HttpRequest) -> HttpResponse:
 
 
 def export_results_csv(request: HttpRequest) -> HttpResponse:
-    """Download finalized results with scoring allocations."""
+    """Download finalized results with scoring allocations.
+
+    Pass ``background=1`` to build the file on the task cluster instead.
+    """
 
     meet_slug = request.GET.get("meet")
     if not meet_slug:
         return HttpResponseBadRequest("Provide a meet slug via ?meet=slug.")
     meet = get_object_or_404(models.Meet, slug=meet_slug)
-    records = services.compute_scoring_records(meet)
+    if request.GET.get("background"):
+        if not request.user.is_authenticated:
+            return HttpResponseForbidden("Sign in to run exports in the background.")
+        return enqueued_response(enqueue_export("sportsday-results", {"meet": meet.slug}, request.user))
+
     response = HttpResponse(content_type="text/csv")
     response["Content-Disposition"] = f'attachment; filename="sportsday-results-{meet.slug}.csv"'
-    writer = csv.writer(response)
-    writer.writerow(
-        [
-            "Event",
-            "Round",
-            "Heat",
-            "Lane/Order",
-            "Student",
-            "House",
-            "Grade",
-            "Rank",
-            "Status",
-            "Performance",
-            "Points",
-            "Participation",
-            "Total",
-        ]
-    )
-    sorted_records = sorted(
-        records,
-        key=lambda record: (
-            record.event.name,
-            record.rank or 999,
-            record.student.last_name,
-            record.student.first_name,
-        ),
-    )
-    for record in sorted_records:
-        entry = record.entry
-        writer.writerow(
-            [
-                record.event.name,
-                entry.round_no,
-                entry.heat,
-                entry.lane_or_order or "",
-                f"{record.student.first_name} {record.student.last_name}",
-                record.house,
-                record.grade,
-                record.rank or "",
-                entry.get_status_display(),
-                format(record.best_value.normalize(), "f") if record.best_value is not None else "",
-                _format_decimal(record.points),
-                _format_decimal(record.participation),
-                _format_decimal(record.total),
-            ]
-        )
+    csv.writer(response).writerows(exports.results_csv_rows(meet))
     return response
 
 
@@ -4820,7 +4683,7 @@ def export_results_ticker(request: HttpRequest) -> HttpResponse:
     events = (
         meet.events.select_related("sport_type")
         .prefetch_related("assigned_teachers", results_prefetch)
-        .order_by(*SCHEDULE_ORDERING)
+        .order_by(*services.SCHEDULE_ORDERING)
     )
 
     events_payload: list[dict[str, object]] = []
@@ -4884,17 +4747,17 @@ def export_leaderboard_csv(request: HttpRequest) -> HttpResponse:
     writer.writerow([f"Overall house points for {meet.name}"])
     writer.writerow(["House", "Points", "Athletes"])
     for row in summaries["overall"]:
-        writer.writerow([row["house"], _format_decimal(row["points"]), row["athletes"]])
+        writer.writerow([row["house"], services.format_decimal(row["points"]), row["athletes"]])
     writer.writerow([])
     writer.writerow(["By grade"])
     writer.writerow(["Grade", "House", "Points", "Athletes"])
     for row in summaries["grade"]:
-        writer.writerow([row["grade"], row["house"], _format_decimal(row["points"]), row["athletes"]])
+        writer.writerow([row["grade"], row["house"], services.format_decimal(row["points"]), row["athletes"]])
     writer.writerow([])
     writer.writerow(["By event"])
     writer.writerow(["Event", "House", "Points", "Entries"])
     for row in summaries["event"]:
-        writer.writerow([row["event"].name, row["house"], _format_decimal(row["points"]), row["entries"]])
+        writer.writerow([row["event"].name, row["house"], services.format_decimal(row["points"]), row["entries"]])
     writer.writerow([])
     writer.writerow(["Participation"])
     writer.writerow(["House", "Participation pts", "Entries", "Athletes", "Events"])
@@ -4902,7 +4765,7 @@ def export_leaderboard_csv(request: HttpRequest) -> HttpResponse:
         writer.writerow(
             [
                 row["house"],
-                _format_decimal(row["points"]),
+                services.format_decimal(row["points"]),
                 row["entries"],
                 row["athletes"],
                 row["events"],
@@ -5274,7 +5137,7 @@ def _compute_leaderboard(
             [
                 {"value": item["grade"]},
                 {"value": item["house"]},
-                {"value": _format_decimal(item["points"]), "align": "text-right"},
+                {"value": services.format_decimal(item["points"]), "align": "text-right"},
                 {"value": item["athletes"], "align": "text-right"},
             ]
             for item in summaries["grade"]
@@ -5292,7 +5155,7 @@ def _compute_leaderboard(
             [
                 {"value": item["event"].name},
                 {"value": item["house"]},
-                {"value": _format_decimal(item["points"]), "align": "text-right"},
+                {"value": services.format_decimal(item["points"]), "align": "text-right"},
                 {"value": item["entries"], "align": "text-right"},
             ]
             for item in summaries["event"]
@@ -5309,7 +5172,7 @@ def _compute_leaderboard(
         rows = [
             [
                 {"value": item["house"]},
-                {"value": _format_decimal(item["points"]), "align": "text-right"},
+                {"value": services.format_decimal(item["points"]), "align": "text-right"},
                 {"value": item["entries"], "align": "text-right"},
                 {"value": item["athletes"], "align": "text-right"},
                 {"value": item["events"], "align": "text-right"},
@@ -5334,9 +5197,9 @@ def _compute_leaderboard(
                 {"value": item["house"]},
                 {"value": item["gender"].title() or "—"},
                 {"value": item["events"], "align": "text-right"},
-                {"value": _format_decimal(item["points"]), "align": "text-right"},
-                {"value": _format_decimal(item["participation"]), "align": "text-right"},
-                {"value": _format_decimal(item["total"]), "align": "text-right"},
+                {"value": services.format_decimal(item["points"]), "align": "text-right"},
+                {"value": services.format_decimal(item["participation"]), "align": "text-right"},
+                {"value": services.format_decimal(item["total"]), "align": "text-right"},
             ]
             for item in student_totals
         ]
@@ -5361,7 +5224,7 @@ def _compute_leaderboard(
                 return "—"
             events = entry["events"]
             event_suffix = "event" if events == 1 else "events"
-            return f"{entry['student']} · {_format_decimal(entry['total'])} pts ({events} {event_suffix})"
+            return f"{entry['student']} · {services.format_decimal(entry['total'])} pts ({events} {event_suffix})"
 
         rows = [
             [
@@ -5384,7 +5247,7 @@ def _compute_leaderboard(
         rows = [
             [
                 {"value": item["house"]},
-                {"value": _format_decimal(item["points"]), "align": "text-right"},
+                {"value": services.format_decimal(item["points"]), "align": "text-right"},
                 {"value": item["athletes"], "align": "text-right"},
             ]
             for item in summaries["overall"]